@@ -0,0 +1,172 @@
+"""Benchmark approximate vector search: recall@k and latency against exact search."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.rag.ann import HNSWConfig, IVFPQConfig, hnswlib
+from app.rag.corpus import DocumentEntry
+from app.rag.vectorstore import LocalStoreConfig, LocalVectorStore
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare ANN indexes with exact search on a local vector store"
+    )
+    parser.add_argument(
+        "--store-dir",
+        help="Existing store directory; synthetic vectors are used when omitted",
+    )
+    parser.add_argument(
+        "--collection",
+        default="exoai_corpus",
+        help="Collection name inside --store-dir",
+    )
+    parser.add_argument("--rows", type=int, default=200_000, help="Synthetic vectors")
+    parser.add_argument(
+        "--dim", type=int, default=384, help="Synthetic vector dimension"
+    )
+    parser.add_argument(
+        "--queries", type=int, default=200, help="Queries per configuration"
+    )
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument(
+        "--kinds", nargs="+", default=["ivfpq", "hnsw"], choices=["ivfpq", "hnsw"]
+    )
+    parser.add_argument("--m", type=int, default=None, help="IVF-PQ sub-quantisers")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 64, 256])
+    parser.add_argument("--rerank", type=int, nargs="+", default=[0, 4, 16])
+    return parser.parse_args()
+
+
+def synthetic_store(
+    directory: Path, rows: int, dim: int, rng: np.random.Generator
+) -> LocalStoreConfig:
+    """Fill a store with clustered vectors; real embeddings are far from uniform."""
+
+    config = LocalStoreConfig(
+        directory=directory, collection_name="bench", initial_capacity=rows
+    )
+    centres = rng.normal(size=(max(1, rows // 500), dim)).astype(np.float32)
+    store = LocalVectorStore(config)
+    for start in range(0, rows, 50_000):
+        size = min(50_000, rows - start)
+        vectors = centres[rng.integers(0, len(centres), size)] + 0.3 * rng.normal(
+            size=(size, dim)
+        ).astype(np.float32)
+        entries = [
+            DocumentEntry(doc_id=f"doc-{start + idx}", text="", metadata={})
+            for idx in range(size)
+        ]
+        store.upsert_documents(entries, vectors)
+    return config
+
+
+def measure(
+    store: LocalVectorStore,
+    queries: np.ndarray,
+    k: int,
+    truth: list[set[str]] | None = None,
+):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        hits = store.search(query, limit=k)
+        latencies.append(time.perf_counter() - started)
+        results.append({hit.id for hit in hits})
+    row = {
+        "p50_ms": round(1000 * float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(1000 * float(np.percentile(latencies, 95)), 3),
+    }
+    if truth is not None:
+        row[f"recall@{k}"] = round(
+            float(np.mean([len(r & t) / k for r, t in zip(results, truth)])), 4
+        )
+    return row, results
+
+
+def index_bytes(path: Path) -> int:
+    return sum(item.stat().st_size for item in (path / "ann").iterdir())
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.store_dir:
+            # Note: this writes the built index into the store's ann/ directory.
+            config = LocalStoreConfig(
+                directory=args.store_dir, collection_name=args.collection
+            )
+        else:
+            config = synthetic_store(Path(tmp), args.rows, args.dim, rng)
+        store = LocalVectorStore(config)
+        vectors, alive = store.snapshot()
+        # Perturbed copies of stored vectors stand in for queries about indexed content.
+        queries = np.asarray(
+            vectors[rng.choice(np.flatnonzero(alive), args.queries)], dtype=np.float32
+        )
+        queries += (
+            0.3
+            / np.sqrt(queries.shape[1])
+            * rng.normal(size=queries.shape).astype(np.float32)
+        )
+
+        exact, truth = measure(store, queries, args.k)
+        print(
+            json.dumps(
+                {
+                    "index": "exact",
+                    "rows": len(store),
+                    "matrix_bytes": vectors.nbytes,
+                    **exact,
+                }
+            )
+        )
+
+        for kind in args.kinds:
+            if kind == "hnsw" and hnswlib is None:
+                print(
+                    json.dumps({"index": "hnsw", "skipped": "hnswlib is not installed"})
+                )
+                continue
+            started = time.perf_counter()
+            store.build_index(
+                IVFPQConfig(m=args.m) if kind == "ivfpq" else HNSWConfig()
+            )
+            build = {
+                "build_s": round(time.perf_counter() - started, 1),
+                "index_bytes": index_bytes(store.path),
+            }
+            knobs = (
+                ("nprobe", args.nprobe)
+                if kind == "ivfpq"
+                else ("ef_search", args.ef_search)
+            )
+            for value in knobs[1]:
+                for rerank in args.rerank:
+                    config.index, config.rerank = kind, rerank
+                    setattr(config, knobs[0], value)
+                    row, _ = measure(LocalVectorStore(config), queries, args.k, truth)
+                    print(
+                        json.dumps(
+                            {
+                                "index": kind,
+                                knobs[0]: value,
+                                "rerank": rerank,
+                                **build,
+                                **row,
+                            }
+                        )
+                    )
+
+
+if __name__ == "__main__":
+    main()
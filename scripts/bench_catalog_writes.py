@@ -0,0 +1,113 @@
+"""Benchmark light-curve catalog writes: row-by-row lookups against the bulk upsert."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.db.models import LightCurveRecord, utcnow
+from app.db.operations import UPSERT_CHUNK_SIZE, record_lightcurve_downloads
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare catalog write strategies on a temporary SQLite database"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="Records per run",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=UPSERT_CHUNK_SIZE,
+        help="Rows per bulk statement",
+    )
+    parser.add_argument(
+        "--skip-legacy", action="store_true", help="Only time the bulk upsert"
+    )
+    return parser.parse_args()
+
+
+def legacy_write(
+    session: Session, *, records: Iterable[tuple[str, dict | None]], **_: object
+) -> None:
+    """The previous implementation: one ``SELECT ... WHERE path = ?`` per record."""
+
+    for path, metadata in records:
+        existing = session.exec(
+            select(LightCurveRecord).where(LightCurveRecord.path == path)
+        ).first()
+        if existing:
+            existing.downloaded_at = utcnow()
+            existing.source_metadata = metadata
+        else:
+            session.add(
+                LightCurveRecord(
+                    target="KIC 1",
+                    mission="Kepler",
+                    path=path,
+                    source_metadata=metadata,
+                )
+            )
+    session.commit()
+
+
+def time_passes(
+    write: Callable[..., None], size: int, chunk_size: int
+) -> dict[str, float]:
+    """Time an insert pass over empty tables, then updates the same paths."""
+
+    records = [
+        (f"/data/kplr{idx:09d}.fits", {"QUARTER": idx % 17}) for idx in range(size)
+    ]
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'catalog.db'}")
+        SQLModel.metadata.create_all(engine)
+        for name in ("insert", "update"):
+            with Session(engine) as session:
+                started = time.perf_counter()
+                write(
+                    session,
+                    target="KIC 1",
+                    mission="Kepler",
+                    flux_type="PDCSAP_FLUX",
+                    records=records,
+                    chunk_size=chunk_size,
+                )
+                timings[name] = time.perf_counter() - started
+        engine.dispose()
+    return timings
+
+
+def main() -> None:
+    args = parse_args()
+    engines = {"bulk": record_lightcurve_downloads}
+    if not args.skip_legacy:
+        engines["legacy"] = legacy_write
+    for size in args.sizes:
+        row: dict[str, float | int] = {"records": size}
+        for name, write in engines.items():
+            for phase, seconds in time_passes(write, size, args.chunk_size).items():
+                row[f"{name}_{phase}_rows_per_s"] = round(size / seconds)
+        if not args.skip_legacy:
+            for phase in ("insert", "update"):
+                row[f"{phase}_speedup"] = round(
+                    row[f"bulk_{phase}_rows_per_s"] / row[f"legacy_{phase}_rows_per_s"],
+                    1,
+                )
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
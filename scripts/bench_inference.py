@@ -0,0 +1,119 @@
+"""Benchmark inference latency of the eager, TorchScript and ONNX Runtime backends."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.models.export import export_onnx, export_torchscript, load_backbone
+from app.services.inference import InferenceConfig, InferenceService
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure per-batch latency for each inference backend"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="Lightning checkpoint (default: untrained weights)",
+    )
+    parser.add_argument("--sequence-length", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--intra-op-threads", type=int, default=None)
+    parser.add_argument(
+        "--backends", nargs="+", default=["torch", "torchscript", "onnx"]
+    )
+    return parser.parse_args()
+
+
+def _latencies(
+    service: InferenceService, batch: np.ndarray, iterations: int, warmup: int
+) -> np.ndarray:
+    for _ in range(warmup):
+        service.predict_batch(batch)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        service.predict_batch(batch)
+        samples.append(time.perf_counter() - started)
+    return np.asarray(samples) * 1000.0
+
+
+def main() -> None:
+    args = parse_args()
+    model = load_backbone(args.checkpoint)
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        artifacts = {"torch": None}
+        if "torchscript" in args.backends:
+            artifacts["torchscript"] = str(
+                export_torchscript(
+                    model, Path(tmp) / "model.ts", sequence_length=args.sequence_length
+                )
+            )
+        if "onnx" in args.backends:
+            try:
+                artifacts["onnx"] = str(
+                    export_onnx(
+                        model,
+                        Path(tmp) / "model.onnx",
+                        sequence_length=args.sequence_length,
+                    )
+                )
+            except (
+                Exception
+            ) as exc:  # noqa: BLE001 - report and keep benchmarking the rest
+                print(
+                    json.dumps(
+                        {"backend": "onnx", "skipped": f"{type(exc).__name__}: {exc}"}
+                    )
+                )
+
+        for backend in args.backends:
+            if backend not in artifacts:
+                continue
+            try:
+                service = InferenceService(
+                    InferenceConfig(
+                        checkpoint_path=(
+                            str(args.checkpoint) if args.checkpoint else None
+                        ),
+                        device="cpu",
+                        backend=backend,
+                        model_path=artifacts[backend],
+                        intra_op_threads=args.intra_op_threads,
+                    )
+                )
+            except ImportError as exc:
+                print(json.dumps({"backend": backend, "skipped": str(exc)}))
+                continue
+            for batch_size in args.batch_sizes:
+                batch = rng.normal(
+                    1.0, 1e-3, size=(batch_size, 2, args.sequence_length)
+                ).astype(np.float32)
+                latencies = _latencies(service, batch, args.iterations, args.warmup)
+                print(
+                    json.dumps(
+                        {
+                            "backend": backend,
+                            "batch_size": batch_size,
+                            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+                            "samples_per_second": round(
+                                batch_size * 1000.0 / float(np.median(latencies)), 1
+                            ),
+                        }
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
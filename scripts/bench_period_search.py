@@ -0,0 +1,122 @@
+"""Benchmark the coarse-to-fine period search against lightkurve's BLS periodogram."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.preprocessing.period_search import PeriodSearchConfig, search_periods
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare period search engines on synthetic transits"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=float,
+        default=90.0,
+        help="Days of data (Kepler quarter: 90, mission: 1460)",
+    )
+    parser.add_argument(
+        "--cadence", type=float, default=29.4 / 1440, help="Sampling interval in days"
+    )
+    parser.add_argument(
+        "--period", type=float, default=3.5217, help="Injected transit period in days"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=0.12, help="Injected transit duration in days"
+    )
+    parser.add_argument(
+        "--depth",
+        type=float,
+        default=800e-6,
+        help="Injected transit depth (relative flux)",
+    )
+    parser.add_argument(
+        "--noise", type=float, default=400e-6, help="Per-cadence white noise"
+    )
+    parser.add_argument(
+        "--curves", type=int, default=3, help="Number of synthetic curves"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes for the coarse search"
+    )
+    parser.add_argument(
+        "--skip-lightkurve", action="store_true", help="Only time the new search"
+    )
+    return parser.parse_args()
+
+
+def synthetic_curve(
+    args: argparse.Namespace, seed: int
+) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    times = np.arange(0.0, args.baseline, args.cadence)
+    # Drop ~5% of cadences, like downlink gaps and safe modes.
+    times = times[rng.random(times.size) > 0.05]
+    epoch = rng.uniform(0, args.period)
+    flux = 1.0 + rng.normal(0.0, args.noise, times.size)
+    phase = (times - epoch + args.period / 2) % args.period - args.period / 2
+    flux[np.abs(phase) < args.duration / 2] -= args.depth
+    return times, flux
+
+
+def time_lightkurve(
+    times: np.ndarray, flux: np.ndarray, config: PeriodSearchConfig
+) -> tuple[float, float]:
+    import lightkurve as lk
+
+    started = time.perf_counter()
+    periodogram = lk.LightCurve(time=times, flux=flux).to_periodogram(
+        method="bls",
+        minimum_period=config.period_min,
+        maximum_period=config.period_max,
+    )
+    return time.perf_counter() - started, float(periodogram.period_at_max_power.value)
+
+
+def main() -> None:
+    args = parse_args()
+    config = PeriodSearchConfig(workers=args.workers)
+    rows = []
+    for seed in range(args.curves):
+        series_time, series_flux = synthetic_curve(args, seed)
+        started = time.perf_counter()
+        candidates = search_periods(series_time, series_flux, config)
+        row = {
+            "curve": seed,
+            "points": int(series_time.size),
+            "fast_seconds": round(time.perf_counter() - started, 4),
+            "fast_period": candidates[0].period,
+            "fast_snr": round(candidates[0].snr, 2),
+        }
+        if not args.skip_lightkurve:
+            seconds, period = time_lightkurve(series_time, series_flux, config)
+            row.update(
+                {
+                    "lightkurve_seconds": round(seconds, 4),
+                    "lightkurve_period": period,
+                    "speedup": round(seconds / row["fast_seconds"], 2),
+                }
+            )
+        rows.append(row)
+        print(json.dumps(row))
+
+    fast_total = sum(row["fast_seconds"] for row in rows)
+    summary = {
+        "curves": len(rows),
+        "fast_seconds_per_curve": round(fast_total / len(rows), 4),
+    }
+    if not args.skip_lightkurve:
+        lk_total = sum(row["lightkurve_seconds"] for row in rows)
+        summary["lightkurve_seconds_per_curve"] = round(lk_total / len(rows), 4)
+        summary["speedup"] = round(lk_total / fast_total, 2)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
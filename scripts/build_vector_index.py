@@ -0,0 +1,73 @@
+"""Build the approximate index for the local vector store set in the environment."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.config import get_settings
+from app.dependencies import get_vector_store
+from app.rag.ann import HNSWConfig, IVFPQConfig
+from app.rag.vectorstore import LocalVectorStore
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build an IVF-PQ or HNSW index over the local vector store"
+    )
+    parser.add_argument(
+        "--kind",
+        choices=["ivfpq", "hnsw"],
+        default=get_settings().vector_store_index or "ivfpq",
+    )
+    parser.add_argument(
+        "--nlist",
+        type=int,
+        default=None,
+        help="IVF-PQ coarse cells (default 4 * sqrt(rows))",
+    )
+    parser.add_argument(
+        "--m", type=int, default=None, help="IVF-PQ bytes per vector (default dim // 4)"
+    )
+    parser.add_argument(
+        "--train-size", type=int, default=65536, help="IVF-PQ training sample"
+    )
+    parser.add_argument("--M", type=int, default=16, help="HNSW graph degree")
+    parser.add_argument(
+        "--ef-construction", type=int, default=200, help="HNSW build beam width"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    settings = get_settings()
+    if settings.vector_backend != "local":
+        raise SystemExit(
+            "Set EXOAI_VECTOR_BACKEND=local; Qdrant manages its own indexes"
+        )
+    store = get_vector_store()
+    assert isinstance(store, LocalVectorStore)
+    if args.kind == "hnsw":
+        config = HNSWConfig(M=args.M, ef_construction=args.ef_construction)
+    else:
+        config = IVFPQConfig(nlist=args.nlist, m=args.m, train_size=args.train_size)
+    started = time.perf_counter()
+    store.build_index(config)
+    print(
+        json.dumps(
+            {
+                "kind": args.kind,
+                "rows": len(store),
+                "path": str(store.path / "ann"),
+                "seconds": round(time.perf_counter() - started, 1),
+            }
+        )
+    )
+    if settings.vector_store_index != args.kind:
+        print(f"Set EXOAI_VECTOR_STORE_INDEX={args.kind} to search with this index")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,12 @@
 
 from fastapi import APIRouter
 
-from . import predictions, health, metrics
+from . import health, jobs, metrics, predictions
 
 router = APIRouter()
 router.include_router(health.router, tags=["health"])
 router.include_router(predictions.router, prefix="/predictions", tags=["predictions"])
+router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 router.include_router(metrics.router, tags=["metrics"])
 
 __all__ = ["router"]
@@ -0,0 +1,283 @@
+"""Durable job endpoints: submit long-running work, then poll for its progress."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import time
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
+from pydantic import BaseModel
+
+from .. import dependencies
+from ..auth import User, require_roles
+from ..config import get_settings
+from ..data.ingestion import IngestionRequest
+from ..data.uploads import TooManyFilesError, UploadTooLargeError, extract_lightcurves
+from ..db import cancel_job, create_job, get_job, get_session, list_job_items
+from ..db.models import JOB_FINAL_STATES, JobItemRecord, JobRecord
+from ..executors import StageExecutors
+from ..jobs import JOB_INGEST, JOB_PREDICT, remove_job_uploads
+from .predictions import IngestionJobRequest
+
+router = APIRouter()
+
+T = TypeVar("T")
+
+
+class JobProgress(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    processed: int
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    owner: str | None
+    progress: JobProgress
+    attempts: int
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    url: str
+    items_url: str
+
+
+def _with_session(operation: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    with get_session() as session:
+        return operation(session, *args, **kwargs)
+
+
+def _job_response(request: Request, job: JobRecord) -> JobResponse:
+    return JobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        owner=job.owner,
+        progress=JobProgress(
+            total=job.total_items,
+            succeeded=job.succeeded_items,
+            failed=job.failed_items,
+            processed=job.succeeded_items + job.failed_items,
+        ),
+        attempts=job.attempts,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        url=request.url_for("get_job", job_id=job.id).path,
+        items_url=request.url_for("list_job_items", job_id=job.id).path,
+    )
+
+
+def _item_view(request: Request, item: JobItemRecord) -> dict[str, Any]:
+    result = item.result
+    if result and result.get("plot_id"):
+        result = {
+            **result,
+            "plot_url": request.url_for(
+                "get_preprocessing_plot", plot_id=result["plot_id"]
+            ).path,
+        }
+    return {
+        "position": item.position,
+        "name": item.name,
+        "status": item.status,
+        "result": result,
+        "error": item.error,
+        "completed_at": item.completed_at.isoformat() if item.completed_at else None,
+    }
+
+
+async def _load_job(executors: StageExecutors, job_id: str) -> JobRecord:
+    job = await executors.run("db", _with_session, get_job, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return job
+
+
+@router.post(
+    "/predictions", status_code=status.HTTP_202_ACCEPTED, response_model=JobResponse
+)
+async def submit_prediction_job(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    include_attention: bool = False,
+    executors: StageExecutors = Depends(dependencies.executors_dependency),
+    user: User = Depends(require_roles("astronomer", "admin")),
+) -> JobResponse:
+    """Queue a prediction run over uploaded files and/or tar/zip archives."""
+
+    settings = get_settings()
+    job_id = uuid.uuid4().hex
+    # Absolute paths, so workers in other processes resolve them the same way.
+    directory = (Path(settings.job_upload_dir) / job_id).resolve()
+    try:
+        # Removes ``directory`` itself if extraction fails.
+        entries = await executors.run(
+            "io",
+            extract_lightcurves,
+            [(upload.filename or "upload", upload.file) for upload in files],
+            directory,
+            settings.batch_max_files,
+            settings.batch_max_bytes,
+        )
+    except (TooManyFilesError, UploadTooLargeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)
+        ) from None
+    try:
+        if not entries:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No light-curve files in upload",
+            )
+        job = await executors.run(
+            "db",
+            _with_session,
+            create_job,
+            job_id=job_id,
+            kind=JOB_PREDICT,
+            # The worker removes upload_dir once the job finishes or is cancelled.
+            payload={
+                "include_attention": include_attention,
+                "upload_dir": str(directory),
+            },
+            items=[(name, {"path": str(path)}) for name, path in entries],
+            owner=user.username,
+            max_attempts=settings.job_max_attempts,
+        )
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    return _job_response(request, job)
+
+
+@router.post(
+    "/ingestion", status_code=status.HTTP_202_ACCEPTED, response_model=JobResponse
+)
+async def submit_ingestion_job(
+    request: Request,
+    payload: IngestionJobRequest,
+    executors: StageExecutors = Depends(dependencies.executors_dependency),
+    user: User = Depends(require_roles("admin", "astronomer")),
+) -> JobResponse:
+    """Queue a light-curve download whose progress and downloaded paths are tracked."""
+
+    ingestion = IngestionRequest(**payload.model_dump(exclude={"priority"}))
+    job = await executors.run(
+        "db",
+        _with_session,
+        create_job,
+        job_id=uuid.uuid4().hex,
+        kind=JOB_INGEST,
+        payload=asdict(ingestion),
+        items=[(ingestion.target, None)],
+        owner=user.username,
+        max_attempts=get_settings().job_max_attempts,
+    )
+    return _job_response(request, job)
+
+
+@router.get("/{job_id}", name="get_job", response_model=JobResponse)
+async def get_job_status(
+    request: Request,
+    job_id: str,
+    wait: float = Query(0.0, ge=0.0, description="Seconds to long-poll for completion"),
+    after: int | None = Query(
+        None,
+        ge=0,
+        description="Also return once more than this many items are processed",
+    ),
+    executors: StageExecutors = Depends(dependencies.executors_dependency),
+    user: User = Depends(require_roles("analyst", "astronomer", "admin")),
+) -> JobResponse:
+    """Return a job's status; with ``wait`` the request is held until the job finishes.
+
+    Workers may run in another process, so long-polling re-reads the database every
+    ``job_poll_interval`` seconds rather than waiting on an in-process event.
+    """
+
+    settings = get_settings()
+    deadline = time.monotonic() + min(wait, settings.job_max_wait_seconds)
+    while True:
+        job = await _load_job(executors, job_id)
+        processed = job.succeeded_items + job.failed_items
+        if (
+            job.status in JOB_FINAL_STATES
+            or (after is not None and processed > after)
+            or time.monotonic() >= deadline
+            or await request.is_disconnected()
+        ):
+            return _job_response(request, job)
+        await asyncio.sleep(
+            min(settings.job_poll_interval, max(0.0, deadline - time.monotonic()))
+        )
+
+
+@router.get("/{job_id}/items", name="list_job_items")
+async def get_job_items(
+    request: Request,
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    item_status: str | None = Query(None, alias="status"),
+    executors: StageExecutors = Depends(dependencies.executors_dependency),
+    user: User = Depends(require_roles("analyst", "astronomer", "admin")),
+) -> dict[str, Any]:
+    """Page through per-item results in submission order."""
+
+    await _load_job(executors, job_id)
+    items = await executors.run(
+        "db",
+        _with_session,
+        list_job_items,
+        job_id,
+        offset=offset,
+        limit=limit,
+        status=item_status,
+    )
+    return {
+        "job_id": job_id,
+        "offset": offset,
+        "items": [_item_view(request, item) for item in items],
+    }
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job_endpoint(
+    request: Request,
+    job_id: str,
+    executors: StageExecutors = Depends(dependencies.executors_dependency),
+    user: User = Depends(require_roles("astronomer", "admin")),
+) -> JobResponse:
+    job = await _load_job(executors, job_id)
+    if not await executors.run("db", _with_session, cancel_job, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Job is already {job.status}"
+        )
+    # A queued job is never claimed again, so no worker would remove its files.
+    await executors.run("io", remove_job_uploads, job.payload)
+    return _job_response(request, await _load_job(executors, job_id))
@@ -3,13 +3,14 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Response
-from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from ..telemetry import metrics_registry
 
 router = APIRouter()
 
 
 @router.get("/metrics")
 async def metrics_endpoint() -> Response:
-    registry = CollectorRegistry()
-    data = generate_latest(registry)
+    data = generate_latest(metrics_registry())
     return Response(content=data, media_type=CONTENT_TYPE_LATEST)
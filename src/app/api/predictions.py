@@ -2,24 +2,56 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Any
+import asyncio
+import functools
+import json
+import shutil
+import time
+import uuid
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator, Callable, Sequence, TypeVar
 
 import numpy as np
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
-from ..auth import User, require_roles
-from ..config import get_settings
-from ..db import get_session, record_preprocessing_result
-from ..preprocessing import PreprocessingConfig, preprocess_lightcurve
-from ..rag.pipeline import EvidenceGenerator
-from ..services.inference import InferenceService
 from .. import dependencies
+from ..auth import User, authenticate_token, require_roles
+from ..config import get_settings
 from ..data.ingestion import IngestionRequest
+from ..data.uploads import TooManyFilesError, UploadTooLargeError, extract_lightcurves
+from ..db import get_session
+from ..db import list_candidates as candidate_rows
+from ..db import record_preprocessing_result
+from ..executors import StageExecutors, StageSaturatedError
+from ..preprocessing import (
+    LightCurveStream,
+    PlotStore,
+    PreprocessingConfig,
+    StreamConfig,
+    preprocess_lightcurve,
+)
+from ..rag.pipeline import EvidenceGenerator
+from ..services.batching import MicroBatcher
+from ..telemetry import STAGE_LATENCY, observe_preprocessing
 
 router = APIRouter()
 
+T = TypeVar("T")
+
 
 class PredictionRequest(BaseModel):
     path: str
@@ -42,39 +74,114 @@ class IngestionJobRequest(BaseModel):
     quarter: int | None = None
     campaign: int | None = None
     flux_type: str = "PDCSAP_FLUX"
+    # Higher runs first on the background ingestion queue.
+    priority: int = 0
+
+
+@STAGE_LATENCY.labels(stage="upload").time()
+def _write_upload(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+
+
+def _store_preprocessing_result(
+    path: str, stats: dict[str, Any], figure_path: str | None
+) -> None:
+    with get_session() as session:
+        record_preprocessing_result(
+            session,
+            path=path,
+            stats=stats,
+            figure_path=figure_path,
+        )
+
+
+async def _prerender_plot(
+    executors: StageExecutors, store: PlotStore, plot_id: str
+) -> None:
+    try:
+        await executors.run("plots", store.render, plot_id)
+    except StageSaturatedError:
+        # Best effort only: the plot is still rendered on first fetch.
+        pass
+
+
+def _preprocess_config() -> PreprocessingConfig:
+    settings = get_settings()
+    return PreprocessingConfig(
+        engine=settings.preprocess_engine,
+        period_search=settings.preprocess_period_search,
+    )
+
+
+def _evidence_question(prediction: int) -> str:
+    return (
+        f"Does this light curve indicate an exoplanet transit? Prediction={prediction}"
+    )
 
 
 @router.post("/predict", response_model=PredictionResponse)
 async def predict_from_file(
+    request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    inference: InferenceService = Depends(dependencies.inference_dependency),
+    batcher: MicroBatcher = Depends(dependencies.inference_batcher_dependency),
     evidence_generator: EvidenceGenerator = Depends(dependencies.evidence_dependency),
+    executors: StageExecutors = Depends(dependencies.executors_dependency),
     user: User = Depends(require_roles("astronomer", "admin")),
 ) -> PredictionResponse:
-    tmp_dir = Path("data/uploads")
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    tmp_path = tmp_dir / file.filename
+    # A directory per request: concurrent uploads with the same filename must not
+    # overwrite each other while this one is still being processed.
+    tmp_dir = Path("data/uploads") / uuid.uuid4().hex
+    tmp_path = tmp_dir / (PurePosixPath(file.filename or "upload").name or "upload")
     content = await file.read()
-    tmp_path.write_bytes(content)
+    try:
+        await executors.run("io", _write_upload, tmp_path, content)
 
-    preprocess_cfg = PreprocessingConfig()
-    result = preprocess_lightcurve(tmp_path, config=preprocess_cfg, artifact_dir=Path("data/artifacts/preprocessing"))
+        settings = get_settings()
+        plot_store = dependencies.get_plot_store()
+        cache = dependencies.get_preprocessing_cache()
+        result = await executors.run(
+            "preprocess",
+            preprocess_lightcurve,
+            tmp_path,
+            config=_preprocess_config(),
+            artifact_dir=Path("data/artifacts/preprocessing"),
+            cache=cache,
+            plot_store=plot_store,
+        )
+        observe_preprocessing(result, cache=cache)
 
-    inputs = np.stack((result["time"], result["flux"]))
-    prediction, probability, attention = inference.predict(inputs)
+        inputs = np.stack((result["time"], result["flux"]))
+        async with executors.admit("inference"):
+            prediction, probability, attention = await batcher.submit(inputs)
 
-    stats = result.get("statistics")
-    if stats:
-        with get_session() as session:
-            record_preprocessing_result(
-                session,
-                path=str(tmp_path),
-                stats=stats,
-                figure_path=result.get("plot_path"),
+        stats = result.get("statistics")
+        pending = [
+            executors.run(
+                "rag", evidence_generator.generate, _evidence_question(prediction)
             )
+        ]
+        if stats:
+            pending.append(
+                executors.run(
+                    "db",
+                    _store_preprocessing_result,
+                    str(tmp_path),
+                    stats,
+                    result.get("plot_path"),
+                )
+            )
+        evidence, *_ = await asyncio.gather(*pending)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
-    question = f"Does this light curve indicate an exoplanet transit? Prediction={prediction}"
-    evidence = evidence_generator.generate(question)
+    plot_id = result.get("plot_id")
+    plot_url = None
+    if plot_id and plot_store is not None:
+        plot_url = request.url_for("get_preprocessing_plot", plot_id=plot_id).path
+        if settings.plot_prerender:
+            background_tasks.add_task(_prerender_plot, executors, plot_store, plot_id)
 
     return PredictionResponse(
         prediction=prediction,
@@ -84,37 +191,571 @@ async def predict_from_file(
         preprocessing={
             "statistics": stats,
             "plot_path": result.get("plot_path"),
+            "plot_id": plot_id,
+            "plot_url": plot_url,
         },
     )
 
 
-@router.get("/candidates")
-async def list_candidates(user: User = Depends(require_roles("analyst", "astronomer", "admin"))):
-    from sqlalchemy import select
+async def _run_when_admitted(
+    executors: StageExecutors,
+    stage: str,
+    func: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """Like ``executors.run`` but waits for capacity instead of failing with 429.
+
+    Batch entries yield to interactive requests rather than rejecting the whole batch.
+    """
+
+    while True:
+        try:
+            return await executors.run(stage, func, *args, **kwargs)
+        except StageSaturatedError:
+            await asyncio.sleep(0.05)
+
+
+async def _submit_when_admitted(
+    executors: StageExecutors, batcher: MicroBatcher, inputs: np.ndarray
+) -> tuple[int, float, np.ndarray]:
+    while True:
+        try:
+            async with executors.admit("inference"):
+                return await batcher.submit(inputs)
+        except StageSaturatedError:
+            await asyncio.sleep(0.05)
+
+
+async def run_prediction(
+    path: Path,
+    *,
+    executors: StageExecutors,
+    batcher: MicroBatcher,
+    plot_store: PlotStore | None,
+) -> dict[str, Any]:
+    """Preprocess, classify and record one light curve, waiting for stage capacity.
+
+    Shared by ``/predictions/batch`` and prediction jobs; ``attention`` is an array.
+    """
+
+    cache = dependencies.get_preprocessing_cache()
+    result = await _run_when_admitted(
+        executors,
+        "preprocess",
+        preprocess_lightcurve,
+        path,
+        config=_preprocess_config(),
+        artifact_dir=Path("data/artifacts/preprocessing"),
+        cache=cache,
+        plot_store=plot_store,
+    )
+    observe_preprocessing(result, cache=cache)
+    prediction, probability, attention = await _submit_when_admitted(
+        executors, batcher, np.stack((result["time"], result["flux"]))
+    )
+    stats = result.get("statistics")
+    if stats:
+        await _run_when_admitted(
+            executors,
+            "db",
+            _store_preprocessing_result,
+            str(path),
+            stats,
+            result.get("plot_path"),
+        )
+    return {
+        "prediction": prediction,
+        "probability": probability,
+        "attention": attention,
+        "statistics": stats,
+        "plot_id": result.get("plot_id"),
+    }
+
+
+async def _predict_batch_entry(
+    name: str,
+    path: Path,
+    *,
+    request: Request,
+    executors: StageExecutors,
+    batcher: MicroBatcher,
+    plot_store: PlotStore | None,
+    include_attention: bool,
+) -> dict[str, Any]:
+    outcome = await run_prediction(
+        path, executors=executors, batcher=batcher, plot_store=plot_store
+    )
+    plot_id = outcome["plot_id"]
+    line: dict[str, Any] = {
+        "type": "result",
+        "name": name,
+        "prediction": outcome["prediction"],
+        "probability": outcome["probability"],
+        "preprocessing": {
+            "statistics": outcome["statistics"],
+            "plot_id": plot_id,
+            "plot_url": (
+                request.url_for("get_preprocessing_plot", plot_id=plot_id).path
+                if plot_id
+                else None
+            ),
+        },
+    }
+    if include_attention:
+        line["attention"] = outcome["attention"].tolist()
+    return line
+
+
+def _ndjson(payload: dict[str, Any]) -> bytes:
+    return (json.dumps(payload) + "\n").encode("utf-8")
+
+
+async def _stream_batch(
+    entries: Sequence[tuple[str, Path]],
+    *,
+    batch_id: str,
+    directory: Path,
+    request: Request,
+    executors: StageExecutors,
+    batcher: MicroBatcher,
+    evidence_generator: EvidenceGenerator | None,
+    include_attention: bool,
+    concurrency: int,
+) -> AsyncIterator[bytes]:
+    """Yield an NDJSON line per finished curve, evidence per class, then a summary."""
+
+    started = time.perf_counter()
+    plot_store = dependencies.get_plot_store()
+    remaining = iter(entries)
+    running: dict[asyncio.Task, str] = {}
+    evidence_tasks: dict[int, asyncio.Task] = {}
+    emitted_evidence: set[int] = set()
+    succeeded = failed = 0
+
+    def _launch() -> bool:
+        entry = next(remaining, None)
+        if entry is None:
+            return False
+        name, path = entry
+        task = asyncio.create_task(
+            _predict_batch_entry(
+                name,
+                path,
+                request=request,
+                executors=executors,
+                batcher=batcher,
+                plot_store=plot_store,
+                include_attention=include_attention,
+            )
+        )
+        running[task] = name
+        return True
 
-    from ..db import get_session
-    from ..db.models import LightCurveRecord
+    def _evidence_lines() -> list[bytes]:
+        lines = []
+        for prediction, task in evidence_tasks.items():
+            if prediction in emitted_evidence or not task.done():
+                continue
+            emitted_evidence.add(prediction)
+            try:
+                lines.append(
+                    _ndjson(
+                        {
+                            "type": "evidence",
+                            "prediction": prediction,
+                            "evidence": task.result(),
+                        }
+                    )
+                )
+            except (
+                Exception
+            ) as exc:  # noqa: BLE001 - evidence is optional for batch results
+                lines.append(
+                    _ndjson(
+                        {
+                            "type": "evidence",
+                            "prediction": prediction,
+                            "error": str(exc),
+                        }
+                    )
+                )
+        return lines
 
+    try:
+        while len(running) < concurrency and _launch():
+            pass
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                try:
+                    line = task.result()
+                except (
+                    Exception
+                ) as exc:  # noqa: BLE001 - one bad curve must not end the stream
+                    failed += 1
+                    yield _ndjson(
+                        {
+                            "type": "error",
+                            "name": name,
+                            "detail": f"{type(exc).__name__}: {exc}",
+                        }
+                    )
+                else:
+                    succeeded += 1
+                    prediction = line["prediction"]
+                    if (
+                        evidence_generator is not None
+                        and prediction not in evidence_tasks
+                    ):
+                        # One retrieval per predicted class, shared by the batch.
+                        evidence_tasks[prediction] = asyncio.create_task(
+                            _run_when_admitted(
+                                executors,
+                                "rag",
+                                evidence_generator.generate,
+                                _evidence_question(prediction),
+                            )
+                        )
+                    yield _ndjson(line)
+                _launch()
+            for evidence_line in _evidence_lines():
+                yield evidence_line
+        if evidence_tasks:
+            await asyncio.wait(evidence_tasks.values())
+            for evidence_line in _evidence_lines():
+                yield evidence_line
+        yield _ndjson(
+            {
+                "type": "summary",
+                "batch_id": batch_id,
+                "total": len(entries),
+                "succeeded": succeeded,
+                "failed": failed,
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+        )
+    finally:
+        # The client may disconnect mid-stream; do not leave work running for it.
+        for task in [*running, *evidence_tasks.values()]:
+            task.cancel()
+        # Removed off the event loop; a batch can spool thousands of files.
+        asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(shutil.rmtree, directory, ignore_errors=True)
+        )
+
+
+@router.post("/batch")
+async def predict_batch(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    evidence: bool = False,
+    include_attention: bool = False,
+    batcher: MicroBatcher = Depends(dependencies.inference_batcher_dependency),
+    executors: StageExecutors = Depends(dependencies.executors_dependency),
+    user: User = Depends(require_roles("astronomer", "admin")),
+) -> StreamingResponse:
+    """Predict many light curves from files and/or tar/zip archives, streaming NDJSON.
+
+    Each curve produces a ``result`` (or ``error``) line as soon as it finishes. With
+    ``evidence=true`` one evidence retrieval runs per predicted class and is emitted as
+    an ``evidence`` line. The stream ends with a ``summary`` line.
+    """
+
+    settings = get_settings()
+    evidence_generator = None
+    if evidence:
+        try:
+            evidence_generator = dependencies.get_evidence_generator()
+        except Exception as exc:  # pragma: no cover
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+            )
+
+    batch_id = uuid.uuid4().hex
+    directory = Path("data/uploads/batches") / batch_id
+    try:
+        # Removes ``directory`` itself if extraction fails.
+        entries = await executors.run(
+            "io",
+            extract_lightcurves,
+            [(upload.filename or "upload", upload.file) for upload in files],
+            directory,
+            settings.batch_max_files,
+            settings.batch_max_bytes,
+        )
+    except (TooManyFilesError, UploadTooLargeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)
+        ) from None
+    if not entries:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No light-curve files in upload",
+        )
+
+    return StreamingResponse(
+        _stream_batch(
+            entries,
+            batch_id=batch_id,
+            directory=directory,
+            request=request,
+            executors=executors,
+            batcher=batcher,
+            evidence_generator=evidence_generator,
+            include_attention=include_attention,
+            concurrency=max(1, settings.batch_concurrency),
+        ),
+        media_type="application/x-ndjson",
+        headers={"X-Batch-Id": batch_id},
+    )
+
+
+@router.get("/plots/{plot_id}", name="get_preprocessing_plot")
+async def get_preprocessing_plot(
+    plot_id: str,
+    executors: StageExecutors = Depends(dependencies.executors_dependency),
+    user: User = Depends(require_roles("analyst", "astronomer", "admin")),
+) -> FileResponse:
+    """Serve a diagnostic plot, rendering it on first fetch."""
+
+    store = dependencies.get_plot_store()
+    if store is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Deferred plots are disabled"
+        )
+    try:
+        path = await executors.run("plots", store.render, plot_id)
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Plot not found"
+        ) from None
+    # Plot IDs are content hashes, so a given URL always serves the same image.
+    return FileResponse(
+        path,
+        media_type="image/png",
+        headers={"Cache-Control": "private, max-age=86400, immutable"},
+    )
+
+
+def _load_candidates(limit: int, processed_only: bool) -> list[dict[str, Any]]:
     with get_session() as session:
-        records = (
-            session.exec(
-                select(LightCurveRecord).order_by(LightCurveRecord.downloaded_at.desc()).limit(20)
-            ).all()
+        rows = candidate_rows(session, limit=limit, processed_only=processed_only)
+    candidates = []
+    for record, processed in rows:
+        if processed is not None:
+            status_name = "processed"
+        else:
+            status_name = "failed" if record.preprocess_error else "pending"
+        candidates.append(
+            {
+                "target": record.target,
+                "mission": record.mission,
+                "path": record.path,
+                "downloaded_at": record.downloaded_at.isoformat(),
+                "status": status_name,
+                "error": record.preprocess_error,
+                "statistics": (
+                    {
+                        "mean": processed.flux_mean,
+                        "std": processed.flux_std,
+                        "min": processed.flux_min,
+                        "max": processed.flux_max,
+                        "count": processed.flux_count,
+                    }
+                    if processed is not None
+                    else None
+                ),
+                "features": processed.features if processed is not None else None,
+                "processed_at": (
+                    processed.created_at.isoformat() if processed is not None else None
+                ),
+            }
         )
-    return [
-        {
-            "target": record.target,
-            "mission": record.mission,
-            "path": record.path,
-            "downloaded_at": record.downloaded_at.isoformat(),
-        }
-        for record in records
-    ]
+    return candidates
+
+
+@router.get("/candidates")
+async def list_candidates(
+    limit: int = Query(20, ge=1, le=500),
+    processed: bool = Query(
+        False, description="Only light curves the catalog pipeline has featurized"
+    ),
+    executors: StageExecutors = Depends(dependencies.executors_dependency),
+    user: User = Depends(require_roles("analyst", "astronomer", "admin")),
+):
+    """Latest downloads with their preprocessing statistics and candidate features."""
+
+    return await executors.run("db", _load_candidates, limit, processed)
 
 
-@router.post("/stream")
-async def stream_placeholder():  # pragma: no cover - placeholder for future streaming support
-    return {"status": "not_implemented", "detail": "Real-time streaming will be available soon."}
+# Open /stream connections in this process; each holds a fixed-size LightCurveStream.
+_ACTIVE_STREAMS = 0
+
+
+def _websocket_token(websocket: WebSocket) -> str:
+    header = websocket.headers.get("authorization", "")
+    if header.lower().startswith("bearer "):
+        return header[7:]
+    # Browsers cannot set headers on WebSocket handshakes.
+    return websocket.query_params.get("token", "")
+
+
+def _push_chunk(stream: LightCurveStream, message: Any, max_chunk: int) -> int:
+    if not isinstance(message, dict) or "time" not in message or "flux" not in message:
+        raise ValueError("Expected a JSON object with 'time' and 'flux' arrays")
+    time_values = np.asarray(message["time"], dtype=np.float64)
+    flux_values = np.asarray(message["flux"], dtype=np.float64)
+    if time_values.size > max_chunk:
+        raise ValueError(f"Chunk has more than {max_chunk} cadences")
+    return stream.push(time_values, flux_values)
+
+
+async def _receive_frame(websocket: WebSocket) -> str | bytes:
+    """Next text or binary frame; unlike ``receive_text``, binary ones do not raise."""
+
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(
+            message.get("code", status.WS_1000_NORMAL_CLOSURE), message.get("reason")
+        )
+    if message.get("text") is not None:
+        return message["text"]
+    return message.get("bytes") or b""
+
+
+async def _stream_update(
+    stream: LightCurveStream,
+    executors: StageExecutors,
+    batcher: MicroBatcher,
+    include_attention: bool,
+) -> dict[str, Any]:
+    time_window, flux_window = stream.take_window()
+    received = stream.received
+    # Time relative to the window start keeps the input scale independent of the epoch.
+    inputs = np.stack((time_window - time_window[0], flux_window)).astype(np.float32)
+    prediction, probability, attention = await _submit_when_admitted(
+        executors, batcher, inputs
+    )
+    update: dict[str, Any] = {
+        "type": "update",
+        "received": received,
+        "window": {
+            "start": float(time_window[0]),
+            "end": float(time_window[-1]),
+            "cadences": int(time_window.size),
+        },
+        "prediction": int(prediction),
+        "probability": float(probability),
+    }
+    if include_attention:
+        update["attention"] = np.asarray(attention).tolist()
+    return update
+
+
+@router.websocket("/stream")
+async def stream_predictions(
+    websocket: WebSocket, include_attention: bool = True, stride: int | None = None
+) -> None:
+    """Classify a live light curve sent as JSON chunks of ``{"time": [...], "flux":
+    [...]}``.
+
+    Each cadence is detrended once on arrival; every ``stride`` new cadences the latest
+    window is classified and an ``update`` message is pushed. If inference falls behind,
+    intermediate windows are skipped rather than queued. Sending ``{"type": "end"}``
+    flushes a final update, a ``summary`` message, and closes the socket.
+    """
+
+    global _ACTIVE_STREAMS
+
+    try:
+        user = authenticate_token(_websocket_token(websocket))
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not any(role in user.roles for role in ("astronomer", "admin")):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    settings = get_settings()
+    if _ACTIVE_STREAMS >= settings.stream_max_connections:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    # Counted before the first await, so concurrent handshakes cannot all pass.
+    _ACTIVE_STREAMS += 1
+    receive: asyncio.Task | None = None
+    pending: asyncio.Task | None = None
+    try:
+        window = max(1, settings.stream_window)
+        stream = LightCurveStream(
+            StreamConfig(
+                window=window,
+                stride=max(1, stride or settings.stream_stride),
+                trend_window=settings.stream_trend_window,
+                min_cadences=min(max(1, settings.stream_min_cadences), window),
+            )
+        )
+        executors = dependencies.get_stage_executors()
+        batcher = dependencies.get_inference_batcher()
+
+        await websocket.accept()
+        receive = asyncio.create_task(_receive_frame(websocket))
+        while receive is not None or pending is not None:
+            done, _ = await asyncio.wait(
+                [task for task in (receive, pending) if task is not None],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if pending is not None and pending in done:
+                try:
+                    await websocket.send_json(pending.result())
+                except WebSocketDisconnect:
+                    raise
+                except (
+                    Exception
+                ) as exc:  # noqa: BLE001 - report and keep the stream open
+                    await websocket.send_json(
+                        {"type": "error", "detail": f"{type(exc).__name__}: {exc}"}
+                    )
+                pending = None
+            if receive is not None and receive in done:
+                frame = receive.result()
+                receive = asyncio.create_task(_receive_frame(websocket))
+                try:
+                    if isinstance(frame, bytes):
+                        raise ValueError(
+                            "Binary frames are not supported; send JSON text frames"
+                        )
+                    message = json.loads(frame)
+                    if message == {"type": "end"}:
+                        receive.cancel()
+                        receive = None
+                    else:
+                        _push_chunk(stream, message, settings.stream_max_chunk)
+                except (TypeError, ValueError) as exc:
+                    await websocket.send_json({"type": "error", "detail": str(exc)})
+            if pending is None and (
+                stream.due or (receive is None and stream.has_new_cadences)
+            ):
+                pending = asyncio.create_task(
+                    _stream_update(stream, executors, batcher, include_attention)
+                )
+        await websocket.send_json(
+            {
+                "type": "summary",
+                "received": stream.received,
+                "accepted": stream.accepted,
+            }
+        )
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _ACTIVE_STREAMS -= 1
+        for task in (receive, pending):
+            if task is not None:
+                task.cancel()
 
 
 @router.post("/ingest")
@@ -123,15 +764,7 @@ async def enqueue_ingestion_job(
     user: User = Depends(require_roles("admin", "astronomer")),
 ):
     queue = dependencies.get_ingestion_queue()
-    service = dependencies.get_ingestion_service()
-    request = IngestionRequest(
-        target=payload.target,
-        mission=payload.mission,
-        author=payload.author,
-        sector=payload.sector,
-        quarter=payload.quarter,
-        campaign=payload.campaign,
-        flux_type=payload.flux_type,
-    )
-    await queue.enqueue(service.fetch, request)
+    request = IngestionRequest(**payload.model_dump(exclude={"priority"}))
+    # Identical requests already queued or running are merged into the existing one.
+    await queue.enqueue(request, priority=payload.priority)
     return {"status": "queued", "target": payload.target}
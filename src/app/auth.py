@@ -42,8 +42,12 @@ async def get_current_user(
 ) -> User:
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing authorization header")
+    return authenticate_token(credentials.credentials)
+
+
+def authenticate_token(token: str) -> User:
+    """Decode a bearer token into a :class:`User`; raises 401 if it is invalid."""
 
-    token = credentials.credentials
     settings = get_settings()
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
@@ -66,4 +70,10 @@ def require_roles(*required_roles: str):
     return dependency
 
 
-__all__ = ["User", "create_access_token", "get_current_user", "require_roles"]
+__all__ = [
+    "User",
+    "authenticate_token",
+    "create_access_token",
+    "get_current_user",
+    "require_roles",
+]
@@ -0,0 +1,310 @@
+"""Background pipeline that preprocesses and featurizes newly catalogued light curves.
+
+Records written by ingestion flow through three stages connected by bounded queues::
+
+    scan (db) -> preprocess + features (preprocess executor) -> write (db)
+
+A full queue blocks the stage feeding it, so a slow stage throttles the ones before it
+instead of letting work pile up in memory. The scanner reads the catalogue rather than
+receiving files directly: downloads recorded by any process are picked up, and records
+interrupted by a restart are found again. Rows are leased to one pipeline with
+:func:`~app.db.operations.claim_lightcurves`, so several API workers can each run a
+pipeline without processing the same file twice; a row whose result was never stored is
+retaken once its lease expires. :meth:`CatalogPipeline.notify` wakes the scanner as soon
+as ingestion records new files; otherwise it polls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, ContextManager, TypeVar
+
+from sqlmodel import Session
+
+from .db import (
+    claim_lightcurves,
+    get_session,
+    record_preprocessing_failure,
+    record_preprocessing_result,
+    release_lightcurve_claims,
+)
+from .executors import StageExecutors, StageSaturatedError
+from .preprocessing import (
+    PreprocessingCache,
+    PreprocessingConfig,
+    compute_statistics,
+    extract_features,
+    preprocess_lightcurve,
+)
+from .telemetry import (
+    CATALOG_PIPELINE_QUEUE_DEPTH,
+    CATALOG_PIPELINE_RECORDS,
+    observe_preprocessing,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class CatalogPipelineConfig:
+    # Light curves preprocessed concurrently; each holds one "preprocess" executor slot.
+    workers: int = 2
+    # Capacity of each inter-stage queue.
+    queue_size: int = 16
+    scan_batch: int = 64
+    # Fallback scan interval when no notification arrives (seconds).
+    poll_interval: float = 30.0
+    # How long a claimed light curve stays reserved for this pipeline (seconds).
+    lease_seconds: float = 600.0
+
+
+@dataclass(slots=True)
+class _Entry:
+    lightcurve_id: int
+    path: str
+    flux_type: str
+
+
+def featurize_lightcurve(
+    path: str,
+    *,
+    flux_column: str,
+    config: PreprocessingConfig,
+    cache: PreprocessingCache | None = None,
+) -> dict[str, Any]:
+    """Preprocess a file and summarise it; runs in the preprocess executor.
+
+    Only statistics and features are returned, so process workers ship no arrays.
+    """
+
+    result = preprocess_lightcurve(
+        path, flux_column=flux_column, config=config, cache=cache
+    )
+    return {
+        "statistics": compute_statistics(result["flux"]).to_dict(),
+        "features": extract_features(result["time"], result["flux"]),
+        "metadata": result["metadata"],
+        "timings": result["timings"],
+    }
+
+
+class CatalogPipeline:
+    """Turns catalogued downloads into ``PreprocessingRecord`` rows with features."""
+
+    def __init__(
+        self,
+        *,
+        executors: StageExecutors,
+        config: CatalogPipelineConfig | None = None,
+        preprocess_config: PreprocessingConfig | None = None,
+        cache: PreprocessingCache | None = None,
+        session_factory: Callable[[], ContextManager[Session]] = get_session,
+    ) -> None:
+        self.config = config or CatalogPipelineConfig()
+        if self.config.workers < 1 or self.config.queue_size < 1:
+            raise ValueError("workers and queue_size must be at least 1")
+        self._executors = executors
+        self._preprocess_config = preprocess_config or PreprocessingConfig()
+        self._cache = cache
+        self._session_factory = session_factory
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._queues: dict[str, asyncio.Queue] = {}
+        self._counts = {"scanned": 0, "processed": 0, "failed": 0}
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        to_preprocess: asyncio.Queue[_Entry] = asyncio.Queue(self.config.queue_size)
+        to_write: asyncio.Queue[tuple[_Entry, dict[str, Any]]] = asyncio.Queue(
+            self.config.queue_size
+        )
+        self._queues = {"preprocess": to_preprocess, "write": to_write}
+        self._tasks = [
+            asyncio.create_task(self._scan(to_preprocess)),
+            *(
+                asyncio.create_task(self._preprocess(to_preprocess, to_write))
+                for _ in range(self.config.workers)
+            ),
+            asyncio.create_task(self._write(to_write)),
+        ]
+
+    async def stop(self) -> None:
+        """Cancel every stage and release this pipeline's leases so unfinished records
+        are picked up again by the next scan, here or in another process."""
+
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        if self._tasks:
+            try:
+                await asyncio.to_thread(
+                    self._with_session, release_lightcurve_claims, self.worker_id
+                )
+            except (
+                Exception
+            ) as exc:  # pragma: no cover - database unavailable; leases expire anyway
+                LOGGER.warning(
+                    "Could not release catalog leases", extra={"error": str(exc)}
+                )
+        self._tasks = []
+        for stage, queue in self._queues.items():
+            CATALOG_PIPELINE_QUEUE_DEPTH.labels(stage=stage).dec(queue.qsize())
+        self._queues = {}
+        self._loop = None
+
+    def notify(self) -> None:
+        """Wake the scanner now; safe to call from any thread."""
+
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **self._counts,
+            **{
+                f"{stage}_queued": queue.qsize()
+                for stage, queue in self._queues.items()
+            },
+        }
+
+    async def _run(
+        self, stage: str, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        # Background work waits for capacity rather than competing with API requests.
+        while True:
+            try:
+                return await self._executors.run(stage, func, *args, **kwargs)
+            except StageSaturatedError:
+                await asyncio.sleep(0.1)
+
+    def _with_session(
+        self, operation: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        with self._session_factory() as session:
+            return operation(session, *args, **kwargs)
+
+    async def _put(self, queue: asyncio.Queue, stage: str, item: Any) -> None:
+        await queue.put(item)
+        CATALOG_PIPELINE_QUEUE_DEPTH.labels(stage=stage).inc()
+
+    async def _get(self, queue: asyncio.Queue, stage: str) -> Any:
+        item = await queue.get()
+        CATALOG_PIPELINE_QUEUE_DEPTH.labels(stage=stage).dec()
+        return item
+
+    async def _scan(self, to_preprocess: asyncio.Queue[_Entry]) -> None:
+        assert self._wake is not None
+        while True:
+            self._wake.clear()
+            # Lease only what the queue takes now, so claimed rows do not outwait it.
+            limit = max(
+                1,
+                min(
+                    self.config.scan_batch,
+                    to_preprocess.maxsize - to_preprocess.qsize(),
+                ),
+            )
+            try:
+                rows = await self._run(
+                    "db",
+                    self._with_session,
+                    claim_lightcurves,
+                    worker_id=self.worker_id,
+                    lease_seconds=self.config.lease_seconds,
+                    limit=limit,
+                )
+            except Exception as exc:  # pragma: no cover - database unavailable
+                LOGGER.exception("Catalog scan failed", exc_info=exc)
+                rows = []
+            for lightcurve_id, path, flux_type in rows:
+                self._counts["scanned"] += 1
+                await self._put(
+                    to_preprocess, "preprocess", _Entry(lightcurve_id, path, flux_type)
+                )
+            if len(rows) < limit:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), self.config.poll_interval)
+
+    async def _preprocess(
+        self,
+        to_preprocess: asyncio.Queue[_Entry],
+        to_write: asyncio.Queue[tuple[_Entry, dict[str, Any]]],
+    ) -> None:
+        while True:
+            entry = await self._get(to_preprocess, "preprocess")
+            try:
+                if not Path(entry.path).exists():
+                    raise FileNotFoundError(
+                        f"Light curve file is missing: {entry.path}"
+                    )
+                result = await self._run(
+                    "preprocess",
+                    featurize_lightcurve,
+                    entry.path,
+                    flux_column=entry.flux_type,
+                    config=self._preprocess_config,
+                    cache=self._cache,
+                )
+            except Exception as exc:
+                LOGGER.warning(
+                    "Catalog preprocessing failed",
+                    extra={"path": entry.path, "error": str(exc)},
+                )
+                error = f"{type(exc).__name__}: {exc}"
+                await self._run(
+                    "db",
+                    self._with_session,
+                    record_preprocessing_failure,
+                    entry.lightcurve_id,
+                    error,
+                )
+                self._counts["failed"] += 1
+                CATALOG_PIPELINE_RECORDS.labels(outcome="failed").inc()
+                continue
+            observe_preprocessing(result, cache=self._cache)
+            await self._put(to_write, "write", (entry, result))
+
+    async def _write(
+        self, to_write: asyncio.Queue[tuple[_Entry, dict[str, Any]]]
+    ) -> None:
+        while True:
+            entry, result = await self._get(to_write, "write")
+            try:
+                await self._run(
+                    "db",
+                    self._with_session,
+                    record_preprocessing_result,
+                    path=entry.path,
+                    stats=result["statistics"],
+                    features=result["features"],
+                )
+            except Exception as exc:  # pragma: no cover - database unavailable
+                # Left unprocessed, so a scan retries it once the lease expires.
+                LOGGER.exception(
+                    "Failed to store catalog features",
+                    exc_info=exc,
+                    extra={"path": entry.path},
+                )
+                continue
+            self._counts["processed"] += 1
+            CATALOG_PIPELINE_RECORDS.labels(outcome="processed").inc()
+
+
+__all__ = ["CatalogPipeline", "CatalogPipelineConfig", "featurize_lightcurve"]
@@ -0,0 +1,69 @@
+"""CLI to export a trained checkpoint for serving with TorchScript or ONNX Runtime."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from app.models.export import export_onnx, export_torchscript, load_backbone
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export the classifier backbone to TorchScript and/or ONNX"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="Lightning checkpoint (default: untrained weights)",
+    )
+    parser.add_argument(
+        "--output-dir", type=Path, default=Path("data/artifacts/export")
+    )
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        action="append",
+        choices=("torchscript", "onnx"),
+        help="Repeat to export several formats (default: both)",
+    )
+    parser.add_argument(
+        "--sequence-length",
+        type=int,
+        default=2000,
+        help="Example length used for tracing",
+    )
+    parser.add_argument("--opset", type=int, default=17)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+
+    model = load_backbone(args.checkpoint)
+    exported: dict[str, str] = {}
+    for fmt in args.formats or ["torchscript", "onnx"]:
+        if fmt == "torchscript":
+            path = export_torchscript(
+                model,
+                args.output_dir / "model.ts",
+                sequence_length=args.sequence_length,
+            )
+        else:
+            path = export_onnx(
+                model,
+                args.output_dir / "model.onnx",
+                sequence_length=args.sequence_length,
+                opset=args.opset,
+            )
+        exported[fmt] = str(path)
+    print(json.dumps(exported, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""CLI to build a quantized and/or pruned inference profile from a checkpoint."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from app.models.export import load_backbone
+from app.models.optimize import OptimizationProfile, build_profile
+from app.utils.manifests import load_manifest
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Quantize/prune the classifier into a named serving profile"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="Lightning checkpoint (default: untrained weights)",
+    )
+    parser.add_argument(
+        "--profile", required=True, help="Profile name, e.g. int8 or int8-pruned"
+    )
+    parser.add_argument(
+        "--profiles-dir", type=Path, default=Path("data/artifacts/profiles")
+    )
+    parser.add_argument(
+        "--no-dynamic-int8", action="store_true", help="Keep LSTM/Linear layers in fp32"
+    )
+    parser.add_argument(
+        "--static-conv",
+        action="store_true",
+        help="Statically quantize the Conv1d stack",
+    )
+    parser.add_argument(
+        "--prune", type=float, default=0.0, help="Fraction of conv channels to remove"
+    )
+    parser.add_argument(
+        "--calibration-manifest",
+        type=Path,
+        help="Manifest sampled for static calibration",
+    )
+    parser.add_argument("--calibration-batches", type=int, default=8)
+    parser.add_argument(
+        "--eval-manifest", type=Path, help="Labelled manifest for the F1 comparison"
+    )
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--sequence-length", type=int, default=2000)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+
+    profile = OptimizationProfile(
+        name=args.profile,
+        dynamic_int8=not args.no_dynamic_int8,
+        static_conv=args.static_conv,
+        prune_amount=args.prune,
+        calibration_batches=args.calibration_batches,
+        batch_size=args.batch_size,
+        sequence_length=args.sequence_length,
+    )
+    report = build_profile(
+        load_backbone(args.checkpoint),
+        profile,
+        args.profiles_dir,
+        calibration_records=(
+            load_manifest(args.calibration_manifest)
+            if args.calibration_manifest
+            else None
+        ),
+        eval_records=load_manifest(args.eval_manifest) if args.eval_manifest else None,
+    )
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""CLI to pack a manifest of per-sample arrays into memory-mapped training shards."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from app.models.packed import pack_records
+from app.utils.manifests import load_manifest
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Pack a JSONL manifest into float32 memmap shards"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        required=True,
+        help="Manifest produced by app.cli.preprocess",
+    )
+    parser.add_argument("--output-dir", type=Path, required=True)
+    parser.add_argument("--sequence-length", type=int, default=2000)
+    parser.add_argument(
+        "--shard-size", type=int, default=65536, help="Samples per shard file"
+    )
+    parser.add_argument(
+        "--no-metadata", action="store_true", help="Skip the columnar metadata table"
+    )
+    parser.add_argument(
+        "--overwrite", action="store_true", help="Replace an existing packed dataset"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+
+    records = load_manifest(args.manifest)
+    started = time.perf_counter()
+    index = pack_records(
+        records,
+        args.output_dir,
+        sequence_length=args.sequence_length,
+        shard_size=args.shard_size,
+        include_metadata=not args.no_metadata,
+        overwrite=args.overwrite,
+    )
+    summary = {
+        **asdict(index),
+        "samples": index.size,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""CLI to preprocess a directory of raw light curves into model-ready arrays."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+from pathlib import Path
+
+from app.data.paths import get_processed_data_dir, get_raw_data_dir
+from app.preprocessing import PreprocessingConfig
+from app.preprocessing.batch import BatchConfig, preprocess_directory
+
+
+def _parse_args() -> argparse.Namespace:
+    defaults = BatchConfig()
+    parser = argparse.ArgumentParser(
+        description="Batch-preprocess light curves into .npy arrays and a manifest"
+    )
+    parser.add_argument(
+        "--mission",
+        help="Mission subdirectory of the raw/processed data dirs (e.g. kepler, tess)",
+    )
+    parser.add_argument(
+        "--input-dir", type=Path, help="Override the raw light-curve directory"
+    )
+    parser.add_argument(
+        "--output-dir", type=Path, help="Override the processed output directory"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="Manifest path (default: <output-dir>/manifest.jsonl)",
+    )
+    parser.add_argument(
+        "--labels", type=Path, help="CSV with 'name,label' rows (file stem or path)"
+    )
+    parser.add_argument(
+        "--default-label",
+        type=int,
+        default=defaults.default_label,
+        help="Label for files missing from --labels (default: leave them out)",
+    )
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    parser.add_argument("--flux-column", default=defaults.flux_column)
+    parser.add_argument("--engine", choices=("lightkurve", "numpy"), default="numpy")
+    parser.add_argument("--period-search", choices=("bls", "fast"), default="fast")
+    parser.add_argument(
+        "--period", type=float, help="Fold every curve on this period (days)"
+    )
+    parser.add_argument(
+        "--no-phase-fold", action="store_true", help="Keep curves in time order"
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Reprocess files whose outputs are current",
+    )
+    return parser.parse_args()
+
+
+def _load_labels(path: Path | None) -> dict[str, int]:
+    if path is None:
+        return {}
+    with path.open(newline="") as fh:
+        return {row["name"]: int(row["label"]) for row in csv.DictReader(fh)}
+
+
+def main() -> None:
+    args = _parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+
+    input_dir = args.input_dir or get_raw_data_dir(args.mission)
+    output_dir = args.output_dir or get_processed_data_dir(args.mission)
+    config = PreprocessingConfig(
+        engine=args.engine,
+        period_search=args.period_search,
+        period=args.period,
+        phase_fold=not args.no_phase_fold,
+    )
+    batch = BatchConfig(
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        flux_column=args.flux_column,
+        overwrite=args.overwrite,
+        default_label=args.default_label,
+    )
+    report = preprocess_directory(
+        input_dir,
+        output_dir,
+        config=config,
+        batch=batch,
+        labels=_load_labels(args.labels),
+        manifest_path=args.manifest,
+    )
+    summary = report.to_dict()
+    summary["failures"] = summary["failures"][:20]
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -44,10 +44,18 @@ def _build_model_config(cfg: dict[str, Any]) -> ModelConfig:
 
 def _prepare_datamodule(cfg: dict[str, Any], batch_size: int, sequence_length: int, num_workers: int) -> LightCurveDataModule:
     paths = cfg["paths"]
-    train_records = load_manifest(paths["train_manifest"])
-    val_records = load_manifest(paths["val_manifest"])
-    test_manifest = paths.get("test_manifest")
-    test_records = load_manifest(test_manifest) if test_manifest else []
+
+    def _split(name: str, required: bool = True):
+        # Packed datasets (see ``app.cli.pack``) take precedence over manifests.
+        if paths.get(f"{name}_packed"):
+            return Path(paths[f"{name}_packed"])
+        if required or paths.get(f"{name}_manifest"):
+            return load_manifest(paths[f"{name}_manifest"])
+        return []
+
+    train_records = _split("train")
+    val_records = _split("val")
+    test_records = _split("test", required=False)
 
     return LightCurveDataModule(
         train_records,
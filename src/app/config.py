@@ -15,8 +15,96 @@ class Settings(BaseSettings):
     qdrant_port: int = 6333
     qdrant_api_key: str | None = None
     model_checkpoint_path: str | None = None
+    inference_backend: str = "torch"
+    inference_model_path: str | None = None
+    inference_profile: str | None = None
+    inference_profiles_dir: str | None = None
+    inference_intra_op_threads: int | None = None
+    inference_inter_op_threads: int | None = 1
+    inference_max_batch_size: int = 32
+    inference_max_batch_wait_ms: float = 5.0
+    inference_length_bucket: int = 0
+    inference_max_pending: int = 256
+    preprocess_engine: str = "lightkurve"
+    preprocess_period_search: str = "bls"
+    preprocess_cache_enabled: bool = True
+    preprocess_cache_dir: str | None = None
+    preprocess_cache_max_bytes: int = 2 * 1024**3
+    # "deferred" returns a plot ID and renders on first fetch; "eager" renders inline.
+    plot_mode: str = "deferred"
+    plot_dir: str | None = None
+    plot_bins: int = 1200
+    plot_prerender: bool = False
+    plot_workers: int = 1
+    plot_max_pending: int = 32
+    # Disk budget for stored plots; least recently used ones are deleted beyond it.
+    plot_max_bytes: int = 512 * 1024**2
+    # Upper bounds on light curves per /predictions/batch request and in flight.
+    batch_max_files: int = 5000
+    # Upper bound on bytes a batch upload may expand to once archives are extracted.
+    batch_max_bytes: int = 4 * 1024**3
+    batch_concurrency: int = 16
+    # Live WebSocket streams: window, cadences between updates and per-process caps.
+    stream_window: int = 2000
+    stream_stride: int = 250
+    stream_trend_window: int = 401
+    stream_min_cadences: int = 256
+    stream_max_chunk: int = 10000
+    stream_max_connections: int = 512
+    # Durable jobs: jobs per process (0 disables the worker), lease and polling.
+    job_workers: int = 1
+    job_lease_seconds: float = 60.0
+    job_poll_interval: float = 1.0
+    job_max_attempts: int = 3
+    job_max_wait_seconds: float = 60.0
+    # Must be on storage shared by every process that runs job workers.
+    job_upload_dir: str = "data/uploads/jobs"
+    # Background ingestion queue: worker pool ("thread" or "process") and retries.
+    ingestion_workers: int = 2
+    ingestion_executor: str = "thread"
+    ingestion_max_attempts: int = 3
+    ingestion_backoff_seconds: float = 30.0
+    # Catalog pipeline: preprocesses and featurizes newly downloaded light curves.
+    catalog_pipeline_enabled: bool = True
+    catalog_pipeline_workers: int = 2
+    catalog_pipeline_queue_size: int = 16
+    catalog_pipeline_poll_interval: float = 30.0
+    catalog_pipeline_lease_seconds: float = 600.0
+    # Light-curve downloads: parallel files, attempts per file and first retry delay.
+    download_concurrency: int = 8
+    download_max_attempts: int = 5
+    download_backoff_seconds: float = 1.0
+    download_timeout_seconds: float = 60.0
+    download_verify_existing: bool = False
+    mast_download_url: str = "https://mast.stsci.edu/api/v0.1/Download/file"
+    preprocess_executor: str = "process"
+    preprocess_workers: int | None = None
+    preprocess_max_pending: int = 32
+    io_workers: int = 4
+    io_max_pending: int = 64
+    rag_workers: int = 8
+    rag_max_pending: int = 64
+    db_workers: int = 4
+    db_max_pending: int = 128
     rag_corpus_dir: str | None = None
     rag_collection_name: str = "exoai_corpus"
+    rag_incremental_indexing: bool = True
+    rag_manifest_path: str | None = None
+    # Fuse dense results with a BM25 keyword index rebuilt whenever the corpus changes.
+    rag_hybrid_search: bool = True
+    rag_lexical_index_dir: str | None = None
+    # "qdrant" uses the server above; "local" keeps the collection in vector_store_dir.
+    vector_backend: str = "qdrant"
+    vector_store_dir: str | None = None
+    vector_store_dtype: str = "float32"
+    # Approximate index for the local store ("ivfpq" or "hnsw"), built with
+    # scripts/build_vector_index.py.
+    vector_store_index: str | None = None
+    vector_store_nprobe: int = 16
+    vector_store_ef_search: int = 64
+    vector_store_rerank: int = 16
+    embedding_cache_enabled: bool = True
+    embedding_cache_dir: str | None = None
     jwt_secret_key: str = "super-secret-key"
     jwt_algorithm: str = "HS256"
     log_level: str = "INFO"
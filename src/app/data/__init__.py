@@ -1,10 +1,27 @@
 """Data access and ingestion utilities."""
 
+from .downloads import (  # noqa: F401
+    DownloadConfig,
+    DownloadError,
+    DownloadResult,
+    DownloadTask,
+    ParallelDownloader,
+)
 from .earthaccess_client import EarthAccessClient, EarthAccessCredentials  # noqa: F401
 from .ingestion import IngestionRequest, LightCurveIngestionService  # noqa: F401
-from .paths import get_data_dir, get_raw_data_dir, get_processed_data_dir  # noqa: F401
+from .paths import get_data_dir, get_processed_data_dir, get_raw_data_dir  # noqa: F401
+from .uploads import (  # noqa: F401
+    TooManyFilesError,
+    UploadTooLargeError,
+    extract_lightcurves,
+)
 
 __all__ = [
+    "DownloadConfig",
+    "DownloadError",
+    "DownloadResult",
+    "DownloadTask",
+    "ParallelDownloader",
     "EarthAccessClient",
     "EarthAccessCredentials",
     "IngestionRequest",
@@ -12,4 +29,7 @@ __all__ = [
     "get_data_dir",
     "get_raw_data_dir",
     "get_processed_data_dir",
+    "TooManyFilesError",
+    "UploadTooLargeError",
+    "extract_lightcurves",
 ]
@@ -0,0 +1,287 @@
+"""Parallel, resumable file downloads for mission archives.
+
+A :class:`ParallelDownloader` fetches many files at once with a bounded number of
+connections. Each file is streamed to a ``.part`` sibling that survives failures and
+restarts: the next attempt asks the server for the missing tail with a ``Range`` header
+and only renames the file into place once its size (and checksum, when known) check out.
+Files already on disk and catalogued with the same size and checksum are skipped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+from urllib.parse import unquote, urlparse
+
+import httpx
+
+LOGGER = logging.getLogger(__name__)
+
+DOWNLOADED = "downloaded"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+# Statuses worth another attempt; other 4xx responses fail immediately.
+RETRY_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class DownloadError(RuntimeError):
+    """Raised when some files could not be fetched after every retry."""
+
+    def __init__(self, failures: Sequence["DownloadResult"]) -> None:
+        self.failures = list(failures)
+        first = self.failures[0]
+        super().__init__(
+            f"{len(self.failures)} download(s) failed; "
+            f"first: {first.task.url}: {first.error}"
+        )
+
+
+class _RetryableError(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class DownloadConfig:
+    concurrency: int = 8
+    max_attempts: int = 5
+    # Delay before retry ``n`` is ``backoff_seconds * 2**(n - 1)``, jittered and capped.
+    backoff_seconds: float = 1.0
+    max_backoff_seconds: float = 60.0
+    timeout_seconds: float = 60.0
+    chunk_bytes: int = 1024 * 1024
+    # Re-hash catalogued files before skipping them instead of trusting size alone.
+    verify_existing: bool = False
+
+
+@dataclass(slots=True)
+class DownloadTask:
+    """One file to fetch; ``size`` and ``checksum`` (SHA-256 hex) are checked if set."""
+
+    url: str
+    destination: Path
+    size: int | None = None
+    checksum: str | None = None
+    metadata: dict[str, Any] | None = None
+
+
+@dataclass(slots=True)
+class DownloadResult:
+    task: DownloadTask
+    status: str
+    size: int = 0
+    checksum: str | None = None
+    attempts: int = 0
+    error: str | None = None
+    resumed_from: int = 0
+
+
+def file_checksum(path: Path, chunk_bytes: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(chunk_bytes):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _partial_path(destination: Path) -> Path:
+    return destination.with_name(destination.name + ".part")
+
+
+class ParallelDownloader:
+    """Download many files concurrently with retries, resume and catalogue skipping."""
+
+    def __init__(
+        self,
+        config: DownloadConfig | None = None,
+        *,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.config = config or DownloadConfig()
+        if self.config.concurrency < 1 or self.config.max_attempts < 1:
+            raise ValueError("concurrency and max_attempts must be at least 1")
+        self._client = client
+
+    async def download_all(
+        self,
+        tasks: Sequence[DownloadTask],
+        *,
+        known: Mapping[str, tuple[int | None, str | None]] | None = None,
+    ) -> list[DownloadResult]:
+        """Fetch ``tasks`` and return one result per task, in order.
+
+        ``known`` maps resolved destination paths to the ``(size, checksum)`` recorded
+        in the catalogue; matching files on disk are skipped without a request.
+        """
+
+        known = known or {}
+        semaphore = asyncio.Semaphore(self.config.concurrency)
+        client = self._client or httpx.AsyncClient(
+            timeout=self.config.timeout_seconds,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.config.concurrency),
+        )
+
+        async def _bounded(task: DownloadTask) -> DownloadResult:
+            async with semaphore:
+                return await self._download(
+                    client, task, known.get(str(task.destination.resolve()))
+                )
+
+        try:
+            return list(await asyncio.gather(*(_bounded(task) for task in tasks)))
+        finally:
+            if self._client is None:
+                await client.aclose()
+
+    async def _download(
+        self,
+        client: httpx.AsyncClient,
+        task: DownloadTask,
+        catalogued: tuple[int | None, str | None] | None,
+    ) -> DownloadResult:
+        if await asyncio.to_thread(self._is_current, task, catalogued):
+            size, checksum = catalogued  # type: ignore[misc]
+            return DownloadResult(task, SKIPPED, size=size or 0, checksum=checksum)
+
+        task.destination.parent.mkdir(parents=True, exist_ok=True)
+        partial = _partial_path(task.destination)
+        resumed_from = partial.stat().st_size if partial.exists() else 0
+        error: str | None = None
+        for attempt in range(1, self.config.max_attempts + 1):
+            try:
+                await self._fetch(client, task, partial)
+                size, checksum = await asyncio.to_thread(self._finalize, task, partial)
+                return DownloadResult(
+                    task,
+                    DOWNLOADED,
+                    size=size,
+                    checksum=checksum,
+                    attempts=attempt,
+                    resumed_from=resumed_from,
+                )
+            except (_RetryableError, httpx.TransportError, OSError) as exc:
+                error = (
+                    str(exc)
+                    if isinstance(exc, _RetryableError)
+                    else f"{type(exc).__name__}: {exc}"
+                )
+            except httpx.HTTPStatusError as exc:
+                return DownloadResult(task, FAILED, attempts=attempt, error=str(exc))
+            if attempt < self.config.max_attempts:
+                delay = min(
+                    self.config.max_backoff_seconds,
+                    self.config.backoff_seconds * 2 ** (attempt - 1),
+                )
+                LOGGER.warning(
+                    "Retrying download",
+                    extra={"url": task.url, "attempt": attempt, "error": error},
+                )
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+        return DownloadResult(
+            task, FAILED, attempts=self.config.max_attempts, error=error
+        )
+
+    def _is_current(
+        self, task: DownloadTask, catalogued: tuple[int | None, str | None] | None
+    ) -> bool:
+        if catalogued is None or not task.destination.exists():
+            return False
+        size, checksum = catalogued
+        on_disk = task.destination.stat().st_size
+        if (
+            size is None
+            or on_disk != size
+            or (task.size is not None and task.size != size)
+        ):
+            return False
+        if task.checksum is not None and task.checksum != checksum:
+            return False
+        if self.config.verify_existing and checksum is not None:
+            return file_checksum(task.destination, self.config.chunk_bytes) == checksum
+        return True
+
+    async def _fetch(
+        self, client: httpx.AsyncClient, task: DownloadTask, partial: Path
+    ) -> None:
+        """Append the missing bytes of ``task`` to ``partial``."""
+
+        offset = partial.stat().st_size if partial.exists() else 0
+        if task.size is not None and offset >= task.size:
+            return
+        if urlparse(task.url).scheme == "file":
+            await asyncio.to_thread(self._copy_local, task, partial, offset)
+            return
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        async with client.stream("GET", task.url, headers=headers) as response:
+            if response.status_code == 416 and offset:
+                # Nothing to send: the partial file is complete, or longer than remote.
+                if task.size is None:
+                    return
+                partial.unlink(missing_ok=True)
+                raise _RetryableError("Range not satisfiable; restarting download")
+            if response.status_code in RETRY_STATUS_CODES:
+                raise _RetryableError(f"HTTP {response.status_code} from {task.url}")
+            response.raise_for_status()
+            if response.status_code == 206 and _range_start(response) != offset:
+                partial.unlink(missing_ok=True)
+                raise _RetryableError(
+                    "Server resumed at the wrong offset; restarting download"
+                )
+            # A server that ignores Range replies 200 with the whole file.
+            mode = "ab" if response.status_code == 206 else "wb"
+            handle = await asyncio.to_thread(partial.open, mode)
+            try:
+                # Unchunked so every byte received is on disk before a drop raises.
+                async for chunk in response.aiter_bytes():
+                    await asyncio.to_thread(handle.write, chunk)
+            finally:
+                await asyncio.to_thread(handle.close)
+
+    def _copy_local(self, task: DownloadTask, partial: Path, offset: int) -> None:
+        source = Path(unquote(urlparse(task.url).path))
+        with source.open("rb") as reader, partial.open("ab") as writer:
+            reader.seek(offset)
+            while chunk := reader.read(self.config.chunk_bytes):
+                writer.write(chunk)
+
+    def _finalize(self, task: DownloadTask, partial: Path) -> tuple[int, str]:
+        size = partial.stat().st_size
+        if task.size is not None and size != task.size:
+            if size > task.size:
+                partial.unlink()
+            raise _RetryableError(f"Expected {task.size} bytes, have {size}")
+        checksum = file_checksum(partial, self.config.chunk_bytes)
+        if task.checksum is not None and checksum != task.checksum:
+            partial.unlink()
+            raise _RetryableError("Checksum mismatch")
+        partial.replace(task.destination)
+        return size, checksum
+
+
+def _range_start(response: httpx.Response) -> int | None:
+    # Content-Range: bytes <start>-<end>/<total>
+    value = response.headers.get("content-range", "")
+    try:
+        return int(value.split()[1].split("-")[0])
+    except (IndexError, ValueError):
+        return None
+
+
+__all__ = [
+    "DOWNLOADED",
+    "DownloadConfig",
+    "DownloadError",
+    "DownloadResult",
+    "DownloadTask",
+    "FAILED",
+    "ParallelDownloader",
+    "SKIPPED",
+    "file_checksum",
+]
@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Callable, Literal
+from urllib.parse import urlencode
+
+import numpy as np
 
 from ..config import get_settings
-from ..db import get_session, record_lightcurve_downloads
+from ..db import catalogued_files, get_session, record_lightcurve_downloads
+from .downloads import (
+    DOWNLOADED,
+    FAILED,
+    DownloadConfig,
+    DownloadError,
+    DownloadTask,
+    ParallelDownloader,
+)
 from .paths import get_raw_data_dir
 
 try:  # pragma: no cover - optional heavy dependency
@@ -38,9 +50,16 @@ class IngestionRequest:
 class LightCurveIngestionService:
     """Download light curves using Lightkurve search interfaces."""
 
-    def __init__(self, *, download_dir: Path | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        download_dir: Path | None = None,
+        on_recorded: Callable[[list[Path]], None] | None = None,
+    ) -> None:
         self.settings = get_settings()
         self.download_dir = download_dir
+        # Called with newly catalogued files, e.g. to wake the catalog pipeline.
+        self.on_recorded = on_recorded
 
     def _ensure_lightkurve(self) -> None:
         if lk is None:  # pragma: no cover
@@ -56,9 +75,86 @@ class LightCurveIngestionService:
         path.mkdir(parents=True, exist_ok=True)
         return path
 
+    def _download_config(self) -> DownloadConfig:
+        return DownloadConfig(
+            concurrency=self.settings.download_concurrency,
+            max_attempts=self.settings.download_max_attempts,
+            backoff_seconds=self.settings.download_backoff_seconds,
+            timeout_seconds=self.settings.download_timeout_seconds,
+            verify_existing=self.settings.download_verify_existing,
+        )
+
+    def _download_tasks(
+        self, search_result: Any, destination: Path
+    ) -> list[DownloadTask]:
+        """One task per product, laid out like lightkurve's cache for reuse."""
+
+        table = search_result.table
+        tasks = []
+        for row in table:
+            size = row["size"] if "size" in table.colnames else None
+            tasks.append(
+                DownloadTask(
+                    url=(
+                        f"{self.settings.mast_download_url}"
+                        f"?{urlencode({'uri': row['dataURI']})}"
+                    ),
+                    destination=(
+                        destination
+                        / "mastDownload"
+                        / str(row["obs_collection"])
+                        / str(row["obs_id"])
+                        / str(row["productFilename"])
+                    ).resolve(),
+                    size=(
+                        int(size)
+                        if size is not None and not np.ma.is_masked(size)
+                        else None
+                    ),
+                )
+            )
+        return tasks
+
+    @staticmethod
+    def _read_metadata(path: Path, flux_type: str) -> dict | None:
+        try:
+            return dict(lk.read(str(path), flux_column=flux_type).meta)
+        except Exception as exc:  # pragma: no cover - corrupt or unexpected products
+            LOGGER.warning(
+                "Could not read light-curve header",
+                extra={"path": str(path), "error": str(exc)},
+            )
+            return None
+
+    @staticmethod
+    def _catalogued(paths: list[str]) -> dict[str, tuple[int | None, str | None]]:
+        with get_session() as session:
+            return catalogued_files(session, paths)
+
+    @staticmethod
+    def _record_downloads(**kwargs: Any) -> None:
+        with get_session() as session:
+            record_lightcurve_downloads(session, **kwargs)
+
     def fetch(self, request: IngestionRequest, *, limit: int | None = None) -> list[Path]:
         """Search and download light curves according to the request."""
 
+        return asyncio.run(self.fetch_async(request, limit=limit))
+
+    async def fetch_async(
+        self,
+        request: IngestionRequest,
+        *,
+        limit: int | None = None,
+        downloader: ParallelDownloader | None = None,
+    ) -> list[Path]:
+        """Search MAST, then download the products in parallel and catalogue them.
+
+        Files already catalogued with a matching size are skipped, and interrupted
+        downloads resume. Successful files are recorded before :class:`DownloadError`
+        is raised for the rest, so a retry only fetches what is still missing.
+        """
+
         self._ensure_lightkurve()
         search_kwargs: dict[str, Any] = {
             "target": request.target,
@@ -74,55 +170,66 @@ class LightCurveIngestionService:
             search_kwargs["sector"] = request.sector
 
         LOGGER.info("Searching light curves", extra={"params": search_kwargs})
-        search_result = lk.search_lightcurve(**search_kwargs)
+        search_result = await asyncio.to_thread(lk.search_lightcurve, **search_kwargs)
         if limit is not None:
             search_result = search_result[:limit]
 
         destination = self._resolve_directory(request.mission or "unknown")
+        tasks = self._download_tasks(search_result, destination)
         LOGGER.info(
             "Downloading light curves",
             extra={
-                "count": len(search_result),
+                "count": len(tasks),
                 "destination": str(destination),
                 "target": request.target,
             },
         )
-        downloaded = search_result.download_all(
-            download_dir=str(destination),
-            flux_column=request.flux_type,
+        # Database calls run on a thread so the job worker's loop keeps serving jobs.
+        known = await asyncio.to_thread(
+            self._catalogued, [str(task.destination) for task in tasks]
         )
-
-        records: list[tuple[str, dict | None]] = []
-        for lightcurve in downloaded:
-            path: Path | None = None
-            lc_path = getattr(lightcurve, "path", None)
-            if lc_path:
-                path = Path(lc_path)
-            else:
-                filename = (
-                    lightcurve.meta.get("FILENAME")
-                    or lightcurve.meta.get("ORIGIN_FILENAME")
-                )
-                if filename:
-                    path = destination / filename
-            if path is not None:
-                path_str = str(path.resolve())
-                metadata = getattr(lightcurve, "meta", None)
-                if metadata is not None:
-                    metadata = dict(metadata)
-                records.append((path_str, metadata))
-
-        if records:
-            with get_session() as session:
-                record_lightcurve_downloads(
-                    session,
-                    target=request.target,
-                    mission=request.mission,
-                    flux_type=request.flux_type,
-                    records=records,
+        downloader = downloader or ParallelDownloader(self._download_config())
+        results = await downloader.download_all(tasks, known=known)
+
+        downloaded = [result for result in results if result.status == DOWNLOADED]
+        metadata = await asyncio.gather(
+            *(
+                asyncio.to_thread(
+                    self._read_metadata, result.task.destination, request.flux_type
                 )
+                for result in downloaded
+            )
+        )
+        if downloaded:
+            await asyncio.to_thread(
+                self._record_downloads,
+                target=request.target,
+                mission=request.mission,
+                flux_type=request.flux_type,
+                records=[
+                    (str(result.task.destination), meta)
+                    for result, meta in zip(downloaded, metadata)
+                ],
+                files={
+                    str(result.task.destination): (result.size, result.checksum)
+                    for result in downloaded
+                },
+            )
+            if self.on_recorded is not None:
+                self.on_recorded([result.task.destination for result in downloaded])
 
-        return [Path(path) for path, _ in records]
+        failures = [result for result in results if result.status == FAILED]
+        LOGGER.info(
+            "Downloaded light curves",
+            extra={
+                "downloaded": len(downloaded),
+                "skipped": len(results) - len(downloaded) - len(failures),
+                "failed": len(failures),
+            },
+        )
+        if failures:
+            raise DownloadError(failures)
+        return [result.task.destination for result in results]
 
 
 __all__ = ["IngestionRequest", "LightCurveIngestionService"]
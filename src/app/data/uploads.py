@@ -0,0 +1,105 @@
+"""Spooling of uploaded light curves and archives to disk."""
+
+from __future__ import annotations
+
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterable, Iterator
+
+from ..preprocessing.batch import LIGHTCURVE_SUFFIXES
+from ..telemetry import STAGE_LATENCY
+
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".zip")
+
+
+class TooManyFilesError(ValueError):
+    """Raised when an upload expands to more light curves than allowed."""
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload expands to more bytes than allowed (e.g. a zip bomb)."""
+
+
+def _is_lightcurve(name: str) -> bool:
+    return name.lower().endswith(LIGHTCURVE_SUFFIXES)
+
+
+def _members(name: str, stream: BinaryIO) -> Iterator[tuple[str, BinaryIO]]:
+    lowered = name.lower()
+    if lowered.endswith(".zip"):
+        with zipfile.ZipFile(stream) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_lightcurve(info.filename):
+                    with archive.open(info) as member:
+                        yield info.filename, member
+    elif lowered.endswith(ARCHIVE_SUFFIXES):
+        # Streaming mode reads members in order without seeking back through the upload.
+        with tarfile.open(fileobj=stream, mode="r|*") as archive:
+            for info in archive:
+                if info.isfile() and _is_lightcurve(info.name):
+                    member = archive.extractfile(info)
+                    if member is not None:
+                        yield info.name, member
+    elif _is_lightcurve(name):
+        yield name, stream
+
+
+def _copy(source: BinaryIO, target: BinaryIO, limit: int | None) -> int:
+    """Copy ``source`` into ``target``, raising once over ``limit`` bytes were read."""
+
+    copied = 0
+    while chunk := source.read(1 << 20):
+        copied += len(chunk)
+        if limit is not None and copied > limit:
+            raise UploadTooLargeError("Upload expands to more bytes than allowed")
+        target.write(chunk)
+    return copied
+
+
+@STAGE_LATENCY.labels(stage="upload").time()
+def extract_lightcurves(
+    uploads: Iterable[tuple[str, BinaryIO]],
+    directory: str | Path,
+    max_files: int,
+    max_bytes: int | None = None,
+) -> list[tuple[str, Path]]:
+    """Write every light curve in ``uploads`` (files or archives) below ``directory``.
+
+    Returns ``(name, path)`` pairs in upload order; ``name`` is the file's name inside
+    its upload. Files whose suffix is not a light-curve format are ignored. On-disk
+    names are prefixed with a counter so members from different archives cannot collide
+    or escape ``directory``. ``max_bytes`` caps the total written. On any error
+    ``directory`` is removed again.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    extracted: list[tuple[str, Path]] = []
+    written = 0
+    try:
+        for upload_name, stream in uploads:
+            for name, member in _members(upload_name, stream):
+                if len(extracted) >= max_files:
+                    raise TooManyFilesError(
+                        f"Upload contains more than {max_files} light curves"
+                    )
+                path = directory / f"{len(extracted):06d}-{PurePosixPath(name).name}"
+                with path.open("wb") as fh:
+                    written += _copy(
+                        member, fh, None if max_bytes is None else max_bytes - written
+                    )
+                extracted.append((name, path))
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    return extracted
+
+
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "TooManyFilesError",
+    "UploadTooLargeError",
+    "extract_lightcurves",
+]
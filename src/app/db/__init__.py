@@ -1,15 +1,54 @@
 """Database helpers and models."""
 
 from .database import get_engine, get_session, init_db
-from .models import LightCurveRecord, PreprocessingRecord
-from .operations import record_lightcurve_downloads, record_preprocessing_result
+from .jobs import (
+    cancel_job,
+    claim_job,
+    create_job,
+    finish_job,
+    get_job,
+    heartbeat_job,
+    list_job_items,
+    pending_job_items,
+    record_job_item,
+    release_job,
+)
+from .models import JobItemRecord, JobRecord, LightCurveRecord, PreprocessingRecord
+from .operations import (
+    catalogued_files,
+    claim_lightcurves,
+    list_candidates,
+    pending_lightcurves,
+    record_lightcurve_downloads,
+    record_preprocessing_failure,
+    record_preprocessing_result,
+    release_lightcurve_claims,
+)
 
 __all__ = [
     "get_engine",
     "get_session",
     "init_db",
+    "JobItemRecord",
+    "JobRecord",
     "LightCurveRecord",
     "PreprocessingRecord",
+    "cancel_job",
+    "catalogued_files",
+    "claim_job",
+    "claim_lightcurves",
+    "create_job",
+    "finish_job",
+    "get_job",
+    "heartbeat_job",
+    "list_job_items",
+    "pending_job_items",
+    "record_job_item",
+    "release_job",
+    "list_candidates",
+    "pending_lightcurves",
     "record_lightcurve_downloads",
+    "record_preprocessing_failure",
     "record_preprocessing_result",
+    "release_lightcurve_claims",
 ]
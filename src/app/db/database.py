@@ -5,6 +5,9 @@ from __future__ import annotations
 from contextlib import contextmanager
 from typing import Generator
 
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
 from sqlmodel import Session, SQLModel, create_engine
 
 from ..config import get_settings
@@ -30,12 +33,48 @@ def get_session() -> Generator[Session, None, None]:
         yield session
 
 
+def _add_missing_columns(engine: Engine) -> list[str]:
+    """Add model columns missing from existing tables; returns the ``table.column``s.
+
+    ``create_all`` never alters an existing table, so a database created before a model
+    gained a column would fail every select of that model. Only nullable columns can be
+    added this way.
+    """
+
+    added: list[str] = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        preparer = connection.dialect.identifier_preparer
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    raise RuntimeError(
+                        f"Cannot add non-nullable column {table.name}.{column.name} "
+                        "to an existing table"
+                    )
+                definition = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {definition}"
+                    )
+                )
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
 def init_db() -> None:
-    """Create database tables if they do not exist."""
+    """Create database tables if they do not exist and add columns they are missing."""
 
     from . import models  # noqa: F401  Ensures model metadata is registered
 
     SQLModel.metadata.create_all(_ENGINE)
+    _add_missing_columns(_ENGINE)
 
 
 __all__ = ["get_engine", "get_session", "init_db"]
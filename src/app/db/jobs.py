@@ -0,0 +1,322 @@
+"""Database operations for durable jobs.
+
+Workers in any number of processes share the ``jobs`` table. A worker claims a job with
+a conditional ``UPDATE`` (compare-and-swap on status and lease), so exactly one claimant
+wins on any backend, then renews its lease with heartbeats while it runs. A job whose
+lease expires, because its worker died or lost the database, becomes claimable again and
+resumes with the items that are still pending.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import and_, func, or_, update
+from sqlmodel import Session, select
+
+from ..telemetry import STAGE_LATENCY
+from .models import (
+    ITEM_FAILED,
+    ITEM_PENDING,
+    ITEM_SUCCEEDED,
+    JOB_CANCELLED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JobItemRecord,
+    JobRecord,
+    utcnow,
+)
+
+
+def _claimable(now: datetime):
+    return or_(
+        JobRecord.status == JOB_QUEUED,
+        and_(JobRecord.status == JOB_RUNNING, JobRecord.lease_expires_at < now),
+    )
+
+
+def create_job(
+    session: Session,
+    *,
+    job_id: str,
+    kind: str,
+    payload: dict[str, Any] | None = None,
+    items: Iterable[tuple[str, dict[str, Any] | None]] = (),
+    owner: str | None = None,
+    max_attempts: int = 3,
+) -> JobRecord:
+    """Insert a queued job and its ``(name, payload)`` items."""
+
+    job = JobRecord(
+        id=job_id,
+        kind=kind,
+        payload=payload or {},
+        owner=owner,
+        max_attempts=max_attempts,
+    )
+    session.add(job)
+    session.flush()
+    total = 0
+    for position, (name, item_payload) in enumerate(items):
+        session.add(
+            JobItemRecord(
+                job_id=job_id, position=position, name=name, payload=item_payload
+            )
+        )
+        total = position + 1
+    job.total_items = total
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def claim_job(
+    session: Session,
+    *,
+    worker_id: str,
+    lease_seconds: float,
+    kinds: Sequence[str] | None = None,
+) -> JobRecord | None:
+    """Atomically take the oldest claimable job for ``worker_id``, or ``None``."""
+
+    now = utcnow()
+    # Jobs abandoned by a worker on their last attempt fail instead of looping forever.
+    session.execute(
+        update(JobRecord)
+        .where(
+            JobRecord.status == JOB_RUNNING,
+            JobRecord.lease_expires_at < now,
+            JobRecord.attempts >= JobRecord.max_attempts,
+        )
+        .values(
+            status=JOB_FAILED,
+            error="Lease expired on the final attempt",
+            worker_id=None,
+            finished_at=now,
+            updated_at=now,
+        )
+    )
+    session.commit()
+
+    query = (
+        select(JobRecord.id)
+        .where(_claimable(now))
+        .order_by(JobRecord.created_at)
+        .limit(8)
+    )
+    if kinds is not None:
+        query = query.where(JobRecord.kind.in_(kinds))
+    for job_id in session.exec(query).all():
+        claimed = session.execute(
+            update(JobRecord)
+            .where(JobRecord.id == job_id, _claimable(now))
+            .values(
+                status=JOB_RUNNING,
+                worker_id=worker_id,
+                attempts=JobRecord.attempts + 1,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                heartbeat_at=now,
+                started_at=func.coalesce(JobRecord.started_at, now),
+                updated_at=now,
+            )
+        )
+        session.commit()
+        if claimed.rowcount == 1:
+            return session.get(JobRecord, job_id, populate_existing=True)
+    return None
+
+
+def heartbeat_job(
+    session: Session, job_id: str, *, worker_id: str, lease_seconds: float
+) -> bool:
+    """Extend the lease; ``False`` means the job was cancelled or claimed elsewhere."""
+
+    now = utcnow()
+    renewed = session.execute(
+        update(JobRecord)
+        .where(
+            JobRecord.id == job_id,
+            JobRecord.worker_id == worker_id,
+            JobRecord.status == JOB_RUNNING,
+        )
+        .values(
+            lease_expires_at=now + timedelta(seconds=lease_seconds), heartbeat_at=now
+        )
+    )
+    session.commit()
+    return renewed.rowcount == 1
+
+
+def pending_job_items(session: Session, job_id: str) -> list[JobItemRecord]:
+    return list(
+        session.exec(
+            select(JobItemRecord)
+            .where(JobItemRecord.job_id == job_id, JobItemRecord.status == ITEM_PENDING)
+            .order_by(JobItemRecord.position)
+        ).all()
+    )
+
+
+@STAGE_LATENCY.labels(stage="db_write").time()
+def record_job_item(
+    session: Session,
+    job_id: str,
+    position: int,
+    *,
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> bool:
+    """Store an item's outcome and bump the job's progress counters exactly once."""
+
+    now = utcnow()
+    status = ITEM_FAILED if error is not None else ITEM_SUCCEEDED
+    updated = session.execute(
+        update(JobItemRecord)
+        .where(
+            JobItemRecord.job_id == job_id,
+            JobItemRecord.position == position,
+            JobItemRecord.status == ITEM_PENDING,
+        )
+        .values(status=status, result=result, error=error, completed_at=now)
+    )
+    if updated.rowcount != 1:
+        session.rollback()
+        return False
+    counter = JobRecord.failed_items if error is not None else JobRecord.succeeded_items
+    session.execute(
+        update(JobRecord)
+        .where(JobRecord.id == job_id)
+        .values({counter: counter + 1, "updated_at": now})
+    )
+    session.commit()
+    return True
+
+
+def finish_job(
+    session: Session,
+    job_id: str,
+    *,
+    worker_id: str,
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> bool:
+    """Mark a running job succeeded, or failed when ``error`` is given."""
+
+    now = utcnow()
+    finished = session.execute(
+        update(JobRecord)
+        .where(
+            JobRecord.id == job_id,
+            JobRecord.worker_id == worker_id,
+            JobRecord.status == JOB_RUNNING,
+        )
+        .values(
+            status=JOB_FAILED if error is not None else JOB_SUCCEEDED,
+            result=result,
+            error=error,
+            lease_expires_at=None,
+            finished_at=now,
+            updated_at=now,
+        )
+    )
+    session.commit()
+    return finished.rowcount == 1
+
+
+def release_job(
+    session: Session,
+    job_id: str,
+    *,
+    worker_id: str,
+    error: str | None,
+    count_attempt: bool = True,
+) -> bool:
+    """Give a job back to the queue, or fail it once its attempts are used up.
+
+    ``count_attempt=False`` is for graceful shutdown: the attempt taken by the claim is
+    refunded so restarting workers does not exhaust a job's retries.
+    """
+
+    job = session.get(JobRecord, job_id, populate_existing=True)
+    if job is None or job.worker_id != worker_id or job.status != JOB_RUNNING:
+        return False
+    if count_attempt and job.attempts >= job.max_attempts:
+        return finish_job(
+            session, job_id, worker_id=worker_id, error=error or "Job failed"
+        )
+    now = utcnow()
+    values: dict[str, Any] = {
+        "status": JOB_QUEUED,
+        "worker_id": None,
+        "lease_expires_at": None,
+        "updated_at": now,
+    }
+    if error is not None:
+        values["error"] = error
+    if not count_attempt:
+        values["attempts"] = JobRecord.attempts - 1
+    released = session.execute(
+        update(JobRecord)
+        .where(
+            JobRecord.id == job_id,
+            JobRecord.worker_id == worker_id,
+            JobRecord.status == JOB_RUNNING,
+        )
+        .values(values)
+    )
+    session.commit()
+    return released.rowcount == 1
+
+
+def cancel_job(session: Session, job_id: str) -> bool:
+    """Cancel a queued or running job; its worker notices at the next heartbeat."""
+
+    now = utcnow()
+    cancelled = session.execute(
+        update(JobRecord)
+        .where(JobRecord.id == job_id, JobRecord.status.in_((JOB_QUEUED, JOB_RUNNING)))
+        .values(
+            status=JOB_CANCELLED, lease_expires_at=None, finished_at=now, updated_at=now
+        )
+    )
+    session.commit()
+    return cancelled.rowcount == 1
+
+
+def get_job(session: Session, job_id: str) -> JobRecord | None:
+    return session.get(JobRecord, job_id, populate_existing=True)
+
+
+def list_job_items(
+    session: Session,
+    job_id: str,
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    status: str | None = None,
+) -> list[JobItemRecord]:
+    query = select(JobItemRecord).where(JobItemRecord.job_id == job_id)
+    if status is not None:
+        query = query.where(JobItemRecord.status == status)
+    return list(
+        session.exec(
+            query.order_by(JobItemRecord.position).offset(offset).limit(limit)
+        ).all()
+    )
+
+
+__all__ = [
+    "cancel_job",
+    "claim_job",
+    "create_job",
+    "finish_job",
+    "get_job",
+    "heartbeat_job",
+    "list_job_items",
+    "pending_job_items",
+    "record_job_item",
+    "release_job",
+]
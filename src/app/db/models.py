@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import JSON, Column, ForeignKey, String, UniqueConstraint
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    ForeignKey,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlmodel import Field, SQLModel
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class LightCurveRecord(SQLModel, table=True):
     """Metadata about downloaded light curves."""
 
@@ -21,7 +33,19 @@ class LightCurveRecord(SQLModel, table=True):
     path: str = Field(sa_column=Column(String(1024), nullable=False))
     flux_type: str = Field(default="PDCSAP_FLUX")
     download_status: str = Field(default="downloaded")
-    downloaded_at: datetime = Field(default_factory=datetime.utcnow)
+    downloaded_at: datetime = Field(default_factory=utcnow)
+    # Size and SHA-256 hex digest when the file was recorded; used to skip re-downloads.
+    file_size: int | None = Field(
+        default=None, sa_column=Column(BigInteger, nullable=True)
+    )
+    checksum: str | None = Field(default=None, max_length=64)
+    # Set when the catalog pipeline could not preprocess the file; it is not retried.
+    preprocess_error: str | None = Field(
+        default=None, sa_column=Column(Text, nullable=True)
+    )
+    # Pipeline worker holding the file and until when; an expired lease can be retaken.
+    preprocess_claimed_by: str | None = Field(default=None, max_length=64)
+    preprocess_lease_expires_at: datetime | None = Field(default=None)
     source_metadata: dict[str, Any] | None = Field(
         default=None,
         sa_column=Column(JSON, nullable=True),
@@ -44,7 +68,92 @@ class PreprocessingRecord(SQLModel, table=True):
         default=None,
         sa_column=Column(String(1024), nullable=True),
     )
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Candidate features from ``preprocessing.features.extract_features``.
+    features: dict[str, float] | None = Field(
+        default=None, sa_column=Column(JSON, nullable=True)
+    )
+    created_at: datetime = Field(default_factory=utcnow)
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+JOB_FINAL_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+ITEM_PENDING = "pending"
+ITEM_SUCCEEDED = "succeeded"
+ITEM_FAILED = "failed"
+
+
+class JobRecord(SQLModel, table=True):
+    """A unit of long-running work claimed by workers under a renewable lease."""
+
+    __tablename__ = "jobs"
+
+    id: str = Field(primary_key=True, max_length=32)
+    kind: str = Field(index=True)
+    status: str = Field(default=JOB_QUEUED, index=True)
+    owner: str | None = Field(default=None, index=True)
+    payload: dict[str, Any] = Field(
+        default_factory=dict, sa_column=Column(JSON, nullable=False)
+    )
+    result: dict[str, Any] | None = Field(
+        default=None, sa_column=Column(JSON, nullable=True)
+    )
+    error: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    total_items: int = 0
+    succeeded_items: int = 0
+    failed_items: int = 0
+    attempts: int = 0
+    max_attempts: int = 3
+    worker_id: str | None = Field(default=None)
+    lease_expires_at: datetime | None = Field(default=None, index=True)
+    heartbeat_at: datetime | None = None
+    created_at: datetime = Field(default_factory=utcnow, index=True)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    updated_at: datetime = Field(default_factory=utcnow)
+
+
+class JobItemRecord(SQLModel, table=True):
+    """One input of a job and, once processed, its result or error."""
+
+    __tablename__ = "job_items"
+    __table_args__ = (
+        UniqueConstraint("job_id", "position", name="uq_job_item_position"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    job_id: str = Field(
+        sa_column=Column(String(32), ForeignKey("jobs.id"), nullable=False, index=True)
+    )
+    position: int
+    name: str = Field(sa_column=Column(String(1024), nullable=False))
+    payload: dict[str, Any] | None = Field(
+        default=None, sa_column=Column(JSON, nullable=True)
+    )
+    status: str = Field(default=ITEM_PENDING, index=True)
+    result: dict[str, Any] | None = Field(
+        default=None, sa_column=Column(JSON, nullable=True)
+    )
+    error: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    completed_at: datetime | None = None
 
 
-__all__ = ["LightCurveRecord", "PreprocessingRecord"]
+__all__ = [
+    "ITEM_FAILED",
+    "ITEM_PENDING",
+    "ITEM_SUCCEEDED",
+    "JOB_CANCELLED",
+    "JOB_FAILED",
+    "JOB_FINAL_STATES",
+    "JOB_QUEUED",
+    "JOB_RUNNING",
+    "JOB_SUCCEEDED",
+    "JobItemRecord",
+    "JobRecord",
+    "LightCurveRecord",
+    "PreprocessingRecord",
+]
@@ -2,14 +2,86 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Iterable
+from datetime import timedelta
+from typing import Any, Iterable, Mapping
 
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import Session, select
 
-from .models import LightCurveRecord, PreprocessingRecord
+from ..telemetry import STAGE_LATENCY
+from .models import LightCurveRecord, PreprocessingRecord, utcnow
 
+# Rows per INSERT ... ON CONFLICT batch or per IN (...) lookup.
+UPSERT_CHUNK_SIZE = 1000
 
+
+def _upsert_rows(
+    session: Session,
+    rows: list[dict[str, Any]],
+    chunk_size: int,
+) -> None:
+    """``INSERT ... ON CONFLICT (path) DO UPDATE`` on SQLite and PostgreSQL."""
+
+    dialect = session.get_bind().dialect.name
+    insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+    table = LightCurveRecord.__table__
+    stmt = insert(table)
+    # Same merge rules as the row-by-row path: empty target/mission keep stored ones.
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.path],
+        set_={
+            "downloaded_at": stmt.excluded.downloaded_at,
+            "source_metadata": stmt.excluded.source_metadata,
+            "flux_type": stmt.excluded.flux_type,
+            "file_size": stmt.excluded.file_size,
+            "checksum": stmt.excluded.checksum,
+            "target": func.coalesce(
+                func.nullif(stmt.excluded.target, ""), table.c.target
+            ),
+            "mission": func.coalesce(
+                func.nullif(stmt.excluded.mission, ""), table.c.mission
+            ),
+        },
+    )
+    for start in range(0, len(rows), chunk_size):
+        session.execute(stmt, rows[start : start + chunk_size])
+
+
+def _merge_rows(
+    session: Session,
+    rows: list[dict[str, Any]],
+    chunk_size: int,
+) -> None:
+    """Portable fallback: one ``IN`` lookup per chunk, then update or add in memory."""
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        existing = {
+            record.path: record
+            for record in session.exec(
+                select(LightCurveRecord).where(
+                    LightCurveRecord.path.in_([row["path"] for row in chunk])
+                )
+            ).all()
+        }
+        for row in chunk:
+            record = existing.get(row["path"])
+            if record is None:
+                session.add(LightCurveRecord(**row))
+                continue
+            record.downloaded_at = row["downloaded_at"]
+            record.source_metadata = row["source_metadata"]
+            record.target = row["target"] or record.target
+            record.mission = row["mission"] or record.mission
+            record.flux_type = row["flux_type"]
+            record.file_size = row["file_size"]
+            record.checksum = row["checksum"]
+        session.flush()
+
+
+@STAGE_LATENCY.labels(stage="db_write").time()
 def record_lightcurve_downloads(
     session: Session,
     *,
@@ -17,40 +89,70 @@ def record_lightcurve_downloads(
     mission: str | None,
     flux_type: str,
     records: Iterable[tuple[str, dict | None]],
+    files: Mapping[str, tuple[int | None, str | None]] | None = None,
+    chunk_size: int = UPSERT_CHUNK_SIZE,
 ) -> None:
-    """Insert or update light-curve metadata records."""
-
-    for path, metadata in records:
-        existing = session.exec(
-            select(LightCurveRecord).where(LightCurveRecord.path == path)
-        ).first()
-
-        if existing:
-            existing.downloaded_at = datetime.utcnow()
-            existing.source_metadata = metadata
-            existing.target = target or existing.target
-            existing.mission = mission or existing.mission
-            existing.flux_type = flux_type
-        else:
-            session.add(
-                LightCurveRecord(
-                    target=target,
-                    mission=mission,
-                    path=path,
-                    flux_type=flux_type,
-                    source_metadata=metadata,
-                )
-            )
+    """Insert or update light-curve metadata records, keyed by path.
 
+    ``files`` optionally maps paths to the ``(size, checksum)`` of the downloaded file.
+
+    SQLite and PostgreSQL upsert in batches of ``chunk_size`` rows with ``ON CONFLICT``;
+    other databases look up each chunk's existing paths with a single ``IN`` query.
+    Later records win when a path appears more than once.
+    """
+
+    now = utcnow()
+    files = files or {}
+    rows = {
+        path: {
+            "path": path,
+            "target": target,
+            "mission": mission,
+            "flux_type": flux_type,
+            "download_status": "downloaded",
+            "downloaded_at": now,
+            "source_metadata": metadata,
+            "file_size": files.get(path, (None, None))[0],
+            "checksum": files.get(path, (None, None))[1],
+        }
+        for path, metadata in records
+    }
+    if rows:
+        if session.get_bind().dialect.name in {"sqlite", "postgresql"}:
+            _upsert_rows(session, list(rows.values()), chunk_size)
+        else:
+            _merge_rows(session, list(rows.values()), chunk_size)
     session.commit()
 
 
+def catalogued_files(
+    session: Session,
+    paths: Iterable[str],
+    chunk_size: int = UPSERT_CHUNK_SIZE,
+) -> dict[str, tuple[int | None, str | None]]:
+    """Return the recorded ``(size, checksum)`` of each catalogued path in ``paths``."""
+
+    paths = list(dict.fromkeys(paths))
+    found: dict[str, tuple[int | None, str | None]] = {}
+    for start in range(0, len(paths), chunk_size):
+        query = select(
+            LightCurveRecord.path, LightCurveRecord.file_size, LightCurveRecord.checksum
+        ).where(LightCurveRecord.path.in_(paths[start : start + chunk_size]))
+        found.update(
+            (path, (size, checksum))
+            for path, size, checksum in session.exec(query).all()
+        )
+    return found
+
+
+@STAGE_LATENCY.labels(stage="db_write").time()
 def record_preprocessing_result(
     session: Session,
     *,
     path: str,
     stats: dict[str, float],
     figure_path: str | None = None,
+    features: dict[str, float] | None = None,
 ) -> PreprocessingRecord:
     """Persist preprocessing statistics associated with a light curve."""
 
@@ -76,6 +178,7 @@ def record_preprocessing_result(
         flux_max=float(stats["max"]),
         flux_count=int(stats["count"]),
         figure_path=figure_path,
+        features=features,
     )
     session.add(record)
     session.commit()
@@ -83,4 +186,147 @@ def record_preprocessing_result(
     return record
 
 
-__all__ = ["record_lightcurve_downloads", "record_preprocessing_result"]
+def pending_lightcurves(
+    session: Session,
+    *,
+    after_id: int = 0,
+    limit: int = 100,
+) -> list[tuple[int, str, str]]:
+    """``(id, path, flux_type)`` of never-preprocessed light curves, ordered by id."""
+
+    processed = select(PreprocessingRecord.id).where(
+        PreprocessingRecord.lightcurve_id == LightCurveRecord.id
+    )
+    query = (
+        select(LightCurveRecord.id, LightCurveRecord.path, LightCurveRecord.flux_type)
+        .where(
+            LightCurveRecord.id > after_id,
+            LightCurveRecord.preprocess_error.is_(None),
+            ~processed.exists(),
+        )
+        .order_by(LightCurveRecord.id)
+        .limit(limit)
+    )
+    return [tuple(row) for row in session.exec(query).all()]  # type: ignore[misc]
+
+
+def claim_lightcurves(
+    session: Session,
+    *,
+    worker_id: str,
+    lease_seconds: float,
+    limit: int = 100,
+) -> list[tuple[int, str, str]]:
+    """Lease up to ``limit`` unprocessed light curves to ``worker_id``, oldest first.
+
+    Like :func:`app.db.jobs.claim_job`, the lease is taken with a conditional
+    ``UPDATE``, so concurrent pipelines never receive the same row while its lease is
+    live. Rows whose result was never stored are claimable again once it expires.
+    """
+
+    now = utcnow()
+    processed = select(PreprocessingRecord.id).where(
+        PreprocessingRecord.lightcurve_id == LightCurveRecord.id
+    )
+    claimable = and_(
+        LightCurveRecord.preprocess_error.is_(None),
+        ~processed.exists(),
+        or_(
+            LightCurveRecord.preprocess_lease_expires_at.is_(None),
+            LightCurveRecord.preprocess_lease_expires_at < now,
+        ),
+    )
+    ids = session.exec(
+        select(LightCurveRecord.id)
+        .where(claimable)
+        .order_by(LightCurveRecord.id)
+        .limit(limit)
+    ).all()
+    if not ids:
+        return []
+    expires = now + timedelta(seconds=lease_seconds)
+    session.execute(
+        update(LightCurveRecord)
+        .where(LightCurveRecord.id.in_(ids), claimable)
+        .values(preprocess_claimed_by=worker_id, preprocess_lease_expires_at=expires)
+    )
+    session.commit()
+    query = (
+        select(LightCurveRecord.id, LightCurveRecord.path, LightCurveRecord.flux_type)
+        .where(
+            LightCurveRecord.id.in_(ids),
+            LightCurveRecord.preprocess_claimed_by == worker_id,
+            LightCurveRecord.preprocess_lease_expires_at == expires,
+        )
+        .order_by(LightCurveRecord.id)
+    )
+    return [tuple(row) for row in session.exec(query).all()]  # type: ignore[misc]
+
+
+def release_lightcurve_claims(session: Session, worker_id: str) -> int:
+    """Drop every lease held by ``worker_id`` so other pipelines take the rows now."""
+
+    released = session.execute(
+        update(LightCurveRecord)
+        .where(LightCurveRecord.preprocess_claimed_by == worker_id)
+        .values(preprocess_claimed_by=None, preprocess_lease_expires_at=None)
+    )
+    session.commit()
+    return released.rowcount
+
+
+def record_preprocessing_failure(
+    session: Session, lightcurve_id: int, error: str
+) -> None:
+    session.execute(
+        update(LightCurveRecord)
+        .where(LightCurveRecord.id == lightcurve_id)
+        .values(preprocess_error=error)
+    )
+    session.commit()
+
+
+def list_candidates(
+    session: Session,
+    *,
+    limit: int = 20,
+    processed_only: bool = False,
+) -> list[tuple[LightCurveRecord, PreprocessingRecord | None]]:
+    """Most recently downloaded light curves with their latest preprocessing record."""
+
+    latest = (
+        select(func.max(PreprocessingRecord.id).label("id"))
+        .group_by(PreprocessingRecord.lightcurve_id)
+        .subquery()
+    )
+    query = (
+        select(LightCurveRecord, PreprocessingRecord)
+        .outerjoin(
+            PreprocessingRecord,
+            PreprocessingRecord.lightcurve_id == LightCurveRecord.id,
+        )
+        .where(
+            or_(
+                PreprocessingRecord.id.is_(None),
+                PreprocessingRecord.id.in_(select(latest.c.id)),
+            )
+        )
+        .order_by(LightCurveRecord.downloaded_at.desc(), LightCurveRecord.id.desc())
+        .limit(limit)
+    )
+    if processed_only:
+        query = query.where(PreprocessingRecord.id.is_not(None))
+    return [tuple(row) for row in session.exec(query).all()]  # type: ignore[misc]
+
+
+__all__ = [
+    "UPSERT_CHUNK_SIZE",
+    "catalogued_files",
+    "claim_lightcurves",
+    "list_candidates",
+    "pending_lightcurves",
+    "record_preprocessing_failure",
+    "record_lightcurve_downloads",
+    "record_preprocessing_result",
+    "release_lightcurve_claims",
+]
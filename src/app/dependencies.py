@@ -2,21 +2,32 @@
 
 from __future__ import annotations
 
+import multiprocessing
 from functools import lru_cache
 from pathlib import Path
 
 from fastapi import Depends, HTTPException, status
 from qdrant_client import QdrantClient
 
+from .catalog_pipeline import CatalogPipeline, CatalogPipelineConfig
 from .config import get_settings
-from .rag.embeddings import EmbeddingService, EmbeddingConfig
+from .data.ingestion import LightCurveIngestionService
+from .data.paths import get_data_dir
+from .executors import StageConfig, StageExecutors, default_cpu_workers
+from .llm_provider import get_llm
+from .preprocessing.cache import PreprocessingCache
+from .preprocessing.config import PreprocessingConfig
+from .preprocessing.plots import PlotStore
+from .rag.corpus import DocumentEntry, load_markdown_corpus
+from .rag.embeddings import EmbeddingConfig, EmbeddingService
+from .rag.incremental import IncrementalIndexer, IndexingReport
 from .rag.indexer import QdrantConfig, QdrantIndexer
+from .rag.lexical import BM25Index
 from .rag.pipeline import EvidenceGenerator
 from .rag.retriever import RetrievalConfig, RetrievalService
-from .rag.corpus import load_markdown_corpus
-from .services.inference import InferenceService, InferenceConfig
-from .data.ingestion import LightCurveIngestionService
-from .llm_provider import get_llm
+from .rag.vectorstore import LocalStoreConfig, LocalVectorStore, VectorStore
+from .services.batching import BatchingConfig, MicroBatcher
+from .services.inference import InferenceConfig, InferenceService
 
 
 @lru_cache(maxsize=1)
@@ -26,10 +37,85 @@ def get_inference_service() -> InferenceService:
         InferenceConfig(
             checkpoint_path=settings.model_checkpoint_path,
             device=None,
+            backend=settings.inference_backend,
+            model_path=settings.inference_model_path,
+            intra_op_threads=settings.inference_intra_op_threads,
+            inter_op_threads=settings.inference_inter_op_threads,
+            profile=settings.inference_profile,
+            profiles_dir=settings.inference_profiles_dir
+            or str(get_data_dir() / "artifacts" / "profiles"),
         )
     )
 
 
+@lru_cache(maxsize=1)
+def get_stage_executors() -> StageExecutors:
+    settings = get_settings()
+    return StageExecutors(
+        {
+            "io": StageConfig(
+                max_workers=settings.io_workers, max_pending=settings.io_max_pending
+            ),
+            "preprocess": StageConfig(
+                kind=(
+                    "process" if settings.preprocess_executor == "process" else "thread"
+                ),
+                max_workers=settings.preprocess_workers or default_cpu_workers(),
+                max_pending=settings.preprocess_max_pending,
+            ),
+            # One thread serializes forward passes; the micro-batcher fills batches.
+            "inference": StageConfig(
+                max_workers=1, max_pending=settings.inference_max_pending
+            ),
+            "rag": StageConfig(
+                max_workers=settings.rag_workers, max_pending=settings.rag_max_pending
+            ),
+            "db": StageConfig(
+                max_workers=settings.db_workers, max_pending=settings.db_max_pending
+            ),
+            "plots": StageConfig(
+                max_workers=settings.plot_workers, max_pending=settings.plot_max_pending
+            ),
+        }
+    )
+
+
+@lru_cache(maxsize=1)
+def get_preprocessing_cache() -> PreprocessingCache | None:
+    settings = get_settings()
+    if not settings.preprocess_cache_enabled:
+        return None
+    directory = settings.preprocess_cache_dir or str(
+        get_data_dir() / "cache" / "preprocessing"
+    )
+    return PreprocessingCache(directory, max_bytes=settings.preprocess_cache_max_bytes)
+
+
+@lru_cache(maxsize=1)
+def get_plot_store() -> PlotStore | None:
+    settings = get_settings()
+    if settings.plot_mode != "deferred":
+        return None
+    directory = settings.plot_dir or str(get_data_dir() / "artifacts" / "plots")
+    return PlotStore(
+        directory, bins=settings.plot_bins, max_bytes=settings.plot_max_bytes
+    )
+
+
+@lru_cache(maxsize=1)
+def get_inference_batcher() -> MicroBatcher:
+    settings = get_settings()
+    return MicroBatcher(
+        get_inference_service(),
+        BatchingConfig(
+            max_batch_size=settings.inference_max_batch_size,
+            max_wait_ms=settings.inference_max_batch_wait_ms,
+            length_bucket=settings.inference_length_bucket,
+        ),
+        executor=get_stage_executors().executor("inference"),
+    )
+
+
 @lru_cache(maxsize=1)
 def get_qdrant_client() -> QdrantClient:
     settings = get_settings()
@@ -40,18 +126,49 @@ def get_qdrant_client() -> QdrantClient:
 
 @lru_cache(maxsize=1)
 def get_embedding_service() -> EmbeddingService:
-    return EmbeddingService(EmbeddingConfig())
+    settings = get_settings()
+    cache_dir = None
+    if settings.embedding_cache_enabled:
+        cache_dir = settings.embedding_cache_dir or str(
+            get_data_dir() / "cache" / "embeddings"
+        )
+    return EmbeddingService(EmbeddingConfig(cache_dir=cache_dir))
+
+
+@lru_cache(maxsize=1)
+def get_vector_store() -> VectorStore:
+    settings = get_settings()
+    if settings.vector_backend == "local":
+        return LocalVectorStore(
+            LocalStoreConfig(
+                directory=settings.vector_store_dir
+                or str(get_data_dir() / "rag" / "vectors"),
+                collection_name=settings.rag_collection_name,
+                dtype=(
+                    "float16" if settings.vector_store_dtype == "float16" else "float32"
+                ),
+                index=settings.vector_store_index or None,
+                nprobe=settings.vector_store_nprobe,
+                ef_search=settings.vector_store_ef_search,
+                rerank=settings.vector_store_rerank,
+            )
+        )
+    return QdrantIndexer(
+        get_qdrant_client(), QdrantConfig(collection_name=settings.rag_collection_name)
+    )
 
 
 @lru_cache(maxsize=1)
 def get_retrieval_service() -> RetrievalService:
-    client = get_qdrant_client()
+    store = get_vector_store()
     embeddings = get_embedding_service()
     settings = get_settings()
     retriever = RetrievalService(
-        client=client,
+        client=getattr(store, "client", None),
         embedding_service=embeddings,
         config=RetrievalConfig(collection_name=settings.rag_collection_name),
+        store=store,
+        lexical=load_lexical_index(),
     )
     return retriever
 
@@ -63,28 +180,103 @@ def get_evidence_generator(retriever: RetrievalService | None = None) -> Evidenc
     return EvidenceGenerator(retriever=retriever, llm=llm)
 
 
-def ensure_corpus_indexed():  # pragma: no cover - executed during app startup
+def get_rag_manifest_path() -> Path:
+    settings = get_settings()
+    if settings.rag_manifest_path:
+        return Path(settings.rag_manifest_path)
+    return get_data_dir() / "rag" / f"{settings.rag_collection_name}.manifest.json"
+
+
+def get_lexical_index_dir() -> Path:
+    settings = get_settings()
+    if settings.rag_lexical_index_dir:
+        return Path(settings.rag_lexical_index_dir)
+    return get_data_dir() / "rag" / f"{settings.rag_collection_name}.bm25"
+
+
+def load_lexical_index() -> BM25Index | None:
+    path = get_lexical_index_dir()
+    if not get_settings().rag_hybrid_search or not (path / "meta.json").exists():
+        return None
+    try:
+        return BM25Index.load(path)
+    except (
+        OSError,
+        ValueError,
+    ):  # pragma: no cover - older format or mid-swap; rebuilt or reloaded later
+        return None
+
+
+def rebuild_lexical_index(
+    entries: list[DocumentEntry],
+) -> None:  # pragma: no cover - executed during app startup
+    BM25Index.build(entries).save(get_lexical_index_dir())
+    get_retrieval_service().set_lexical_index(load_lexical_index())
+
+
+def ensure_corpus_indexed() -> (
+    IndexingReport | None
+):  # pragma: no cover - executed during app startup
     settings = get_settings()
     if not settings.rag_corpus_dir:
-        return
+        return None
     corpus_dir = Path(settings.rag_corpus_dir)
     if not corpus_dir.exists():
-        return
+        return None
+    indexer = get_vector_store()
+    embeddings_service = get_embedding_service()
+
+    if settings.rag_incremental_indexing:
+        incremental = IncrementalIndexer(
+            indexer, embeddings_service, get_rag_manifest_path()
+        )
+        report = incremental.sync(corpus_dir)
+        if report.changed:
+            get_retrieval_service().set_collection_version(report.version)
+        if settings.rag_hybrid_search and (
+            report.changed or not (get_lexical_index_dir() / "meta.json").exists()
+        ):
+            # Same chunking as the dense index, so both rankings share document ids.
+            rebuild_lexical_index(
+                load_markdown_corpus(
+                    corpus_dir,
+                    chunk_size=incremental.chunk_size,
+                    overlap=incremental.overlap,
+                )
+            )
+        return report
+
     entries = load_markdown_corpus(corpus_dir)
     if not entries:
-        return
-    embeddings_service = get_embedding_service()
+        return None
     vectors = embeddings_service.embed_documents(entry.text for entry in entries)
-    client = get_qdrant_client()
-    settings = get_settings()
-    indexer = QdrantIndexer(client, QdrantConfig(collection_name=settings.rag_collection_name))
     indexer.ensure_collection(vector_size=vectors.shape[1])
     indexer.upsert_documents(entries, vectors)
+    get_retrieval_service().invalidate_cache()
+    if settings.rag_hybrid_search:
+        rebuild_lexical_index(entries)
+    return IndexingReport(
+        added=len(entries),
+        files_changed=len({entry.metadata["source"] for entry in entries}),
+    )
 
 
 async def inference_dependency() -> InferenceService:
     try:
         return get_inference_service()
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+        )
+
+
+async def executors_dependency() -> StageExecutors:
+    return get_stage_executors()
+
+
+async def inference_batcher_dependency() -> MicroBatcher:
+    try:
+        return get_inference_batcher()
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
 
@@ -110,6 +302,35 @@ def get_ingestion_queue():
     return SCHEDULER.ingestion_queue
 
 
+@lru_cache(maxsize=1)
+def get_catalog_pipeline() -> CatalogPipeline:
+    settings = get_settings()
+    return CatalogPipeline(
+        executors=get_stage_executors(),
+        config=CatalogPipelineConfig(
+            workers=settings.catalog_pipeline_workers,
+            queue_size=settings.catalog_pipeline_queue_size,
+            poll_interval=settings.catalog_pipeline_poll_interval,
+            lease_seconds=settings.catalog_pipeline_lease_seconds,
+        ),
+        preprocess_config=PreprocessingConfig(
+            engine=settings.preprocess_engine,
+            period_search=settings.preprocess_period_search,
+        ),
+        cache=get_preprocessing_cache(),
+    )
+
+
+def _notify_catalog_pipeline(paths: list[Path]) -> None:
+    # In an ingestion process worker there is no running pipeline to wake; the parent
+    # notifies its own pipeline when the fetch returns (see ``IngestionQueue``).
+    if (
+        get_settings().catalog_pipeline_enabled
+        and multiprocessing.parent_process() is None
+    ):
+        get_catalog_pipeline().notify()
+
+
 @lru_cache(maxsize=1)
 def get_ingestion_service() -> LightCurveIngestionService:
-    return LightCurveIngestionService()
+    return LightCurveIngestionService(on_recorded=_notify_catalog_pipeline)
@@ -0,0 +1,182 @@
+"""Bounded per-stage executors with admission control for request handling."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Literal, Mapping, TypeVar
+
+from .telemetry import EXECUTOR_PENDING, EXECUTOR_REJECTED
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StageSaturatedError(RuntimeError):
+    """Raised when a stage already holds its maximum amount of pending work."""
+
+    def __init__(self, stage: str, limit: int) -> None:
+        super().__init__(f"Stage '{stage}' is saturated ({limit} pending tasks)")
+        self.stage = stage
+        self.limit = limit
+
+
+class StageUnavailableError(RuntimeError):
+    """Raised when work is submitted to a stage that has been shut down."""
+
+
+@dataclass(slots=True)
+class StageConfig:
+    kind: Literal["thread", "process"] = "thread"
+    max_workers: int = 4
+    # Running plus queued tasks admitted before new work is rejected.
+    max_pending: int = 64
+
+
+class _Stage:
+    def __init__(self, name: str, config: StageConfig) -> None:
+        self.name = name
+        self.config = config
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor: Executor | None = None
+        self._closed = False
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._closed:
+                raise StageUnavailableError(f"Stage '{self.name}' is shut down")
+            if self._executor is None:
+                if self.config.kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.config.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.config.max_workers,
+                        thread_name_prefix=f"exoai-{self.name}",
+                    )
+            return self._executor
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise StageUnavailableError(f"Stage '{self.name}' is shut down")
+            if self.pending >= self.config.max_pending:
+                self.rejected += 1
+                EXECUTOR_REJECTED.labels(stage=self.name).inc()
+                raise StageSaturatedError(self.name, self.config.max_pending)
+            self.pending += 1
+        EXECUTOR_PENDING.labels(stage=self.name).inc()
+
+    def release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+        EXECUTOR_PENDING.labels(stage=self.name).dec()
+
+    def reset(self) -> None:
+        """Drop a broken pool so the next submission starts a fresh one."""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool) -> None:
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class StageExecutors:
+    """Runs blocking pipeline stages on dedicated, bounded thread or process pools.
+
+    Each stage admits at most ``max_pending`` tasks; further submissions fail fast with
+    :class:`StageSaturatedError` instead of queueing unboundedly, which keeps tail
+    latency bounded under bursts and lets the API answer with 429.
+    """
+
+    def __init__(self, stages: Mapping[str, StageConfig]) -> None:
+        self._stages = {name: _Stage(name, config) for name, config in stages.items()}
+
+    def _stage(self, name: str) -> _Stage:
+        try:
+            return self._stages[name]
+        except KeyError:
+            raise KeyError(f"Unknown executor stage: {name}") from None
+
+    def executor(self, stage: str) -> Executor:
+        return self._stage(stage).executor
+
+    @asynccontextmanager
+    async def admit(self, stage: str) -> AsyncIterator[None]:
+        """Hold one admission slot of ``stage`` for work scheduled elsewhere."""
+
+        entry = self._stage(stage)
+        entry.acquire()
+        try:
+            yield
+        finally:
+            entry.release()
+
+    async def run(
+        self, stage: str, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        entry = self._stage(stage)
+        entry.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                entry.executor, functools.partial(func, *args, **kwargs)
+            )
+        except BrokenExecutor:
+            LOGGER.error("Executor for stage %s broke; restarting it", stage)
+            entry.reset()
+            raise
+        finally:
+            entry.release()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            name: {
+                "pending": stage.pending,
+                "rejected": stage.rejected,
+                "max_pending": stage.config.max_pending,
+            }
+            for name, stage in self._stages.items()
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        for stage in self._stages.values():
+            stage.shutdown(wait)
+
+
+def default_cpu_workers() -> int:
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+__all__ = [
+    "StageConfig",
+    "StageExecutors",
+    "StageSaturatedError",
+    "StageUnavailableError",
+    "default_cpu_workers",
+]
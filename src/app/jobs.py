@@ -0,0 +1,306 @@
+"""Durable background jobs executed by leased workers.
+
+Jobs and their items live in the database (see :mod:`app.db.jobs`), so they survive
+restarts and every API process can run a :class:`JobWorker` against the same tables.
+Handlers receive a :class:`JobContext` listing the items that are still pending and
+record each item's outcome as soon as it is known; a job resumed after a crash only
+redoes the items that were in flight. Files spooled for a job
+(``payload["upload_dir"]``) are removed once the job is final.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import socket
+import uuid
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, ContextManager, Mapping
+
+from sqlmodel import Session
+
+from .config import get_settings
+from .db import database
+from .db.jobs import (
+    claim_job,
+    finish_job,
+    get_job,
+    heartbeat_job,
+    pending_job_items,
+    record_job_item,
+    release_job,
+)
+from .db.models import JOB_FINAL_STATES, JobRecord
+
+LOGGER = logging.getLogger(__name__)
+
+JOB_PREDICT = "predict"
+JOB_INGEST = "ingest"
+
+SessionFactory = Callable[[], ContextManager[Session]]
+
+
+@dataclass(slots=True)
+class JobItem:
+    position: int
+    name: str
+    payload: dict[str, Any] | None
+
+
+class JobContext:
+    """What a handler sees of its job: payload, pending items and a result recorder."""
+
+    def __init__(
+        self, job: JobRecord, items: list[JobItem], session_factory: SessionFactory
+    ) -> None:
+        self.job_id = job.id
+        self.kind = job.kind
+        self.payload = dict(job.payload or {})
+        self.attempt = job.attempts
+        self.items = items
+        self._session_factory = session_factory
+
+    def _record(
+        self, position: int, result: dict[str, Any] | None, error: str | None
+    ) -> bool:
+        with self._session_factory() as session:
+            return record_job_item(
+                session, self.job_id, position, result=result, error=error
+            )
+
+    async def record(
+        self,
+        item: JobItem,
+        *,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        await asyncio.to_thread(self._record, item.position, result, error)
+
+
+JobHandler = Callable[[JobContext], Awaitable[dict[str, Any] | None]]
+
+
+def remove_job_uploads(payload: Mapping[str, Any] | None) -> None:
+    """Delete the files a job was submitted with; call once the job is final."""
+
+    directory = (payload or {}).get("upload_dir")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class JobWorker:
+    """Claims jobs from the database and runs them, renewing their leases meanwhile."""
+
+    def __init__(
+        self,
+        handlers: Mapping[str, JobHandler],
+        *,
+        session_factory: SessionFactory | None = None,
+        concurrency: int = 1,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 1.0,
+        worker_id: str | None = None,
+    ) -> None:
+        self.handlers = dict(handlers)
+        self.session_factory = session_factory or database.get_session
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or _default_worker_id()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._loop()) for _ in range(self.concurrency)
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+
+    def _call(self, operation: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self.session_factory() as session:
+            return operation(session, *args, **kwargs)
+
+    async def _db(
+        self, operation: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        return await asyncio.to_thread(self._call, operation, *args, **kwargs)
+
+    async def _remove_uploads_if_final(self, job_id: str) -> None:
+        job = await self._db(get_job, job_id)
+        if job is not None and job.status in JOB_FINAL_STATES:
+            await asyncio.to_thread(remove_job_uploads, job.payload)
+
+    async def run_once(self) -> bool:
+        """Claim and run a single job; return ``False`` when nothing was claimable."""
+
+        job = await self._db(
+            claim_job,
+            worker_id=self.worker_id,
+            lease_seconds=self.lease_seconds,
+            kinds=list(self.handlers),
+        )
+        if job is None:
+            return False
+        await self._execute(job)
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                ran = await self.run_once()
+            except (
+                Exception
+            ) as exc:  # pragma: no cover - keep polling through database hiccups
+                LOGGER.exception("Job worker iteration failed", exc_info=exc)
+                ran = False
+            if not ran:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _execute(self, job: JobRecord) -> None:
+        items = [
+            JobItem(position=item.position, name=item.name, payload=item.payload)
+            for item in await self._db(pending_job_items, job.id)
+        ]
+        context = JobContext(job, items, self.session_factory)
+        LOGGER.info(
+            "Running job",
+            extra={
+                "job_id": job.id,
+                "kind": job.kind,
+                "attempt": job.attempts,
+                "pending": len(items),
+            },
+        )
+        task = asyncio.create_task(self.handlers[job.kind](context))
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.lease_seconds / 3)
+                if done:
+                    break
+                alive = await self._db(
+                    heartbeat_job,
+                    job.id,
+                    worker_id=self.worker_id,
+                    lease_seconds=self.lease_seconds,
+                )
+                if not alive:
+                    LOGGER.info("Job cancelled or lease lost", extra={"job_id": job.id})
+                    task.cancel()
+                    with suppress(asyncio.CancelledError):
+                        await task
+                    await self._remove_uploads_if_final(job.id)
+                    return
+        except asyncio.CancelledError:
+            # Shutdown: hand the job back without charging it an attempt.
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+            await asyncio.shield(
+                self._db(
+                    release_job,
+                    job.id,
+                    worker_id=self.worker_id,
+                    error=None,
+                    count_attempt=False,
+                )
+            )
+            raise
+
+        try:
+            result = task.result()
+        except Exception as exc:  # noqa: BLE001 - recorded on the job for the client
+            LOGGER.exception("Job failed", extra={"job_id": job.id}, exc_info=exc)
+            await self._db(
+                release_job,
+                job.id,
+                worker_id=self.worker_id,
+                error=f"{type(exc).__name__}: {exc}",
+            )
+        else:
+            await self._db(finish_job, job.id, worker_id=self.worker_id, result=result)
+        # A released job that ran out of attempts is final too.
+        await self._remove_uploads_if_final(job.id)
+
+
+async def run_prediction_job(context: JobContext) -> dict[str, Any]:
+    """Classify every pending light curve; items are shared ``{"path": ...}``."""
+
+    from . import dependencies
+    from .api.predictions import run_prediction
+
+    executors = dependencies.get_stage_executors()
+    batcher = dependencies.get_inference_batcher()
+    plot_store = dependencies.get_plot_store()
+    semaphore = asyncio.Semaphore(max(1, get_settings().batch_concurrency))
+
+    async def _process(item: JobItem) -> None:
+        async with semaphore:
+            try:
+                outcome = await run_prediction(
+                    Path(item.payload["path"]),
+                    executors=executors,
+                    batcher=batcher,
+                    plot_store=plot_store,
+                )
+            except (
+                Exception
+            ) as exc:  # noqa: BLE001 - one bad curve must not fail the job
+                await context.record(item, error=f"{type(exc).__name__}: {exc}")
+                return
+            attention = outcome.pop("attention")
+            if context.payload.get("include_attention"):
+                outcome["attention"] = attention.tolist()
+            await context.record(item, result=outcome)
+
+    await asyncio.gather(*(_process(item) for item in context.items))
+    return {"processed": len(context.items)}
+
+
+async def run_ingestion_job(context: JobContext) -> dict[str, Any]:
+    """Download the light curves of the payload (an ``IngestionRequest``)."""
+
+    from . import dependencies
+    from .data.ingestion import IngestionRequest
+
+    request = IngestionRequest(**context.payload)
+    paths = await dependencies.get_ingestion_service().fetch_async(request)
+    result = {"paths": [str(path) for path in paths]}
+    for item in context.items:
+        await context.record(item, result=result)
+    return {"downloaded": len(paths), "request": asdict(request)}
+
+
+DEFAULT_HANDLERS: dict[str, JobHandler] = {
+    JOB_PREDICT: run_prediction_job,
+    JOB_INGEST: run_ingestion_job,
+}
+
+
+__all__ = [
+    "DEFAULT_HANDLERS",
+    "JOB_INGEST",
+    "JOB_PREDICT",
+    "JobContext",
+    "JobHandler",
+    "JobItem",
+    "JobWorker",
+    "remove_job_uploads",
+    "run_ingestion_job",
+    "run_prediction_job",
+]
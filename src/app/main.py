@@ -2,12 +2,20 @@
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
 from .api import router as api_router
 from .config import get_settings
-from .dependencies import ensure_corpus_indexed
+from .db import init_db
+from .dependencies import (
+    ensure_corpus_indexed,
+    get_inference_batcher,
+    get_stage_executors,
+)
+from .executors import StageSaturatedError, StageUnavailableError
 from .logging_config import configure_logging
+from .telemetry import mark_process_dead
 from .workers import SCHEDULER
 
 
@@ -15,11 +23,35 @@ from .workers import SCHEDULER
 async def lifespan(app: FastAPI):
     """Manage application lifecycle events."""
     # Startup
+    init_db()
     ensure_corpus_indexed()
     await SCHEDULER.start()
     yield
     # Shutdown
     await SCHEDULER.stop()
+    if get_inference_batcher.cache_info().currsize:
+        await get_inference_batcher().close()
+    if get_stage_executors.cache_info().currsize:
+        get_stage_executors().shutdown(wait=False)
+    mark_process_dead()
+
+
+async def _stage_saturated_handler(
+    request: Request, exc: StageSaturatedError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc), "stage": exc.stage},
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _stage_unavailable_handler(
+    request: Request, exc: StageUnavailableError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": str(exc)}
+    )
 
 
 def create_app() -> FastAPI:
@@ -33,6 +65,8 @@ def create_app() -> FastAPI:
         lifespan=lifespan
     )
     app.include_router(api_router, prefix=settings.api_prefix)
+    app.add_exception_handler(StageSaturatedError, _stage_saturated_handler)
+    app.add_exception_handler(StageUnavailableError, _stage_unavailable_handler)
 
     return app
 
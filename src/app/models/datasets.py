@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Iterable, Sequence
+from typing import Any, Callable, Iterable, Mapping, Sequence
 
 import numpy as np
 import torch
@@ -17,6 +17,58 @@ except ImportError:  # pragma: no cover
     LightningDataModule = object  # type: ignore
 
 
+# Per-sample physics targets read from metadata, in tensor column order; NaN if missing.
+PHYSICS_TARGETS = ("expected_depth", "period", "duration")
+
+
+def physics_targets(metadata: Mapping[str, Any] | None) -> np.ndarray:
+    """Return the :data:`PHYSICS_TARGETS` of a metadata mapping as a float32 vector."""
+
+    values = np.full(len(PHYSICS_TARGETS), np.nan, dtype=np.float32)
+    if metadata:
+        for column, name in enumerate(PHYSICS_TARGETS):
+            value = metadata.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values[column] = value
+    return values
+
+
+def _empty(
+    shape: tuple[int, ...], dtype: torch.dtype, fill: float | None = None
+) -> torch.Tensor:
+    tensor = torch.empty(shape, dtype=dtype)
+    if torch.utils.data.get_worker_info() is not None:
+        # Like the default collate: build batches in shared memory so handing them to
+        # the main process does not copy.
+        tensor.share_memory_()
+    if fill is not None:
+        tensor.fill_(fill)
+    return tensor
+
+
+def collate_light_curves(samples: Sequence[dict[str, Any]]) -> dict[str, Any]:
+    """Collate samples into preallocated ``inputs``, ``label`` and ``physics`` tensors.
+
+    ``physics`` has shape ``(batch, len(PHYSICS_TARGETS))``. Metadata dicts, when
+    present, are passed through as a plain list instead of being merged key by key.
+    """
+
+    size = len(samples)
+    first = samples[0]["inputs"]
+    inputs = _empty((size, *first.shape), first.dtype)
+    labels = _empty((size,), torch.long)
+    physics = _empty((size, len(PHYSICS_TARGETS)), torch.float32, fill=float("nan"))
+    for row, sample in enumerate(samples):
+        inputs[row] = sample["inputs"]
+        labels[row] = sample["label"]
+        if "physics" in sample:
+            physics[row] = sample["physics"]
+    batch: dict[str, Any] = {"inputs": inputs, "label": labels, "physics": physics}
+    if any("metadata" in sample for sample in samples):
+        batch["metadata"] = [sample.get("metadata", {}) for sample in samples]
+    return batch
+
+
 @dataclass(slots=True)
 class SampleRecord:
     """Represents a preprocessed light-curve sample on disk."""
@@ -32,20 +84,43 @@ class SampleRecord:
         return cls(flux_path=path, time_path=path, label=label, metadata_path=base.with_suffix(".json"))
 
 
-def _load_array(path: Path) -> np.ndarray:
+def _load_array(path: Path, key: str = "flux") -> np.ndarray:
     if path.suffix == ".npz":
-        data = np.load(path)
-        if "flux" in data:
-            return data["flux"]
-        if "time" in data:
-            return data["time"]
-        raise KeyError(f"No suitable array in {path}")
+        with np.load(path) as data:
+            if key in data:
+                return data[key]
+            raise KeyError(f"No '{key}' array in {path}")
     elif path.suffix == ".npy":
         return np.load(path)
     else:  # pragma: no cover - caller ensures extension
         raise ValueError(f"Unsupported file extension: {path.suffix}")
 
 
+def load_sample_arrays(record: SampleRecord) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(time, flux)`` for a record, opening a shared ``.npz`` only once."""
+
+    if record.flux_path == record.time_path and record.flux_path.suffix == ".npz":
+        with np.load(record.flux_path) as data:
+            return data["time"], data["flux"]
+    return _load_array(record.time_path, "time"), _load_array(record.flux_path, "flux")
+
+
+def pad_or_crop(array: np.ndarray, target: int) -> np.ndarray:
+    """Center-crop or zero-pad a 1D array to ``target`` samples."""
+
+    if array.ndim != 1:
+        raise ValueError("Flux/time arrays must be 1D")
+    if array.size == target:
+        return array
+    if array.size > target:
+        start = (array.size - target) // 2
+        return array[start : start + target]
+    pad_total = target - array.size
+    pad_left = pad_total // 2
+    pad_right = pad_total - pad_left
+    return np.pad(array, (pad_left, pad_right), mode="constant", constant_values=0.0)
+
+
 class LightCurveDataset(Dataset):
     """PyTorch dataset for prepared light curve tensors."""
 
@@ -64,23 +139,11 @@ class LightCurveDataset(Dataset):
         return len(self.samples)
 
     def _pad_or_crop(self, array: np.ndarray) -> np.ndarray:
-        if array.ndim != 1:
-            raise ValueError("Flux/time arrays must be 1D")
-        target = self.sequence_length
-        if array.size == target:
-            return array
-        if array.size > target:
-            start = (array.size - target) // 2
-            return array[start : start + target]
-        pad_total = target - array.size
-        pad_left = pad_total // 2
-        pad_right = pad_total - pad_left
-        return np.pad(array, (pad_left, pad_right), mode="constant", constant_values=0.0)
+        return pad_or_crop(array, self.sequence_length)
 
     def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
         record = self.samples[idx]
-        flux = _load_array(record.flux_path)
-        time = _load_array(record.time_path)
+        time, flux = load_sample_arrays(record)
         flux = self._pad_or_crop(flux).astype(np.float32)
         time = self._pad_or_crop(time).astype(np.float32)
 
@@ -97,18 +160,22 @@ class LightCurveDataset(Dataset):
                 sample["metadata"] = json.loads(record.metadata_path.read_text())
             except json.JSONDecodeError:  # pragma: no cover
                 sample["metadata"] = {}
+        sample["physics"] = torch.from_numpy(physics_targets(sample.get("metadata")))
 
         return sample
 
 
 class LightCurveDataModule(LightningDataModule):
-    """LightningDataModule orchestrating train/val/test splits for light curves."""
+    """LightningDataModule orchestrating train/val/test splits for light curves.
+
+    Each split is either a list of records or the path of a packed dataset directory.
+    """
 
     def __init__(
         self,
-        train_records: Sequence[SampleRecord],
-        val_records: Sequence[SampleRecord],
-        test_records: Sequence[SampleRecord] | None = None,
+        train_records: Sequence[SampleRecord] | str | Path,
+        val_records: Sequence[SampleRecord] | str | Path,
+        test_records: Sequence[SampleRecord] | str | Path | None = None,
         *,
         batch_size: int = 32,
         num_workers: int = 4,
@@ -124,22 +191,21 @@ class LightCurveDataModule(LightningDataModule):
         self.sequence_length = sequence_length
         self.transform = transform
 
-    def setup(self, stage: str | None = None) -> None:
-        self.train_dataset = LightCurveDataset(
-            self.train_records,
-            sequence_length=self.sequence_length,
-            transform=self.transform,
+    def _build_dataset(self, source: Sequence[SampleRecord] | str | Path) -> Dataset:
+        if isinstance(source, (str, Path)):
+            from .packed import PackedLightCurveDataset
+
+            return PackedLightCurveDataset(source, transform=self.transform)
+        return LightCurveDataset(
+            source, sequence_length=self.sequence_length, transform=self.transform
         )
-        self.val_dataset = LightCurveDataset(
-            self.val_records,
-            sequence_length=self.sequence_length,
-            transform=self.transform,
+
+    def setup(self, stage: str | None = None) -> None:
+        self.train_dataset = self._build_dataset(self.train_records)
+        self.val_dataset = self._build_dataset(self.val_records)
+        self.test_dataset = (
+            self._build_dataset(self.test_records) if self.test_records else None
         )
-        self.test_dataset = LightCurveDataset(
-            self.test_records,
-            sequence_length=self.sequence_length,
-            transform=self.transform,
-        ) if self.test_records else None
 
     def train_dataloader(self) -> DataLoader:
         return DataLoader(
@@ -148,6 +214,7 @@ class LightCurveDataModule(LightningDataModule):
             shuffle=True,
             num_workers=self.num_workers,
             pin_memory=True,
+            collate_fn=collate_light_curves,
         )
 
     def val_dataloader(self) -> DataLoader:
@@ -157,6 +224,7 @@ class LightCurveDataModule(LightningDataModule):
             shuffle=False,
             num_workers=self.num_workers,
             pin_memory=True,
+            collate_fn=collate_light_curves,
         )
 
     def test_dataloader(self) -> DataLoader:
@@ -168,11 +236,17 @@ class LightCurveDataModule(LightningDataModule):
             shuffle=False,
             num_workers=self.num_workers,
             pin_memory=True,
+            collate_fn=collate_light_curves,
         )
 
 
 __all__ = [
+    "PHYSICS_TARGETS",
     "SampleRecord",
     "LightCurveDataset",
     "LightCurveDataModule",
+    "collate_light_curves",
+    "load_sample_arrays",
+    "pad_or_crop",
+    "physics_targets",
 ]
@@ -0,0 +1,107 @@
+"""Export the classifier backbone to TorchScript and ONNX for serving."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+import torch
+
+from .architecture import BiLSTMConfig, CNNBiLSTMAttention, CNNConfig
+
+LOGGER = logging.getLogger(__name__)
+
+INPUT_NAMES = ["inputs"]
+OUTPUT_NAMES = ["logits", "attention"]
+# Batch and sequence length vary per request; attention has one weight per pooled step.
+DYNAMIC_AXES = {
+    "inputs": {0: "batch", 2: "sequence"},
+    "logits": {0: "batch"},
+    "attention": {0: "batch", 1: "steps"},
+}
+
+
+def load_backbone(
+    checkpoint_path: str | Path | None = None, map_location: str | torch.device = "cpu"
+) -> CNNBiLSTMAttention:
+    """Build the bare ``CNNBiLSTMAttention`` from a Lightning checkpoint, in eval mode.
+
+    Only the backbone weights are restored; the Lightning module, its metrics and the
+    physics loss are not instantiated. Without a checkpoint a freshly initialized
+    backbone with the default configuration is returned.
+    """
+
+    if checkpoint_path is None:
+        return CNNBiLSTMAttention().eval()
+
+    checkpoint: dict[str, Any] = torch.load(
+        checkpoint_path, map_location=map_location, weights_only=False
+    )
+    hparams = checkpoint.get("hyper_parameters", {})
+    model = CNNBiLSTMAttention(
+        cnn_cfg=CNNConfig(**hparams["cnn"]) if "cnn" in hparams else None,
+        lstm_cfg=BiLSTMConfig(**hparams["lstm"]) if "lstm" in hparams else None,
+        num_classes=hparams.get("num_classes", 2),
+    )
+    state = {
+        key.removeprefix("model."): value
+        for key, value in checkpoint["state_dict"].items()
+        if key.startswith("model.")
+    }
+    model.load_state_dict(state)
+    return model.eval()
+
+
+def _example_inputs(
+    model: CNNBiLSTMAttention, sequence_length: int, batch_size: int = 2
+) -> torch.Tensor:
+    in_channels = model.cnn[0].in_channels
+    return torch.randn(batch_size, in_channels, sequence_length)
+
+
+def export_torchscript(
+    model: CNNBiLSTMAttention, path: str | Path, *, sequence_length: int = 2000
+) -> Path:
+    """Trace ``model`` to TorchScript; the graph takes any batch and sequence length."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    model = model.eval()
+    with torch.no_grad():
+        traced = torch.jit.trace(
+            model, _example_inputs(model, sequence_length), check_trace=False
+        )
+    traced = torch.jit.freeze(traced)
+    traced.save(str(path))
+    LOGGER.info("Exported TorchScript model", extra={"path": str(path)})
+    return path
+
+
+def export_onnx(
+    model: CNNBiLSTMAttention,
+    path: str | Path,
+    *,
+    sequence_length: int = 2000,
+    opset: int = 17,
+) -> Path:
+    """Export ``model`` to ONNX with dynamic batch and sequence axes."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    model = model.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (_example_inputs(model, sequence_length),),
+            str(path),
+            input_names=INPUT_NAMES,
+            output_names=OUTPUT_NAMES,
+            dynamic_axes=DYNAMIC_AXES,
+            opset_version=opset,
+        )
+    LOGGER.info("Exported ONNX model", extra={"path": str(path)})
+    return path
+
+
+__all__ = ["DYNAMIC_AXES", "export_onnx", "export_torchscript", "load_backbone"]
@@ -12,10 +12,24 @@ from torch import nn
 class PhysicsLossConfig:
     weight: float = 0.1
     epsilon: float = 1e-6
+    # Relative weight of the duty-cycle (duration / period) term; 0 disables it.
+    duty_cycle_weight: float = 0.0
+    # Softness, in normalized flux units, of the duty cycle's in-transit indicator.
+    transit_temperature: float = 1e-3
+
+
+def _masked_mean(values: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+    # Avoids data-dependent branching so the step never synchronizes with the device.
+    total = torch.where(mask, values, torch.zeros_like(values)).sum()
+    return total / mask.sum().clamp(min=1)
 
 
 class PhysicsInformedLoss(nn.Module):
-    """Penalizes deviations from expected transit depth ratios."""
+    """Penalizes deviations from expected transit depths and Keplerian duty cycles.
+
+    Targets are per-sample tensors; NaN marks an unknown value and drops that sample
+    from the corresponding term.
+    """
 
     def __init__(self, config: PhysicsLossConfig | None = None) -> None:
         super().__init__()
@@ -25,15 +39,20 @@ class PhysicsInformedLoss(nn.Module):
         self,
         flux: torch.Tensor,
         expected_depth: torch.Tensor,
+        period: torch.Tensor | None = None,
+        duration: torch.Tensor | None = None,
     ) -> torch.Tensor:
-        """Compute weighted L1 penalty between observed and expected depths.
+        """Compute weighted L1 penalties between observed and expected transits.
 
         Parameters
         ----------
         flux: Tensor of shape (batch, sequence_len)
-            Normalized flux values for each sample.
+            Normalized, phase-folded flux values for each sample.
         expected_depth: Tensor of shape (batch,)
             Target transit depths derived from astrophysical constraints.
+        period, duration: Tensors of shape (batch,), optional
+            Orbital period and transit duration in the same unit; their ratio is the
+            expected fraction of the folded curve spent in transit.
         """
 
         if flux.ndim != 2:
@@ -42,7 +61,27 @@ class PhysicsInformedLoss(nn.Module):
         baseline = flux.mean(dim=1)
         min_flux, _ = flux.min(dim=1)
         observed_depth = torch.clamp((baseline - min_flux) / (baseline + self.config.epsilon), 0.0, 1.0)
-        loss = torch.mean(torch.abs(observed_depth - expected_depth))
+        depth_known = ~torch.isnan(expected_depth)
+        loss = _masked_mean(torch.abs(observed_depth - expected_depth), depth_known)
+
+        if (
+            self.config.duty_cycle_weight > 0
+            and period is not None
+            and duration is not None
+        ):
+            expected_duty = duration / period
+            duty_known = torch.isfinite(expected_duty) & (period > 0)
+            # Points below half the observed depth count as in transit (softly).
+            threshold = baseline - 0.5 * (baseline - min_flux)
+            in_transit = torch.sigmoid(
+                (threshold.unsqueeze(1) - flux) / self.config.transit_temperature
+            )
+            observed_duty = in_transit.mean(dim=1)
+            duty_loss = _masked_mean(
+                torch.abs(observed_duty - expected_duty), duty_known
+            )
+            loss = loss + self.config.duty_cycle_weight * duty_loss
+
         return self.config.weight * loss
 
 
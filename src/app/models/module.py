@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import Any
 
 import torch
@@ -17,6 +17,7 @@ except ImportError:  # pragma: no cover
     F1Score = Precision = Recall = Any  # type: ignore
 
 from .architecture import CNNBiLSTMAttention, BiLSTMConfig, CNNConfig
+from .datasets import PHYSICS_TARGETS
 from .losses import PhysicsInformedLoss, PhysicsLossConfig
 
 
@@ -48,7 +49,7 @@ class ExoplanetClassifier(pl.LightningModule):  # type: ignore[misc]
         )
         self.criterion = nn.CrossEntropyLoss()
         self.physics_loss = PhysicsInformedLoss(self.config.physics_loss)
-        self.save_hyperparameters(self.config.__dict__)
+        self.save_hyperparameters(asdict(self.config))
 
         self.train_f1 = F1Score(task="binary", num_classes=self.config.num_classes)
         self.val_f1 = F1Score(task="binary", num_classes=self.config.num_classes)
@@ -58,17 +59,19 @@ class ExoplanetClassifier(pl.LightningModule):  # type: ignore[misc]
     def forward(self, inputs: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
         return self.model(inputs)
 
-    def _extract_expected_depth(self, batch: dict[str, Any]) -> torch.Tensor:
-        metadata = batch.get("metadata")
-        if metadata is None:
-            return torch.zeros(batch["inputs"].size(0), device=self.device)
-        expected = []
-        for item in metadata:
-            if isinstance(item, dict) and "expected_depth" in item:
-                expected.append(float(item["expected_depth"]))
-            else:
-                expected.append(0.0)
-        return torch.tensor(expected, dtype=torch.float32, device=self.device)
+    def _physics_targets(self, batch: dict[str, Any]) -> torch.Tensor:
+        """Return the ``(batch, len(PHYSICS_TARGETS))`` targets collated by
+        ``collate_light_curves``."""
+
+        physics = batch.get("physics")
+        if physics is None:
+            # Other collate functions carry no targets; NaN disables the physics term.
+            return torch.full(
+                (batch["inputs"].size(0), len(PHYSICS_TARGETS)),
+                float("nan"),
+                device=self.device,
+            )
+        return physics.to(self.device, non_blocking=True)
 
     def training_step(self, batch: dict[str, Any], batch_idx: int) -> torch.Tensor:
         inputs = batch["inputs"].to(self.device)
@@ -76,10 +79,13 @@ class ExoplanetClassifier(pl.LightningModule):  # type: ignore[misc]
         logits, attention = self(inputs)
         loss = self.criterion(logits, labels)
 
-        expected_depth = self._extract_expected_depth(batch)
-        if torch.any(expected_depth > 0):
-            flux = inputs[:, 1, :]
-            loss = loss + self.physics_loss(flux, expected_depth)
+        physics = self._physics_targets(batch)
+        loss = loss + self.physics_loss(
+            inputs[:, 1, :],
+            physics[:, PHYSICS_TARGETS.index("expected_depth")],
+            period=physics[:, PHYSICS_TARGETS.index("period")],
+            duration=physics[:, PHYSICS_TARGETS.index("duration")],
+        )
 
         preds = torch.argmax(logits, dim=1)
         self.train_f1(preds, labels)
@@ -112,7 +118,6 @@ class ExoplanetClassifier(pl.LightningModule):  # type: ignore[misc]
             mode="max",
             factor=0.5,
             patience=3,
-            verbose=True,
         )
         return {
             "optimizer": optimizer,
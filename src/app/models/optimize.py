@@ -0,0 +1,368 @@
+"""Post-training optimization profiles: int8 quantization and conv channel pruning.
+
+A profile is saved as ``<profiles_dir>/<name>/model.ts`` (a traced TorchScript module)
+plus ``profile.json`` with the settings used and an :class:`OptimizationReport`
+comparing it to the fp32 baseline. Profiles are loaded by name by
+:class:`app.services.inference.InferenceService`.
+"""
+
+from __future__ import annotations
+
+import copy
+import io
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+import torch
+from torch import nn
+
+from .architecture import CNNBiLSTMAttention
+from .datasets import LightCurveDataset, SampleRecord, collate_light_curves
+
+try:  # pragma: no cover - eager-mode quantization ships with torch but may be trimmed
+    from torch.ao import quantization as tq
+except ImportError:  # pragma: no cover
+    tq = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+MODEL_FILE = "model.ts"
+PROFILE_FILE = "profile.json"
+
+
+def _ensure_quantization() -> None:
+    if tq is None:  # pragma: no cover
+        raise ImportError("torch.ao.quantization is required for quantized profiles.")
+
+
+@dataclass(slots=True)
+class OptimizationProfile:
+    name: str
+    # int8 weights for LSTM and Linear layers, activations quantized on the fly.
+    dynamic_int8: bool = True
+    # int8 Conv1d stack (fused Conv+BN+ReLU) calibrated on real samples.
+    static_conv: bool = False
+    # Fraction of output channels removed from every conv layer, by smallest L1 norm.
+    prune_amount: float = 0.0
+    calibration_batches: int = 8
+    batch_size: int = 16
+    sequence_length: int = 2000
+
+
+@dataclass(slots=True)
+class OptimizationReport:
+    profile: str
+    size_bytes: int
+    baseline_size_bytes: int
+    # Median milliseconds per forward pass, keyed by batch size.
+    latency_ms: dict[str, float] = field(default_factory=dict)
+    baseline_latency_ms: dict[str, float] = field(default_factory=dict)
+    f1: float | None = None
+    baseline_f1: float | None = None
+
+    @property
+    def f1_delta(self) -> float | None:
+        if self.f1 is None or self.baseline_f1 is None:
+            return None
+        return self.f1 - self.baseline_f1
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["f1_delta"] = self.f1_delta
+        data["size_ratio"] = round(self.size_bytes / self.baseline_size_bytes, 4)
+        return data
+
+
+def _conv_blocks(
+    model: CNNBiLSTMAttention,
+) -> list[tuple[int, nn.Conv1d, nn.BatchNorm1d]]:
+    layers = list(model.cnn)
+    return [
+        (idx, layer, layers[idx + 1])
+        for idx, layer in enumerate(layers)
+        if isinstance(layer, nn.Conv1d) and isinstance(layers[idx + 1], nn.BatchNorm1d)
+    ]
+
+
+def prune_conv_channels(model: CNNBiLSTMAttention, amount: float) -> CNNBiLSTMAttention:
+    """Physically remove the lowest-L1 output channels of every conv layer.
+
+    Unlike mask-based pruning this shrinks the tensors, so the following BatchNorm, the
+    next conv's inputs and the LSTM's input projection shrink too and inference gets
+    cheaper. Accuracy usually needs a short fine-tune; the report shows the F1 cost.
+    """
+
+    if not 0.0 <= amount < 1.0:
+        raise ValueError("Prune amount must be in [0, 1)")
+    model = copy.deepcopy(model)
+    if amount == 0.0:
+        return model
+
+    blocks = _conv_blocks(model)
+    keep_prev: torch.Tensor | None = None
+    for _, conv, norm in blocks:
+        weight = (
+            conv.weight.data if keep_prev is None else conv.weight.data[:, keep_prev]
+        )
+        keep_count = max(1, int(round(conv.out_channels * (1.0 - amount))))
+        keep = (
+            torch.argsort(weight.abs().sum(dim=(1, 2)), descending=True)[:keep_count]
+            .sort()
+            .values
+        )
+
+        conv.weight = nn.Parameter(weight[keep].clone())
+        if conv.bias is not None:
+            conv.bias = nn.Parameter(conv.bias.data[keep].clone())
+        conv.in_channels, conv.out_channels = weight.shape[1], keep_count
+        norm.weight = nn.Parameter(norm.weight.data[keep].clone())
+        norm.bias = nn.Parameter(norm.bias.data[keep].clone())
+        norm.running_mean = norm.running_mean[keep].clone()
+        norm.running_var = norm.running_var[keep].clone()
+        norm.num_features = keep_count
+        keep_prev = keep
+
+    if keep_prev is not None:
+        lstm = model.lstm
+        for suffix in ("", "_reverse"):
+            name = f"weight_ih_l0{suffix}"
+            if hasattr(lstm, name):
+                setattr(
+                    lstm,
+                    name,
+                    nn.Parameter(getattr(lstm, name).data[:, keep_prev].clone()),
+                )
+        lstm.input_size = int(keep_prev.numel())
+        lstm._init_flat_weights()
+    return model
+
+
+class _QuantizedStack(nn.Module):
+    def __init__(self, cnn: nn.Sequential) -> None:
+        super().__init__()
+        self.quant = tq.QuantStub()
+        self.cnn = cnn
+        self.dequant = tq.DeQuantStub()
+
+    def forward(self, inputs: torch.Tensor) -> torch.Tensor:
+        return self.dequant(self.cnn(self.quant(inputs)))
+
+
+def quantize_conv_static(
+    model: CNNBiLSTMAttention, calibration: Iterable[torch.Tensor]
+) -> CNNBiLSTMAttention:
+    """Fuse Conv+BN+ReLU and quantize the conv stack to int8 on ``calibration``."""
+
+    _ensure_quantization()
+    model = copy.deepcopy(model).eval()
+    groups = [
+        [str(idx), str(idx + 1), str(idx + 2)] for idx, _, _ in _conv_blocks(model)
+    ]
+    stack = _QuantizedStack(tq.fuse_modules(model.cnn, groups))
+    stack.qconfig = tq.get_default_qconfig(torch.backends.quantized.engine)
+    tq.prepare(stack, inplace=True)
+    seen = 0
+    with torch.no_grad():
+        for batch in calibration:
+            stack(batch)
+            seen += 1
+    if not seen:
+        raise ValueError("Static quantization needs at least one calibration batch")
+    tq.convert(stack, inplace=True)
+    model.cnn = stack
+    return model
+
+
+def quantize_dynamic_int8(model: nn.Module) -> nn.Module:
+    """Quantize LSTM and Linear weights to int8 with dynamic activation quantization."""
+
+    _ensure_quantization()
+    return tq.quantize_dynamic(
+        copy.deepcopy(model).eval(), {nn.LSTM, nn.Linear}, dtype=torch.qint8
+    )
+
+
+def load_batches(
+    records: Sequence[SampleRecord],
+    *,
+    sequence_length: int,
+    batch_size: int,
+    max_batches: int | None = None,
+) -> list[tuple[torch.Tensor, torch.Tensor]]:
+    """Read ``(inputs, labels)`` batches from manifest records."""
+
+    dataset = LightCurveDataset(records, sequence_length=sequence_length)
+    batches = []
+    for start in range(0, len(dataset), batch_size):
+        if max_batches is not None and len(batches) >= max_batches:
+            break
+        batch = collate_light_curves(
+            [
+                dataset[idx]
+                for idx in range(start, min(start + batch_size, len(dataset)))
+            ]
+        )
+        batches.append((batch["inputs"], batch["label"]))
+    return batches
+
+
+def optimize_model(
+    model: CNNBiLSTMAttention,
+    profile: OptimizationProfile,
+    calibration: Sequence[torch.Tensor] | None = None,
+) -> nn.Module:
+    optimized: nn.Module = prune_conv_channels(model.eval(), profile.prune_amount)
+    if profile.static_conv:
+        optimized = quantize_conv_static(optimized, calibration or [])
+    if profile.dynamic_int8:
+        optimized = quantize_dynamic_int8(optimized)
+    return optimized.eval()
+
+
+def _trace(model: nn.Module, sequence_length: int) -> torch.jit.ScriptModule:
+    with torch.no_grad():
+        return torch.jit.trace(
+            model.eval(), torch.randn(2, 2, sequence_length), check_trace=False
+        )
+
+
+def _serialized_size(module: torch.jit.ScriptModule) -> int:
+    buffer = io.BytesIO()
+    torch.jit.save(module, buffer)
+    return buffer.getbuffer().nbytes
+
+
+def measure_latency(
+    model: nn.Module,
+    sequence_length: int,
+    batch_sizes: Sequence[int] = (1, 8),
+    iterations: int = 20,
+) -> dict[str, float]:
+    latencies: dict[str, float] = {}
+    with torch.inference_mode():
+        for batch_size in batch_sizes:
+            inputs = torch.randn(batch_size, 2, sequence_length)
+            model(inputs)  # warm-up
+            samples = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                model(inputs)
+                samples.append(time.perf_counter() - started)
+            latencies[str(batch_size)] = round(float(np.median(samples)) * 1000.0, 3)
+    return latencies
+
+
+def evaluate_f1(
+    model: nn.Module, batches: Sequence[tuple[torch.Tensor, torch.Tensor]]
+) -> float:
+    from sklearn.metrics import f1_score
+
+    predictions, labels = [], []
+    with torch.inference_mode():
+        for inputs, targets in batches:
+            logits, _ = model(inputs)
+            predictions.append(logits.argmax(dim=1).numpy())
+            labels.append(targets.numpy())
+    y_true, y_pred = np.concatenate(labels), np.concatenate(predictions)
+    average = "binary" if set(np.unique(y_true)) <= {0, 1} else "macro"
+    return float(f1_score(y_true, y_pred, average=average, zero_division=0))
+
+
+def build_profile(
+    model: CNNBiLSTMAttention,
+    profile: OptimizationProfile,
+    profiles_dir: str | Path,
+    *,
+    calibration_records: Sequence[SampleRecord] | None = None,
+    eval_records: Sequence[SampleRecord] | None = None,
+    latency_iterations: int = 20,
+) -> OptimizationReport:
+    """Optimize ``model`` per ``profile``, save it and report deltas against fp32."""
+
+    model = model.eval()
+    calibration = None
+    if profile.static_conv:
+        if not calibration_records:
+            raise ValueError("Static conv quantization needs calibration records")
+        calibration = [
+            inputs
+            for inputs, _ in load_batches(
+                calibration_records,
+                sequence_length=profile.sequence_length,
+                batch_size=profile.batch_size,
+                max_batches=profile.calibration_batches,
+            )
+        ]
+    optimized = optimize_model(model, profile, calibration)
+
+    baseline_traced = _trace(model, profile.sequence_length)
+    optimized_traced = _trace(optimized, profile.sequence_length)
+    report = OptimizationReport(
+        profile=profile.name,
+        size_bytes=_serialized_size(optimized_traced),
+        baseline_size_bytes=_serialized_size(baseline_traced),
+        latency_ms=measure_latency(
+            optimized_traced, profile.sequence_length, iterations=latency_iterations
+        ),
+        baseline_latency_ms=measure_latency(
+            baseline_traced, profile.sequence_length, iterations=latency_iterations
+        ),
+    )
+    if eval_records:
+        batches = load_batches(
+            eval_records,
+            sequence_length=profile.sequence_length,
+            batch_size=profile.batch_size,
+        )
+        report.baseline_f1 = evaluate_f1(model, batches)
+        report.f1 = evaluate_f1(optimized, batches)
+
+    directory = Path(profiles_dir) / profile.name
+    directory.mkdir(parents=True, exist_ok=True)
+    optimized_traced.save(str(directory / MODEL_FILE))
+    payload = {
+        "profile": asdict(profile),
+        "quantized_engine": torch.backends.quantized.engine,
+        "report": report.to_dict(),
+    }
+    (directory / PROFILE_FILE).write_text(
+        json.dumps(payload, indent=2), encoding="utf-8"
+    )
+    LOGGER.info("Saved optimization profile", extra=report.to_dict())
+    return report
+
+
+def prepare_profile(profiles_dir: str | Path, name: str) -> Path:
+    """Return a saved profile's model path, selecting its quantized engine."""
+
+    directory = Path(profiles_dir) / name
+    try:
+        payload = json.loads((directory / PROFILE_FILE).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Optimization profile not found: {directory}"
+        ) from None
+    engine = payload.get("quantized_engine")
+    if engine and engine in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = engine
+    return directory / MODEL_FILE
+
+
+__all__ = [
+    "OptimizationProfile",
+    "OptimizationReport",
+    "build_profile",
+    "evaluate_f1",
+    "load_batches",
+    "measure_latency",
+    "optimize_model",
+    "prepare_profile",
+    "prune_conv_channels",
+    "quantize_conv_static",
+    "quantize_dynamic_int8",
+]
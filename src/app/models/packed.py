@@ -0,0 +1,253 @@
+"""Packed, memory-mapped shard format for light-curve training data.
+
+A packed dataset is a directory holding:
+
+* ``shard-00000.npy`` ... – float32 arrays of shape ``(count, 2, sequence_length)``
+  with the padded/cropped time and flux of each sample stored contiguously;
+* ``labels.npy`` – int64 labels for all samples in order;
+* ``physics.npy`` – float32 ``(count, len(PHYSICS_TARGETS))`` targets, NaN if unknown;
+* ``metadata.npz`` – one array per scalar metadata field (a columnar table);
+* ``index.json`` – format version, sequence length and shard sizes, written last.
+
+Reading a sample is a slice of a memmap instead of opening, decompressing and parsing
+per-sample files.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from .datasets import (
+    PHYSICS_TARGETS,
+    SampleRecord,
+    load_sample_arrays,
+    pad_or_crop,
+    physics_targets,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+PACKED_FORMAT_VERSION = 1
+INDEX_FILE = "index.json"
+LABELS_FILE = "labels.npy"
+PHYSICS_FILE = "physics.npy"
+METADATA_FILE = "metadata.npz"
+
+
+@dataclass(slots=True)
+class PackedIndex:
+    sequence_length: int
+    shards: list[int] = field(default_factory=list)
+    metadata_columns: list[str] = field(default_factory=list)
+    format: int = PACKED_FORMAT_VERSION
+
+    @property
+    def size(self) -> int:
+        return sum(self.shards)
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "PackedIndex":
+        data = json.loads((Path(directory) / INDEX_FILE).read_text(encoding="utf-8"))
+        if data.get("format") != PACKED_FORMAT_VERSION:
+            raise ValueError(f"Unsupported packed dataset format: {data.get('format')}")
+        return cls(**data)
+
+
+def shard_path(directory: str | Path, shard: int) -> Path:
+    return Path(directory) / f"shard-{shard:05d}.npy"
+
+
+def _read_metadata(record: SampleRecord) -> dict[str, Any]:
+    if record.metadata_path is None or not record.metadata_path.exists():
+        return {}
+    try:
+        return json.loads(record.metadata_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+
+def _scalars(metadata: dict[str, Any]) -> dict[str, Any]:
+    return {
+        key: value
+        for key, value in metadata.items()
+        if isinstance(value, (bool, int, float, str))
+    }
+
+
+def _metadata_table(rows: Sequence[dict[str, Any]]) -> dict[str, np.ndarray]:
+    """Turn per-sample scalar dicts into columns; missing values become NaN or ''."""
+
+    columns: dict[str, np.ndarray] = {}
+    for key in sorted({key for row in rows for key in row}):
+        values = [row.get(key) for row in rows]
+        kinds = {type(value) for value in values if value is not None}
+        complete = None not in values
+        if complete and kinds <= {bool}:
+            columns[key] = np.asarray(values, dtype=bool)
+        elif complete and kinds <= {int}:
+            columns[key] = np.asarray(values, dtype=np.int64)
+        elif kinds <= {int, float}:
+            columns[key] = np.asarray(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+        else:
+            columns[key] = np.asarray(
+                ["" if value is None else str(value) for value in values], dtype=np.str_
+            )
+    return columns
+
+
+def pack_records(
+    records: Sequence[SampleRecord],
+    output_dir: str | Path,
+    *,
+    sequence_length: int = 2000,
+    shard_size: int = 65536,
+    include_metadata: bool = True,
+    overwrite: bool = False,
+) -> PackedIndex:
+    """Pack per-sample arrays into fixed-length float32 shards under ``output_dir``."""
+
+    output_dir = Path(output_dir)
+    if (output_dir / INDEX_FILE).exists():
+        if not overwrite:
+            raise FileExistsError(f"Packed dataset already exists: {output_dir}")
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    index = PackedIndex(sequence_length=sequence_length)
+    labels = np.empty(len(records), dtype=np.int64)
+    physics = np.empty((len(records), len(PHYSICS_TARGETS)), dtype=np.float32)
+    metadata_rows: list[dict[str, Any]] = []
+    for start in range(0, len(records), shard_size):
+        chunk = records[start : start + shard_size]
+        shard = np.lib.format.open_memmap(
+            shard_path(output_dir, len(index.shards)),
+            mode="w+",
+            dtype=np.float32,
+            shape=(len(chunk), 2, sequence_length),
+        )
+        for row, record in enumerate(chunk):
+            time, flux = load_sample_arrays(record)
+            shard[row, 0] = pad_or_crop(
+                np.asarray(time, dtype=np.float32), sequence_length
+            )
+            shard[row, 1] = pad_or_crop(
+                np.asarray(flux, dtype=np.float32), sequence_length
+            )
+            labels[start + row] = record.label
+            metadata = _read_metadata(record)
+            physics[start + row] = physics_targets(metadata)
+            if include_metadata:
+                metadata_rows.append(
+                    {"source": str(record.flux_path), **_scalars(metadata)}
+                )
+        shard.flush()
+        del shard
+        index.shards.append(len(chunk))
+        LOGGER.info(
+            "Packed shard",
+            extra={"shard": len(index.shards) - 1, "samples": start + len(chunk)},
+        )
+
+    np.save(output_dir / LABELS_FILE, labels)
+    np.save(output_dir / PHYSICS_FILE, physics)
+    columns = _metadata_table(metadata_rows) if include_metadata else {}
+    np.savez(output_dir / METADATA_FILE, **columns)
+    index.metadata_columns = sorted(columns)
+
+    # The index is written last; its presence marks the pack as complete.
+    tmp = output_dir / f".{INDEX_FILE}.tmp"
+    tmp.write_text(json.dumps(asdict(index)), encoding="utf-8")
+    os.replace(tmp, output_dir / INDEX_FILE)
+    return index
+
+
+class PackedLightCurveDataset(Dataset):
+    """Dataset over a packed directory; ``__getitem__`` returns views into mmap shards.
+
+    Shards are opened lazily in each process, so the dataset can be pickled into
+    DataLoader workers without carrying open maps.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        transform: Callable[[torch.Tensor], torch.Tensor] | None = None,
+        include_metadata: bool = False,
+    ) -> None:
+        self.directory = Path(directory)
+        self.index = PackedIndex.load(self.directory)
+        self.sequence_length = self.index.sequence_length
+        self.transform = transform
+        self.include_metadata = include_metadata
+        self.labels = np.load(self.directory / LABELS_FILE)
+        self.physics = torch.from_numpy(np.load(self.directory / PHYSICS_FILE))
+        self._offsets = np.cumsum([0, *self.index.shards])
+        self._shards: list[np.ndarray] | None = None
+        self._metadata: dict[str, np.ndarray] | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_shards"] = None
+        return state
+
+    def __len__(self) -> int:
+        return int(self._offsets[-1])
+
+    def _open(self) -> list[np.ndarray]:
+        if self._shards is None:
+            # Copy-on-write maps are writable, so torch.from_numpy shares the pages.
+            self._shards = [
+                np.load(shard_path(self.directory, shard), mmap_mode="c")
+                for shard in range(len(self.index.shards))
+            ]
+        return self._shards
+
+    @property
+    def metadata(self) -> dict[str, np.ndarray]:
+        if self._metadata is None:
+            with np.load(self.directory / METADATA_FILE) as data:
+                self._metadata = {name: data[name] for name in data.files}
+        return self._metadata
+
+    def __getitem__(self, idx: int) -> dict[str, Any]:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        shard = int(np.searchsorted(self._offsets, idx, side="right")) - 1
+        x = torch.from_numpy(self._open()[shard][idx - self._offsets[shard]])
+        if self.transform:
+            x = self.transform(x)
+        sample: dict[str, Any] = {
+            "inputs": x,
+            "label": torch.tensor(self.labels[idx], dtype=torch.long),
+            "physics": self.physics[idx],
+        }
+        if self.include_metadata:
+            sample["metadata"] = {
+                name: column[idx].item() for name, column in self.metadata.items()
+            }
+        return sample
+
+
+__all__ = [
+    "PACKED_FORMAT_VERSION",
+    "PackedIndex",
+    "PackedLightCurveDataset",
+    "pack_records",
+    "shard_path",
+]
@@ -1,7 +1,13 @@
 """Light curve preprocessing utilities."""
 
+from .batch import BatchConfig, BatchReport, preprocess_directory
+from .cache import PreprocessingCache
 from .config import PreprocessingConfig
-from .pipeline import preprocess_lightcurve
+from .features import FEATURE_NAMES, extract_features
+from .period_search import PeriodCandidate, PeriodSearchConfig, search_periods
+from .pipeline import PreprocessingError, preprocess_lightcurve
+from .plots import PlotStore, decimate_minmax
+from .streaming import LightCurveStream, RingBuffer, StreamConfig
 from .validation import (
     PreprocessingStatistics,
     compute_statistics,
@@ -11,7 +17,22 @@ from .validation import (
 
 __all__ = [
     "PreprocessingConfig",
+    "PreprocessingError",
+    "FEATURE_NAMES",
+    "extract_features",
     "preprocess_lightcurve",
+    "PeriodCandidate",
+    "PeriodSearchConfig",
+    "search_periods",
+    "BatchConfig",
+    "BatchReport",
+    "preprocess_directory",
+    "PreprocessingCache",
+    "PlotStore",
+    "decimate_minmax",
+    "LightCurveStream",
+    "RingBuffer",
+    "StreamConfig",
     "PreprocessingStatistics",
     "compute_statistics",
     "save_plot",
@@ -0,0 +1,368 @@
+"""Resumable batch preprocessing of light-curve directories over a process pool."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+
+from ..executors import default_cpu_workers
+from .config import PreprocessingConfig
+from .pipeline import preprocess_lightcurve
+
+LOGGER = logging.getLogger(__name__)
+
+LIGHTCURVE_SUFFIXES = (".fits", ".fits.gz", ".fit")
+METADATA_FORMAT_VERSION = 1
+
+
+@dataclass(slots=True)
+class BatchConfig:
+    workers: int = field(default_factory=default_cpu_workers)
+    # Files handed to a worker per task; larger chunks amortize pickling and scheduling.
+    chunk_size: int = 16
+    flux_column: str = "PDCSAP_FLUX"
+    overwrite: bool = False
+    # Label for files missing from ``labels``; None leaves them out of the manifest,
+    # since the training loss has no "unknown" class.
+    default_label: int | None = None
+    # Log progress every this many finished files.
+    log_every: int = 500
+    # multiprocessing start method; None uses the platform default. Use "spawn" when
+    # calling from a process that already runs threads (e.g. the API server).
+    start_method: str | None = None
+
+
+@dataclass(slots=True)
+class BatchReport:
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    # Preprocessed files left out of the manifest because they have no label.
+    unlabeled: int = 0
+    seconds: float = 0.0
+    manifest_path: str | None = None
+    failures: list[dict[str, str]] = field(default_factory=list)
+
+    @property
+    def curves_per_second(self) -> float:
+        return self.processed / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["curves_per_second"] = round(self.curves_per_second, 3)
+        return data
+
+
+@dataclass(slots=True)
+class OutputPaths:
+    flux: Path
+    time: Path
+    metadata: Path
+
+
+def iter_lightcurve_files(directory: str | Path) -> Iterator[Path]:
+    """Yield light-curve files below ``directory`` in a stable order."""
+
+    for path in sorted(Path(directory).rglob("*")):
+        if path.is_file() and path.name.lower().endswith(LIGHTCURVE_SUFFIXES):
+            yield path
+
+
+def _stem(path: Path) -> str:
+    name = path.name
+    for suffix in LIGHTCURVE_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return path.stem
+
+
+def output_paths(source: Path, input_dir: Path, output_dir: Path) -> OutputPaths:
+    """Mirror the source's location below ``input_dir`` under ``output_dir``."""
+
+    base = output_dir / source.parent.relative_to(input_dir) / _stem(source)
+    return OutputPaths(
+        flux=base.with_name(base.name + ".flux.npy"),
+        time=base.with_name(base.name + ".time.npy"),
+        metadata=base.with_name(base.name + ".json"),
+    )
+
+
+def config_hash(config: PreprocessingConfig, flux_column: str) -> str:
+    payload = json.dumps(
+        {"config": asdict(config), "flux_column": flux_column}, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _source_state(path: Path) -> dict[str, int]:
+    stat = path.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _read_metadata(path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def is_current(source: Path, outputs: OutputPaths, digest: str) -> bool:
+    """Whether outputs exist and came from this exact source file and configuration."""
+
+    metadata = _read_metadata(outputs.metadata)
+    if metadata is None or not outputs.flux.exists() or not outputs.time.exists():
+        return False
+    batch = metadata.get("batch", {})
+    return (
+        batch.get("format") == METADATA_FORMAT_VERSION
+        and batch.get("config_hash") == digest
+        and batch.get("source") == _source_state(source)
+    )
+
+
+def _save_npy(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as fh:
+        np.save(fh, array)
+    os.replace(tmp, path)
+
+
+def _process_file(
+    source: Path,
+    outputs: OutputPaths,
+    config: PreprocessingConfig,
+    flux_column: str,
+    digest: str,
+) -> dict[str, Any]:
+    state = _source_state(source)
+    result = preprocess_lightcurve(source, flux_column=flux_column, config=config)
+    outputs.flux.parent.mkdir(parents=True, exist_ok=True)
+    _save_npy(outputs.flux, result["flux"])
+    _save_npy(outputs.time, result["time"])
+    metadata = {
+        **result["metadata"],
+        "length": int(result["flux"].size),
+        "batch": {
+            "format": METADATA_FORMAT_VERSION,
+            "config_hash": digest,
+            "source": state,
+        },
+    }
+    # Metadata is written last: its presence marks the arrays complete for resuming.
+    tmp = outputs.metadata.with_name(outputs.metadata.name + ".tmp")
+    tmp.write_text(json.dumps(metadata), encoding="utf-8")
+    os.replace(tmp, outputs.metadata)
+    return metadata
+
+
+def _process_chunk(
+    tasks: Sequence[tuple[Path, OutputPaths]],
+    config: PreprocessingConfig,
+    flux_column: str,
+    digest: str,
+) -> list[tuple[Path, str | None]]:
+    """Worker entry point: preprocess a chunk of files and report per-file errors."""
+
+    results: list[tuple[Path, str | None]] = []
+    for source, outputs in tasks:
+        try:
+            _process_file(source, outputs, config, flux_column, digest)
+            results.append((source, None))
+        except Exception as exc:  # noqa: BLE001 - one bad file must not stop the batch
+            results.append((source, f"{type(exc).__name__}: {exc}"))
+    return results
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    chunk: list[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_manifest(
+    path: Path,
+    entries: Iterable[tuple[Path, OutputPaths]],
+    labels: Mapping[str, int],
+    default_label: int | None = None,
+) -> int:
+    """Write a JSONL manifest readable by :func:`app.utils.manifests.load_manifest`.
+
+    Entries without a label (and no ``default_label``) are skipped; returns how many.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    unlabeled = 0
+    with tmp.open("w", encoding="utf-8") as fh:
+        for source, outputs in entries:
+            stem = _stem(source)
+            label = labels.get(str(source), labels.get(stem, default_label))
+            if label is None:
+                unlabeled += 1
+                continue
+            record = {
+                "flux_path": str(outputs.flux),
+                "time_path": str(outputs.time),
+                "metadata_path": str(outputs.metadata),
+                "label": int(label),
+                "source": str(source),
+            }
+            fh.write(json.dumps(record) + "\n")
+    os.replace(tmp, path)
+    return unlabeled
+
+
+def preprocess_directory(
+    input_dir: str | Path,
+    output_dir: str | Path,
+    *,
+    config: PreprocessingConfig | None = None,
+    batch: BatchConfig | None = None,
+    labels: Mapping[str, int] | None = None,
+    manifest_path: str | Path | None = None,
+) -> BatchReport:
+    """Preprocess every light curve below ``input_dir`` into arrays and a manifest.
+
+    Files whose outputs were produced from the same source (mtime and size) with the
+    same configuration are skipped, so interrupted runs resume where they stopped.
+    """
+
+    cfg = config or PreprocessingConfig()
+    opts = batch or BatchConfig()
+    input_dir = Path(input_dir).resolve()
+    output_dir = Path(output_dir).resolve()
+    manifest = Path(manifest_path) if manifest_path else output_dir / "manifest.jsonl"
+    digest = config_hash(cfg, opts.flux_column)
+
+    entries: list[tuple[Path, OutputPaths]] = []
+    pending: list[tuple[Path, OutputPaths]] = []
+    # Sources whose outputs are complete; only these go into the manifest.
+    finished: set[Path] = set()
+    report = BatchReport(manifest_path=str(manifest))
+    for source in iter_lightcurve_files(input_dir):
+        outputs = output_paths(source, input_dir, output_dir)
+        entries.append((source, outputs))
+        if not opts.overwrite and is_current(source, outputs, digest):
+            report.skipped += 1
+            finished.add(source)
+        else:
+            pending.append((source, outputs))
+
+    LOGGER.info(
+        "Batch preprocessing started",
+        extra={
+            "files": len(entries),
+            "pending": len(pending),
+            "skipped": report.skipped,
+            "workers": opts.workers,
+        },
+    )
+    started = time.perf_counter()
+
+    def _record(results: list[tuple[Path, str | None]]) -> None:
+        for source, error in results:
+            if error is None:
+                report.processed += 1
+                finished.add(source)
+            else:
+                report.failed += 1
+                report.failures.append({"path": str(source), "error": error})
+                LOGGER.warning(
+                    "Preprocessing failed", extra={"path": str(source), "error": error}
+                )
+            done = report.processed + report.failed
+            if opts.log_every and done % opts.log_every == 0:
+                elapsed = time.perf_counter() - started
+                LOGGER.info(
+                    "Batch preprocessing progress",
+                    extra={
+                        "done": done,
+                        "total": len(pending),
+                        "curves_per_second": round(done / elapsed, 2),
+                    },
+                )
+
+    def _record_broken(
+        chunk: list[tuple[Path, OutputPaths]], exc: BrokenProcessPool
+    ) -> None:
+        # A worker died (e.g. killed for memory); the whole chunk's outcome is unknown.
+        _record([(source, f"{type(exc).__name__}: {exc}") for source, _ in chunk])
+
+    chunks = _chunked(pending, max(1, opts.chunk_size))
+    try:
+        if opts.workers <= 1:
+            for chunk in chunks:
+                _record(_process_chunk(chunk, cfg, opts.flux_column, digest))
+        else:
+            context = multiprocessing.get_context(opts.start_method)
+            with ProcessPoolExecutor(
+                max_workers=opts.workers, mp_context=context
+            ) as pool:
+                # Keep a bounded window of chunks in flight, not a future per file.
+                in_flight: dict[Future, list[tuple[Path, OutputPaths]]] = {}
+
+                def _settle(futures: Iterable[Future]) -> None:
+                    for future in futures:
+                        chunk = in_flight.pop(future)
+                        try:
+                            _record(future.result())
+                        except BrokenProcessPool as exc:
+                            _record_broken(chunk, exc)
+
+                for chunk in chunks:
+                    if len(in_flight) >= 2 * opts.workers:
+                        _settle(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                    try:
+                        in_flight[
+                            pool.submit(
+                                _process_chunk, chunk, cfg, opts.flux_column, digest
+                            )
+                        ] = chunk
+                    except BrokenProcessPool as exc:
+                        _record_broken(chunk, exc)
+                _settle(wait(in_flight).done)
+    finally:
+        # Always write a manifest of the complete outputs, even after an early stop.
+        report.seconds = time.perf_counter() - started
+        report.unlabeled = write_manifest(
+            manifest,
+            (entry for entry in entries if entry[0] in finished),
+            labels or {},
+            opts.default_label,
+        )
+    if report.unlabeled:
+        LOGGER.warning(
+            "Unlabeled light curves left out of the manifest",
+            extra={"count": report.unlabeled},
+        )
+    LOGGER.info("Batch preprocessing finished", extra=report.to_dict())
+    return report
+
+
+__all__ = [
+    "BatchConfig",
+    "BatchReport",
+    "OutputPaths",
+    "config_hash",
+    "is_current",
+    "iter_lightcurve_files",
+    "output_paths",
+    "preprocess_directory",
+    "write_manifest",
+]
@@ -0,0 +1,210 @@
+"""Content-addressed on-disk cache for preprocessing results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+from .config import PreprocessingConfig
+
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+# Bump whenever a code change alters preprocessing output so stale entries miss.
+PIPELINE_VERSION = "1"
+
+_META = "meta.json"
+# Running byte total of all entries, shared by every process using the directory.
+_SIZE = ".size"
+_LOCK = ".lock"
+_ARRAYS = ("time", "flux")
+
+
+def file_digest(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PreprocessingCache:
+    """Stores folded time/flux arrays as ``.npy`` files served as read-only memmaps.
+
+    Entries are keyed by the source file's content hash, the preprocessing config, the
+    flux column and :data:`PIPELINE_VERSION`. The directory is bounded to ``max_bytes``;
+    the least recently read entries (by ``meta.json`` mtime, refreshed on every hit) are
+    evicted first. The byte total lives in a file updated under a file lock, so worker
+    processes that receive a pickled copy share it instead of rescanning the directory.
+
+    Lookups are not counted here: the lookup may run in a worker process whose copy is
+    discarded. Callers report the ``cache_hit`` flag of each result with :meth:`record`.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = 2 * 1024**3) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(
+        self, path: str | Path, config: PreprocessingConfig, flux_column: str
+    ) -> str:
+        payload = {
+            "file": file_digest(path),
+            "config": asdict(config),
+            "flux_column": flux_column,
+            "version": PIPELINE_VERSION,
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return ``{"time", "flux", "metadata", ...}`` for ``key``, or ``None``."""
+
+        entry = self._entry(key)
+        try:
+            meta = json.loads((entry / _META).read_text(encoding="utf-8"))
+            arrays = {
+                name: np.load(entry / f"{name}.npy", mmap_mode="r") for name in _ARRAYS
+            }
+            os.utime(entry / _META)
+        except (OSError, ValueError):
+            return None
+        return {**arrays, **meta}
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with (self.directory / _LOCK).open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read_total(self) -> int | None:
+        try:
+            return int((self.directory / _SIZE).read_text(encoding="ascii"))
+        except (OSError, ValueError):
+            return None
+
+    def _write_total(self, total: int) -> None:
+        (self.directory / _SIZE).write_text(str(total), encoding="ascii")
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        entry = self._entry(key)
+        if entry.exists():
+            return
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = entry.parent / f".tmp-{uuid.uuid4().hex}"
+        staging.mkdir()
+        try:
+            for name in _ARRAYS:
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(result[name]))
+            meta = {
+                name: value for name, value in result.items() if name not in _ARRAYS
+            }
+            (staging / _META).write_text(json.dumps(meta), encoding="utf-8")
+            size = sum(item.stat().st_size for item in staging.iterdir())
+            os.rename(staging, entry)
+        except OSError:
+            # Another process may have published the same entry first.
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        with self._file_lock():
+            total = self._read_total()
+            # Without a recorded total (first write or a damaged file), scan once; the
+            # scan already includes the new entry.
+            total = self.size_bytes() if total is None else total + size
+            if total > self.max_bytes:
+                self._evict_locked()
+            else:
+                self._write_total(total)
+
+    def update(self, key: str, **fields: Any) -> None:
+        """Merge ``fields`` into an existing entry's metadata."""
+
+        path = self._entry(key) / _META
+        try:
+            meta = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        meta.update(fields)
+        tmp = path.with_name(f".{_META}.{uuid.uuid4().hex}")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for shard in self.directory.iterdir():
+            if not shard.is_dir():
+                continue
+            for entry in shard.iterdir():
+                if entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    size = sum(item.stat().st_size for item in entry.iterdir())
+                    entries.append(((entry / _META).stat().st_mtime, size, entry))
+                except OSError:
+                    continue
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+
+        with self._file_lock():
+            return self._evict_locked()
+
+    def _evict_locked(self) -> int:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        self._write_total(total)
+        if removed:
+            LOGGER.info(
+                "Evicted preprocessing cache entries",
+                extra={"removed": removed, "bytes": total},
+            )
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+__all__ = ["PIPELINE_VERSION", "PreprocessingCache", "file_digest"]
@@ -15,4 +15,8 @@ class PreprocessingConfig:
     period_min: float | None = None
     period_max: float | None = None
     mask_outliers: bool = True
+    # "lightkurve" runs the LightCurve methods; "numpy" the array engine in ``fast``.
+    engine: str = "lightkurve"
+    # "bls" searches lightkurve's dense grid; "fast" the coarse-to-fine search.
+    period_search: str = "bls"
 
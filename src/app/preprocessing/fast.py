@@ -0,0 +1,215 @@
+"""Array-only preprocessing engine mirroring lightkurve's cleaning and folding."""
+
+from __future__ import annotations
+
+import logging
+import warnings
+from pathlib import Path
+
+import numpy as np
+from scipy.interpolate import interp1d
+from scipy.signal import savgol_filter
+
+from .config import PreprocessingConfig
+from .period_search import PeriodSearchConfig, search_periods
+
+LOGGER = logging.getLogger(__name__)
+
+# lightkurve's "default" quality bitmasks (KeplerQualityFlags /
+# TessQualityFlags.DEFAULT_BITMASK).
+KEPLER_DEFAULT_BITMASK = 1130799
+TESS_DEFAULT_BITMASK = 17087
+
+# Grid used by lightkurve's BoxLeastSquaresPeriodogram when no durations are given.
+BLS_DURATIONS = (0.05, 0.10, 0.15, 0.20, 0.25, 0.33)
+BLS_FREQUENCY_FACTOR = 10
+
+
+def _default_bitmask(header) -> int:
+    telescope = str(header.get("TELESCOP", header.get("MISSION", ""))).strip().upper()
+    if telescope in {"KEPLER", "K2"}:
+        return KEPLER_DEFAULT_BITMASK
+    return TESS_DEFAULT_BITMASK
+
+
+def load_arrays(
+    path: str | Path, flux_column: str = "PDCSAP_FLUX"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Read time and flux columns from a Kepler/TESS light curve FITS file."""
+
+    from astropy.io import fits
+
+    with fits.open(path, memmap=True) as hdul:
+        header = hdul[0].header
+        data = hdul[1].data
+        columns = {name.upper(): name for name in data.columns.names}
+        time = np.array(data[columns["TIME"]], dtype=np.float64)
+        flux = np.array(data[columns[flux_column.upper()]], dtype=np.float64)
+        keep = ~np.isnan(time)
+        if "QUALITY" in columns:
+            quality = np.asarray(data[columns["QUALITY"]]).astype(np.int64)
+            keep &= (quality & _default_bitmask(header)) == 0
+    return time[keep], flux[keep]
+
+
+def sigma_clip_mask(
+    values: np.ndarray, sigma: float, *, maxiters: int = 5
+) -> np.ndarray:
+    """Return a keep-mask equal to ``~astropy.stats.sigma_clip(values, sigma).mask``."""
+
+    finite = np.isfinite(values)
+    filtered = values[finite]
+    lower = upper = np.nan
+    for _ in range(maxiters):
+        if filtered.size == 0:
+            break
+        center = np.median(filtered)
+        spread = np.std(filtered)
+        lower, upper = center - spread * sigma, center + spread * sigma
+        kept = filtered[(filtered >= lower) & (filtered <= upper)]
+        changed = filtered.size - kept.size
+        filtered = kept
+        if changed == 0:
+            break
+    with np.errstate(invalid="ignore"):
+        return finite & (values >= lower) & (values <= upper)
+
+
+def flatten_trend(
+    time: np.ndarray,
+    flux: np.ndarray,
+    window_length: int,
+    *,
+    polyorder: int = 2,
+    sigma: float = 3.0,
+    niters: int = 3,
+    break_tolerance: int = 5,
+) -> np.ndarray:
+    """Estimate the long-term trend with the iterative Savitzky-Golay scheme of
+    ``LightCurve.flatten``."""
+
+    polyorder = min(polyorder, window_length - 1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mask = np.isfinite(flux)
+        mask &= (
+            np.nan_to_num(np.abs(flux - np.nanmedian(flux))) <= np.nanstd(flux) * sigma
+        )
+
+        trend = np.zeros(0)
+        for _ in range(niters):
+            masked_time = time[mask]
+            masked_flux = flux[mask]
+            dt = np.diff(masked_time)
+            cut = np.where(dt > break_tolerance * np.nanmedian(dt))[0] + 1
+            low = np.append([0], cut)
+            high = np.append(cut, masked_time.size)
+
+            trend = np.zeros(masked_time.size)
+            for lo, hi in zip(low, high):
+                if window_length > hi - lo or hi - lo < break_tolerance:
+                    trend[lo:hi] = np.nanmedian(masked_flux[lo:hi])
+                else:
+                    trend[lo:hi] = savgol_filter(
+                        masked_flux[lo:hi], window_length, polyorder
+                    )
+
+            residual = masked_flux - trend
+            inliers = (
+                np.nan_to_num(np.abs(residual)) < np.nanstd(residual) * sigma + 1e-14
+            )
+            interpolate = interp1d(
+                masked_time[inliers], trend[inliers], fill_value="extrapolate"
+            )
+            trend = interpolate(time)
+            mask[mask] &= inliers
+    return trend
+
+
+def normalize(flux: np.ndarray) -> np.ndarray:
+    return flux / np.nanmedian(flux)
+
+
+def fold(
+    time: np.ndarray, flux: np.ndarray, period: float, *, epoch: float | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Fold on ``period`` (days) around ``epoch`` and sort by phase, as
+    ``LightCurve.fold`` does."""
+
+    if epoch is None:
+        epoch = time[0]
+    half = period / 2.0
+    phase = (time - epoch + half) % period - half
+    order = np.argsort(phase, kind="stable")
+    return phase[order], flux[order]
+
+
+def estimate_period(
+    time: np.ndarray, flux: np.ndarray, period_min: float, period_max: float
+) -> float:
+    """Return the BLS period with the highest power on lightkurve's default grid."""
+
+    from astropy.timeseries import BoxLeastSquares
+
+    model = BoxLeastSquares(time, flux)
+    durations = np.asarray(BLS_DURATIONS)
+    periods = model.autoperiod(
+        durations,
+        minimum_period=period_min,
+        maximum_period=period_max,
+        frequency_factor=BLS_FREQUENCY_FACTOR,
+    )
+    power = model.power(periods, durations).power
+    return float(periods[np.nanargmax(power)])
+
+
+def clean_arrays(
+    time: np.ndarray, flux: np.ndarray, config: PreprocessingConfig
+) -> tuple[np.ndarray, np.ndarray]:
+    """Outlier removal, NaN removal, flattening and normalization on plain arrays."""
+
+    if config.mask_outliers:
+        keep = sigma_clip_mask(flux, config.sigma)
+        time, flux = time[keep], flux[keep]
+    keep = ~np.isnan(flux)
+    time, flux = time[keep], flux[keep]
+    flux = flux / flatten_trend(time, flux, config.window_length)
+    if config.normalize:
+        flux = normalize(flux)
+    return time, flux
+
+
+def find_period(
+    time: np.ndarray, flux: np.ndarray, config: PreprocessingConfig
+) -> float:
+    """Return ``config.period`` or search for one with the configured method."""
+
+    if config.period is not None:
+        return config.period
+    period_min, period_max = config.period_min or 0.5, config.period_max or 30.0
+    if config.period_search == "fast":
+        return search_periods(
+            time, flux, PeriodSearchConfig(period_min, period_max, top_k=1)
+        )[0].period
+    return estimate_period(time, flux, period_min, period_max)
+
+
+def phase_fold_arrays(
+    time: np.ndarray, flux: np.ndarray, config: PreprocessingConfig
+) -> tuple[np.ndarray, np.ndarray]:
+    if not config.phase_fold:
+        return time, flux
+    return fold(time, flux, find_period(time, flux, config))
+
+
+__all__ = [
+    "clean_arrays",
+    "estimate_period",
+    "find_period",
+    "flatten_trend",
+    "fold",
+    "load_arrays",
+    "normalize",
+    "phase_fold_arrays",
+    "sigma_clip_mask",
+]
@@ -0,0 +1,65 @@
+"""Summary features of a phase-folded light curve for ranking candidates."""
+
+from __future__ import annotations
+
+import numpy as np
+
+FEATURE_NAMES = (
+    "flux_mean",
+    "flux_std",
+    "flux_min",
+    "flux_max",
+    "flux_ptp",
+    "flux_skew",
+    "flux_kurtosis",
+    "transit_depth",
+    "depth_snr",
+)
+
+
+def extract_features(
+    time: np.ndarray, flux: np.ndarray, *, bins: int = 200
+) -> dict[str, float]:
+    """Flux moments plus the depth of the deepest phase bin and its signal-to-noise.
+
+    ``time`` is the phase (or time) axis the flux is ordered by. The depth is measured
+    on the median of ``bins`` equal-count bins below the overall median, and the noise
+    is the robust (MAD) scatter divided by the square root of the points per bin.
+    """
+
+    from scipy.stats import kurtosis, skew
+
+    time = np.asarray(time, dtype=np.float64)
+    flux = np.asarray(flux, dtype=np.float64)
+    if flux.ndim != 1 or flux.shape != time.shape or flux.size < 2:
+        raise ValueError(
+            "time and flux must be one-dimensional arrays of equal length >= 2"
+        )
+    flux = flux[np.argsort(time, kind="stable")]
+
+    median = float(np.median(flux))
+    binned = np.array(
+        [np.median(chunk) for chunk in np.array_split(flux, min(bins, flux.size))]
+    )
+    depth = max(median - float(binned.min()), 0.0)
+    scatter = 1.4826 * float(np.median(np.abs(flux - median)))
+    noise = scatter / np.sqrt(flux.size / binned.size)
+
+    features = {
+        "flux_mean": float(np.mean(flux)),
+        "flux_std": float(np.std(flux)),
+        "flux_min": float(np.min(flux)),
+        "flux_max": float(np.max(flux)),
+        "flux_ptp": float(np.ptp(flux)),
+        "flux_skew": float(skew(flux)),
+        "flux_kurtosis": float(kurtosis(flux)),
+        "transit_depth": depth,
+        "depth_snr": depth / noise if noise > 0 else 0.0,
+    }
+    # JSON has no NaN; constant flux gives undefined skew and kurtosis.
+    return {
+        name: value if np.isfinite(value) else 0.0 for name, value in features.items()
+    }
+
+
+__all__ = ["FEATURE_NAMES", "extract_features"]
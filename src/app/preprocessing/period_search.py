@@ -0,0 +1,318 @@
+"""Coarse-to-fine box least squares period search on plain arrays."""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Iterator, Sequence
+
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+# Budget of (periods x (points + phase bins)) elements evaluated per vectorized chunk.
+_CHUNK_ELEMENTS = 2_000_000
+
+
+@dataclass(slots=True)
+class PeriodSearchConfig:
+    period_min: float = 0.5
+    period_max: float = 30.0
+    durations: tuple[float, ...] = (0.05, 0.10, 0.15, 0.20, 0.25, 0.33)
+    # Largest transit-time drift over the baseline between neighbouring trial periods,
+    # as a fraction of the shortest duration; coarse grid first, then refinement.
+    coarse_tolerance: float = 1.0
+    fine_tolerance: float = 0.1
+    # Time and phase bin widths as fractions of the shortest duration; the refinement
+    # stage bins time and phase alike.
+    coarse_bin: float = 0.5
+    coarse_phase_bin: float = 0.5
+    fine_phase_bin: float = 0.1
+    refine_peaks: int = 8
+    top_k: int = 5
+    workers: int = 1
+
+
+@dataclass(slots=True)
+class PeriodCandidate:
+    period: float
+    duration: float
+    epoch: float
+    depth: float
+    snr: float
+
+    def to_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+def _bin_series(
+    time: np.ndarray, values: np.ndarray, width: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    index = np.floor((time - time[0]) / width).astype(np.int64)
+    counts = np.bincount(index).astype(np.float64)
+    sums = np.bincount(index, weights=values)
+    filled = counts > 0
+    centers = time[0] + (np.nonzero(filled)[0] + 0.5) * width
+    return centers, sums[filled], counts[filled]
+
+
+def _frequency_grid(f_min: float, f_max: float, step: float) -> np.ndarray:
+    """Geometric grid whose spacing keeps the transit-time drift below tolerance."""
+
+    count = int(np.ceil(np.log(f_max / f_min) / np.log1p(step))) + 1
+    return f_min * np.power(1.0 + step, np.arange(count))
+
+
+def _chunks(nbins: np.ndarray, points: int) -> Iterator[slice]:
+    """Split trial periods into blocks within the budget and of similar bin counts."""
+
+    lo = 0
+    while lo < nbins.size:
+        hi = lo + 1
+        low = high = int(nbins[lo])
+        while hi < nbins.size:
+            low, high = min(low, int(nbins[hi])), max(high, int(nbins[hi]))
+            if (hi - lo + 1) * (points + high) > _CHUNK_ELEMENTS or low < 0.8 * high:
+                break
+            hi += 1
+        yield slice(lo, hi)
+        lo = hi
+
+
+def _box_search(
+    time: np.ndarray,
+    sums: np.ndarray,
+    weights: np.ndarray,
+    periods: np.ndarray,
+    phase_bin: float,
+    durations: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Best box per trial period: returns (delta chi^2, duration index, start bin).
+
+    ``sums`` holds mean-subtracted flux (summed per sample or time bin) and ``weights``
+    the number of cadences behind each entry, so binned and unbinned inputs share one
+    code path. Boxes are evaluated for every duration at once from cumulative sums
+    of the phase histogram.
+    """
+
+    total = weights.sum()
+    widths = np.maximum(1, np.round(durations / phase_bin).astype(np.int64))
+    max_width = int(widths.max())
+    power = np.full(periods.size, -np.inf)
+    best_duration = np.zeros(periods.size, dtype=np.int64)
+    best_start = np.zeros(periods.size, dtype=np.int64)
+
+    # Each period gets a whole number of equal phase bins no wider than ``phase_bin``.
+    all_bins = np.ceil(periods / phase_bin).astype(np.int64)
+    offset = time - time[0]
+    for chunk in _chunks(all_bins, time.size + max_width):
+        lo = chunk.start
+        block = periods[chunk]
+        nbins = all_bins[chunk]
+        max_bins = int(nbins.max())
+        phase = np.multiply.outer(1.0 / block, offset)
+        phase -= np.floor(phase)
+        # Scale slightly below nbins so a phase that rounds to 1.0 still lands in the
+        # last bin, and shift each row into its own stretch of the shared histogram.
+        phase *= (nbins - 1e-6)[:, None]
+        phase += (np.arange(block.size) * float(max_bins))[:, None]
+        index = phase.astype(np.intp)
+        size = block.size * max_bins
+        flat = index.ravel()
+        hist_y = np.bincount(
+            flat, weights=np.broadcast_to(sums, index.shape).ravel(), minlength=size
+        )
+        hist_w = np.bincount(
+            flat, weights=np.broadcast_to(weights, index.shape).ravel(), minlength=size
+        )
+        hist_y = hist_y.reshape(block.size, max_bins)
+        hist_w = hist_w.reshape(block.size, max_bins)
+
+        # Extend each row periodically so boxes may wrap around phase zero.
+        columns = np.arange(max_bins + max_width)[None, :] % nbins[:, None]
+        zero = np.zeros((block.size, 1))
+        cum_y = np.concatenate(
+            [zero, np.cumsum(np.take_along_axis(hist_y, columns, axis=1), axis=1)],
+            axis=1,
+        )
+        cum_w = np.concatenate(
+            [zero, np.cumsum(np.take_along_axis(hist_w, columns, axis=1), axis=1)],
+            axis=1,
+        )
+
+        # Rows are periodic, so starts past a row's own bin count repeat earlier boxes.
+        rows = np.arange(block.size)
+        block_power = np.full(block.size, -np.inf)
+        block_duration = np.zeros(block.size, dtype=np.int64)
+        block_start = np.zeros(block.size, dtype=np.int64)
+        chi2 = np.zeros((block.size, max_bins))
+        for d_index, width in enumerate(widths):
+            box_y = np.minimum(
+                cum_y[:, width : width + max_bins] - cum_y[:, :max_bins], 0.0
+            )
+            box_w = cum_w[:, width : width + max_bins] - cum_w[:, :max_bins]
+            denominator = box_w * (total - box_w)
+            chi2.fill(0.0)
+            np.divide(
+                box_y * box_y * total, denominator, out=chi2, where=denominator > 0
+            )
+            start = np.argmax(chi2, axis=1)
+            value = chi2[rows, start]
+            better = value > block_power
+            block_power[better] = value[better]
+            block_duration[better] = d_index
+            block_start[better] = start[better] % nbins[better]
+        power[lo : lo + block.size] = block_power
+        best_duration[lo : lo + block.size] = block_duration
+        best_start[lo : lo + block.size] = block_start
+    return power, best_duration, best_start
+
+
+def _search_chunk(args: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return _box_search(*args)
+
+
+def _parallel_box_search(
+    time: np.ndarray,
+    sums: np.ndarray,
+    weights: np.ndarray,
+    periods: np.ndarray,
+    phase_bin: float,
+    durations: np.ndarray,
+    workers: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if workers <= 1 or periods.size < 2 * workers:
+        return _box_search(time, sums, weights, periods, phase_bin, durations)
+    # Interleave periods so every worker gets a similar mix of short and long ones.
+    parts = [np.arange(start, periods.size, workers) for start in range(workers)]
+    tasks = [
+        (time, sums, weights, periods[part], phase_bin, durations) for part in parts
+    ]
+    power = np.empty(periods.size)
+    duration = np.empty(periods.size, dtype=np.int64)
+    start = np.empty(periods.size, dtype=np.int64)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part, result in zip(parts, pool.map(_search_chunk, tasks)):
+            power[part], duration[part], start[part] = result
+    return power, duration, start
+
+
+def _local_peaks(power: np.ndarray, count: int, separation: int) -> list[int]:
+    order = np.argsort(power)[::-1]
+    taken = np.zeros(power.size, dtype=bool)
+    peaks: list[int] = []
+    for idx in order:
+        if len(peaks) >= count or not np.isfinite(power[idx]):
+            break
+        if taken[idx]:
+            continue
+        peaks.append(int(idx))
+        taken[max(0, idx - separation) : idx + separation + 1] = True
+    return peaks
+
+
+def search_periods(
+    time: Sequence[float] | np.ndarray,
+    flux: Sequence[float] | np.ndarray,
+    config: PeriodSearchConfig | None = None,
+) -> list[PeriodCandidate]:
+    """Return the ``top_k`` box least squares periods of a light curve, strongest first.
+
+    A coarse pass runs on time-binned flux over a frequency grid spaced for a drift of
+    ``coarse_tolerance`` durations, then each of the strongest coarse peaks is refined
+    on finely binned flux with a grid spaced for ``fine_tolerance``.
+    """
+
+    cfg = config or PeriodSearchConfig()
+    time = np.asarray(time, dtype=np.float64)
+    flux = np.asarray(flux, dtype=np.float64)
+    finite = np.isfinite(time) & np.isfinite(flux)
+    time, flux = time[finite], flux[finite]
+    if time.size < 3:
+        raise ValueError("Period search needs at least three finite samples")
+    order = np.argsort(time, kind="stable")
+    time, flux = time[order], flux[order]
+
+    baseline = time[-1] - time[0]
+    period_max = min(cfg.period_max, baseline)
+    if period_max <= cfg.period_min:
+        raise ValueError("Baseline is too short for the requested period range")
+
+    durations = np.asarray(sorted(cfg.durations), dtype=np.float64)
+    shortest = durations[0]
+    residual = flux - flux.mean()
+    noise = 1.4826 * np.median(np.abs(flux - np.median(flux)))
+    if noise <= 0:
+        noise = flux.std() or 1.0
+
+    coarse_step = cfg.coarse_tolerance * shortest / baseline
+    frequencies = _frequency_grid(1.0 / period_max, 1.0 / cfg.period_min, coarse_step)
+    coarse_periods = 1.0 / frequencies
+    binned_time, binned_sums, binned_counts = _bin_series(
+        time, residual, shortest * cfg.coarse_bin
+    )
+    coarse_power, _, _ = _parallel_box_search(
+        binned_time,
+        binned_sums,
+        binned_counts,
+        coarse_periods,
+        shortest * cfg.coarse_phase_bin,
+        durations,
+        cfg.workers,
+    )
+
+    fine_step = cfg.fine_tolerance * shortest / baseline
+    span = int(np.ceil(2 * coarse_step / fine_step))
+    fine_phase_bin = shortest * cfg.fine_phase_bin
+    fine_time, fine_sums, fine_counts = _bin_series(time, residual, fine_phase_bin)
+    candidates: list[PeriodCandidate] = []
+    for peak in _local_peaks(
+        coarse_power, max(cfg.refine_peaks, cfg.top_k), separation=2
+    ):
+        trial = frequencies[peak] * np.power(
+            1.0 + fine_step, np.arange(-span, span + 1)
+        )
+        trial = trial[(trial >= frequencies[0]) & (trial <= frequencies[-1])]
+        periods = 1.0 / trial
+        power, duration_index, start = _box_search(
+            fine_time, fine_sums, fine_counts, periods, fine_phase_bin, durations
+        )
+        best = int(np.argmax(power))
+        if not np.isfinite(power[best]):
+            continue
+        period = float(periods[best])
+        nbins = int(np.ceil(period / fine_phase_bin))
+        bin_width = period / nbins
+        width = max(1, int(round(durations[duration_index[best]] / fine_phase_bin)))
+        phase = (time - fine_time[0]) / period
+        phase_index = np.minimum(
+            ((phase - np.floor(phase)) * nbins).astype(np.int64), nbins - 1
+        )
+        in_transit = (phase_index - start[best]) % nbins < width
+        depth = float(flux[~in_transit].mean() - flux[in_transit].mean())
+        candidates.append(
+            PeriodCandidate(
+                period=period,
+                duration=float(width * bin_width),
+                epoch=float(
+                    fine_time[0] + ((start[best] + width / 2.0) * bin_width) % period
+                ),
+                depth=depth,
+                snr=float(np.sqrt(power[best]) / noise),
+            )
+        )
+
+    # Sidelobes of a stronger peak drift under one transit duration over the baseline.
+    candidates.sort(key=lambda candidate: candidate.snr, reverse=True)
+    distinct: list[PeriodCandidate] = []
+    for candidate in candidates:
+        if all(
+            baseline * abs(candidate.period - kept.period) / kept.period > durations[-1]
+            for kept in distinct
+        ):
+            distinct.append(candidate)
+    return distinct[: cfg.top_k]
+
+
+__all__ = ["PeriodCandidate", "PeriodSearchConfig", "search_periods"]
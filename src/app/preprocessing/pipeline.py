@@ -3,14 +3,20 @@
 from __future__ import annotations
 
 import logging
+import time as _time
+from contextlib import contextmanager
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import numpy as np
 
+from . import fast
+from .cache import PreprocessingCache
 from .config import PreprocessingConfig
-from .validation import validate_preprocessed_output
+from .period_search import PeriodSearchConfig, search_periods
+from .plots import PlotStore
+from .validation import compute_statistics, validate_preprocessed_output
 
 try:  # pragma: no cover - optional heavy dependency
     import lightkurve as lk
@@ -24,6 +30,15 @@ class PreprocessingError(RuntimeError):
     """Raised when preprocessing fails."""
 
 
+@contextmanager
+def _timed(timings: dict[str, float], step: str) -> Iterator[None]:
+    started = _time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[step] = timings.get(step, 0.0) + _time.perf_counter() - started
+
+
 def _ensure_lightkurve() -> None:
     if lk is None:  # pragma: no cover
         raise ImportError(
@@ -57,22 +72,31 @@ def _apply_cleaning(
     return cleaned
 
 
-def _phase_fold(
-    lc: "lk.LightCurve", config: PreprocessingConfig
-) -> "lk.LightCurve":  # type: ignore[name-defined]
-    if not config.phase_fold:
-        return lc
-    if config.period is not None:
-        return lc.fold(period=config.period)
-
+def _search_period(
+    lc: "lk.LightCurve", config: PreprocessingConfig  # type: ignore[name-defined]
+) -> float:
     period_min = config.period_min or 0.5
     period_max = config.period_max or 30.0
 
+    if config.period_search == "fast":
+        search = PeriodSearchConfig(
+            period_min=period_min, period_max=period_max, top_k=1
+        )
+        try:
+            candidates = search_periods(
+                _extract_array(lc.time), _extract_array(lc.flux), search
+            )
+        except ValueError as exc:
+            raise PreprocessingError("Failed to compute periodogram") from exc
+        if not candidates:
+            raise PreprocessingError("Unable to determine period for phase fold")
+        return candidates[0].period
+
     try:
         periodogram = lc.to_periodogram(  # type: ignore[attr-defined]
             method="bls",
-            period_min=period_min,
-            period_max=period_max,
+            minimum_period=period_min,
+            maximum_period=period_max,
         )
         period = getattr(periodogram.period_at_max_power, "value", None)
     except Exception as exc:  # pragma: no cover
@@ -80,8 +104,24 @@ def _phase_fold(
 
     if period is None:
         raise PreprocessingError("Unable to determine period for phase fold")
+    return period
 
-    return lc.fold(period=period)
+
+def _phase_fold(
+    lc: "lk.LightCurve",
+    config: PreprocessingConfig,
+    timings: dict[str, float] | None = None,
+) -> "lk.LightCurve":  # type: ignore[name-defined]
+    if not config.phase_fold:
+        return lc
+    if timings is None:
+        timings = {}
+    period = config.period
+    if period is None:
+        with _timed(timings, "bls"):
+            period = _search_period(lc, config)
+    with _timed(timings, "fold"):
+        return lc.fold(period=period)
 
 
 def _extract_array(values: Any) -> np.ndarray:
@@ -90,49 +130,135 @@ def _extract_array(values: Any) -> np.ndarray:
     return np.asarray(values)
 
 
+def _run_lightkurve_engine(
+    path: Path, flux_column: str, config: PreprocessingConfig, timings: dict[str, float]
+) -> tuple[np.ndarray, np.ndarray]:
+    with _timed(timings, "load"):
+        lc = _load_lightcurve(path, flux_column)
+    with _timed(timings, "clean"):
+        cleaned = _apply_cleaning(lc, config)
+    folded = _phase_fold(cleaned, config, timings)
+    return _extract_array(folded.time), _extract_array(folded.flux)
+
+
+def _run_numpy_engine(
+    path: Path, flux_column: str, config: PreprocessingConfig, timings: dict[str, float]
+) -> tuple[np.ndarray, np.ndarray]:
+    with _timed(timings, "load"):
+        try:
+            time, flux = fast.load_arrays(path, flux_column)
+        except Exception as exc:
+            raise PreprocessingError(f"Failed to load light curve: {path}") from exc
+    with _timed(timings, "clean"):
+        time, flux = fast.clean_arrays(time, flux, config)
+    if not config.phase_fold:
+        return time, flux
+    try:
+        with _timed(timings, "bls"):
+            period = fast.find_period(time, flux, config)
+    except Exception as exc:  # pragma: no cover
+        raise PreprocessingError("Failed to compute periodogram") from exc
+    with _timed(timings, "fold"):
+        return fast.fold(time, flux, period)
+
+
+_ENGINES = {"lightkurve": _run_lightkurve_engine, "numpy": _run_numpy_engine}
+
+
 def preprocess_lightcurve(
     path: str | Path,
     *,
     flux_column: str = "PDCSAP_FLUX",
     config: PreprocessingConfig | None = None,
     artifact_dir: str | Path | None = None,
+    cache: PreprocessingCache | None = None,
+    plot_store: PlotStore | None = None,
 ) -> dict[str, Any]:
-    """Load and preprocess a light curve file, returning tensors and metadata."""
+    """Load and preprocess a light curve file, returning tensors and metadata.
+
+    With a ``cache``, results are looked up by file content and configuration first;
+    ``metadata["cache_hit"]`` tells whether the pipeline was skipped. ``timings`` holds
+    the seconds spent per step (``load``, ``clean``, ``bls``, ``fold``) and in
+    ``total``. With a ``plot_store``, the diagnostic plot is deferred: the result
+    carries a ``plot_id`` and ``artifact_dir`` is not used for rendering.
+    """
 
+    started = _time.perf_counter()
+    timings: dict[str, float] = {}
     cfg = config or PreprocessingConfig()
     path = Path(path)
     LOGGER.info("Preprocessing light curve", extra={"path": str(path), **asdict(cfg)})
 
-    lc = _load_lightcurve(path, flux_column)
-    cleaned = _apply_cleaning(lc, cfg)
-    folded = _phase_fold(cleaned, cfg)
-
-    flux = _extract_array(folded.flux)
-    time = _extract_array(folded.time)
-
-    if np.isnan(flux).any():
-        raise PreprocessingError("Preprocessed flux contains NaNs")
+    try:
+        engine = _ENGINES[cfg.engine]
+    except KeyError:
+        raise PreprocessingError(
+            f"Unknown preprocessing engine: {cfg.engine}"
+        ) from None
+
+    key: str | None = None
+    cached: dict[str, Any] | None = None
+    if cache is not None:
+        key = cache.key(path, cfg, flux_column)
+        cached = cache.get(key)
+
+    if cached is not None:
+        time, flux = cached["time"], cached["flux"]
+        metadata = cached["metadata"]
+        stats, plot_path = cached.get("statistics"), cached.get("plot_path")
+        plot_id = cached.get("plot_id")
+    else:
+        time, flux = engine(path, flux_column, cfg, timings)
+        if np.isnan(flux).any():
+            raise PreprocessingError("Preprocessed flux contains NaNs")
+        metadata = {"flux_column": flux_column, "config": asdict(cfg)}
+        stats, plot_path, plot_id = None, None, None
 
     result: dict[str, Any] = {
-        "time": time.astype(np.float32),
-        "flux": flux.astype(np.float32),
+        "time": time.astype(np.float32, copy=False),
+        "flux": flux.astype(np.float32, copy=False),
         "metadata": {
             "path": str(path.resolve()),
-            "flux_column": flux_column,
-            "config": asdict(cfg),
+            **metadata,
+            "cache_hit": cached is not None,
         },
     }
 
-    if artifact_dir is not None:
-        stats, plot_path = validate_preprocessed_output(
-            time=time,
-            flux=flux,
-            artifact_dir=artifact_dir,
-            filename=path.stem,
-        )
-        result["statistics"] = stats.to_dict()
-        result["plot_path"] = str(plot_path)
-
+    validated = False
+    if plot_store is not None:
+        if stats is None:
+            stats, validated = compute_statistics(np.asarray(flux)).to_dict(), True
+        if plot_id is None or not plot_store.exists(plot_id):
+            plot_id, validated = plot_store.submit(time, flux), True
+        plot_path = str(plot_store.image_path(plot_id))
+        result.update(statistics=stats, plot_path=plot_path, plot_id=plot_id)
+    elif artifact_dir is not None:
+        if stats is None or plot_path is None or not Path(plot_path).exists():
+            statistics, plot = validate_preprocessed_output(
+                time=time,
+                flux=flux,
+                artifact_dir=artifact_dir,
+                filename=path.stem,
+            )
+            stats, plot_path, validated = statistics.to_dict(), str(plot), True
+        result["statistics"] = stats
+        result["plot_path"] = plot_path
+
+    if cache is not None and key is not None:
+        if cached is None:
+            entry = {
+                "time": result["time"],
+                "flux": result["flux"],
+                "metadata": metadata,
+            }
+            if stats is not None:
+                entry.update(statistics=stats, plot_path=plot_path, plot_id=plot_id)
+            cache.put(key, entry)
+        elif validated:
+            cache.update(key, statistics=stats, plot_path=plot_path, plot_id=plot_id)
+
+    timings["total"] = _time.perf_counter() - started
+    result["timings"] = timings
     return result
 
 
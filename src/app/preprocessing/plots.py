@@ -0,0 +1,251 @@
+"""Decimated, deferred rendering of diagnostic light-curve plots."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+from matplotlib.figure import Figure
+
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+# Roughly the pixel width of an 8in figure at 150 dpi; each bin adds a min and a max.
+DEFAULT_PLOT_BINS = 1200
+DEFAULT_PLOT_DPI = 150
+
+_PLOT_ID = re.compile(r"^[0-9a-f]{32}$")
+# Running byte total of all plots, shared by every process using the directory.
+_SIZE = ".size"
+_LOCK = ".lock"
+
+
+def decimate_minmax(
+    time: np.ndarray, flux: np.ndarray, bins: int = DEFAULT_PLOT_BINS
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce a curve to the min and max flux of each of ``bins`` equal-width bins.
+
+    The rendered line covers the same pixels as the full curve, so outliers and transits
+    stay visible while the point count is bounded by ``2 * bins``. Short curves are
+    kept as is.
+    """
+
+    time = np.asarray(time)
+    flux = np.asarray(flux)
+    if time.shape != flux.shape:
+        raise ValueError("Time and flux arrays must share the same shape")
+    if bins <= 0 or time.size <= 2 * bins:
+        return time, flux
+
+    if np.any(time[1:] < time[:-1]):
+        order = np.argsort(time, kind="stable")
+        time, flux = time[order], flux[order]
+    edges = np.linspace(time[0], time[-1], bins + 1)
+    # Empty bins share their start index with the next non-empty one; keep one of each.
+    starts = np.unique(np.searchsorted(time, edges[:-1], side="left"))
+    counts = np.diff(np.append(starts, time.size))
+    centers = np.add.reduceat(time, starts) / counts
+    lows = np.minimum.reduceat(flux, starts)
+    highs = np.maximum.reduceat(flux, starts)
+    return np.repeat(centers, 2), np.column_stack((lows, highs)).ravel()
+
+
+def render_plot(
+    time: np.ndarray,
+    flux: np.ndarray,
+    output_path: str | Path,
+    *,
+    bins: int = DEFAULT_PLOT_BINS,
+    dpi: int = DEFAULT_PLOT_DPI,
+) -> Path:
+    """Render a curve to PNG, decimating it first.
+
+    Uses the object-oriented Figure API rather than pyplot, so it is safe to call from
+    worker threads.
+    """
+
+    time, flux = decimate_minmax(time, flux, bins)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    ax.plot(time, flux, marker="o", linestyle="-", linewidth=1, markersize=2)
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Normalized Flux")
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=dpi, format="png")
+    return output_path
+
+
+class PlotStore:
+    """Keeps decimated curves on disk and renders their PNGs on first request.
+
+    :meth:`submit` is cheap enough for the request path: it decimates the curve and
+    writes a small ``.npz`` named after the content hash, which doubles as the plot ID.
+    :meth:`render` produces ``<plot_id>.png`` once and serves the existing file
+    afterwards. The store holds only paths, so it can be passed to worker processes.
+
+    Like :class:`~app.preprocessing.cache.PreprocessingCache`, the directory is bounded
+    to ``max_bytes``: the least recently used plots (by file mtime, refreshed on every
+    submit and render) are deleted first; the byte total lives in a locked file.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        bins: int = DEFAULT_PLOT_BINS,
+        dpi: int = DEFAULT_PLOT_DPI,
+        max_bytes: int = 512 * 1024**2,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.bins = bins
+        self.dpi = dpi
+        self.max_bytes = max_bytes
+
+    def _check(self, plot_id: str) -> str:
+        if not _PLOT_ID.match(plot_id):
+            raise ValueError(f"Invalid plot id: {plot_id!r}")
+        return plot_id
+
+    def data_path(self, plot_id: str) -> Path:
+        return self.directory / f"{self._check(plot_id)}.npz"
+
+    def image_path(self, plot_id: str) -> Path:
+        return self.directory / f"{self._check(plot_id)}.png"
+
+    def exists(self, plot_id: str) -> bool:
+        return self.data_path(plot_id).exists() or self.image_path(plot_id).exists()
+
+    def submit(self, time: np.ndarray, flux: np.ndarray) -> str:
+        """Store the decimated curve and return its plot ID without rendering."""
+
+        time, flux = decimate_minmax(time, flux, self.bins)
+        time = np.ascontiguousarray(time, dtype=np.float64)
+        flux = np.ascontiguousarray(flux, dtype=np.float32)
+        plot_id = hashlib.sha256(time.tobytes() + flux.tobytes()).hexdigest()[:32]
+        path = self.data_path(plot_id)
+        try:
+            os.utime(path)
+            return plot_id
+        except FileNotFoundError:
+            pass
+        tmp = path.with_name(f".{plot_id}.{uuid.uuid4().hex}.npz")
+        with tmp.open("wb") as fh:
+            np.savez(fh, time=time, flux=flux)
+        size = tmp.stat().st_size
+        os.replace(tmp, path)
+        self._grow(size, keep=plot_id)
+        return plot_id
+
+    def render(self, plot_id: str) -> Path:
+        """Return the PNG for ``plot_id``, rendering it if needed.
+
+        Raises ``FileNotFoundError`` for unknown IDs.
+        """
+
+        image = self.image_path(plot_id)
+        if image.exists():
+            # Recency is tracked on the data file; the image mtime records the render.
+            try:
+                os.utime(self.data_path(plot_id))
+            except FileNotFoundError:
+                pass
+            return image
+        with np.load(self.data_path(plot_id)) as data:
+            time, flux = data["time"], data["flux"]
+        # Concurrent renders each write a private file; the last rename wins.
+        tmp = image.with_name(f".{plot_id}.{uuid.uuid4().hex}.png")
+        render_plot(time, flux, tmp, bins=self.bins, dpi=self.dpi)
+        size = tmp.stat().st_size
+        os.replace(tmp, image)
+        LOGGER.info(
+            "Rendered preprocessing plot",
+            extra={"plot_id": plot_id, "path": str(image)},
+        )
+        self._grow(size, keep=plot_id)
+        return image
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with (self.directory / _LOCK).open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _grow(self, size: int, *, keep: str | None = None) -> None:
+        with self._file_lock():
+            try:
+                total = int((self.directory / _SIZE).read_text(encoding="ascii")) + size
+            except (OSError, ValueError):
+                # First write or a damaged total: scan once, new file included.
+                total = self.size_bytes()
+            if total > self.max_bytes:
+                self._evict_locked(keep)
+            else:
+                (self.directory / _SIZE).write_text(str(total), encoding="ascii")
+
+    def _plots(self) -> list[tuple[float, int, str]]:
+        plots: dict[str, tuple[float, int]] = {}
+        for path in self.directory.iterdir():
+            plot_id, _, suffix = path.name.partition(".")
+            if suffix not in ("npz", "png") or not _PLOT_ID.match(plot_id):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            mtime, size = plots.get(plot_id, (0.0, 0))
+            plots[plot_id] = (max(mtime, stat.st_mtime), size + stat.st_size)
+        return [(mtime, size, plot_id) for plot_id, (mtime, size) in plots.items()]
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._plots())
+
+    def evict(self) -> int:
+        """Delete least recently used plots until the store fits ``max_bytes``."""
+
+        with self._file_lock():
+            return self._evict_locked()
+
+    def _evict_locked(self, keep: str | None = None) -> int:
+        plots = sorted(self._plots())
+        total = sum(size for _, size, _ in plots)
+        removed = 0
+        for _, size, plot_id in plots:
+            if total <= self.max_bytes:
+                break
+            if plot_id == keep:
+                continue
+            for path in (self.data_path(plot_id), self.image_path(plot_id)):
+                path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        (self.directory / _SIZE).write_text(str(total), encoding="ascii")
+        if removed:
+            LOGGER.info(
+                "Evicted preprocessing plots",
+                extra={"removed": removed, "bytes": total},
+            )
+        return removed
+
+
+__all__ = ["DEFAULT_PLOT_BINS", "PlotStore", "decimate_minmax", "render_plot"]
@@ -0,0 +1,227 @@
+"""Incremental preprocessing for live light-curve streams.
+
+A :class:`LightCurveStream` consumes cadences in arbitrary chunks, detrends each cadence
+once against a trailing window of recent flux and keeps only the most recent classifier
+window in ring buffers. Memory per stream is fixed by the configuration, whatever the
+length of the stream, and each chunk costs ``O(chunk + trend_window)``.
+
+The batch pipeline flattens with a centred Savitzky-Golay filter and phase-folds on a
+searched period; neither is possible causally, so streamed windows are detrended with a
+sigma-clipped trailing linear fit and classified unfolded.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO of scalars backed by a single numpy array."""
+
+    def __init__(self, capacity: int, dtype: np.dtype | type = np.float64) -> None:
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        self._data = np.empty(capacity, dtype=dtype)
+        self._start = 0
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=self._data.dtype)[-self.capacity :]
+        count = values.shape[0]
+        if count == 0:
+            return
+        end = (self._start + self._size) % self.capacity
+        self._data[(end + np.arange(count)) % self.capacity] = values
+        overflow = max(0, self._size + count - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+
+    def values(self) -> np.ndarray:
+        """Return the contents, oldest first, as a new array."""
+
+        end = self._start + self._size
+        if end <= self.capacity:
+            return self._data[self._start : end].copy()
+        return np.concatenate(
+            (self._data[self._start :], self._data[: end - self.capacity])
+        )
+
+
+@dataclass(slots=True)
+class StreamConfig:
+    # Cadences per classified window and new cadences between two classifications.
+    window: int = 2000
+    stride: int = 250
+    # Trailing cadences fitted for the trend; plays the role of ``window_length``.
+    trend_window: int = 401
+    sigma: float = 5.0
+    # No classification before this many detrended cadences are buffered.
+    min_cadences: int = 256
+
+
+def _trailing_fits(
+    history_time: np.ndarray,
+    history_flux: np.ndarray,
+    time: np.ndarray,
+    flux: np.ndarray,
+    window: int,
+    *,
+    inclusive: bool,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Least-squares line through the ``window`` cadences up to each new cadence.
+
+    Returns the line evaluated at each new cadence, the residual scatter and the number
+    of cadences used. A line rather than a mean keeps a trailing window from lagging
+    behind slow drifts. Running sums over history plus chunk give every fit in one pass.
+    """
+
+    # Offsets keep the running sums small so the differences below stay accurate.
+    x = np.concatenate((history_time, time))
+    x = x - x[0]
+    y = np.concatenate((history_flux, flux))
+    offset = y[0]
+    y = y - offset
+    sums = [
+        np.concatenate(([0.0], np.cumsum(values)))
+        for values in (x, x * x, y, x * y, y * y)
+    ]
+    ends = history_time.shape[0] + np.arange(time.shape[0]) + (1 if inclusive else 0)
+    starts = np.maximum(ends - window, 0)
+    n = (ends - starts).astype(np.float64)
+    sx, sxx, sy, sxy, syy = (total[ends] - total[starts] for total in sums)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denominator = n * sxx - sx * sx
+        degenerate = np.abs(denominator) <= 1e-12 * np.maximum(n * sxx, 1.0)
+        slope = np.where(degenerate, 0.0, (n * sxy - sx * sy) / denominator)
+        intercept = (sy - slope * sx) / n
+        variance = (syy - intercept * sy - slope * sxy) / n
+    at = x[history_time.shape[0] :]
+    return offset + intercept + slope * at, np.sqrt(np.maximum(variance, 0.0)), n
+
+
+class LightCurveStream:
+    """Rolling detrending state and classifier window for one live light curve."""
+
+    # Trailing samples needed before outliers are judged against the local scatter.
+    MIN_CLIP_SAMPLES = 16
+
+    def __init__(self, config: StreamConfig | None = None) -> None:
+        self.config = config or StreamConfig()
+        cfg = self.config
+        if min(cfg.window, cfg.stride, cfg.trend_window) < 1:
+            raise ValueError("window, stride and trend_window must be positive")
+        if not 1 <= cfg.min_cadences <= cfg.window:
+            raise ValueError("min_cadences must be between 1 and window")
+        self._raw_time = RingBuffer(cfg.trend_window)
+        self._raw = RingBuffer(cfg.trend_window)
+        self._time = RingBuffer(cfg.window)
+        self._flux = RingBuffer(cfg.window, np.float32)
+        self._last_time = -np.inf
+        self._since_window = 0
+        self.received = 0
+        self.accepted = 0
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._raw_time.nbytes
+            + self._raw.nbytes
+            + self._time.nbytes
+            + self._flux.nbytes
+        )
+
+    @property
+    def buffered(self) -> int:
+        return len(self._time)
+
+    @property
+    def due(self) -> bool:
+        """Whether ``stride`` new cadences arrived since the last window was taken."""
+
+        return (
+            self.buffered >= self.config.min_cadences
+            and self._since_window >= self.config.stride
+        )
+
+    @property
+    def has_new_cadences(self) -> bool:
+        return self.buffered >= self.config.min_cadences and self._since_window > 0
+
+    def push(self, time: np.ndarray, flux: np.ndarray) -> int:
+        """Detrend and buffer a chunk; returns how many cadences were kept.
+
+        Cadences with non-finite values, timestamps not after the previous cadence, or
+        flux over ``sigma`` trailing standard deviations from the trend are dropped.
+        """
+
+        time = np.asarray(time, dtype=np.float64).ravel()
+        flux = np.asarray(flux, dtype=np.float64).ravel()
+        if time.shape != flux.shape:
+            raise ValueError("time and flux must have the same length")
+        self.received += time.shape[0]
+
+        previous = np.fmax.accumulate(np.concatenate(([self._last_time], time)))[:-1]
+        keep = np.isfinite(time) & np.isfinite(flux) & (time > previous)
+        time, flux = time[keep], flux[keep]
+        if time.shape[0] == 0:
+            return 0
+
+        history_time, history_flux = self._raw_time.values(), self._raw.values()
+        expected, scatter, counts = _trailing_fits(
+            history_time,
+            history_flux,
+            time,
+            flux,
+            self.config.trend_window,
+            inclusive=False,
+        )
+        with np.errstate(invalid="ignore"):
+            outlier = (counts >= self.MIN_CLIP_SAMPLES) & (
+                np.abs(flux - expected) > self.config.sigma * scatter
+            )
+        time, flux = time[~outlier], flux[~outlier]
+        if time.shape[0] == 0:
+            return 0
+
+        trend, _, _ = _trailing_fits(
+            history_time,
+            history_flux,
+            time,
+            flux,
+            self.config.trend_window,
+            inclusive=True,
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            detrended = flux / trend
+        detrended = np.where(np.isfinite(detrended), detrended, 1.0)
+
+        self._raw_time.extend(time)
+        self._raw.extend(flux)
+        self._time.extend(time)
+        self._flux.extend(detrended)
+        self._last_time = float(time[-1])
+        self._since_window += time.shape[0]
+        self.accepted += time.shape[0]
+        return int(time.shape[0])
+
+    def take_window(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the buffered ``(time, detrended_flux)`` window; resets the stride."""
+
+        self._since_window = 0
+        return self._time.values(), self._flux.values()
+
+
+__all__ = ["LightCurveStream", "RingBuffer", "StreamConfig"]
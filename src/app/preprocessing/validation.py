@@ -8,9 +8,10 @@ from pathlib import Path
 from typing import Any
 
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 
+from .plots import render_plot
+
 matplotlib.use("Agg", force=True)
 
 LOGGER = logging.getLogger(__name__)
@@ -49,18 +50,7 @@ def compute_statistics(flux: np.ndarray) -> PreprocessingStatistics:
 def save_plot(time: np.ndarray, flux: np.ndarray, output_path: str | Path) -> Path:
     if time.shape != flux.shape:
         raise ValueError("Time and flux arrays must share the same shape")
-    output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    fig, ax = plt.subplots(figsize=(8, 4))
-    ax.plot(time, flux, marker="o", linestyle="-", linewidth=1, markersize=2)
-    ax.set_xlabel("Time")
-    ax.set_ylabel("Normalized Flux")
-    ax.grid(True, alpha=0.3)
-    fig.tight_layout()
-    fig.savefig(output_path, dpi=150)
-    plt.close(fig)
-
+    output_path = render_plot(time, flux, output_path)
     LOGGER.info("Saved preprocessing plot", extra={"path": str(output_path)})
     return output_path
 
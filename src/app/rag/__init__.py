@@ -1,16 +1,33 @@
 """Retrieval-Augmented Generation helpers."""
 
+from .ann import HNSWConfig, IVFPQConfig
 from .corpus import DocumentEntry, load_markdown_corpus
+from .embedding_cache import EmbeddingCache
 from .embeddings import EmbeddingService
+from .incremental import IncrementalIndexer, IndexingReport
 from .indexer import QdrantIndexer
-from .retriever import RetrievalService
+from .lexical import BM25Config, BM25Index, reciprocal_rank_fusion
 from .pipeline import EvidenceGenerator
+from .retriever import RetrievalService
+from .vectorstore import LocalStoreConfig, LocalVectorStore, SearchHit, VectorStore
 
 __all__ = [
     "DocumentEntry",
+    "HNSWConfig",
+    "IVFPQConfig",
     "load_markdown_corpus",
+    "EmbeddingCache",
     "EmbeddingService",
+    "IncrementalIndexer",
+    "IndexingReport",
+    "BM25Config",
+    "BM25Index",
+    "reciprocal_rank_fusion",
     "QdrantIndexer",
     "RetrievalService",
     "EvidenceGenerator",
+    "LocalStoreConfig",
+    "LocalVectorStore",
+    "SearchHit",
+    "VectorStore",
 ]
@@ -0,0 +1,391 @@
+"""Approximate nearest-neighbour indexes for
+:class:`~app.rag.vectorstore.LocalVectorStore`.
+
+Indexes are built offline from the vectors a store already holds. They cover the rows
+that existed at build time, and the store scans rows added later exactly. Two
+kinds exist:
+
+``ivfpq``
+    An inverted file over k-means cells with product-quantised residuals. Each vector is
+    stored as ``m`` one-byte codes, so 384-dim float32 vectors shrink 16x with the
+    default ``m=96``. Arrays are memory-mapped on load. ``nprobe`` trades recall for
+    latency, and re-scoring the best candidates against the stored vectors recovers most
+    of the recall lost to quantisation.
+``hnsw``
+    An ``hnswlib`` graph. This is an optional dependency, and it is loaded fully into
+    memory. ``ef_search`` trades recall for latency.
+
+Vectors are unit-normalised, so every score is an inner product (cosine similarity).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+
+try:  # pragma: no cover - optional dependency
+    import hnswlib
+except ImportError:  # pragma: no cover
+    hnswlib = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+ANN_KINDS = ("ivfpq", "hnsw")
+# Rows per block when assigning or encoding; bounds the temporary distance matrices.
+ENCODE_BLOCK_ROWS = 16384
+
+
+def _ensure_hnswlib() -> None:
+    if hnswlib is None:  # pragma: no cover
+        raise ImportError(
+            "hnswlib is required for the 'hnsw' vector index. "
+            "Install it with `pip install hnswlib`."
+        )
+
+
+@dataclass(slots=True)
+class IVFPQConfig:
+    # Coarse cells; defaults to 4 * sqrt(rows).
+    nlist: int | None = None
+    # Sub-quantisers (bytes per vector); must divide the dimension. Default: dim // 4.
+    m: int | None = None
+    train_size: int = 65536
+    kmeans_iterations: int = 10
+    seed: int = 0
+
+
+@dataclass(slots=True)
+class HNSWConfig:
+    M: int = 16
+    ef_construction: int = 200
+    seed: int = 0
+
+
+class AnnIndex(Protocol):
+    kind: str
+    rows: int
+
+    def search(
+        self, query: np.ndarray, k: int, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return up to ``k`` candidate rows with approximate scores, best first.
+
+        ``mask`` has one entry per covered row and excludes rows that are ``False``.
+        """
+
+    def save(self, directory: Path) -> None: ...
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid (squared L2) for each row."""
+
+    norms = np.einsum("ij,ij->i", centroids, centroids)
+    labels = np.empty(data.shape[0], dtype=np.int64)
+    for start in range(0, data.shape[0], ENCODE_BLOCK_ROWS):
+        block = np.asarray(data[start : start + ENCODE_BLOCK_ROWS], dtype=np.float32)
+        labels[start : start + block.shape[0]] = np.argmin(
+            norms - 2.0 * (block @ centroids.T), axis=1
+        )
+    return labels
+
+
+def _kmeans(
+    data: np.ndarray, k: int, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    centroids = data[rng.choice(data.shape[0], k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(data, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=k)
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+        centroids[filled] = (
+            np.add.reduceat(data[order], starts, axis=0) / counts[filled, None]
+        )
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            centroids[empty] = data[
+                rng.choice(data.shape[0], empty.size, replace=False)
+            ]
+    return centroids
+
+
+def _default_m(dim: int) -> int:
+    target = max(1, dim // 4)
+    return max(m for m in range(1, target + 1) if dim % m == 0)
+
+
+def _sample(
+    vectors: np.ndarray, alive: np.ndarray, size: int, rng: np.random.Generator
+) -> np.ndarray:
+    rows = np.flatnonzero(alive)
+    if rows.size > size:
+        rows = np.sort(rng.choice(rows, size, replace=False))
+    return np.asarray(vectors[rows], dtype=np.float32)
+
+
+class IVFPQIndex:
+    """Inverted file with product-quantised residuals; search scans ``nprobe`` cells."""
+
+    kind = "ivfpq"
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        codebooks: np.ndarray,
+        list_offsets: np.ndarray,
+        list_rows: np.ndarray,
+        codes: np.ndarray,
+        *,
+        rows: int,
+        nprobe: int = 16,
+    ) -> None:
+        self.centroids = centroids
+        self.codebooks = codebooks
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+        self.codes = codes
+        self.rows = rows
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(
+        cls, vectors: np.ndarray, alive: np.ndarray, config: IVFPQConfig | None = None
+    ) -> "IVFPQIndex":
+        """Train on a sample of live rows and encode every live row of ``vectors``."""
+
+        config = config or IVFPQConfig()
+        rng = np.random.default_rng(config.seed)
+        live = int(np.count_nonzero(alive))
+        dim = vectors.shape[1]
+        m = config.m or _default_m(dim)
+        if dim % m:
+            raise ValueError(f"m={m} does not divide the vector dimension {dim}")
+        sample = _sample(vectors, alive, config.train_size, rng)
+        nlist = min(config.nlist or max(1, int(4 * math.sqrt(live))), sample.shape[0])
+        if sample.shape[0] == 0:
+            raise ValueError("Cannot build an index over an empty collection")
+
+        centroids = _kmeans(sample, nlist, config.kmeans_iterations, rng)
+        residuals = sample - centroids[_assign(sample, centroids)]
+        dsub, ksub = dim // m, min(256, sample.shape[0])
+        codebooks = np.stack(
+            [
+                _kmeans(
+                    np.ascontiguousarray(residuals[:, j * dsub : (j + 1) * dsub]),
+                    ksub,
+                    config.kmeans_iterations,
+                    rng,
+                )
+                for j in range(m)
+            ]
+        )
+
+        live_rows = np.flatnonzero(alive)
+        labels = np.empty(live_rows.size, dtype=np.int64)
+        codes = np.empty((live_rows.size, m), dtype=np.uint8)
+        for start in range(0, live_rows.size, ENCODE_BLOCK_ROWS):
+            block_rows = live_rows[start : start + ENCODE_BLOCK_ROWS]
+            block = np.asarray(vectors[block_rows], dtype=np.float32)
+            block_labels = _assign(block, centroids)
+            block_residuals = block - centroids[block_labels]
+            labels[start : start + block_rows.size] = block_labels
+            for j in range(m):
+                codes[start : start + block_rows.size, j] = _assign(
+                    block_residuals[:, j * dsub : (j + 1) * dsub], codebooks[j]
+                )
+
+        # Store each cell's rows contiguously so a probe reads one slice.
+        order = np.argsort(labels, kind="stable")
+        list_offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(labels, minlength=nlist)))
+        ).astype(np.int64)
+        return cls(
+            centroids.astype(np.float32),
+            codebooks.astype(np.float32),
+            list_offsets,
+            live_rows[order].astype(np.int64),
+            np.ascontiguousarray(codes[order]),
+            rows=vectors.shape[0],
+        )
+
+    def search(
+        self, query: np.ndarray, k: int, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        nlist, m = self.centroids.shape[0], self.codebooks.shape[0]
+        coarse = self.centroids @ query
+        nprobe = min(max(1, self.nprobe), nlist)
+        probe = (
+            np.argpartition(-coarse, nprobe - 1)[:nprobe]
+            if nprobe < nlist
+            else np.arange(nlist)
+        )
+        # Inner product of the query with every codeword, per sub-space.
+        table = np.einsum("mkd,md->mk", self.codebooks, query.reshape(m, -1))
+
+        rows, scores = [], []
+        for cell in probe:
+            start, stop = self.list_offsets[cell], self.list_offsets[cell + 1]
+            if start == stop:
+                continue
+            cell_rows = np.asarray(self.list_rows[start:stop])
+            cell_codes = np.asarray(self.codes[start:stop])
+            if mask is not None:
+                keep = mask[cell_rows]
+                cell_rows, cell_codes = cell_rows[keep], cell_codes[keep]
+            rows.append(cell_rows)
+            scores.append(coarse[cell] + table[np.arange(m), cell_codes].sum(axis=1))
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        rows_arr, scores_arr = np.concatenate(rows), np.concatenate(scores).astype(
+            np.float32
+        )
+        if k < rows_arr.size:
+            top = np.argpartition(-scores_arr, k - 1)[:k]
+            rows_arr, scores_arr = rows_arr[top], scores_arr[top]
+        order = np.argsort(-scores_arr, kind="stable")
+        return rows_arr[order], scores_arr[order]
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ("centroids", "codebooks", "list_offsets", "list_rows", "codes"):
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        _write_meta(directory, {"kind": self.kind, "rows": self.rows})
+
+    @classmethod
+    def load(cls, directory: Path, *, rows: int, nprobe: int = 16) -> "IVFPQIndex":
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r")
+            for name in ("centroids", "codebooks", "list_offsets", "list_rows", "codes")
+        }
+        # The small arrays are read on every query; keep them in memory.
+        for name in ("centroids", "codebooks", "list_offsets"):
+            arrays[name] = np.array(arrays[name])
+        return cls(**arrays, rows=rows, nprobe=nprobe)
+
+
+class HNSWIndex:
+    """Graph index backed by ``hnswlib``; search explores ``ef_search`` candidates."""
+
+    kind = "hnsw"
+
+    def __init__(self, index, *, rows: int, ef_search: int = 64) -> None:
+        self.index = index
+        self.rows = rows
+        self.ef_search = ef_search
+
+    @classmethod
+    def build(
+        cls, vectors: np.ndarray, alive: np.ndarray, config: HNSWConfig | None = None
+    ) -> "HNSWIndex":
+        _ensure_hnswlib()
+        config = config or HNSWConfig()
+        live_rows = np.flatnonzero(alive)
+        if live_rows.size == 0:
+            raise ValueError("Cannot build an index over an empty collection")
+        index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        index.init_index(
+            max_elements=live_rows.size,
+            M=config.M,
+            ef_construction=config.ef_construction,
+            random_seed=config.seed,
+        )
+        for start in range(0, live_rows.size, ENCODE_BLOCK_ROWS):
+            block_rows = live_rows[start : start + ENCODE_BLOCK_ROWS]
+            index.add_items(
+                np.asarray(vectors[block_rows], dtype=np.float32), block_rows
+            )
+        return cls(index, rows=vectors.shape[0])
+
+    def search(
+        self, query: np.ndarray, k: int, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        k = min(k, self.index.get_current_count())
+        if k < 1:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        self.index.set_ef(max(self.ef_search, k))
+        accept = None if mask is None else (lambda label: bool(mask[label]))
+        try:
+            labels, distances = self.index.knn_query(query, k=k, filter=accept)
+        except RuntimeError:
+            # Raised when a filter leaves under k reachable rows; the caller then scans.
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.index.save_index(str(directory / "hnsw.bin"))
+        _write_meta(
+            directory, {"kind": self.kind, "rows": self.rows, "dim": self.index.dim}
+        )
+
+    @classmethod
+    def load(cls, directory: Path, *, rows: int, ef_search: int = 64) -> "HNSWIndex":
+        _ensure_hnswlib()
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        index = hnswlib.Index(space="ip", dim=int(meta["dim"]))
+        index.load_index(str(directory / "hnsw.bin"))
+        return cls(index, rows=rows, ef_search=ef_search)
+
+
+def _write_meta(directory: Path, meta: dict) -> None:
+    (directory / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+
+def build_ann_index(
+    vectors: np.ndarray, alive: np.ndarray, config: IVFPQConfig | HNSWConfig
+) -> IVFPQIndex | HNSWIndex:
+    LOGGER.info(
+        "Building %s index",
+        "hnsw" if isinstance(config, HNSWConfig) else "ivfpq",
+        extra=asdict(config),
+    )
+    if isinstance(config, HNSWConfig):
+        return HNSWIndex.build(vectors, alive, config)
+    return IVFPQIndex.build(vectors, alive, config)
+
+
+def save_ann_index(index: IVFPQIndex | HNSWIndex, directory: Path) -> None:
+    """Write ``index`` to ``directory``, replacing any previous index there."""
+
+    staging = directory.with_name(directory.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    index.save(staging)
+    retired = directory.with_name(directory.name + ".old")
+    shutil.rmtree(retired, ignore_errors=True)
+    if directory.exists():
+        directory.rename(retired)
+    staging.rename(directory)
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+def load_ann_index(
+    directory: Path, *, nprobe: int = 16, ef_search: int = 64
+) -> IVFPQIndex | HNSWIndex | None:
+    meta_path = directory / "meta.json"
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta["kind"] == "hnsw":
+        return HNSWIndex.load(directory, rows=int(meta["rows"]), ef_search=ef_search)
+    return IVFPQIndex.load(directory, rows=int(meta["rows"]), nprobe=nprobe)
+
+
+__all__ = [
+    "ANN_KINDS",
+    "AnnIndex",
+    "HNSWConfig",
+    "HNSWIndex",
+    "IVFPQConfig",
+    "IVFPQIndex",
+    "build_ann_index",
+    "load_ann_index",
+    "save_ann_index",
+]
@@ -0,0 +1,78 @@
+"""Bounded in-process caches for retrieval."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+from ..telemetry import record_cache_lookup
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float | None = None,
+        *,
+        timer: Callable[[], float] = time.monotonic,
+        name: str | None = None,
+    ) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        # Reported as the ``cache`` label of exoai_cache_lookups_total when set.
+        self.name = name
+        self._data: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: V | None = None) -> V | None:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                expires_at, value = item  # type: ignore[misc]
+                if self.ttl is None or expires_at > self._timer():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    if self.name:
+                        record_cache_lookup(self.name, hits=1)
+                    return value
+                del self._data[key]
+            self.misses += 1
+        if self.name:
+            record_cache_lookup(self.name, misses=1)
+        return default
+
+    def set(self, key: Hashable, value: V) -> None:
+        if self.maxsize == 0:
+            return
+        expires_at = self._timer() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+__all__ = ["TTLCache"]
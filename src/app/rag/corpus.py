@@ -5,7 +5,7 @@ from __future__ import annotations
 import hashlib
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
 
 @dataclass(slots=True)
@@ -33,6 +33,38 @@ def _chunk_text(text: str, *, chunk_size: int = 1000, overlap: int = 200) -> Ite
         start = max(end - overlap, 0)
 
 
+CORPUS_SUFFIXES = frozenset({".md", ".txt"})
+
+
+def iter_corpus_files(directory: str | Path) -> Iterator[Path]:
+    """Yield Markdown and text files below ``directory`` in a stable order."""
+
+    directory = Path(directory)
+    for path in sorted(directory.glob("**/*")):
+        if path.is_file() and path.suffix.lower() in CORPUS_SUFFIXES:
+            yield path
+
+
+def chunk_document(
+    path: Path, content: str, *, chunk_size: int = 1000, overlap: int = 200
+) -> List[DocumentEntry]:
+    """Split the content of a single corpus file into DocumentEntry chunks."""
+
+    entries: list[DocumentEntry] = []
+    for idx, chunk in enumerate(
+        _chunk_text(content, chunk_size=chunk_size, overlap=overlap)
+    ):
+        doc_id = f"{path.stem}-{idx}-{_hash_content(chunk)[:8]}"
+        entries.append(
+            DocumentEntry(
+                doc_id=doc_id,
+                text=chunk,
+                metadata={"source": str(path), "chunk_index": str(idx)},
+            )
+        )
+    return entries
+
+
 def load_markdown_corpus(directory: str | Path, *, chunk_size: int = 1000, overlap: int = 200) -> List[DocumentEntry]:
     """Load Markdown and text documents into DocumentEntry chunks."""
 
@@ -41,20 +73,18 @@ def load_markdown_corpus(directory: str | Path, *, chunk_size: int = 1000, overl
         raise FileNotFoundError(f"Corpus directory not found: {directory}")
 
     entries: list[DocumentEntry] = []
-    for path in directory.glob("**/*"):
-        if not path.is_file() or path.suffix.lower() not in {".md", ".txt"}:
-            continue
+    for path in iter_corpus_files(directory):
         content = path.read_text(encoding="utf-8")
-        for idx, chunk in enumerate(_chunk_text(content, chunk_size=chunk_size, overlap=overlap)):
-            doc_id = f"{path.stem}-{idx}-{_hash_content(chunk)[:8]}"
-            entries.append(
-                DocumentEntry(
-                    doc_id=doc_id,
-                    text=chunk,
-                    metadata={"source": str(path), "chunk_index": str(idx)},
-                )
-            )
+        entries.extend(
+            chunk_document(path, content, chunk_size=chunk_size, overlap=overlap)
+        )
     return entries
 
 
-__all__ = ["DocumentEntry", "load_markdown_corpus"]
+__all__ = [
+    "CORPUS_SUFFIXES",
+    "DocumentEntry",
+    "chunk_document",
+    "iter_corpus_files",
+    "load_markdown_corpus",
+]
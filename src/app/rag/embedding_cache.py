@@ -0,0 +1,195 @@
+"""Content-addressed on-disk cache for embedding vectors."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from ..telemetry import record_cache_lookup
+
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+KEY_SIZE = 16
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonicalize text so trivially different whitespace maps to one key."""
+
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _slugify(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+
+
+class EmbeddingCache:
+    """Append-only float32 vector file with a compact digest index.
+
+    ``vectors.f32`` holds one fixed-width row per cached text and ``keys.bin`` holds the
+    matching 16-byte digests in the same order, so the index is rebuilt by reading a
+    single small file and vectors are served straight from a memory map.
+    """
+
+    def __init__(self, directory: str | Path, model_name: str) -> None:
+        self.model_name = model_name
+        self.directory = Path(directory) / _slugify(model_name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.directory / "vectors.f32"
+        self._keys_path = self.directory / "keys.bin"
+        self._meta_path = self.directory / "meta.json"
+        self._lock_path = self.directory / ".lock"
+        self._mutex = threading.Lock()
+        self._index: dict[bytes, int] = {}
+        self._dim: int | None = None
+        self._vectors: np.memmap | None = None
+        self._rows = 0
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def dim(self) -> int | None:
+        return self._dim
+
+    def key(self, text: str) -> bytes:
+        payload = f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).digest()[:KEY_SIZE]
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with self._lock_path.open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _consistent_rows(self) -> int:
+        """Truncate both files to the rows fully written before a crash."""
+
+        if self._dim is None:
+            return 0
+        row_bytes = self._dim * 4
+        vector_bytes = (
+            self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        )
+        key_bytes = self._keys_path.stat().st_size if self._keys_path.exists() else 0
+        rows = min(vector_bytes // row_bytes, key_bytes // KEY_SIZE)
+        if vector_bytes != rows * row_bytes:
+            os.truncate(self._vectors_path, rows * row_bytes)
+        if key_bytes != rows * KEY_SIZE:
+            os.truncate(self._keys_path, rows * KEY_SIZE)
+        return rows
+
+    def _load(self) -> None:
+        if self._meta_path.exists():
+            self._dim = int(json.loads(self._meta_path.read_text())["dim"])
+        with self._file_lock():
+            rows = self._consistent_rows()
+        self._refresh(rows)
+        LOGGER.info(
+            "Loaded embedding cache",
+            extra={"path": str(self.directory), "entries": rows},
+        )
+
+    def _refresh(self, rows: int) -> None:
+        if rows == 0 or self._dim is None:
+            self._index = {}
+            self._vectors = None
+            self._rows = 0
+            return
+        keys = np.fromfile(self._keys_path, dtype=f"V{KEY_SIZE}", count=rows)
+        self._index = {bytes(key): row for row, key in enumerate(keys)}
+        self._remap(rows)
+
+    def _remap(self, rows: int) -> None:
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim)
+        )
+        self._rows = rows
+
+    def lookup(self, keys: Sequence[bytes]) -> list[np.ndarray | None]:
+        """Return cached vectors in ``keys`` order, ``None`` for misses."""
+
+        with self._mutex:
+            vectors = self._vectors
+            rows = [self._index.get(key) for key in keys]
+        found = [idx for idx, row in enumerate(rows) if row is not None]
+        results: list[np.ndarray | None] = [None] * len(keys)
+        if found and vectors is not None:
+            block = np.asarray(vectors[[rows[idx] for idx in found]])
+            for position, idx in enumerate(found):
+                results[idx] = block[position]
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        record_cache_lookup("embedding", hits=len(found), misses=len(keys) - len(found))
+        return results
+
+    def add(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        """Append vectors for keys that are not cached yet."""
+
+        if not keys:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(keys):
+            raise ValueError("Expected one vector row per key")
+        with self._mutex, self._file_lock():
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                self._meta_path.write_text(
+                    json.dumps({"dim": self._dim, "model_name": self.model_name})
+                )
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"cache dimension {self._dim}"
+                )
+
+            rows = self._consistent_rows()
+            if rows != self._rows:
+                self._refresh(rows)  # another process appended since we last looked
+            fresh: dict[bytes, int] = {}
+            for idx, key in enumerate(keys):
+                if key not in self._index and key not in fresh:
+                    fresh[key] = idx
+            if not fresh:
+                return
+            selected = list(fresh.values())
+            with self._vectors_path.open("ab") as handle:
+                handle.write(vectors[selected].tobytes())
+                handle.flush()
+                os.fsync(handle.fileno())
+            with self._keys_path.open("ab") as handle:
+                handle.write(b"".join(fresh))
+                handle.flush()
+                os.fsync(handle.fileno())
+            for offset, key in enumerate(fresh):
+                self._index[key] = rows + offset
+            self._remap(rows + len(fresh))
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._index), "hits": self.hits, "misses": self.misses}
+
+
+__all__ = ["EmbeddingCache", "normalize_text"]
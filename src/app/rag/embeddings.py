@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Iterable, List
 
 import numpy as np
 
+from ..telemetry import MODEL_LOAD_SECONDS
+from .embedding_cache import EmbeddingCache
+
 try:  # pragma: no cover - heavy dependency check
     from sentence_transformers import SentenceTransformer
 except ImportError:  # pragma: no cover
@@ -20,21 +24,70 @@ DEFAULT_MODEL_NAME = "BAAI/bge-base-en-v1.5"
 class EmbeddingConfig:
     model_name: str = DEFAULT_MODEL_NAME
     device: str | None = None
+    batch_size: int = 32
+    cache_dir: str | None = None
 
 
 class EmbeddingService:
-    """Wraps SentenceTransformer to embed documents and queries."""
+    """Wraps SentenceTransformer to embed documents and queries.
+
+    When a cache is configured only texts missing from it are sent to the model, and the
+    model itself is loaded lazily so a fully cached corpus never pays the load cost.
+    """
 
-    def __init__(self, config: EmbeddingConfig | None = None) -> None:
+    def __init__(
+        self,
+        config: EmbeddingConfig | None = None,
+        *,
+        cache: EmbeddingCache | None = None,
+    ) -> None:
         self.config = config or EmbeddingConfig()
         if SentenceTransformer is None:  # pragma: no cover
             raise ImportError("sentence-transformers is not installed")
-        self.model = SentenceTransformer(self.config.model_name, device=self.config.device)
+        if cache is None and self.config.cache_dir:
+            cache = EmbeddingCache(self.config.cache_dir, self.config.model_name)
+        self.cache = cache
+        self._model = None
 
-    def embed_documents(self, texts: Iterable[str]) -> np.ndarray:
-        vectors = self.model.encode(list(texts), batch_size=32, normalize_embeddings=True)
+    @property
+    def model(self):
+        if self._model is None:
+            started = time.perf_counter()
+            self._model = SentenceTransformer(
+                self.config.model_name, device=self.config.device
+            )
+            MODEL_LOAD_SECONDS.labels(model="embedding").set(
+                time.perf_counter() - started
+            )
+        return self._model
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            texts, batch_size=self.config.batch_size, normalize_embeddings=True
+        )
         return np.asarray(vectors, dtype=np.float32)
 
+    def embed_documents(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        if self.cache is None or not texts:
+            return self._encode(texts)
+
+        keys = [self.cache.key(text) for text in texts]
+        cached = self.cache.lookup(keys)
+        pending: dict[bytes, str] = {}
+        for key, text, vector in zip(keys, texts, cached):
+            if vector is None:
+                pending.setdefault(key, text)
+        if pending:
+            fresh = self._encode(list(pending.values()))
+            self.cache.add(list(pending), fresh)
+            computed = dict(zip(pending, fresh))
+            cached = [
+                vector if vector is not None else computed[key]
+                for key, vector in zip(keys, cached)
+            ]
+        return np.stack(cached).astype(np.float32, copy=False)
+
     def embed_query(self, text: str) -> np.ndarray:
         vector = self.model.encode([text], batch_size=1, normalize_embeddings=True)[0]
         return np.asarray(vector, dtype=np.float32)
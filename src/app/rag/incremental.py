@@ -0,0 +1,231 @@
+"""Incremental, hash-aware corpus indexing."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any
+
+from .corpus import DocumentEntry, chunk_document, iter_corpus_files
+from .embeddings import EmbeddingService
+from .vectorstore import VectorStore
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_FORMAT_VERSION = 1
+
+
+@dataclass(slots=True)
+class FileState:
+    """Last indexed state of a single corpus file."""
+
+    mtime_ns: int
+    size: int
+    sha256: str
+    doc_ids: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class IndexingReport:
+    """Outcome of an indexing pass, counted in chunks."""
+
+    added: int = 0
+    skipped: int = 0
+    deleted: int = 0
+    files_scanned: int = 0
+    files_changed: int = 0
+    version: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.deleted)
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class IndexManifest:
+    """Persistent mapping of corpus file path to its indexed state."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        files: dict[str, FileState] | None = None,
+        fingerprint: dict[str, Any] | None = None,
+        version: int = 0,
+    ) -> None:
+        self.path = Path(path)
+        self.files = files or {}
+        self.fingerprint = fingerprint or {}
+        self.version = version
+
+    @classmethod
+    def load(cls, path: str | Path) -> "IndexManifest":
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            LOGGER.warning(
+                "Ignoring unreadable index manifest", extra={"path": str(path)}
+            )
+            return cls(path)
+        if data.get("format") != MANIFEST_FORMAT_VERSION:
+            return cls(path)
+        files = {
+            key: FileState(**value) for key, value in data.get("files", {}).items()
+        }
+        return cls(
+            path,
+            files=files,
+            fingerprint=data.get("fingerprint", {}),
+            version=int(data.get("version", 0)),
+        )
+
+    def doc_ids(self) -> set[str]:
+        return {doc_id for state in self.files.values() for doc_id in state.doc_ids}
+
+    def save(self) -> None:
+        """Atomically write the manifest to disk."""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "format": MANIFEST_FORMAT_VERSION,
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "files": {key: asdict(state) for key, state in sorted(self.files.items())},
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+class IncrementalIndexer:
+    """Embeds and upserts only corpus chunks that changed since the last pass."""
+
+    def __init__(
+        self,
+        indexer: VectorStore,
+        embedding_service: EmbeddingService,
+        manifest_path: str | Path,
+        *,
+        chunk_size: int = 1000,
+        overlap: int = 200,
+        batch_size: int = 256,
+    ) -> None:
+        self.indexer = indexer
+        self.embedding_service = embedding_service
+        self.manifest_path = Path(manifest_path)
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.batch_size = batch_size
+
+    def _fingerprint(self) -> dict[str, Any]:
+        config = getattr(self.embedding_service, "config", None)
+        return {
+            "model": getattr(config, "model_name", None),
+            "collection": self.indexer.config.collection_name,
+            # Qdrant and the local store must not reuse each other's manifest.
+            "backend": type(self.indexer).__name__,
+            "chunk_size": self.chunk_size,
+            "overlap": self.overlap,
+        }
+
+    def _embed_and_upsert(self, entries: list[DocumentEntry]) -> None:
+        collection_ready = False
+        for start in range(0, len(entries), self.batch_size):
+            batch = entries[start : start + self.batch_size]
+            vectors = self.embedding_service.embed_documents(
+                entry.text for entry in batch
+            )
+            if not collection_ready:
+                self.indexer.ensure_collection(vector_size=vectors.shape[1])
+                collection_ready = True
+            self.indexer.upsert_documents(batch, vectors)
+
+    def sync(self, corpus_dir: str | Path) -> IndexingReport:
+        """Bring the vector collection in line with the files under ``corpus_dir``."""
+
+        corpus_dir = Path(corpus_dir)
+        if not corpus_dir.exists():
+            raise FileNotFoundError(f"Corpus directory not found: {corpus_dir}")
+
+        manifest = IndexManifest.load(self.manifest_path)
+        fingerprint = self._fingerprint()
+        collection_exists = self.indexer.collection_exists()
+        reusable = collection_exists and manifest.fingerprint == fingerprint
+        previous = manifest.files if reusable else {}
+        indexed_ids = {
+            doc_id for state in previous.values() for doc_id in state.doc_ids
+        }
+        stale_ids = manifest.doc_ids() if collection_exists else set()
+
+        report = IndexingReport()
+        files: dict[str, FileState] = {}
+        candidates: dict[str, DocumentEntry] = {}
+        for path in iter_corpus_files(corpus_dir):
+            report.files_scanned += 1
+            key = str(path)
+            stat = path.stat()
+            prior = previous.get(key)
+            if (
+                prior is not None
+                and prior.mtime_ns == stat.st_mtime_ns
+                and prior.size == stat.st_size
+            ):
+                files[key] = prior
+                continue
+
+            content = path.read_text(encoding="utf-8")
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if prior is not None and prior.sha256 == digest:
+                files[key] = replace(
+                    prior, mtime_ns=stat.st_mtime_ns, size=stat.st_size
+                )
+                continue
+
+            report.files_changed += 1
+            entries = chunk_document(
+                path, content, chunk_size=self.chunk_size, overlap=self.overlap
+            )
+            files[key] = FileState(
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                sha256=digest,
+                doc_ids=[entry.doc_id for entry in entries],
+            )
+            for entry in entries:
+                if entry.doc_id not in indexed_ids:
+                    candidates.setdefault(entry.doc_id, entry)
+
+        current_ids = {doc_id for state in files.values() for doc_id in state.doc_ids}
+        removed_ids = sorted(stale_ids - current_ids)
+        report.files_changed += len(set(previous) - set(files))
+
+        if candidates:
+            self._embed_and_upsert(list(candidates.values()))
+        if removed_ids:
+            self.indexer.delete_documents(removed_ids)
+
+        report.added = len(candidates)
+        report.skipped = len(current_ids) - len(candidates)
+        report.deleted = len(removed_ids)
+
+        manifest.files = files
+        manifest.fingerprint = fingerprint
+        if report.changed or not reusable:
+            manifest.version += 1
+        report.version = manifest.version
+        manifest.save()
+
+        LOGGER.info("Incremental corpus indexing finished", extra=report.to_dict())
+        return report
+
+
+__all__ = ["FileState", "IncrementalIndexer", "IndexManifest", "IndexingReport"]
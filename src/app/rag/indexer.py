@@ -3,13 +3,37 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Any, Iterable, Mapping, Sequence
 
 import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    MatchAny,
+    MatchValue,
+    PointIdsList,
+    PointStruct,
+    VectorParams,
+)
 
 from .corpus import DocumentEntry
+from .vectorstore import SearchHit
+
+
+def payload_filter(filters: Mapping[str, Any] | Filter | None) -> Filter | None:
+    """Translate ``{field: value | [values]}`` into a Qdrant filter (or pass one)."""
+
+    if filters is None or isinstance(filters, Filter):
+        return filters
+    conditions = []
+    for key, value in filters.items():
+        if isinstance(value, (list, tuple, set, frozenset)):
+            conditions.append(FieldCondition(key=key, match=MatchAny(any=list(value))))
+        else:
+            conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
+    return Filter(must=conditions) if conditions else None
 
 
 @dataclass(slots=True)
@@ -27,6 +51,9 @@ class QdrantIndexer:
         self.client = client
         self.config = config or QdrantConfig()
 
+    def collection_exists(self) -> bool:
+        return bool(self.client.collection_exists(self.config.collection_name))
+
     def ensure_collection(self, vector_size: int) -> None:
         cfg = self.config
         if cfg.recreate_collection:
@@ -54,5 +81,31 @@ class QdrantIndexer:
         if points:
             self.client.upsert(collection_name=self.config.collection_name, points=points)
 
+    def delete_documents(self, doc_ids: Iterable[str]) -> None:
+        ids = list(doc_ids)
+        if ids:
+            self.client.delete(
+                collection_name=self.config.collection_name,
+                points_selector=PointIdsList(points=ids),
+            )
+
+    def search(
+        self,
+        vector: Sequence[float] | np.ndarray,
+        *,
+        limit: int,
+        filters: Mapping[str, Any] | Filter | None = None,
+    ) -> list[SearchHit]:
+        points = self.client.search(
+            collection_name=self.config.collection_name,
+            query_vector=np.asarray(vector, dtype=np.float32).tolist(),
+            limit=limit,
+            query_filter=payload_filter(filters),
+        )
+        return [
+            SearchHit(id=point.id, score=point.score, payload=point.payload or {})
+            for point in points
+        ]
+
 
-__all__ = ["QdrantIndexer", "QdrantConfig"]
+__all__ = ["QdrantIndexer", "QdrantConfig", "payload_filter"]
@@ -0,0 +1,336 @@
+"""BM25 keyword index over corpus chunks and reciprocal rank fusion with dense results.
+
+Dense embeddings blur exact identifiers such as ``KOI-7016.01``, ``TOI-700 d`` or
+``TIC 307210830``. The tokenizer keeps those whole and also emits their parts, so
+"Kepler 22b" and "Kepler-22b" both match.
+
+Postings are stored in CSR form: ``indptr[t]:indptr[t + 1]`` slices the document numbers
+and precomputed BM25 weights of term ``t``. Within a term, postings are sorted by
+weight, so a query reads at most ``max_postings`` of them per term. A query's cost is
+bounded by that cap and not by the size of the corpus.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+
+from .corpus import DocumentEntry
+from .vectorstore import SearchHit
+
+LOGGER = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-_+][a-z0-9]+)*")
+TOKEN_PART_SEPARATORS = re.compile(r"[\-_+]")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to was were which with".split()
+)
+LEXICAL_FORMAT_VERSION = 1
+_ARRAYS = ("indptr", "postings", "weights", "payload_offsets")
+
+
+def tokenize(text: str) -> list[str]:
+    tokens: list[str] = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if TOKEN_PART_SEPARATORS.search(token):
+            tokens.extend(
+                part
+                for part in TOKEN_PART_SEPARATORS.split(token)
+                if part and part not in STOPWORDS
+            )
+    return tokens
+
+
+@dataclass(slots=True)
+class BM25Config:
+    k1: float = 1.2
+    b: float = 0.75
+    # Highest-weighted postings read per query term; bounds very common terms' cost.
+    max_postings: int = 20000
+    # Payload fields that can be used in search filters.
+    filter_fields: tuple[str, ...] = ("mission", "source")
+
+
+class BM25Index:
+    """Immutable BM25 index; rebuild it when the corpus changes."""
+
+    def __init__(
+        self,
+        *,
+        terms: dict[str, int],
+        doc_ids: list[str],
+        indptr: np.ndarray,
+        postings: np.ndarray,
+        weights: np.ndarray,
+        payloads: np.ndarray,
+        payload_offsets: np.ndarray,
+        codes: dict[str, np.ndarray],
+        vocab: dict[str, dict[str, int]],
+        config: BM25Config,
+    ) -> None:
+        self.terms = terms
+        self.doc_ids = doc_ids
+        self.indptr = indptr
+        self.postings = postings
+        self.weights = weights
+        self.payloads = payloads
+        self.payload_offsets = payload_offsets
+        self.codes = codes
+        self.vocab = vocab
+        self.config = config
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @classmethod
+    def build(
+        cls, entries: Iterable[DocumentEntry], config: BM25Config | None = None
+    ) -> "BM25Index":
+        config = config or BM25Config()
+        terms: dict[str, int] = {}
+        doc_ids: list[str] = []
+        token_docs: list[np.ndarray] = []
+        token_terms: list[np.ndarray] = []
+        blobs: list[bytes] = []
+        vocab: dict[str, dict[str, int]] = {name: {} for name in config.filter_fields}
+        field_codes: dict[str, list[int]] = {name: [] for name in config.filter_fields}
+        for doc, entry in enumerate(entries):
+            doc_ids.append(entry.doc_id)
+            ids = [
+                terms.setdefault(token, len(terms)) for token in tokenize(entry.text)
+            ]
+            token_terms.append(np.asarray(ids, dtype=np.int64))
+            token_docs.append(np.full(len(ids), doc, dtype=np.int64))
+            blobs.append(
+                json.dumps({"text": entry.text, **entry.metadata}).encode("utf-8")
+            )
+            for name in config.filter_fields:
+                value = entry.metadata.get(name)
+                field_codes[name].append(
+                    -1
+                    if value is None
+                    else vocab[name].setdefault(str(value), len(vocab[name]))
+                )
+
+        n_docs = len(doc_ids)
+        doc_of_token = (
+            np.concatenate(token_docs) if token_docs else np.empty(0, dtype=np.int64)
+        )
+        term_of_token = (
+            np.concatenate(token_terms) if token_terms else np.empty(0, dtype=np.int64)
+        )
+        # One (term, document) pair per distinct key; its count is the term frequency.
+        keys, tf = np.unique(
+            term_of_token * max(n_docs, 1) + doc_of_token, return_counts=True
+        )
+        key_terms, key_docs = keys // max(n_docs, 1), keys % max(n_docs, 1)
+        df = np.bincount(key_terms, minlength=len(terms))
+        lengths = np.bincount(doc_of_token, minlength=n_docs).astype(np.float64)
+        avg_length = float(lengths.mean()) if n_docs else 0.0
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        norm = config.k1 * (
+            1.0 - config.b + config.b * lengths[key_docs] / max(avg_length, 1e-9)
+        )
+        weights = idf[key_terms] * tf * (config.k1 + 1.0) / (tf + norm)
+
+        order = np.lexsort((-weights, key_terms))
+        sizes = np.fromiter((len(blob) for blob in blobs), dtype=np.int64, count=n_docs)
+        zero = np.zeros(1, dtype=np.int64)
+        starts = (
+            np.concatenate((zero, np.cumsum(sizes)[:-1]))
+            if n_docs
+            else np.empty(0, dtype=np.int64)
+        )
+        LOGGER.info(
+            "Built BM25 index", extra={"documents": n_docs, "terms": len(terms)}
+        )
+        return cls(
+            terms=terms,
+            doc_ids=doc_ids,
+            indptr=np.concatenate((zero, np.cumsum(df))).astype(np.int64),
+            postings=key_docs[order].astype(np.int32),
+            weights=weights[order].astype(np.float32),
+            payloads=np.frombuffer(b"".join(blobs), dtype=np.uint8),
+            payload_offsets=(
+                np.stack((starts, sizes), axis=1)
+                if n_docs
+                else np.zeros((0, 2), dtype=np.int64)
+            ),
+            codes={
+                name: np.asarray(values, dtype=np.int32)
+                for name, values in field_codes.items()
+            },
+            vocab=vocab,
+            config=config,
+        )
+
+    def rank(
+        self, query: str, *, limit: int, filters: Mapping[str, Any] | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Document numbers and BM25 scores of the ``limit`` best matches, in order."""
+
+        empty = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        term_ids = sorted(
+            {self.terms[token] for token in tokenize(query) if token in self.terms}
+        )
+        if not term_ids or limit < 1:
+            return empty
+        allowed = {}
+        for name, value in (filters or {}).items():
+            if name not in self.codes:
+                raise ValueError(f"Payload field '{name}' is not indexed for filtering")
+            values = (
+                value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+            )
+            allowed[name] = [
+                self.vocab[name][str(item)]
+                for item in values
+                if str(item) in self.vocab[name]
+            ]
+
+        # Documents are unique within one term's postings, so each slice can be added
+        # with fancy indexing into a dense accumulator; candidates are never all sorted.
+        totals = np.zeros(len(self.doc_ids), dtype=np.float64)
+        touched = []
+        for term in term_ids:
+            start = self.indptr[term]
+            stop = min(self.indptr[term + 1], start + self.config.max_postings)
+            docs = np.asarray(self.postings[start:stop])
+            totals[docs] += self.weights[start:stop]
+            touched.append(docs)
+        docs = np.concatenate(touched)
+        for name, codes in allowed.items():
+            docs = docs[np.isin(self.codes[name][docs], codes)]
+        if docs.size == 0:
+            return empty
+
+        scores = totals[docs]
+        # A document appears once per matching term, so over-select, then deduplicate.
+        wanted = limit * len(term_ids)
+        if wanted < docs.size:
+            top = np.argpartition(-scores, wanted - 1)[:wanted]
+            docs, scores = docs[top], scores[top]
+        docs, first = np.unique(docs, return_index=True)
+        scores = scores[first]
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return docs[order].astype(np.int64), scores[order]
+
+    def search(
+        self, query: str, *, limit: int, filters: Mapping[str, Any] | None = None
+    ) -> list[SearchHit]:
+        docs, scores = self.rank(query, limit=limit, filters=filters)
+        return [
+            SearchHit(
+                id=self.doc_ids[doc], score=float(score), payload=self.payload(doc)
+            )
+            for doc, score in zip(docs, scores)
+        ]
+
+    def payload(self, doc: int) -> dict[str, Any]:
+        start, size = self.payload_offsets[doc]
+        return json.loads(self.payloads[start : start + size].tobytes())
+
+    def save(self, directory: str | Path) -> None:
+        """Write the index to ``directory``, replacing any previous index there.
+
+        Several API workers may rebuild the same index at startup, so each one stages in
+        a private directory and the swap tolerates losing the race to another writer.
+        """
+
+        directory = Path(directory)
+        token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        staging = directory.with_name(f"{directory.name}.tmp-{token}")
+        staging.mkdir(parents=True)
+        for name in _ARRAYS:
+            np.save(staging / f"{name}.npy", getattr(self, name))
+        for name, codes in self.codes.items():
+            np.save(staging / f"codes_{name}.npy", codes)
+        self.payloads.tofile(staging / "payloads.bin")
+        meta = {
+            "format": LEXICAL_FORMAT_VERSION,
+            "config": asdict(self.config),
+            "terms": self.terms,
+            "doc_ids": self.doc_ids,
+            "vocab": self.vocab,
+        }
+        (staging / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        retired = directory.with_name(f"{directory.name}.old-{token}")
+        try:
+            os.replace(directory, retired)
+        except FileNotFoundError:
+            pass
+        try:
+            os.replace(staging, directory)
+        except OSError:
+            # Another writer installed its index between the two renames; keep that one.
+            LOGGER.info(
+                "Lexical index at %s was replaced concurrently; discarding this build",
+                directory,
+            )
+            shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "BM25Index":
+        """Load an index; postings and payloads stay memory-mapped."""
+
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format") != LEXICAL_FORMAT_VERSION:
+            raise ValueError(f"Lexical index at {directory} has an incompatible format")
+        config = BM25Config(
+            **{
+                **meta["config"],
+                "filter_fields": tuple(meta["config"]["filter_fields"]),
+            }
+        )
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in _ARRAYS
+        }
+        arrays["indptr"] = np.array(arrays["indptr"])
+        size = (directory / "payloads.bin").stat().st_size
+        return cls(
+            terms=meta["terms"],
+            doc_ids=meta["doc_ids"],
+            payloads=(
+                np.memmap(directory / "payloads.bin", dtype=np.uint8, mode="r")
+                if size
+                else np.empty(0, np.uint8)
+            ),
+            codes={
+                name: np.load(directory / f"codes_{name}.npy")
+                for name in config.filter_fields
+            },
+            vocab=meta["vocab"],
+            config=config,
+            **arrays,
+        )
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], *, k: int = 60
+) -> list[tuple[str, float]]:
+    """Fuse ranked id lists: each list adds ``1 / (k + rank)`` for every id it holds."""
+
+    fused: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))
+
+
+__all__ = ["BM25Config", "BM25Index", "reciprocal_rank_fusion", "tokenize"]
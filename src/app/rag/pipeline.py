@@ -8,6 +8,7 @@ from typing import Any, List
 from langchain.prompts import PromptTemplate
 from langchain_core.language_models import BaseLanguageModel
 
+from ..telemetry import STAGE_LATENCY
 from .retriever import RetrievalService
 
 
@@ -41,17 +42,24 @@ class EvidenceGenerator:
             metadata = item.get("metadata", {})
             documents.append({"text": item.get("text", ""), "metadata": metadata, "score": item.get("score")})
             source = metadata.get("source", "")
-            context_chunks.append(f"Source: {source}\nScore: {item.get('score', 0):.3f}\n{item.get('text', '')}")
+            score = item.get("score")
+            # Chunks found only by keyword search have no similarity score.
+            shown = "keyword match" if score is None else f"{score:.3f}"
+            context_chunks.append(
+                f"Source: {source}\nScore: {shown}\n{item.get('text', '')}"
+            )
         return "\n\n".join(context_chunks), documents
 
     def generate(self, question: str) -> dict[str, Any]:
-        context, documents = self._build_context(question)
+        with STAGE_LATENCY.labels(stage="retrieval").time():
+            context, documents = self._build_context(question)
         prompt_value = self.prompt.format(context=context, question=question)
-        if hasattr(self.llm, "invoke"):
-            response = self.llm.invoke(prompt_value)
-            answer = getattr(response, "content", response)
-        else:  # pragma: no cover - fallback
-            answer = self.llm(prompt_value)
+        with STAGE_LATENCY.labels(stage="generation").time():
+            if hasattr(self.llm, "invoke"):
+                response = self.llm.invoke(prompt_value)
+                answer = getattr(response, "content", response)
+            else:  # pragma: no cover - fallback
+                answer = self.llm(prompt_value)
         return {
             "question": question,
             "answer": answer,
@@ -1,55 +1,198 @@
-"""Retrieval service using Qdrant embeddings."""
+"""Retrieval service over an embedded corpus held in a vector store.
+
+With a BM25 index attached, dense and keyword rankings are fused by reciprocal rank.
+"""
 
 from __future__ import annotations
 
+import copy
+import threading
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Hashable, List, Mapping
 
 from qdrant_client import QdrantClient
-from qdrant_client.models import Filter, PointStruct
+from qdrant_client.models import Filter
 
+from .cache import TTLCache
 from .embeddings import EmbeddingService
+from .indexer import QdrantConfig, QdrantIndexer
+from .lexical import BM25Index, reciprocal_rank_fusion
+from .vectorstore import VectorStore
 
 
 @dataclass(slots=True)
 class RetrievalConfig:
     collection_name: str = "exoai_corpus"
     top_k: int = 5
+    query_cache_size: int = 1024
+    result_cache_size: int = 256
+    cache_ttl: float | None = 600.0
+    # Hits taken from each ranking before reciprocal rank fusion (hybrid search only).
+    fusion_candidates: int = 50
+    rrf_k: int = 60
+
+
+def _filter_key(filters: Mapping[str, Any] | Filter | None) -> Hashable:
+    if filters is None:
+        return None
+    if isinstance(filters, Mapping):
+        return repr(sorted((key, repr(value)) for key, value in filters.items()))
+    if hasattr(filters, "model_dump_json"):
+        return filters.model_dump_json(exclude_none=True)
+    return repr(filters)
 
 
 class RetrievalService:
-    """Provides nearest-neighbour search over embedded corpus."""
+    """Provides nearest-neighbour search over embedded corpus.
+
+    Query vectors and search results are cached in two LRU/TTL tiers. Result keys
+    include the collection version, and bumping the version drops both tiers.
+    """
 
     def __init__(
         self,
-        client: QdrantClient,
+        client: QdrantClient | None,
         embedding_service: EmbeddingService,
         config: RetrievalConfig | None = None,
+        *,
+        store: VectorStore | None = None,
+        lexical: BM25Index | None = None,
     ) -> None:
         self.client = client
         self.embedding_service = embedding_service
         self.config = config or RetrievalConfig()
+        if store is None:
+            if client is None:
+                raise ValueError(
+                    "RetrievalService needs a Qdrant client or a vector store"
+                )
+            store = QdrantIndexer(
+                client, QdrantConfig(collection_name=self.config.collection_name)
+            )
+        self.store = store
+        self.lexical = lexical
+        self.collection_version = 0
+        self._version_lock = threading.Lock()
+        self._query_cache: TTLCache[Any] = TTLCache(
+            self.config.query_cache_size, self.config.cache_ttl, name="retrieval_query"
+        )
+        self._result_cache: TTLCache[List[dict]] = TTLCache(
+            self.config.result_cache_size,
+            self.config.cache_ttl,
+            name="retrieval_result",
+        )
+
+    def set_collection_version(self, version: int) -> None:
+        """Record the indexer's collection version, invalidating caches on change."""
+
+        with self._version_lock:
+            if version == self.collection_version:
+                return
+            self.collection_version = version
+            self.invalidate_cache()
+
+    def set_lexical_index(self, lexical: BM25Index | None) -> None:
+        """Swap in a rebuilt BM25 index (``None`` disables hybrid search)."""
+
+        self.lexical = lexical
+        self.invalidate_cache()
+
+    def invalidate_cache(self) -> None:
+        self._query_cache.clear()
+        self._result_cache.clear()
 
-    def search(self, query: str, *, filters: Filter | None = None) -> List[dict]:
-        vector = self.embedding_service.embed_query(query)
-        results = self.client.search(
-            collection_name=self.config.collection_name,
-            query_vector=vector.tolist(),
-            limit=self.config.top_k,
-            query_filter=filters,
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        return {
+            "query": self._query_cache.stats(),
+            "results": self._result_cache.stats(),
+        }
+
+    def _embed_query(self, query: str):
+        vector = self._query_cache.get(query)
+        if vector is None:
+            vector = self.embedding_service.embed_query(query)
+            self._query_cache.set(query, vector)
+        return vector
+
+    def search(
+        self, query: str, *, filters: Mapping[str, Any] | Filter | None = None
+    ) -> List[dict]:
+        """Top-k documents for ``query``; ``filters`` map payload fields to values.
+
+        Qdrant ``Filter`` objects are accepted too, but only by the Qdrant store, and
+        they skip the keyword ranking. ``score`` is always the vector similarity,
+        ``None`` for chunks found only by keyword; hybrid results are ordered by
+        an added ``fusion_score``.
+        """
+
+        lexical = (
+            self.lexical if filters is None or isinstance(filters, Mapping) else None
         )
-        documents: list[dict] = []
-        for point in results:
-            payload = point.payload or {}
-            documents.append(
-                {
-                    "id": point.id,
-                    "score": point.score,
-                    "text": payload.get("text", ""),
-                    "metadata": {k: v for k, v in payload.items() if k != "text"},
-                }
+        key = (
+            query,
+            _filter_key(filters),
+            self.config.top_k,
+            self.collection_version,
+            lexical is not None,
+        )
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        vector = self._embed_query(query)
+        ranked: list[tuple[Any, float | None, dict[str, Any], float | None]]
+        # The isinstance check repeats the one above for the type checker.
+        if lexical is not None and (filters is None or isinstance(filters, Mapping)):
+            ranked = self._hybrid_search(query, vector, lexical, filters)
+        else:
+            # A Qdrant Filter is passed through; only QdrantIndexer understands it.
+            hits = self.store.search(
+                vector,
+                limit=self.config.top_k,
+                filters=filters,  # type: ignore[arg-type]
             )
+            ranked = [(hit.id, hit.score, hit.payload, None) for hit in hits]
+        documents: list[dict] = []
+        for doc_id, score, payload, fusion_score in ranked:
+            document = {
+                "id": doc_id,
+                "score": score,
+                "text": payload.get("text", ""),
+                "metadata": {k: v for k, v in payload.items() if k != "text"},
+            }
+            if fusion_score is not None:
+                document["fusion_score"] = fusion_score
+            documents.append(document)
+        self._result_cache.set(key, copy.deepcopy(documents))
         return documents
 
+    def _hybrid_search(
+        self,
+        query: str,
+        vector: Any,
+        lexical: BM25Index,
+        filters: Mapping[str, Any] | None,
+    ) -> list[tuple[Any, float | None, dict[str, Any], float | None]]:
+        """``(id, vector score, payload, fused score)`` of the best ``top_k``."""
+
+        depth = max(self.config.top_k, self.config.fusion_candidates)
+        dense = self.store.search(vector, limit=depth, filters=filters)
+        matches, _ = lexical.rank(query, limit=depth, filters=filters)
+        keyword_ids = {lexical.doc_ids[doc]: doc for doc in matches}
+        # Qdrant may return integer or UUID ids; fuse on their string form.
+        found = {str(hit.id): hit for hit in dense}
+        fused = reciprocal_rank_fusion(
+            [list(found), list(keyword_ids)], k=self.config.rrf_k
+        )
+        ranked: list[tuple[Any, float | None, dict[str, Any], float | None]] = []
+        for key, score in fused[: self.config.top_k]:
+            hit = found.get(key)
+            if hit is None:
+                # Keyword-only payloads are decoded for the final results only.
+                ranked.append((key, None, lexical.payload(keyword_ids[key]), score))
+            else:
+                ranked.append((hit.id, hit.score, hit.payload, score))
+        return ranked
+
 
 __all__ = ["RetrievalService", "RetrievalConfig"]
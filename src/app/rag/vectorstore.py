@@ -0,0 +1,797 @@
+"""Pluggable vector stores for the RAG corpus.
+
+:class:`QdrantIndexer` talks to a Qdrant server; :class:`LocalVectorStore` keeps the
+collection in this process, so retrieval needs no network hop and tests or air-gapped
+nodes need no server. Both implement :class:`VectorStore`.
+
+The local store holds unit-normalised vectors in a memory-mapped float32 or float16
+matrix and answers queries with an exact matrix-vector product followed by
+``argpartition``. Its cost is a full pass over the matrix. That is a few milliseconds up
+to roughly 100k chunks; a 1M x 384 float32 matrix (1.5 GB) is limited by memory
+bandwidth to tens of milliseconds per query. For larger collections, build an
+approximate index offline with :meth:`LocalVectorStore.build_index` (see
+:mod:`app.rag.ann`).
+
+On-disk layout, one directory per collection::
+
+    meta.json        dimension, dtype, row count, filter vocabularies (written last)
+    vectors.bin      capacity x dimension matrix
+    ids.jsonl        document id per row, append-only
+    payloads.jsonl   payload per upsert, append-only; rows point at their latest line
+    state.npz        per-row liveness, payload offsets and filter codes
+    ann/             optional approximate index over the rows present when it was built
+
+:meth:`LocalVectorStore.compact` writes a complete copy next to the collection
+(``<name>.compacting``, renamed to ``<name>.compacted`` once whole) and swaps it in with
+directory renames; opening the store finishes or discards an interrupted swap.
+
+Several processes may open the same collection (e.g. one per API worker). Writes hold an
+exclusive ``flock`` on ``<name>.lock`` and first reload anything another process
+committed; searches reload when ``meta.json`` has been replaced since they last read it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Literal, Mapping, Protocol, Sequence
+
+import numpy as np
+
+from .ann import (
+    HNSWConfig,
+    HNSWIndex,
+    IVFPQConfig,
+    IVFPQIndex,
+    build_ann_index,
+    load_ann_index,
+    save_ann_index,
+)
+from .corpus import DocumentEntry
+
+try:  # pragma: no cover - not available on Windows
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+STORE_FORMAT_VERSION = 1
+# Filters matching fewer rows than this are scanned exactly even with an index.
+EXACT_SCAN_ROWS = 10_000
+# Superseded payload bytes tolerated before an upsert or delete compacts the collection;
+# compaction also requires them to outweigh the live payloads.
+PAYLOAD_COMPACT_BYTES = 16 << 20
+
+
+@dataclass(slots=True)
+class SearchHit:
+    id: str
+    score: float
+    payload: dict[str, Any]
+
+
+class VectorStore(Protocol):
+    """Collection lifecycle, upserts and top-k search used by indexing and retrieval.
+
+    ``filters`` map a payload field to a value, or to a list of accepted values.
+    """
+
+    config: Any
+
+    def collection_exists(self) -> bool: ...
+
+    def ensure_collection(self, vector_size: int) -> None: ...
+
+    def upsert_documents(
+        self, entries: Iterable[DocumentEntry], embeddings: np.ndarray
+    ) -> None: ...
+
+    def delete_documents(self, doc_ids: Iterable[str]) -> None: ...
+
+    def search(
+        self,
+        vector: Sequence[float] | np.ndarray,
+        *,
+        limit: int,
+        filters: Mapping[str, Any] | None = None,
+    ) -> list[SearchHit]: ...
+
+
+@dataclass(slots=True)
+class LocalStoreConfig:
+    directory: str | Path = "data/rag/vectors"
+    collection_name: str = "exoai_corpus"
+    dtype: Literal["float32", "float16"] = "float32"
+    # Payload fields that can be used in search filters.
+    filter_fields: tuple[str, ...] = ("mission", "source")
+    # Rows scored per block; bounds the float32 copy made of float16 storage.
+    block_rows: int = 1 << 18
+    initial_capacity: int = 1024
+    # Approximate index to load: None (exact search), "ivfpq" or "hnsw".
+    index: str | None = None
+    nprobe: int = 16
+    ef_search: int = 64
+    # Index candidates per requested result that are re-scored against the stored
+    # vectors; 0 returns the index's approximate scores.
+    rerank: int = 16
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _top_k(
+    rows: np.ndarray, scores: np.ndarray, k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """The ``k`` best rows, best first."""
+
+    if k < scores.shape[0]:
+        top = np.argpartition(-scores, k - 1)[:k]
+        rows, scores = rows[top], scores[top]
+    order = np.argsort(-scores, kind="stable")
+    return rows[order], scores[order]
+
+
+def _accepted(value: Any) -> list[Any]:
+    return list(value) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+
+
+def _read_payloads(handle: IO[bytes], offsets: np.ndarray) -> list[dict[str, Any]]:
+    payloads = []
+    for start, length in offsets:
+        handle.seek(int(start))
+        payloads.append(json.loads(handle.read(int(length))))
+    return payloads
+
+
+class LocalVectorStore:
+    """Cosine search over a memory-mapped matrix persisted under ``directory``.
+
+    Search is exact unless ``config.index`` names an approximate index built with
+    :meth:`build_index`.
+    """
+
+    def __init__(self, config: LocalStoreConfig | None = None) -> None:
+        self.config = config or LocalStoreConfig()
+        self.path = Path(self.config.directory) / self.config.collection_name
+        self._dtype = np.dtype(self.config.dtype)
+        self._lock = threading.RLock()
+        # Outside the collection directory, which compaction replaces.
+        self._lock_path = self._sibling("lock")
+        # Bumped whenever rows are renumbered, so searches can tell they went stale.
+        self._generation = 0
+        # Identity of the meta.json this process last read or wrote.
+        self._signature: tuple[int, int, int] | None = None
+        self._reset()
+        self._load()
+
+    # -- state -----------------------------------------------------------------------
+
+    def _reset(self) -> None:
+        self._dim: int | None = None
+        self._count = 0
+        self._dead = 0
+        self._matrix: np.ndarray | None = None
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._offsets = np.zeros((0, 2), dtype=np.int64)
+        self._codes = {
+            name: np.zeros(0, dtype=np.int32) for name in self.config.filter_fields
+        }
+        self._vocab: dict[str, dict[str, int]] = {
+            name: {} for name in self.config.filter_fields
+        }
+        self._saved_ids = 0
+        # Size of payloads.jsonl and the part of it still referenced by live rows.
+        self._payload_bytes = 0
+        self._live_payload_bytes = 0
+        self._index: IVFPQIndex | HNSWIndex | None = None
+
+    @property
+    def dimension(self) -> int | None:
+        return self._dim
+
+    def __len__(self) -> int:
+        return self._count - self._dead
+
+    def _sibling(self, tag: str) -> Path:
+        return self.path.with_name(f"{self.path.name}.{tag}")
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False) -> Iterator[None]:
+        self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock_path.open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _disk_signature(self) -> tuple[int, int, int] | None:
+        # meta.json is replaced, never rewritten in place, so each commit changes it.
+        try:
+            stat = (self.path / "meta.json").stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _sync(self) -> None:
+        """Hold both locks, reloading if another process has committed since."""
+
+        if self._disk_signature() != self._signature:
+            self._reset()
+            self._read()
+            self._generation += 1
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        with self._lock, self._file_lock():
+            self._recover()
+            self._sync()
+            yield
+
+    def _swap_in(self, finished: Path) -> None:
+        retired = self._sibling("retired")
+        shutil.rmtree(retired, ignore_errors=True)
+        if self.path.exists():
+            os.replace(self.path, retired)
+        os.replace(finished, self.path)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def _recover(self) -> None:
+        """Finish a compaction whose copy was complete; discard one that was not."""
+
+        shutil.rmtree(self._sibling("compacting"), ignore_errors=True)
+        finished = self._sibling("compacted")
+        if finished.exists():
+            LOGGER.warning("Completing an interrupted compaction of %s", self.path)
+            self._swap_in(finished)
+        shutil.rmtree(self._sibling("retired"), ignore_errors=True)
+
+    def _load(self) -> None:
+        with self._lock, self._file_lock():
+            self._recover()
+            self._read()
+
+    def _read(self) -> None:
+        meta_path = self.path / "meta.json"
+        self._signature = self._disk_signature()
+        if self._signature is None:
+            return
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if (
+            meta.get("format") != STORE_FORMAT_VERSION
+            or meta.get("dtype") != self._dtype.name
+        ):
+            raise ValueError(
+                f"Vector store at {self.path} has an incompatible format or dtype"
+            )
+        self._dim, self._count = int(meta["dim"]), int(meta["count"])
+        capacity = int(meta["capacity"])
+        self._matrix = np.memmap(
+            self.path / "vectors.bin",
+            dtype=self._dtype,
+            mode="r+",
+            shape=(capacity, self._dim),
+        )
+        with (self.path / "ids.jsonl").open(encoding="utf-8") as handle:
+            self._ids = [
+                json.loads(line) for _, line in zip(range(self._count), handle)
+            ]
+        self._saved_ids = self._count
+        with np.load(self.path / "state.npz") as state:
+            self._alive = np.zeros(capacity, dtype=bool)
+            self._alive[: self._count] = state["alive"]
+            self._offsets = np.zeros((capacity, 2), dtype=np.int64)
+            self._offsets[: self._count] = state["offsets"]
+            for name in self.config.filter_fields:
+                codes = np.full(capacity, -1, dtype=np.int32)
+                if f"codes_{name}" in state:
+                    codes[: self._count] = state[f"codes_{name}"]
+                self._codes[name] = codes
+        self._vocab.update(
+            {name: dict(values) for name, values in meta.get("vocab", {}).items()}
+        )
+        self._rows = {
+            doc_id: row for row, doc_id in enumerate(self._ids) if self._alive[row]
+        }
+        self._dead = self._count - len(self._rows)
+        self._payload_bytes = (self.path / "payloads.jsonl").stat().st_size
+        self._live_payload_bytes = int(
+            self._offsets[: self._count][self._alive[: self._count], 1].sum()
+        )
+        if self.config.index:
+            self._index = load_ann_index(
+                self.path / "ann",
+                nprobe=self.config.nprobe,
+                ef_search=self.config.ef_search,
+            )
+            if self._index is None:
+                LOGGER.warning(
+                    "No %s index under %s; using exact search",
+                    self.config.index,
+                    self.path,
+                )
+            elif self._index.kind != self.config.index:
+                LOGGER.warning(
+                    "Expected a %s index, loaded %s",
+                    self.config.index,
+                    self._index.kind,
+                )
+
+    def _save(self, directory: Path | None = None) -> None:
+        """Persist row metadata; ``meta.json`` is replaced last and marks the commit."""
+
+        assert self._matrix is not None
+        path = directory or self.path
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        if self._saved_ids < self._count:
+            with (path / "ids.jsonl").open("a", encoding="utf-8") as handle:
+                handle.writelines(
+                    json.dumps(doc_id) + "\n"
+                    for doc_id in self._ids[self._saved_ids : self._count]
+                )
+            self._saved_ids = self._count
+        arrays: dict[str, Any] = {
+            "alive": self._alive[: self._count],
+            "offsets": self._offsets[: self._count],
+        }
+        arrays.update(
+            {
+                f"codes_{name}": codes[: self._count]
+                for name, codes in self._codes.items()
+            }
+        )
+        with (path / "state.npz.tmp").open("wb") as handle:
+            np.savez(handle, **arrays)
+        os.replace(path / "state.npz.tmp", path / "state.npz")
+        meta = {
+            "format": STORE_FORMAT_VERSION,
+            "dim": self._dim,
+            "dtype": self._dtype.name,
+            "count": self._count,
+            "capacity": self._matrix.shape[0],
+            "vocab": self._vocab,
+        }
+        (path / "meta.json.tmp").write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(path / "meta.json.tmp", path / "meta.json")
+        if directory is None:
+            self._signature = self._disk_signature()
+
+    def _wasteful(self) -> bool:
+        superseded = self._payload_bytes - self._live_payload_bytes
+        return superseded > max(PAYLOAD_COMPACT_BYTES, self._live_payload_bytes)
+
+    @property
+    def compaction_pending(self) -> bool:
+        """Whether deleted rows or superseded payloads are due to be compacted away.
+
+        Upserts and deletes compact automatically unless an approximate index exists,
+        since compaction renumbers rows and would drop it; :meth:`build_index`
+        compacts first.
+        """
+
+        return self._dead > max(1024, self._count // 2) or self._wasteful()
+
+    def _maybe_compact(self) -> None:
+        if not self.compaction_pending:
+            self._save()
+        elif self._index is not None or (self.path / "ann").exists():
+            LOGGER.info(
+                "Deferring compaction of %s until the approximate index is rebuilt",
+                self.path,
+            )
+            self._save()
+        else:
+            self._compact()
+
+    def _reserve(self, rows: int) -> None:
+        assert self._matrix is not None and self._dim is not None
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity)
+        tmp_path = self.path / "vectors.bin.tmp"
+        grown = np.memmap(
+            tmp_path, dtype=self._dtype, mode="w+", shape=(capacity, self._dim)
+        )
+        grown[: self._count] = self._matrix[: self._count]
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self.path / "vectors.bin")
+        # Searches holding the old mapping keep reading the unlinked file until done.
+        self._matrix = np.memmap(
+            self.path / "vectors.bin",
+            dtype=self._dtype,
+            mode="r+",
+            shape=(capacity, self._dim),
+        )
+        extra = capacity - self._alive.shape[0]
+        self._alive = np.concatenate((self._alive, np.zeros(extra, dtype=bool)))
+        self._offsets = np.concatenate(
+            (self._offsets, np.zeros((extra, 2), dtype=np.int64))
+        )
+        for name, codes in self._codes.items():
+            self._codes[name] = np.concatenate(
+                (codes, np.full(extra, -1, dtype=np.int32))
+            )
+
+    # -- VectorStore -----------------------------------------------------------------
+
+    def collection_exists(self) -> bool:
+        return self._dim is not None
+
+    def ensure_collection(self, vector_size: int) -> None:
+        with self._writing():
+            self._create(vector_size)
+
+    def _create(self, vector_size: int) -> None:
+        if self._dim is not None:
+            if self._dim != vector_size:
+                raise ValueError(
+                    f"Collection has dimension {self._dim}, "
+                    f"got vectors of size {vector_size}"
+                )
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        for name in ("vectors.bin", "ids.jsonl", "payloads.jsonl", "state.npz"):
+            (self.path / name).unlink(missing_ok=True)
+        shutil.rmtree(self.path / "ann", ignore_errors=True)
+        (self.path / "ids.jsonl").touch()
+        (self.path / "payloads.jsonl").touch()
+        self._dim = vector_size
+        capacity = max(1, self.config.initial_capacity)
+        self._matrix = np.memmap(
+            self.path / "vectors.bin",
+            dtype=self._dtype,
+            mode="w+",
+            shape=(capacity, vector_size),
+        )
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._offsets = np.zeros((capacity, 2), dtype=np.int64)
+        self._codes = {
+            name: np.full(capacity, -1, dtype=np.int32)
+            for name in self.config.filter_fields
+        }
+        self._save()
+
+    def upsert_documents(
+        self, entries: Iterable[DocumentEntry], embeddings: np.ndarray
+    ) -> None:
+        entries = list(entries)
+        if not entries:
+            return
+        vectors = _normalise(
+            np.asarray(embeddings, dtype=np.float32).reshape(len(entries), -1)
+        )
+        with self._writing():
+            self._create(vectors.shape[1])
+            assert self._matrix is not None
+            new_ids = {
+                entry.doc_id for entry in entries if entry.doc_id not in self._rows
+            }
+            self._reserve(self._count + len(new_ids))
+            rows = np.empty(len(entries), dtype=np.int64)
+            with (self.path / "payloads.jsonl").open("ab") as payloads:
+                for idx, entry in enumerate(entries):
+                    row = self._rows.get(entry.doc_id)
+                    if row is None:
+                        row = self._count
+                        self._count += 1
+                        self._ids.append(entry.doc_id)
+                        self._rows[entry.doc_id] = row
+                    else:
+                        self._live_payload_bytes -= int(self._offsets[row, 1])
+                    line = (
+                        json.dumps({"text": entry.text, **entry.metadata}).encode(
+                            "utf-8"
+                        )
+                        + b"\n"
+                    )
+                    self._offsets[row] = (payloads.tell(), len(line))
+                    self._live_payload_bytes += len(line)
+                    payloads.write(line)
+                    for name, codes in self._codes.items():
+                        value = entry.metadata.get(name)
+                        codes[row] = (
+                            -1
+                            if value is None
+                            else self._vocab[name].setdefault(
+                                str(value), len(self._vocab[name])
+                            )
+                        )
+                    rows[idx] = row
+                self._payload_bytes = payloads.tell()
+            # Rows of repeated ids in one batch keep the last vector, like the payload.
+            self._matrix[rows] = vectors.astype(self._dtype, copy=False)
+            self._alive[rows] = True
+            # Re-upserting the same documents leaves their old payload lines behind.
+            self._maybe_compact()
+
+    def delete_documents(self, doc_ids: Iterable[str]) -> None:
+        with self._writing():
+            rows = [
+                self._rows.pop(doc_id) for doc_id in doc_ids if doc_id in self._rows
+            ]
+            if not rows or self._matrix is None:
+                return
+            self._alive[rows] = False
+            self._dead += len(rows)
+            self._live_payload_bytes -= int(self._offsets[rows, 1].sum())
+            self._maybe_compact()
+
+    def search(
+        self,
+        vector: Sequence[float] | np.ndarray,
+        *,
+        limit: int,
+        filters: Mapping[str, Any] | None = None,
+    ) -> list[SearchHit]:
+        while True:
+            with self._lock:
+                if self._disk_signature() != self._signature:
+                    with self._file_lock(shared=True):
+                        self._sync()
+                generation = self._generation
+                matrix, count, dead, index = (
+                    self._matrix,
+                    self._count,
+                    self._dead,
+                    self._index,
+                )
+                alive = self._alive[:count]
+                codes = {name: values[:count] for name, values in self._codes.items()}
+                vocab = self._vocab
+            if matrix is None or count == 0 or limit < 1:
+                return []
+            query = _normalise(np.asarray(vector, dtype=np.float32).ravel())
+            if query.shape[0] != matrix.shape[1]:
+                raise ValueError(
+                    f"Query has dimension {query.shape[0]}, "
+                    f"collection has {matrix.shape[1]}"
+                )
+
+            mask = alive if dead else None
+            for name, value in (filters or {}).items():
+                if name not in codes:
+                    raise ValueError(
+                        f"Payload field '{name}' is not indexed for filtering"
+                    )
+                allowed = [
+                    vocab[name][str(item)]
+                    for item in _accepted(value)
+                    if str(item) in vocab[name]
+                ]
+                matched = np.isin(codes[name], allowed)
+                mask = matched if mask is None else mask & matched
+
+            matching = count if mask is None else int(np.count_nonzero(mask))
+            if matching == 0:
+                return []
+            found = None
+            if index is not None and matching > EXACT_SCAN_ROWS:
+                found = self._approximate(index, matrix, count, query, limit, mask)
+            if found is None:
+                found = self._exact(matrix, count, query, limit, mask)
+            rows, scores = found
+            with self._lock, self._file_lock(shared=True):
+                if (
+                    self._generation != generation
+                    or self._disk_signature() != self._signature
+                ):
+                    # Compacted while scoring: the row numbers refer to the old layout.
+                    continue
+                ids = [self._ids[row] for row in rows]
+                offsets = self._offsets[rows].copy()
+                # An open handle keeps reading this file even if compaction replaces it.
+                handle = (self.path / "payloads.jsonl").open("rb")
+            with handle:
+                payloads = _read_payloads(handle, offsets)
+            return [
+                SearchHit(id=doc_id, score=float(score), payload=payload)
+                for doc_id, score, payload in zip(ids, scores, payloads)
+            ]
+
+    def _exact(
+        self,
+        matrix: np.ndarray,
+        count: int,
+        query: np.ndarray,
+        limit: int,
+        mask: np.ndarray | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if mask is None:
+            return _top_k(
+                np.arange(count), self._scores(matrix, 0, count, query), limit
+            )
+        rows = np.flatnonzero(mask)
+        # Selective filters score only the matching rows.
+        if rows.size * 4 < count:
+            return _top_k(rows, self._gather_scores(matrix, rows, query), limit)
+        return _top_k(rows, self._scores(matrix, 0, count, query)[rows], limit)
+
+    def _approximate(
+        self,
+        index,
+        matrix: np.ndarray,
+        count: int,
+        query: np.ndarray,
+        limit: int,
+        mask: np.ndarray | None,
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """Index candidates plus an exact scan of rows added after the build.
+
+        Returns ``None`` when the index finds fewer than ``limit`` rows (e.g. a filter
+        removes most of the probed cells), so the caller falls back to an exact scan.
+        """
+
+        covered = min(index.rows, count)
+        covered_mask = None if mask is None else mask[:covered]
+        rows, scores = index.search(
+            query, limit * max(1, self.config.rerank), covered_mask
+        )
+        reachable = (
+            covered if covered_mask is None else int(np.count_nonzero(covered_mask))
+        )
+        if rows.size < min(limit, reachable):
+            return None
+        if self.config.rerank and rows.size:
+            scores = self._gather_scores(matrix, rows, query)
+        if covered < count:
+            tail = np.arange(covered, count)
+            if mask is not None:
+                tail = tail[mask[covered:]]
+            rows = np.concatenate((rows, tail))
+            scores = np.concatenate((scores, self._gather_scores(matrix, tail, query)))
+        return _top_k(rows, scores, limit)
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray]:
+        """Stored unit vectors (a view of the mapping) and a copy of the live mask."""
+
+        with self._lock:
+            if self._matrix is None:
+                return np.zeros((0, self._dim or 0), dtype=self._dtype), np.zeros(
+                    0, dtype=bool
+                )
+            return self._matrix[: self._count], self._alive[: self._count].copy()
+
+    def build_index(self, config: IVFPQConfig | HNSWConfig) -> None:
+        """Compact, then build, save and start using an approximate index of the rows.
+
+        Rows upserted afterwards are searched exactly until the next build. Rows updated
+        in place keep their old position in the index, and automatic compaction is
+        deferred while an index exists (see :attr:`compaction_pending`), so rebuild
+        after large re-indexing runs.
+        """
+
+        while True:
+            with self._writing():
+                if self._dead or self._payload_bytes > self._live_payload_bytes:
+                    self._compact()
+                generation = self._generation
+                vectors, alive = self.snapshot()
+            if not alive.any():
+                raise ValueError("Cannot build an index over an empty collection")
+            # Built without the locks held; retried if the rows were renumbered.
+            index = build_ann_index(vectors, alive, config)
+            if hasattr(index, "nprobe"):
+                index.nprobe = self.config.nprobe
+            if hasattr(index, "ef_search"):
+                index.ef_search = self.config.ef_search
+            with self._writing():
+                if self._generation != generation:
+                    continue
+                save_ann_index(index, self.path / "ann")
+                self._index = index
+                # A new meta.json makes other processes reload and pick up the index.
+                self._save()
+                return
+
+    # -- helpers ---------------------------------------------------------------------
+
+    def _scores(
+        self, matrix: np.ndarray, start: int, stop: int, query: np.ndarray
+    ) -> np.ndarray:
+        if self._dtype == np.float32 and stop - start <= self.config.block_rows * 4:
+            return matrix[start:stop] @ query
+        scores = np.empty(stop - start, dtype=np.float32)
+        for block in range(start, stop, self.config.block_rows):
+            end = min(block + self.config.block_rows, stop)
+            scores[block - start : end - start] = (
+                matrix[block:end].astype(np.float32, copy=False) @ query
+            )
+        return scores
+
+    def _gather_scores(
+        self, matrix: np.ndarray, rows: np.ndarray, query: np.ndarray
+    ) -> np.ndarray:
+        scores = np.empty(rows.shape[0], dtype=np.float32)
+        for block in range(0, rows.shape[0], self.config.block_rows):
+            chunk = rows[block : block + self.config.block_rows]
+            scores[block : block + chunk.shape[0]] = (
+                matrix[chunk].astype(np.float32, copy=False) @ query
+            )
+        return scores
+
+    def compact(self) -> None:
+        """Rewrite the collection without deleted rows and superseded payloads.
+
+        The copy is built in a sibling directory and swapped in by renames, so a crash
+        at any point leaves either the old or the new collection complete on disk.
+        """
+
+        with self._writing():
+            self._compact()
+
+    def _compact(self) -> None:
+        if self._matrix is None or self._dim is None:
+            return
+        keep = np.flatnonzero(self._alive[: self._count])
+        count = keep.shape[0]
+        capacity = max(count, self.config.initial_capacity, 1)
+        staging = self._sibling("compacting")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        matrix = np.memmap(
+            staging / "vectors.bin",
+            dtype=self._dtype,
+            mode="w+",
+            shape=(capacity, self._dim),
+        )
+        for block in range(0, count, self.config.block_rows):
+            rows = keep[block : block + self.config.block_rows]
+            matrix[block : block + rows.shape[0]] = self._matrix[rows]
+        ids = [self._ids[row] for row in keep]
+        with (staging / "ids.jsonl").open("w", encoding="utf-8") as handle:
+            handle.writelines(json.dumps(doc_id) + "\n" for doc_id in ids)
+        offsets = np.zeros((capacity, 2), dtype=np.int64)
+        with (self.path / "payloads.jsonl").open("rb") as source, (
+            staging / "payloads.jsonl"
+        ).open("wb") as target:
+            for row, (start, length) in enumerate(self._offsets[keep]):
+                source.seek(int(start))
+                offsets[row] = (target.tell(), length)
+                target.write(source.read(int(length)))
+            payload_bytes = target.tell()
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:count] = True
+        codes = {}
+        for name, values in self._codes.items():
+            codes[name] = np.full(capacity, -1, dtype=np.int32)
+            codes[name][:count] = values[keep]
+        if self._index is not None or (self.path / "ann").exists():
+            LOGGER.warning(
+                "Compaction renumbers rows; "
+                "dropping the approximate index until it is rebuilt"
+            )
+
+        self._matrix, self._count, self._dead = matrix, count, 0
+        self._ids, self._saved_ids = ids, count
+        self._rows = {doc_id: row for row, doc_id in enumerate(ids)}
+        self._alive, self._offsets, self._codes = alive, offsets, codes
+        self._payload_bytes = self._live_payload_bytes = payload_bytes
+        self._index = None
+        self._generation += 1
+        self._save(staging)
+        finished = self._sibling("compacted")
+        shutil.rmtree(finished, ignore_errors=True)
+        os.replace(staging, finished)
+        # The old directory, including any ann/ index, is retired with the swap.
+        self._swap_in(finished)
+        self._signature = self._disk_signature()
+
+
+__all__ = ["LocalStoreConfig", "LocalVectorStore", "SearchHit", "VectorStore"]
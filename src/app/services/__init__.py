@@ -1,5 +1,6 @@
 """Service layer for inference and background jobs."""
 
+from .batching import BatchingConfig, MicroBatcher
 from .inference import InferenceService
 
-__all__ = ["InferenceService"]
+__all__ = ["BatchingConfig", "InferenceService", "MicroBatcher"]
@@ -0,0 +1,83 @@
+"""Model runtimes for CPU/GPU inference: eager PyTorch, TorchScript and ONNX Runtime."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import torch
+
+try:  # pragma: no cover - optional dependency
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover
+    ort = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torchscript", "onnx")
+
+
+def _ensure_onnxruntime() -> None:
+    if ort is None:  # pragma: no cover
+        raise ImportError(
+            "onnxruntime is required for the 'onnx' inference backend. "
+            "Install dependencies first."
+        )
+
+
+def configure_torch_threads(
+    intra_op_threads: int | None, inter_op_threads: int | None
+) -> None:
+    """Apply thread limits to the process-wide PyTorch CPU pools."""
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads and torch.get_num_interop_threads() != inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError:
+            # Only allowed before the first parallel region runs in this process.
+            LOGGER.warning(
+                "Could not set inter-op threads; PyTorch pool already started"
+            )
+
+
+class OnnxRuntimeModel:
+    """Runs an exported classifier with ONNX Runtime on CPU.
+
+    Requests are served one batch at a time by the inference stage, so the session runs
+    graph nodes sequentially and spends its threads inside each operator.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        intra_op_threads: int | None = None,
+        inter_op_threads: int | None = 1,
+        providers: list[str] | None = None,
+    ) -> None:
+        _ensure_onnxruntime()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads
+        self.session = ort.InferenceSession(
+            str(path),
+            sess_options=options,
+            providers=providers or ["CPUExecutionProvider"],
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, inputs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        logits, attention = self.session.run(
+            None, {self.input_name: np.ascontiguousarray(inputs, dtype=np.float32)}
+        )
+        return logits, attention
+
+
+__all__ = ["BACKENDS", "OnnxRuntimeModel", "configure_torch_threads"]
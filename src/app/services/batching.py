@@ -0,0 +1,209 @@
+"""Cross-request dynamic micro-batching in front of the classifier."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Protocol, Sequence
+
+import numpy as np
+
+from ..telemetry import (
+    INFERENCE_BATCH_SIZE,
+    INFERENCE_QUEUE_DEPTH,
+    INFERENCE_QUEUE_WAIT,
+    STAGE_LATENCY,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+Prediction = tuple[int, float, np.ndarray]
+
+
+class BatchPredictor(Protocol):
+    def predict_batch(
+        self, inputs: np.ndarray, lengths: Sequence[int] | None = None
+    ) -> list[Prediction]: ...
+
+
+@dataclass(slots=True)
+class BatchingConfig:
+    max_batch_size: int = 32
+    max_wait_ms: float = 5.0
+    # 0 only batches samples of identical length (bit-exact with unbatched inference);
+    # a positive value right-pads samples up to the next multiple of this many cadences.
+    length_bucket: int = 0
+
+
+@dataclass(slots=True)
+class _Pending:
+    inputs: np.ndarray
+    future: asyncio.Future
+    enqueued_at: float
+
+
+def _bucket_length(length: int, bucket: int) -> int:
+    if bucket <= 0:
+        return length
+    return -(-length // bucket) * bucket
+
+
+def _pad_batch(samples: Sequence[np.ndarray], length: int) -> np.ndarray:
+    channels = samples[0].shape[0]
+    batch = np.zeros((len(samples), channels, length), dtype=np.float32)
+    for idx, sample in enumerate(samples):
+        batch[idx, :, : sample.shape[-1]] = sample
+    return batch
+
+
+class MicroBatcher:
+    """Collects concurrent predict calls and serves them with batched forward passes."""
+
+    def __init__(
+        self,
+        predictor: BatchPredictor,
+        config: BatchingConfig | None = None,
+        *,
+        executor: Executor | None = None,
+    ) -> None:
+        self.predictor = predictor
+        self.config = config or BatchingConfig()
+        if self.config.max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.executor = executor
+        self._queue: asyncio.Queue[_Pending] | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_worker(self) -> asyncio.Queue[_Pending]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        assert self._queue is not None
+        return self._queue
+
+    async def submit(self, inputs: np.ndarray) -> Prediction:
+        """Queue one (channels, sequence_length) sample and wait for its prediction."""
+
+        if inputs.ndim != 2:
+            raise ValueError("Expected inputs with shape (channels, sequence_length)")
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put(
+            _Pending(np.asarray(inputs, dtype=np.float32), future, time.perf_counter())
+        )
+        INFERENCE_QUEUE_DEPTH.inc()
+        return await future
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _collect(
+        self, queue: asyncio.Queue[_Pending], batch: list[_Pending]
+    ) -> None:
+        """Fill ``batch`` in place, so items taken before cancellation stay visible."""
+
+        first = await queue.get()
+        batch.append(first)
+        deadline = first.enqueued_at + self.config.max_wait_ms / 1000.0
+        while len(batch) < self.config.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(queue.get_nowait())
+                else:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        INFERENCE_QUEUE_DEPTH.dec(len(batch))
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        batch: list[_Pending] = []
+        try:
+            while True:
+                batch = []
+                await self._collect(queue, batch)
+                groups: dict[tuple[int, int], list[_Pending]] = defaultdict(list)
+                for item in batch:
+                    key = (
+                        item.inputs.shape[0],
+                        _bucket_length(
+                            item.inputs.shape[-1], self.config.length_bucket
+                        ),
+                    )
+                    groups[key].append(item)
+
+                for (_, length), items in groups.items():
+                    live = [item for item in items if not item.future.done()]
+                    if not live:
+                        continue
+                    started = time.perf_counter()
+                    for item in live:
+                        INFERENCE_QUEUE_WAIT.observe(started - item.enqueued_at)
+                    INFERENCE_BATCH_SIZE.observe(len(live))
+                    lengths = [item.inputs.shape[-1] for item in live]
+                    try:
+                        stacked = _pad_batch([item.inputs for item in live], length)
+                        results = await loop.run_in_executor(
+                            self.executor,
+                            self.predictor.predict_batch,
+                            stacked,
+                            lengths,
+                        )
+                        if len(results) != len(live):
+                            raise RuntimeError(
+                                f"Predictor returned {len(results)} results "
+                                f"for {len(live)} inputs"
+                            )
+                        STAGE_LATENCY.labels(stage="inference").observe(
+                            time.perf_counter() - started
+                        )
+                    except Exception as exc:
+                        LOGGER.exception(
+                            "Batched inference failed", extra={"batch_size": len(live)}
+                        )
+                        _fail([item.future for item in live], exc)
+                        continue
+                    for item, result in zip(live, results):
+                        if not item.future.done():
+                            item.future.set_result(result)
+        finally:
+            # Whatever ends the worker (cancellation from close() included), no caller
+            # may be left waiting on a future that nothing will resolve.
+            pending = [item.future for item in batch]
+            while not queue.empty():
+                pending.append(queue.get_nowait().future)
+                INFERENCE_QUEUE_DEPTH.dec()
+            _fail(
+                pending,
+                RuntimeError("Micro-batcher stopped before serving the request"),
+            )
+
+
+def _fail(futures: Sequence[asyncio.Future], exc: BaseException) -> None:
+    for future in futures:
+        if not future.done():
+            future.set_exception(exc)
+
+
+__all__ = ["BatchingConfig", "MicroBatcher"]
@@ -2,20 +2,35 @@
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
 import numpy as np
 import torch
+from torch import nn
 
-from app.models.module import ExoplanetClassifier, ModelConfig
+from app.models.export import load_backbone
+from app.models.optimize import prepare_profile
+from app.telemetry import MODEL_LOAD_SECONDS
+
+from .backends import BACKENDS, OnnxRuntimeModel, configure_torch_threads
 
 
 @dataclass(slots=True)
 class InferenceConfig:
     checkpoint_path: str | None = None
     device: str | None = None
+    # "torch" serves the checkpoint eagerly; "torchscript" and "onnx" serve an artifact
+    # written by ``app.cli.export`` from ``model_path``.
+    backend: str = "torch"
+    model_path: str | None = None
+    intra_op_threads: int | None = None
+    inter_op_threads: int | None = 1
+    # Optimization profile built by ``app.cli.optimize``; overrides backend/model_path.
+    profile: str | None = None
+    profiles_dir: str = "data/artifacts/profiles"
 
 
 class InferenceService:
@@ -23,16 +38,57 @@ class InferenceService:
 
     def __init__(self, config: InferenceConfig | None = None) -> None:
         self.config = config or InferenceConfig()
+        if self.config.profile:
+            # Quantized profiles are traced TorchScript modules that run on CPU only.
+            self.config.model_path = str(
+                prepare_profile(self.config.profiles_dir, self.config.profile)
+            )
+            self.config.backend = "torchscript"
+            self.config.device = "cpu"
+        if self.config.backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend: {self.config.backend}")
         device = self.config.device or ("cuda" if torch.cuda.is_available() else "cpu")
         self.device = torch.device(device)
-        self.model = self._load_model().to(self.device)
-        self.model.eval()
+        self.runtime: OnnxRuntimeModel | None = None
+        self.model: nn.Module | None = None
+        started = time.perf_counter()
+        if self.config.backend == "onnx":
+            self.runtime = OnnxRuntimeModel(
+                self._artifact_path(),
+                intra_op_threads=self.config.intra_op_threads,
+                inter_op_threads=self.config.inter_op_threads,
+            )
+        else:
+            configure_torch_threads(
+                self.config.intra_op_threads, self.config.inter_op_threads
+            )
+            self.model = self._load_model().to(self.device)
+            self.model.eval()
+        MODEL_LOAD_SECONDS.labels(model="classifier").set(time.perf_counter() - started)
+
+    def _artifact_path(self) -> Path:
+        if not self.config.model_path or not Path(self.config.model_path).exists():
+            raise FileNotFoundError(
+                f"Backend '{self.config.backend}' needs an exported model; "
+                f"got {self.config.model_path!r}"
+            )
+        return Path(self.config.model_path)
 
-    def _load_model(self) -> ExoplanetClassifier:
+    def _load_model(self) -> nn.Module:
+        if self.config.backend == "torchscript":
+            return torch.jit.load(str(self._artifact_path()), map_location=self.device)
         checkpoint = self.config.checkpoint_path
         if checkpoint and Path(checkpoint).exists():
-            return ExoplanetClassifier.load_from_checkpoint(checkpoint)  # type: ignore[arg-type]
-        return ExoplanetClassifier(config=ModelConfig())
+            return load_backbone(checkpoint, map_location=self.device)
+        return load_backbone()
+
+    def _forward(self, inputs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if self.runtime is not None:
+            return self.runtime(inputs)
+        tensor = torch.from_numpy(inputs).to(self.device)
+        with torch.inference_mode():
+            logits, attention = self.model(tensor)  # type: ignore[misc]
+        return logits.float().cpu().numpy(), attention.float().cpu().numpy()
 
     def predict(self, inputs: np.ndarray) -> tuple[int, float, np.ndarray]:
         """Run inference on a single light-curve sample.
@@ -45,16 +101,50 @@ class InferenceService:
 
         if inputs.ndim != 2:
             raise ValueError("Expected inputs with shape (channels, sequence_length)")
-        tensor = torch.from_numpy(inputs).unsqueeze(0).to(self.device)
-        with torch.no_grad():
-            logits, attention = self.model(tensor)
-            probabilities = torch.softmax(logits, dim=1)
-        probability, prediction = torch.max(probabilities, dim=1)
-        return (
-            int(prediction.item()),
-            float(probability.item()),
-            attention.squeeze(0).detach().cpu().numpy(),
-        )
+        return self.predict_batch(inputs[np.newaxis])[0]
+
+    def predict_batch(
+        self,
+        inputs: np.ndarray,
+        lengths: Sequence[int] | None = None,
+    ) -> list[tuple[int, float, np.ndarray]]:
+        """Run one forward pass over a batch of equal-length samples.
+
+        Parameters
+        ----------
+        inputs : np.ndarray
+            Array shaped (batch, channels, sequence_length)
+        lengths : Sequence[int], optional
+            Unpadded length of each sample. Attention weights are cropped to the
+            matching prefix and renormalized when a sample was right-padded.
+        """
+
+        if inputs.ndim != 3:
+            raise ValueError(
+                "Expected inputs with shape (batch, channels, sequence_length)"
+            )
+        logits, weights = self._forward(np.ascontiguousarray(inputs, dtype=np.float32))
+        shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities = shifted / shifted.sum(axis=1, keepdims=True)
+        predictions = probabilities.argmax(axis=1).tolist()
+        confidences = probabilities.max(axis=1).tolist()
+
+        padded_length = inputs.shape[-1]
+        results: list[tuple[int, float, np.ndarray]] = []
+        for idx in range(inputs.shape[0]):
+            sample_attention = weights[idx]
+            if lengths is not None and lengths[idx] < padded_length:
+                valid = max(
+                    1, (sample_attention.shape[0] * int(lengths[idx])) // padded_length
+                )
+                sample_attention = sample_attention[:valid]
+                sample_attention = sample_attention / max(
+                    float(sample_attention.sum()), 1e-12
+                )
+            results.append(
+                (int(predictions[idx]), float(confidences[idx]), sample_attention)
+            )
+        return results
 
 
 __all__ = ["InferenceService", "InferenceConfig"]
@@ -0,0 +1,219 @@
+"""Process-wide Prometheus metrics.
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set before the application starts, prometheus_client
+keeps every value in per-process files under that directory and :func:`metrics_registry`
+aggregates them at scrape time, so any uvicorn/gunicorn worker reports the totals of all
+workers. Gauges declare how they combine across processes.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, Any, Mapping
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .preprocessing.cache import PreprocessingCache
+
+MULTIPROCESS_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+# Stages: upload, preprocess, inference, retrieval, generation, db_write, ingestion.
+STAGE_LATENCY = Histogram(
+    "exoai_stage_duration_seconds",
+    "Time spent in each pipeline stage, excluding executor queueing.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+PREPROCESS_STEP_LATENCY = Histogram(
+    "exoai_preprocess_step_duration_seconds",
+    "Time spent in each preprocessing step (load, clean, bls, fold).",
+    ["step"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+INFERENCE_BATCH_SIZE = Histogram(
+    "exoai_inference_batch_size",
+    "Number of samples per batched model forward pass.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+    registry=REGISTRY,
+)
+
+INFERENCE_QUEUE_WAIT = Histogram(
+    "exoai_inference_queue_wait_seconds",
+    "Time a sample waits in the micro-batcher before its forward pass starts.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    registry=REGISTRY,
+)
+
+INFERENCE_QUEUE_DEPTH = Gauge(
+    "exoai_inference_queue_depth",
+    "Samples waiting in the micro-batcher.",
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+
+EXECUTOR_PENDING = Gauge(
+    "exoai_executor_pending",
+    "Tasks admitted to a stage executor (running or queued).",
+    ["stage"],
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+
+EXECUTOR_REJECTED = Counter(
+    "exoai_executor_rejected_total",
+    "Tasks rejected because a stage executor was saturated.",
+    ["stage"],
+    registry=REGISTRY,
+)
+
+INGESTION_QUEUE_DEPTH = Gauge(
+    "exoai_ingestion_queue_depth",
+    "Ingestion requests waiting for a worker (excluding those backing off to retry).",
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+
+INGESTION_RUNNING = Gauge(
+    "exoai_ingestion_running",
+    "Ingestion requests currently being fetched.",
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+
+# Throughput: rate(exoai_ingestion_requests_total{outcome="succeeded"}[5m]).
+INGESTION_REQUESTS = Counter(
+    "exoai_ingestion_requests_total",
+    "Ingestion requests by outcome (succeeded, failed, retried, deduplicated).",
+    ["outcome"],
+    registry=REGISTRY,
+)
+
+CATALOG_PIPELINE_QUEUE_DEPTH = Gauge(
+    "exoai_catalog_pipeline_queue_depth",
+    "Light curves buffered between catalog pipeline stages (preprocess, write).",
+    ["stage"],
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+
+CATALOG_PIPELINE_RECORDS = Counter(
+    "exoai_catalog_pipeline_records_total",
+    "Catalogued light curves handled by the catalog pipeline, by outcome.",
+    ["outcome"],
+    registry=REGISTRY,
+)
+
+# Hit ratio: rate(...{result="hit"}) / rate(...) per cache.
+CACHE_LOOKUPS = Counter(
+    "exoai_cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ["cache", "result"],
+    registry=REGISTRY,
+)
+
+MODEL_LOAD_SECONDS = Gauge(
+    "exoai_model_load_seconds",
+    "Seconds taken by the most recent model load (classifier or embedding).",
+    ["model"],
+    multiprocess_mode="max",
+    registry=REGISTRY,
+)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get(MULTIPROCESS_ENV))
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry for ``/metrics``: this process's, or the multiprocess aggregate."""
+
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_process_dead(pid: int | None = None) -> None:
+    """Drop a stopped worker's live gauges from the multiprocess aggregate."""
+
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def record_cache_lookup(cache: str, hits: int = 0, misses: int = 0) -> None:
+    if hits:
+        CACHE_LOOKUPS.labels(cache=cache, result="hit").inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(cache=cache, result="miss").inc(misses)
+
+
+def observe_preprocessing(
+    result: Mapping[str, Any], *, cache: PreprocessingCache | None
+) -> None:
+    """Record the timings and cache outcome reported by ``preprocess_lightcurve``.
+
+    Preprocessing may run in a process pool, so the worker measures and the caller
+    observes; that way nothing is lost or double counted in either metrics mode. The
+    outcome is also credited to ``cache``'s own hit/miss counters.
+    """
+
+    if cache is not None:
+        hit = bool(result.get("metadata", {}).get("cache_hit"))
+        cache.record(hit)
+        record_cache_lookup("preprocessing", hits=int(hit), misses=int(not hit))
+    for step, seconds in (result.get("timings") or {}).items():
+        if step == "total":
+            STAGE_LATENCY.labels(stage="preprocess").observe(seconds)
+        else:
+            PREPROCESS_STEP_LATENCY.labels(step=step).observe(seconds)
+
+
+__all__ = [
+    "CACHE_LOOKUPS",
+    "CATALOG_PIPELINE_QUEUE_DEPTH",
+    "CATALOG_PIPELINE_RECORDS",
+    "EXECUTOR_PENDING",
+    "EXECUTOR_REJECTED",
+    "INFERENCE_BATCH_SIZE",
+    "INFERENCE_QUEUE_DEPTH",
+    "INFERENCE_QUEUE_WAIT",
+    "INGESTION_QUEUE_DEPTH",
+    "INGESTION_REQUESTS",
+    "INGESTION_RUNNING",
+    "MODEL_LOAD_SECONDS",
+    "PREPROCESS_STEP_LATENCY",
+    "REGISTRY",
+    "STAGE_LATENCY",
+    "mark_process_dead",
+    "metrics_registry",
+    "multiprocess_enabled",
+    "observe_preprocessing",
+    "record_cache_lookup",
+]
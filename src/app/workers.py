@@ -3,47 +3,219 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
+import multiprocessing
+import time
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from contextlib import suppress
+from dataclasses import astuple, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Literal
 
-from .dependencies import ensure_corpus_indexed
+from .catalog_pipeline import CatalogPipeline
+from .config import get_settings
+from .data.ingestion import IngestionRequest
+from .dependencies import ensure_corpus_indexed, get_catalog_pipeline
+from .jobs import DEFAULT_HANDLERS, JobWorker
+from .telemetry import (
+    INGESTION_QUEUE_DEPTH,
+    INGESTION_REQUESTS,
+    INGESTION_RUNNING,
+    STAGE_LATENCY,
+)
 
 LOGGER = logging.getLogger(__name__)
 
 
+def fetch_lightcurves(request: IngestionRequest) -> list[Path]:
+    """Default ingestion task; module-level so process workers can unpickle it."""
+
+    from . import dependencies
+
+    return dependencies.get_ingestion_service().fetch(request)
+
+
+@dataclass(order=True, slots=True)
+class _QueuedIngestion:
+    # Negated priority, then submission order: higher priority first, FIFO within one.
+    rank: int
+    sequence: int
+    request: IngestionRequest = field(compare=False)
+    key: tuple = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
 class IngestionQueue:
-    """Simple asynchronous queue for ingestion jobs."""
+    """Priority queue of ingestion requests served by a thread or process pool.
+
+    A request equal to one already queued, running or waiting to retry is dropped.
+    Failed fetches are retried with exponential backoff until ``max_attempts`` is
+    reached. ``after_fetch`` runs in this process after every attempt, successful or
+    not; process workers cannot reach objects living here, such as the catalog pipeline.
+    """
 
-    def __init__(self) -> None:
-        self._queue: asyncio.Queue = asyncio.Queue()
-        self._task: asyncio.Task | None = None
+    def __init__(
+        self,
+        fetch: Callable[[IngestionRequest], Any] = fetch_lightcurves,
+        *,
+        workers: int = 2,
+        executor: Literal["thread", "process"] = "thread",
+        max_attempts: int = 3,
+        backoff_seconds: float = 30.0,
+        max_backoff_seconds: float = 600.0,
+        after_fetch: Callable[[], None] | None = None,
+    ) -> None:
+        if workers < 1 or max_attempts < 1:
+            raise ValueError("workers and max_attempts must be at least 1")
+        self._fetch = fetch
+        self.workers = workers
+        self.executor_kind = executor
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.after_fetch = after_fetch
+        self._queue: asyncio.PriorityQueue[_QueuedIngestion] = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._active: set[tuple] = set()
+        self._retries: dict[tuple, asyncio.TimerHandle] = {}
+        self._executor: Executor | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._running = 0
+        self._counts = {"succeeded": 0, "failed": 0, "retried": 0, "deduplicated": 0}
 
     async def start(self) -> None:
-        if self._task is None or self._task.done():
-            self._task = asyncio.create_task(self._worker())
+        if self._tasks:
+            return
+        self._executor = self._create_executor()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
 
     async def stop(self) -> None:
-        if self._task is None:
-            return
-        self._task.cancel()
-        with suppress(asyncio.CancelledError):
-            await self._task
-        self._task = None
+        """Cancel the workers; queued and retrying requests are dropped."""
 
-    async def enqueue(self, func, *args, **kwargs) -> None:
-        await self._queue.put((func, args, kwargs))
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        INGESTION_QUEUE_DEPTH.dec(self._queue.qsize())
+        self._queue = asyncio.PriorityQueue()
+        self._active.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _create_executor(self) -> Executor:
+        if self.executor_kind == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="exoai-ingestion"
+        )
+
+    async def enqueue(self, request: IngestionRequest, *, priority: int = 0) -> bool:
+        """Queue ``request``; ``False`` when an identical one is already pending."""
+
+        key = astuple(request)
+        if key in self._active:
+            self._count("deduplicated")
+            return False
+        self._active.add(key)
+        self._put(_QueuedIngestion(-priority, next(self._sequence), request, key))
+        return True
+
+    async def join(self) -> None:
+        """Wait until every queued request, including retries, has finished."""
+
+        while self._active:
+            await self._queue.join()
+            if self._active:
+                await asyncio.sleep(0.01)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "running": self._running,
+            "retrying": len(self._retries),
+            **self._counts,
+        }
+
+    def _put(self, item: _QueuedIngestion) -> None:
+        self._retries.pop(item.key, None)
+        self._queue.put_nowait(item)
+        INGESTION_QUEUE_DEPTH.inc()
+
+    def _count(self, outcome: str) -> None:
+        self._counts[outcome] += 1
+        INGESTION_REQUESTS.labels(outcome=outcome).inc()
 
     async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
         while True:
-            func, args, kwargs = await self._queue.get()
+            item = await self._queue.get()
+            INGESTION_QUEUE_DEPTH.dec()
+            INGESTION_RUNNING.inc()
+            self._running += 1
+            item.attempts += 1
+            started = time.perf_counter()
             try:
-                result = func(*args, **kwargs)
-                if asyncio.iscoroutine(result):
-                    await result
-            except Exception as exc:  # pragma: no cover
-                LOGGER.exception("Ingestion task failed", exc_info=exc)
+                await loop.run_in_executor(self._executor, self._fetch, item.request)
+            except BrokenExecutor as exc:
+                # A crashed process worker breaks the whole pool; the first to notice
+                # replaces it.
+                if self._executor is not None and getattr(
+                    self._executor, "_broken", False
+                ):
+                    LOGGER.error("Ingestion executor broke; restarting it")
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self._create_executor()
+                self._failed(item, exc)
+            except Exception as exc:
+                self._failed(item, exc)
+            else:
+                self._active.discard(item.key)
+                self._count("succeeded")
             finally:
+                STAGE_LATENCY.labels(stage="ingestion").observe(
+                    time.perf_counter() - started
+                )
+                INGESTION_RUNNING.dec()
+                self._running -= 1
                 self._queue.task_done()
+                if self.after_fetch is not None:
+                    # A failed fetch may still have catalogued some files.
+                    self.after_fetch()
+
+    def _failed(self, item: _QueuedIngestion, exc: Exception) -> None:
+        extra = {"target": item.request.target, "attempts": item.attempts}
+        if item.attempts >= self.max_attempts:
+            LOGGER.error("Ingestion task failed", exc_info=exc, extra=extra)
+            self._active.discard(item.key)
+            self._count("failed")
+            return
+        delay = min(
+            self.max_backoff_seconds, self.backoff_seconds * 2 ** (item.attempts - 1)
+        )
+        LOGGER.warning(
+            "Ingestion task failed; retrying",
+            extra={**extra, "delay": delay, "error": str(exc)},
+        )
+        self._count("retried")
+        item.sequence = next(self._sequence)
+        self._retries[item.key] = asyncio.get_running_loop().call_later(
+            delay, self._put, item
+        )
 
 
 class BackgroundScheduler:
@@ -52,14 +224,47 @@ class BackgroundScheduler:
     def __init__(self, embedding_refresh_interval: int = 3600) -> None:
         self.embedding_refresh_interval = embedding_refresh_interval
         self._tasks: list[asyncio.Task] = []
-        self.ingestion_queue = IngestionQueue()
+        settings = get_settings()
+        process = settings.ingestion_executor == "process"
+        self.ingestion_queue = IngestionQueue(
+            workers=settings.ingestion_workers,
+            executor="process" if process else "thread",
+            max_attempts=settings.ingestion_max_attempts,
+            backoff_seconds=settings.ingestion_backoff_seconds,
+            # Thread workers notify the pipeline themselves when they record files.
+            after_fetch=self._wake_catalog_pipeline if process else None,
+        )
+        self.job_worker: JobWorker | None = None
+        self.catalog_pipeline: CatalogPipeline | None = None
 
     async def start(self) -> None:
         await self.ingestion_queue.start()
+        settings = get_settings()
+        if settings.job_workers > 0:
+            self.job_worker = JobWorker(
+                DEFAULT_HANDLERS,
+                concurrency=settings.job_workers,
+                lease_seconds=settings.job_lease_seconds,
+                poll_interval=settings.job_poll_interval,
+            )
+            await self.job_worker.start()
+        if settings.catalog_pipeline_enabled:
+            self.catalog_pipeline = get_catalog_pipeline()
+            await self.catalog_pipeline.start()
         self._tasks.append(asyncio.create_task(self._run_embedding_refresh()))
 
+    def _wake_catalog_pipeline(self) -> None:
+        if self.catalog_pipeline is not None:
+            self.catalog_pipeline.notify()
+
     async def stop(self) -> None:
         await self.ingestion_queue.stop()
+        if self.job_worker is not None:
+            await self.job_worker.stop()
+            self.job_worker = None
+        if self.catalog_pipeline is not None:
+            await self.catalog_pipeline.stop()
+            self.catalog_pipeline = None
         for task in self._tasks:
             task.cancel()
             with suppress(asyncio.CancelledError):
@@ -69,7 +274,9 @@ class BackgroundScheduler:
     async def _run_embedding_refresh(self) -> None:
         while True:
             try:
-                ensure_corpus_indexed()
+                report = await asyncio.to_thread(ensure_corpus_indexed)
+                if report is not None:
+                    LOGGER.info("Corpus refresh complete", extra=report.to_dict())
             except Exception as exc:  # pragma: no cover
                 LOGGER.exception("Failed to refresh embeddings", exc_info=exc)
             await asyncio.sleep(self.embedding_refresh_interval)
@@ -78,4 +285,4 @@ class BackgroundScheduler:
 SCHEDULER = BackgroundScheduler()
 
 
-__all__ = ["BackgroundScheduler", "SCHEDULER", "IngestionQueue"]
+__all__ = ["BackgroundScheduler", "SCHEDULER", "IngestionQueue", "fetch_lightcurves"]
@@ -1,22 +1,31 @@
 from __future__ import annotations
 
 import io
+import json
+import time
+import zipfile
 from pathlib import Path
-from typing import Any
 from types import SimpleNamespace
+from typing import Any
 
 import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
-from app.main import create_app
 from app.auth import create_access_token
+from app.executors import StageConfig, StageExecutors
+from app.main import create_app
+from app.preprocessing import PlotStore
+from app.services.batching import MicroBatcher
 
 
 class DummyInferenceService:
     def predict(self, inputs: np.ndarray):
         return 1, 0.95, np.ones(inputs.shape[1])
 
+    def predict_batch(self, inputs: np.ndarray, lengths=None):
+        return [self.predict(sample) for sample in inputs]
+
 
 class DummyEvidenceGenerator:
     def generate(self, question: str) -> dict[str, Any]:
@@ -32,11 +41,10 @@ class DummyQueue:
 
 
 @pytest.fixture
-def client(monkeypatch):
+def client(monkeypatch, tmp_path):
     dummy_queue = DummyQueue()
 
-    from app import dependencies
-    from app import workers
+    from app import dependencies, workers
 
     monkeypatch.setattr(dependencies, "ensure_corpus_indexed", lambda: None)
 
@@ -48,11 +56,36 @@ def client(monkeypatch):
 
     app = create_app()
 
-    monkeypatch.setattr(dependencies, "get_inference_service", lambda: DummyInferenceService())
-    monkeypatch.setattr(dependencies, "get_evidence_generator", lambda retriever=None: DummyEvidenceGenerator())
-    monkeypatch.setattr(dependencies, "inference_dependency", lambda: DummyInferenceService())
-    monkeypatch.setattr(dependencies, "evidence_dependency", lambda: DummyEvidenceGenerator())
+    monkeypatch.setattr(
+        dependencies, "get_inference_service", lambda: DummyInferenceService()
+    )
+    monkeypatch.setattr(
+        dependencies,
+        "get_evidence_generator",
+        lambda retriever=None: DummyEvidenceGenerator(),
+    )
+    monkeypatch.setattr(
+        dependencies, "inference_dependency", lambda: DummyInferenceService()
+    )
+    monkeypatch.setattr(
+        dependencies,
+        "get_inference_batcher",
+        lambda: MicroBatcher(DummyInferenceService()),
+    )
+    monkeypatch.setattr(
+        dependencies, "evidence_dependency", lambda: DummyEvidenceGenerator()
+    )
     monkeypatch.setattr(dependencies, "get_ingestion_queue", lambda: dummy_queue)
+    executors = StageExecutors(
+        {
+            name: StageConfig()
+            for name in ("io", "preprocess", "inference", "rag", "db", "plots")
+        }
+    )
+    monkeypatch.setattr(dependencies, "get_stage_executors", lambda: executors)
+    monkeypatch.setattr(dependencies, "get_preprocessing_cache", lambda: None)
+    plot_store = PlotStore(tmp_path / "plots")
+    monkeypatch.setattr(dependencies, "get_plot_store", lambda: plot_store)
     monkeypatch.setattr(dependencies, "get_ingestion_service", lambda: SimpleNamespace(fetch=lambda request: None))
 
     from app.api import predictions
@@ -67,6 +100,7 @@ def client(monkeypatch):
 
     test_client = TestClient(app)
     test_client.app.state.dummy_queue = dummy_queue  # type: ignore[attr-defined]
+    test_client.app.state.plot_store = plot_store  # type: ignore[attr-defined]
     return test_client
 
 
@@ -98,6 +132,101 @@ def test_predict_endpoint(client: TestClient, tmp_path: Path):
     assert payload["evidence"]["answer"].startswith("Likely")
 
 
+def test_batch_endpoint_streams_ndjson(client: TestClient, tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("q1/kplr003.fits", b"dummy")
+        zf.writestr("README.txt", b"not a light curve")
+    token = create_access_token(subject="tester", roles=["astronomer"])
+
+    response = client.post(
+        "/api/predictions/batch?evidence=true",
+        files=[
+            ("files", ("kplr001.fits", b"dummy", "application/octet-stream")),
+            ("files", ("kplr002.fits", b"dummy", "application/octet-stream")),
+            ("files", ("more.zip", archive.getvalue(), "application/zip")),
+        ],
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results = [line for line in lines if line["type"] == "result"]
+    assert sorted(line["name"] for line in results) == [
+        "kplr001.fits",
+        "kplr002.fits",
+        "q1/kplr003.fits",
+    ]
+    assert all(line["prediction"] == 1 and "attention" not in line for line in results)
+    evidence = [line for line in lines if line["type"] == "evidence"]
+    assert len(evidence) == 1 and evidence[0]["evidence"]["answer"].startswith("Likely")
+    assert lines[-1]["type"] == "summary" and lines[-1]["succeeded"] == 3
+    batches = tmp_path / "data" / "uploads" / "batches"
+    for _ in range(100):
+        if not any(batches.iterdir()):
+            break
+        time.sleep(0.01)
+    assert not any(batches.iterdir())
+
+
+def test_batch_endpoint_rejects_uploads_without_light_curves(
+    client: TestClient, tmp_path: Path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    token = create_access_token(subject="tester", roles=["astronomer"])
+    response = client.post(
+        "/api/predictions/batch",
+        files=[("files", ("notes.txt", b"hello", "text/plain"))],
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 400
+    assert not any((tmp_path / "data" / "uploads" / "batches").iterdir())
+
+
+def test_batch_endpoint_rejects_uploads_over_the_byte_limit(
+    client: TestClient, tmp_path: Path, monkeypatch
+):
+    from app.config import get_settings
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(get_settings(), "batch_max_bytes", 8)
+    token = create_access_token(subject="tester", roles=["astronomer"])
+    response = client.post(
+        "/api/predictions/batch",
+        files=[
+            ("files", ("kplr001.fits", b"dummy", "application/octet-stream")),
+            ("files", ("kplr002.fits", b"dummy", "application/octet-stream")),
+        ],
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 413
+    assert not any((tmp_path / "data" / "uploads" / "batches").iterdir())
+
+
+def test_plot_endpoint_renders_on_first_fetch(client: TestClient):
+    store = client.app.state.plot_store  # type: ignore[attr-defined]
+    plot_id = store.submit(np.linspace(0, 1, 50), np.linspace(1, 0, 50))
+    assert not store.image_path(plot_id).exists()
+
+    token = create_access_token(subject="tester", roles=["analyst"])
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get(f"/api/predictions/plots/{plot_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert store.image_path(plot_id).exists()
+
+    assert (
+        client.get("/api/predictions/plots/" + "0" * 32, headers=headers).status_code
+        == 404
+    )
+    assert (
+        client.get("/api/predictions/plots/not-a-plot", headers=headers).status_code
+        == 404
+    )
+
+
 def test_candidates_endpoint(client: TestClient):
     token = create_access_token(subject="tester", roles=["analyst"])
     response = client.get("/api/predictions/candidates", headers={"Authorization": f"Bearer {token}"})
@@ -118,3 +247,157 @@ def test_ingestion_enqueue(client: TestClient):
     assert data["status"] == "queued"
     queue = client.app.state.dummy_queue  # type: ignore[attr-defined]
     assert len(queue.enqueued) == 1
+
+
+def test_prediction_job_lifecycle(client: TestClient, tmp_path: Path, monkeypatch):
+    import asyncio
+    from contextlib import contextmanager
+
+    from sqlmodel import Session, SQLModel, create_engine
+
+    from app.api import jobs as jobs_api
+    from app.jobs import DEFAULT_HANDLERS, JobWorker
+
+    monkeypatch.chdir(tmp_path)
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    @contextmanager
+    def _session():
+        with Session(engine) as session:
+            yield session
+
+    monkeypatch.setattr(jobs_api, "get_session", _session)
+    token = create_access_token(subject="tester", roles=["astronomer"])
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post(
+        "/api/jobs/predictions",
+        files=[
+            ("files", ("kplr001.fits", b"dummy", "application/octet-stream")),
+            ("files", ("kplr002.fits", b"dummy", "application/octet-stream")),
+        ],
+        headers=headers,
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert (
+        job["status"] == "queued"
+        and job["progress"]["total"] == 2
+        and job["owner"] == "tester"
+    )
+
+    worker = JobWorker(DEFAULT_HANDLERS, session_factory=_session)
+    assert asyncio.run(worker.run_once())
+
+    response = client.get(f"{job['url']}?wait=5", headers=headers)
+    assert response.status_code == 200
+    finished = response.json()
+    assert finished["status"] == "succeeded"
+    assert finished["progress"] == {
+        "total": 2,
+        "succeeded": 2,
+        "failed": 0,
+        "processed": 2,
+    }
+
+    items = client.get(finished["items_url"], headers=headers).json()["items"]
+    assert [item["name"] for item in items] == ["kplr001.fits", "kplr002.fits"]
+    assert all(item["result"]["prediction"] == 1 for item in items)
+
+    uploads = tmp_path / "data" / "uploads" / "jobs"
+    assert not any(uploads.iterdir())
+
+    assert (
+        client.post(f"/api/jobs/{job['job_id']}/cancel", headers=headers).status_code
+        == 409
+    )
+    assert client.get("/api/jobs/" + "0" * 32, headers=headers).status_code == 404
+
+    queued = client.post(
+        "/api/jobs/predictions",
+        files=[("files", ("kplr003.fits", b"dummy", "application/octet-stream"))],
+        headers=headers,
+    ).json()
+    assert (uploads / queued["job_id"]).is_dir()
+    assert (
+        client.post(f"/api/jobs/{queued['job_id']}/cancel", headers=headers).json()[
+            "status"
+        ]
+        == "cancelled"
+    )
+    assert not (uploads / queued["job_id"]).exists()
+
+    response = client.post(
+        "/api/jobs/predictions",
+        files=[("files", ("notes.txt", b"hello", "text/plain"))],
+        headers=headers,
+    )
+    assert response.status_code == 400 and not any(uploads.iterdir())
+
+
+def test_stream_websocket_pushes_updates(client: TestClient, monkeypatch):
+    from app.config import get_settings
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "stream_window", 64)
+    monkeypatch.setattr(settings, "stream_min_cadences", 32)
+    token = create_access_token(subject="tester", roles=["astronomer"])
+    time = np.arange(100) * 0.02
+    flux = 1000.0 + np.sin(time)
+
+    with client.websocket_connect(
+        f"/api/predictions/stream?token={token}&stride=32"
+    ) as websocket:
+        websocket.send_text(
+            json.dumps({"time": time[:40].tolist(), "flux": flux[:40].tolist()})
+        )
+        first = websocket.receive_json()
+        assert first["type"] == "update" and first["prediction"] == 1
+        assert first["window"]["cadences"] == 40 and len(first["attention"]) == 40
+
+        websocket.send_text("not json")
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_text(json.dumps({"time": {"a": 1}, "flux": [1.0]}))
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_bytes(b"\x00\x01")
+        assert websocket.receive_json()["type"] == "error"
+
+        websocket.send_text(
+            json.dumps({"time": time[40:].tolist(), "flux": flux[40:].tolist()})
+        )
+        assert websocket.receive_json()["window"]["cadences"] == 64
+        websocket.send_text(json.dumps({"type": "end"}))
+        summary = websocket.receive_json()
+        assert summary == {"type": "summary", "received": 100, "accepted": 100}
+
+
+def test_stream_websocket_requires_token(client: TestClient):
+    from starlette.websockets import WebSocketDisconnect
+
+    with pytest.raises(WebSocketDisconnect) as exc_info:
+        with client.websocket_connect("/api/predictions/stream") as websocket:
+            websocket.receive_json()
+    assert exc_info.value.code == 1008
+
+
+def test_stream_websocket_enforces_connection_limit(client: TestClient, monkeypatch):
+    from starlette.websockets import WebSocketDisconnect
+
+    from app.api import predictions
+    from app.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "stream_max_connections", 1)
+    token = create_access_token(subject="tester", roles=["astronomer"])
+
+    with client.websocket_connect(f"/api/predictions/stream?token={token}") as first:
+        assert predictions._ACTIVE_STREAMS == 1
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(
+                f"/api/predictions/stream?token={token}"
+            ) as second:
+                second.receive_json()
+        assert exc_info.value.code == 1013
+        first.send_text(json.dumps({"type": "end"}))
+        assert first.receive_json()["type"] == "summary"
+    assert predictions._ACTIVE_STREAMS == 0
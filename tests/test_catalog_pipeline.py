@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import catalog_pipeline
+from app.catalog_pipeline import CatalogPipeline, CatalogPipelineConfig
+from app.db.models import PreprocessingRecord
+from app.db.operations import (
+    claim_lightcurves,
+    list_candidates,
+    pending_lightcurves,
+    record_lightcurve_downloads,
+    release_lightcurve_claims,
+)
+from app.executors import StageConfig, StageExecutors
+
+
+@pytest.fixture
+def session_factory(tmp_path: Path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    @contextmanager
+    def _session():
+        with Session(engine) as session:
+            yield session
+
+    yield _session
+    engine.dispose()
+
+
+@pytest.fixture
+def executors():
+    stages = StageExecutors(
+        {name: StageConfig(max_workers=2) for name in ("preprocess", "db")}
+    )
+    yield stages
+    stages.shutdown()
+
+
+def _catalogue(
+    session_factory, tmp_path: Path, count: int, missing: int = 0
+) -> list[str]:
+    paths = []
+    for idx in range(count + missing):
+        path = tmp_path / f"lc-{idx}.fits"
+        if idx < count:
+            path.write_bytes(b"FITS")
+        paths.append(str(path))
+    with session_factory() as session:
+        record_lightcurve_downloads(
+            session,
+            target="KIC 9",
+            mission="Kepler",
+            flux_type="PDCSAP_FLUX",
+            records=[(p, None) for p in paths],
+        )
+    return paths
+
+
+def _fake_preprocess(gate: threading.Event | None = None):
+    def _preprocess(path, **kwargs):
+        if gate is not None:
+            gate.wait(5)
+        phase = np.linspace(-0.5, 0.5, 500, dtype=np.float32)
+        flux = np.where(np.abs(phase) < 0.02, 0.99, 1.0).astype(np.float32)
+        return {
+            "time": phase,
+            "flux": flux,
+            "metadata": {"cache_hit": False},
+            "timings": {"total": 0.01},
+        }
+
+    return _preprocess
+
+
+async def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "pipeline did not finish in time"
+        await asyncio.sleep(0.01)
+
+
+def test_new_downloads_are_preprocessed_and_featurized(
+    session_factory, executors, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(catalog_pipeline, "preprocess_lightcurve", _fake_preprocess())
+    _catalogue(session_factory, tmp_path, count=2, missing=1)
+    pipeline = CatalogPipeline(executors=executors, session_factory=session_factory)
+    later = tmp_path / "later"
+    later.mkdir()
+
+    async def _run():
+        await pipeline.start()
+        await _wait_for(
+            lambda: pipeline.stats()["processed"] + pipeline.stats()["failed"] == 3
+        )
+        # Files recorded later are picked up as soon as ingestion notifies the pipeline.
+        _catalogue(session_factory, later, 1)
+        pipeline.notify()
+        await _wait_for(lambda: pipeline.stats()["processed"] == 3)
+        await pipeline.stop()
+
+    asyncio.run(_run())
+
+    with session_factory() as session:
+        records = session.exec(select(PreprocessingRecord)).all()
+        candidates = list_candidates(session, limit=10)
+        assert pending_lightcurves(session) == []
+    assert len(records) == 3
+    assert records[0].features["transit_depth"] == pytest.approx(0.01)
+    statuses = sorted(
+        ("failed" if lc.preprocess_error else "processed" if pre else "pending")
+        for lc, pre in candidates
+    )
+    assert statuses == ["failed", "processed", "processed", "processed"]
+
+
+def test_slow_preprocessing_applies_backpressure(
+    session_factory, executors, tmp_path, monkeypatch
+):
+    gate = threading.Event()
+    monkeypatch.setattr(
+        catalog_pipeline, "preprocess_lightcurve", _fake_preprocess(gate)
+    )
+    _catalogue(session_factory, tmp_path, count=12)
+    config = CatalogPipelineConfig(workers=1, queue_size=1, scan_batch=4)
+    pipeline = CatalogPipeline(
+        executors=executors, config=config, session_factory=session_factory
+    )
+
+    async def _run():
+        await pipeline.start()
+        await asyncio.sleep(0.3)
+        # One file in the worker, one queued and one waiting in the scanner's put.
+        scanned_while_blocked = pipeline.stats()["scanned"]
+        gate.set()
+        await _wait_for(lambda: pipeline.stats()["processed"] == 12)
+        await pipeline.stop()
+        return scanned_while_blocked
+
+    assert asyncio.run(_run()) <= 3
+
+
+def test_claims_are_exclusive_until_released_or_expired(session_factory, tmp_path):
+    _catalogue(session_factory, tmp_path, count=3)
+    with session_factory() as session:
+        first = claim_lightcurves(session, worker_id="a", lease_seconds=600, limit=2)
+        assert len(first) == 2
+        assert [
+            row[0]
+            for row in claim_lightcurves(
+                session, worker_id="b", lease_seconds=-1, limit=5
+            )
+        ] == [3]
+        assert release_lightcurve_claims(session, "a") == 2
+        # b's lease on row 3 has already expired, so it is claimable again too.
+        assert (
+            len(claim_lightcurves(session, worker_id="c", lease_seconds=600, limit=5))
+            == 3
+        )
+
+
+def test_concurrent_pipelines_process_each_file_once(
+    session_factory, executors, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(catalog_pipeline, "preprocess_lightcurve", _fake_preprocess())
+    _catalogue(session_factory, tmp_path, count=20)
+    config = CatalogPipelineConfig(workers=2, queue_size=2, scan_batch=4)
+    pipelines = [
+        CatalogPipeline(
+            executors=executors, config=config, session_factory=session_factory
+        )
+        for _ in range(3)
+    ]
+
+    async def _run():
+        for pipeline in pipelines:
+            await pipeline.start()
+        await _wait_for(
+            lambda: sum(pipeline.stats()["processed"] for pipeline in pipelines) == 20
+        )
+        await asyncio.sleep(0.1)
+        for pipeline in pipelines:
+            await pipeline.stop()
+
+    asyncio.run(_run())
+
+    with session_factory() as session:
+        records = session.exec(select(PreprocessingRecord)).all()
+    assert sorted(record.lightcurve_id for record in records) == list(range(1, 21))
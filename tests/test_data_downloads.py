@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from app.data.downloads import (
+    DOWNLOADED,
+    FAILED,
+    SKIPPED,
+    DownloadConfig,
+    DownloadTask,
+    ParallelDownloader,
+)
+
+FILES = {f"/lc-{idx}.fits": bytes(range(256)) * (40 + idx) for idx in range(6)}
+
+
+class _Archive:
+    """State shared with the stand-in archive server's request handler."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests: list[tuple[str, str | None]] = []
+        self.failures: dict[str, int] = {}
+        self.truncate: dict[str, int] = {}
+        self.active = 0
+        self.peak = 0
+
+
+def _handler(archive: _Archive):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            with archive.lock:
+                archive.requests.append((self.path, self.headers.get("Range")))
+                archive.active += 1
+                archive.peak = max(archive.peak, archive.active)
+                failing = archive.failures.get(self.path, 0)
+                if failing:
+                    archive.failures[self.path] = failing - 1
+            try:
+                self._respond(failing)
+            finally:
+                with archive.lock:
+                    archive.active -= 1
+
+        def _respond(self, failing: int) -> None:
+            threading.Event().wait(0.02)
+            body = FILES.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            if failing:
+                self.send_error(503)
+                return
+            start = 0
+            if self.headers.get("Range"):
+                start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+                self.send_response(206)
+                self.send_header(
+                    "Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}"
+                )
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(len(body) - start))
+            self.end_headers()
+            cut = archive.truncate.pop(self.path, None)
+            # Simulate a dropped connection part-way through the body.
+            self.wfile.write(body[start:cut] if cut is not None else body[start:])
+            if cut is not None:
+                self.close_connection = True
+
+    return Handler
+
+
+@pytest.fixture
+def archive():
+    state = _Archive()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _tasks(archive: _Archive, root: Path, names=FILES) -> list[DownloadTask]:
+    return [
+        DownloadTask(url=archive.url + name, destination=root / name.lstrip("/"))
+        for name in names
+    ]
+
+
+def _config(**overrides) -> DownloadConfig:
+    return DownloadConfig(
+        **{"concurrency": 3, "backoff_seconds": 0.0, "max_attempts": 3, **overrides}
+    )
+
+
+def test_downloads_in_parallel_with_bounded_concurrency(archive, tmp_path: Path):
+    results = asyncio.run(
+        ParallelDownloader(_config()).download_all(_tasks(archive, tmp_path))
+    )
+
+    assert [result.status for result in results] == [DOWNLOADED] * len(FILES)
+    assert 1 < archive.peak <= 3
+    for result, body in zip(results, FILES.values()):
+        assert result.task.destination.read_bytes() == body
+        assert (result.size, result.checksum) == (
+            len(body),
+            hashlib.sha256(body).hexdigest(),
+        )
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_retries_transient_errors_and_resumes_dropped_transfers(
+    archive, tmp_path: Path
+):
+    archive.failures["/lc-0.fits"] = 2
+    archive.truncate["/lc-1.fits"] = 5000
+    tasks = _tasks(archive, tmp_path, ["/lc-0.fits", "/lc-1.fits"])
+    tasks[1].size = len(FILES["/lc-1.fits"])
+
+    results = asyncio.run(ParallelDownloader(_config()).download_all(tasks))
+
+    assert [(result.status, result.attempts) for result in results] == [
+        (DOWNLOADED, 3),
+        (DOWNLOADED, 2),
+    ]
+    assert tasks[1].destination.read_bytes() == FILES["/lc-1.fits"]
+    assert ("/lc-1.fits", "bytes=5000-") in archive.requests
+
+
+def test_resumes_partial_file_from_previous_run(archive, tmp_path: Path):
+    body = FILES["/lc-2.fits"]
+    (tmp_path / "lc-2.fits.part").write_bytes(body[:4096])
+
+    (result,) = asyncio.run(
+        ParallelDownloader(_config()).download_all(
+            _tasks(archive, tmp_path, ["/lc-2.fits"])
+        )
+    )
+
+    assert result.status == DOWNLOADED and result.resumed_from == 4096
+    assert archive.requests == [("/lc-2.fits", "bytes=4096-")]
+    assert result.task.destination.read_bytes() == body
+
+
+def test_skips_catalogued_files_and_fails_fast_on_missing(archive, tmp_path: Path):
+    body = FILES["/lc-3.fits"]
+    (tmp_path / "lc-3.fits").write_bytes(body)
+    known = {
+        str((tmp_path / "lc-3.fits").resolve()): (
+            len(body),
+            hashlib.sha256(body).hexdigest(),
+        )
+    }
+    tasks = _tasks(archive, tmp_path, ["/lc-3.fits", "/missing.fits"])
+
+    skipped, missing = asyncio.run(
+        ParallelDownloader(_config()).download_all(tasks, known=known)
+    )
+
+    assert skipped.status == SKIPPED
+    assert (missing.status, missing.attempts) == (FAILED, 1)
+    assert [path for path, _ in archive.requests] == ["/missing.fits"]
+
+
+def test_copies_from_local_mirror(tmp_path: Path):
+    mirror = tmp_path / "mirror.fits"
+    mirror.write_bytes(FILES["/lc-4.fits"])
+    destination = tmp_path / "out" / "lc-4.fits"
+    destination.parent.mkdir()
+    destination.with_name("lc-4.fits.part").write_bytes(FILES["/lc-4.fits"][:100])
+    task = DownloadTask(
+        url=mirror.as_uri(), destination=destination, size=mirror.stat().st_size
+    )
+
+    (result,) = asyncio.run(ParallelDownloader(_config()).download_all([task]))
+
+    assert (
+        result.status == DOWNLOADED and destination.read_bytes() == FILES["/lc-4.fits"]
+    )
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import io
+import tarfile
+
+import pytest
+
+from app.data.uploads import TooManyFilesError, UploadTooLargeError, extract_lightcurves
+
+
+def _tarball(names: list[str]) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name in names:
+            info = tarfile.TarInfo(name)
+            info.size = len(name)
+            archive.addfile(info, io.BytesIO(name.encode()))
+    buffer.seek(0)
+    return buffer
+
+
+def test_extract_lightcurves_flattens_archives_safely(tmp_path):
+    uploads = [
+        ("survey.tar.gz", _tarball(["a/kplr1.fits", "../escape.fits", "notes.md"])),
+        ("single.fits", io.BytesIO(b"x")),
+    ]
+
+    entries = extract_lightcurves(uploads, tmp_path / "out", max_files=10)
+
+    assert [name for name, _ in entries] == [
+        "a/kplr1.fits",
+        "../escape.fits",
+        "single.fits",
+    ]
+    assert all(path.parent == tmp_path / "out" for _, path in entries)
+    assert entries[0][1].read_bytes() == b"a/kplr1.fits"
+
+
+def test_extract_lightcurves_enforces_limit(tmp_path):
+    with pytest.raises(TooManyFilesError):
+        extract_lightcurves(
+            [("many.tgz", _tarball([f"{i}.fits" for i in range(3)]))],
+            tmp_path,
+            max_files=2,
+        )
+
+
+def test_extract_lightcurves_caps_bytes_and_cleans_up(tmp_path):
+    names = [f"{i}.fits" for i in range(3)]
+    assert (
+        len(
+            extract_lightcurves(
+                [("ok.tgz", _tarball(names))], tmp_path / "ok", 10, max_bytes=18
+            )
+        )
+        == 3
+    )
+
+    with pytest.raises(UploadTooLargeError):
+        extract_lightcurves(
+            [("big.tgz", _tarball(names))], tmp_path / "big", 10, max_bytes=17
+        )
+    assert not (tmp_path / "big").exists()
@@ -34,7 +34,10 @@ def temp_database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
 def test_record_lightcurve_downloads(temp_database):
     from app.db.database import get_session
     from app.db.models import LightCurveRecord
-    from app.db.operations import record_lightcurve_downloads, record_preprocessing_result
+    from app.db.operations import (
+        record_lightcurve_downloads,
+        record_preprocessing_result,
+    )
 
     with get_session() as session:
         record_lightcurve_downloads(
@@ -82,3 +85,156 @@ def test_record_lightcurve_downloads(temp_database):
     assert result.flux_type == "SAP_FLUX"
     assert stats_record.figure_path == "/tmp/plot.png"
     assert stats_record.flux_count == 100
+
+
+@pytest.fixture
+def session(tmp_path: Path):
+    from sqlmodel import Session, SQLModel, create_engine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.mark.parametrize("native", [True, False])
+def test_bulk_upsert_merges_by_path(
+    session, monkeypatch: pytest.MonkeyPatch, native: bool
+):
+    from app.db import operations
+    from app.db.models import LightCurveRecord
+
+    if not native:
+        monkeypatch.setattr(operations, "_upsert_rows", operations._merge_rows)
+
+    paths = [f"/tmp/lc-{idx}.fits" for idx in range(25)]
+    operations.record_lightcurve_downloads(
+        session,
+        target="KIC 1",
+        mission="Kepler",
+        flux_type="PDCSAP_FLUX",
+        records=[(path, {"idx": idx}) for idx, path in enumerate(paths)],
+        chunk_size=7,
+    )
+    # Overlapping batch with a blank target and mission, plus a repeated path.
+    operations.record_lightcurve_downloads(
+        session,
+        target="",
+        mission=None,
+        flux_type="SAP_FLUX",
+        records=[
+            (paths[0], {"first": True}),
+            (paths[1], None),
+            (paths[0], {"second": True}),
+            ("/tmp/new.fits", None),
+        ],
+        chunk_size=2,
+    )
+
+    rows = {row.path: row for row in session.exec(select(LightCurveRecord)).all()}
+    assert len(rows) == 26
+    assert rows[paths[0]].source_metadata == {"second": True}
+    assert (
+        rows[paths[0]].target,
+        rows[paths[0]].mission,
+        rows[paths[0]].flux_type,
+    ) == ("KIC 1", "Kepler", "SAP_FLUX")
+    assert rows[paths[1]].source_metadata is None
+    assert (
+        rows[paths[24]].source_metadata == {"idx": 24}
+        and rows[paths[24]].flux_type == "PDCSAP_FLUX"
+    )
+
+
+def test_catalogued_files_reports_size_and_checksum(session):
+    from app.db.operations import catalogued_files, record_lightcurve_downloads
+
+    record_lightcurve_downloads(
+        session,
+        target="TIC 2",
+        mission="TESS",
+        flux_type="PDCSAP_FLUX",
+        records=[("/tmp/a.fits", None), ("/tmp/b.fits", None)],
+        files={"/tmp/a.fits": (2_880, "ab" * 32)},
+    )
+
+    assert catalogued_files(
+        session, ["/tmp/a.fits", "/tmp/b.fits", "/tmp/c.fits"], chunk_size=1
+    ) == {
+        "/tmp/a.fits": (2_880, "ab" * 32),
+        "/tmp/b.fits": (None, None),
+    }
+
+
+# light_curves and preprocessing_records as created before they gained columns.
+BASELINE_SCHEMA = (
+    """
+    CREATE TABLE light_curves (
+        id INTEGER NOT NULL PRIMARY KEY,
+        target VARCHAR NOT NULL,
+        mission VARCHAR,
+        path VARCHAR(1024) NOT NULL,
+        flux_type VARCHAR NOT NULL,
+        download_status VARCHAR NOT NULL,
+        downloaded_at DATETIME NOT NULL,
+        source_metadata JSON,
+        CONSTRAINT uq_lightcurve_path UNIQUE (path)
+    )
+    """,
+    """
+    CREATE TABLE preprocessing_records (
+        id INTEGER NOT NULL PRIMARY KEY,
+        lightcurve_id INTEGER NOT NULL REFERENCES light_curves (id),
+        flux_mean FLOAT NOT NULL,
+        flux_std FLOAT NOT NULL,
+        flux_min FLOAT NOT NULL,
+        flux_max FLOAT NOT NULL,
+        flux_count INTEGER NOT NULL,
+        figure_path VARCHAR(1024),
+        created_at DATETIME NOT NULL
+    )
+    """,
+    "INSERT INTO light_curves"
+    " (target, mission, path, flux_type, download_status, downloaded_at)"
+    " VALUES ('KIC 9', 'Kepler', '/tmp/old.fits', 'PDCSAP_FLUX',"
+    " 'downloaded', '2024-01-01 00:00:00')",
+)
+
+
+def test_missing_columns_are_added_to_existing_tables(tmp_path: Path):
+    from sqlalchemy import text
+    from sqlmodel import Session, SQLModel, create_engine
+
+    from app.db.database import _add_missing_columns
+    from app.db.models import LightCurveRecord
+    from app.db.operations import list_candidates, record_preprocessing_result
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+
+    SQLModel.metadata.create_all(engine)
+    added = _add_missing_columns(engine)
+
+    assert {
+        "light_curves.checksum",
+        "light_curves.preprocess_claimed_by",
+        "preprocessing_records.features",
+    } <= set(added)
+    assert _add_missing_columns(engine) == []
+    with Session(engine) as session:
+        record = session.exec(select(LightCurveRecord)).one()
+        assert record.path == "/tmp/old.fits" and record.checksum is None
+        record_preprocessing_result(
+            session,
+            path="/tmp/old.fits",
+            stats={"mean": 0.0, "std": 1.0, "min": -1.0, "max": 1.0, "count": 3},
+            features={"depth": 0.5},
+        )
+        [(lightcurve, processed)] = list_candidates(
+            session, limit=5, processed_only=True
+        )
+    assert lightcurve.id == record.id and processed.features == {"depth": 0.5}
+    engine.dispose()
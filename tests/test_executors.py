@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+
+import pytest
+
+from app.executors import (
+    StageConfig,
+    StageExecutors,
+    StageSaturatedError,
+    StageUnavailableError,
+)
+
+
+def test_stage_rejects_work_beyond_max_pending():
+    executors = StageExecutors({"db": StageConfig(max_workers=1, max_pending=2)})
+    release = threading.Event()
+
+    async def scenario():
+        running = [
+            asyncio.ensure_future(executors.run("db", release.wait, 5))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        with pytest.raises(StageSaturatedError):
+            await executors.run("db", release.wait, 5)
+        assert executors.stats()["db"]["rejected"] == 1
+        release.set()
+        await asyncio.gather(*running)
+        assert executors.stats()["db"]["pending"] == 0
+
+    asyncio.run(scenario())
+    executors.shutdown()
+
+
+def test_admit_counts_against_limit():
+    executors = StageExecutors({"inference": StageConfig(max_pending=1)})
+
+    async def scenario():
+        async with executors.admit("inference"):
+            with pytest.raises(StageSaturatedError):
+                async with executors.admit("inference"):
+                    pass
+        async with executors.admit("inference"):
+            pass
+
+    asyncio.run(scenario())
+
+
+def test_process_stage_and_shutdown():
+    executors = StageExecutors(
+        {"preprocess": StageConfig(kind="process", max_workers=1)}
+    )
+    assert asyncio.run(executors.run("preprocess", math.factorial, 5)) == 120
+    executors.shutdown()
+    with pytest.raises(StageUnavailableError):
+        asyncio.run(executors.run("preprocess", math.factorial, 5))
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.db.jobs import (
+    cancel_job,
+    claim_job,
+    create_job,
+    get_job,
+    heartbeat_job,
+    list_job_items,
+    pending_job_items,
+    record_job_item,
+)
+from app.jobs import JobContext, JobWorker
+
+
+@pytest.fixture
+def session_factory(tmp_path: Path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    @contextmanager
+    def _session():
+        with Session(engine) as session:
+            yield session
+
+    yield _session
+    engine.dispose()
+
+
+def _submit(
+    session_factory,
+    job_id: str = "job1",
+    items: int = 3,
+    max_attempts: int = 3,
+    upload_dir: Path | None = None,
+) -> None:
+    payload: dict = {"scale": 2}
+    if upload_dir is not None:
+        payload["upload_dir"] = str(upload_dir)
+    with session_factory() as session:
+        create_job(
+            session,
+            job_id=job_id,
+            kind="echo",
+            payload=payload,
+            items=[(f"item-{idx}", {"value": idx}) for idx in range(items)],
+            max_attempts=max_attempts,
+        )
+
+
+def test_claim_is_exclusive_until_lease_expires(session_factory):
+    _submit(session_factory)
+
+    with session_factory() as session:
+        first = claim_job(session, worker_id="a", lease_seconds=60)
+        assert first is not None and first.status == "running" and first.attempts == 1
+        assert claim_job(session, worker_id="b", lease_seconds=60) is None
+        assert heartbeat_job(session, "job1", worker_id="a", lease_seconds=0)
+
+    # Worker "a" stopped heartbeating; its zero-length lease has lapsed.
+    with session_factory() as session:
+        stolen = claim_job(session, worker_id="b", lease_seconds=60)
+        assert stolen is not None and stolen.worker_id == "b" and stolen.attempts == 2
+        assert not heartbeat_job(session, "job1", worker_id="a", lease_seconds=60)
+
+
+def test_item_results_are_counted_once_and_survive_resume(session_factory):
+    _submit(session_factory)
+
+    with session_factory() as session:
+        assert record_job_item(session, "job1", 0, result={"value": 0})
+        assert not record_job_item(session, "job1", 0, result={"value": 0})
+        assert record_job_item(session, "job1", 2, error="boom")
+        job = get_job(session, "job1")
+        assert (job.total_items, job.succeeded_items, job.failed_items) == (3, 1, 1)
+        assert [item.position for item in pending_job_items(session, "job1")] == [1]
+        assert [item.status for item in list_job_items(session, "job1")] == [
+            "succeeded",
+            "pending",
+            "failed",
+        ]
+
+
+def test_worker_runs_pending_items_and_finishes(session_factory):
+    _submit(session_factory)
+    with session_factory() as session:
+        record_job_item(session, "job1", 0, result={"value": 0})
+
+    seen = []
+
+    async def _echo(context: JobContext):
+        for item in context.items:
+            seen.append(item.position)
+            await context.record(
+                item, result={"value": item.payload["value"] * context.payload["scale"]}
+            )
+        return {"processed": len(context.items)}
+
+    worker = JobWorker({"echo": _echo}, session_factory=session_factory, worker_id="w")
+    assert asyncio.run(worker.run_once())
+    assert not asyncio.run(worker.run_once())
+
+    with session_factory() as session:
+        job = get_job(session, "job1")
+        items = list_job_items(session, "job1")
+    assert seen == [1, 2]
+    assert job.status == "succeeded" and job.result == {"processed": 2}
+    assert [item.result for item in items] == [{"value": 0}, {"value": 2}, {"value": 4}]
+
+
+def test_worker_retries_then_fails(session_factory, tmp_path: Path):
+    uploads = tmp_path / "uploads" / "job1"
+    uploads.mkdir(parents=True)
+    _submit(session_factory, max_attempts=2, upload_dir=uploads)
+
+    async def _broken(context: JobContext):
+        raise RuntimeError("no disk")
+
+    worker = JobWorker({"echo": _broken}, session_factory=session_factory)
+    assert asyncio.run(worker.run_once())
+    with session_factory() as session:
+        job = get_job(session, "job1")
+        assert job.status == "queued" and job.error == "RuntimeError: no disk"
+    assert uploads.is_dir()
+
+    assert asyncio.run(worker.run_once())
+    with session_factory() as session:
+        job = get_job(session, "job1")
+    assert job.status == "failed" and job.attempts == 2
+    assert not uploads.exists()
+
+
+def test_cancel_stops_running_job(session_factory):
+    _submit(session_factory)
+
+    async def _slow(context: JobContext):
+        await asyncio.sleep(30)
+
+    def _cancel_soon():
+        with session_factory() as session:
+            assert cancel_job(session, "job1")
+
+    async def _run():
+        worker = JobWorker(
+            {"echo": _slow}, session_factory=session_factory, lease_seconds=0.3
+        )
+        running = asyncio.create_task(worker.run_once())
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(_cancel_soon)
+        await asyncio.wait_for(running, timeout=5)
+
+    asyncio.run(_run())
+    with session_factory() as session:
+        job = get_job(session, "job1")
+        assert job.status == "cancelled"
+        assert not cancel_job(session, "job1")
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import json
+import pickle
 from pathlib import Path
 
 import numpy as np
+import pytest
 import torch
 
 from app.models.architecture import CNNBiLSTMAttention
-from app.models.datasets import LightCurveDataset, SampleRecord
-from app.models.losses import PhysicsInformedLoss
+from app.models.datasets import (
+    PHYSICS_TARGETS,
+    LightCurveDataset,
+    SampleRecord,
+    collate_light_curves,
+)
+from app.models.losses import PhysicsInformedLoss, PhysicsLossConfig
+from app.models.packed import PackedLightCurveDataset, pack_records
 
 
 def test_dataset_pad_and_stack(tmp_path: Path):
@@ -40,3 +49,107 @@ def test_physics_loss_zero_when_matching():
     loss_fn = PhysicsInformedLoss()
     loss = loss_fn(flux, expected_depth)
     assert torch.isclose(loss, torch.tensor(0.0))
+
+
+def test_dataset_reads_time_and_flux_from_shared_npz(tmp_path: Path):
+    path = tmp_path / "sample.npz"
+    np.savez(
+        path, time=np.arange(5, dtype=np.float32), flux=np.ones(5, dtype=np.float32)
+    )
+
+    sample = LightCurveDataset(
+        [SampleRecord.from_npz(path, label=0)], sequence_length=5
+    )[0]
+
+    assert torch.equal(sample["inputs"][0], torch.arange(5, dtype=torch.float32))
+    assert torch.equal(sample["inputs"][1], torch.ones(5))
+
+
+def test_packed_dataset_matches_per_file_dataset(tmp_path: Path):
+    records = []
+    for idx, size in enumerate((80, 100, 140)):
+        np.save(tmp_path / f"{idx}.flux.npy", np.random.rand(size).astype(np.float32))
+        np.save(
+            tmp_path / f"{idx}.time.npy", np.linspace(0, 1, size).astype(np.float32)
+        )
+        (tmp_path / f"{idx}.json").write_text(
+            json.dumps({"length": size, "mission": "kepler", "config": {}})
+        )
+        records.append(
+            SampleRecord(
+                flux_path=tmp_path / f"{idx}.flux.npy",
+                time_path=tmp_path / f"{idx}.time.npy",
+                label=idx % 2,
+                metadata_path=tmp_path / f"{idx}.json",
+            )
+        )
+
+    index = pack_records(
+        records, tmp_path / "packed", sequence_length=120, shard_size=2
+    )
+    assert index.shards == [2, 1]
+    assert "length" in index.metadata_columns and "config" not in index.metadata_columns
+
+    packed = PackedLightCurveDataset(tmp_path / "packed", include_metadata=True)
+    reference = LightCurveDataset(records, sequence_length=120)
+    assert len(packed) == 3
+    for idx in range(3):
+        assert torch.equal(packed[idx]["inputs"], reference[idx]["inputs"])
+        assert packed[idx]["label"].item() == idx % 2
+    assert packed[2]["metadata"]["length"] == 140
+    assert packed[-1]["metadata"]["mission"] == "kepler"
+    assert torch.isnan(packed[0]["physics"]).all()
+
+    restored = pickle.loads(pickle.dumps(packed))
+    assert torch.equal(restored[1]["inputs"], reference[1]["inputs"])
+
+
+def test_collate_carries_physics_targets(tmp_path: Path):
+    records = []
+    for idx, metadata in enumerate(
+        ({"expected_depth": 0.01, "period": 3.0, "duration": 0.1}, {"mission": "tess"})
+    ):
+        np.save(tmp_path / f"{idx}.npy", np.ones(50, dtype=np.float32))
+        (tmp_path / f"{idx}.json").write_text(json.dumps(metadata))
+        records.append(
+            SampleRecord(
+                flux_path=tmp_path / f"{idx}.npy",
+                time_path=tmp_path / f"{idx}.npy",
+                label=idx,
+                metadata_path=tmp_path / f"{idx}.json",
+            )
+        )
+    dataset = LightCurveDataset(records, sequence_length=50)
+
+    batch = collate_light_curves([dataset[0], dataset[1]])
+
+    assert batch["inputs"].shape == (2, 2, 50)
+    assert batch["label"].tolist() == [0, 1]
+    assert batch["physics"].shape == (2, len(PHYSICS_TARGETS))
+    assert torch.allclose(batch["physics"][0], torch.tensor([0.01, 3.0, 0.1]))
+    assert torch.isnan(batch["physics"][1]).all()
+    assert batch["metadata"][1] == {"mission": "tess"}
+
+
+def test_physics_loss_ignores_unknown_targets_and_checks_duty_cycle():
+    flux = torch.ones(2, 100)
+    flux[:, :10] = 0.99  # 10% of the folded curve in transit, 1% deep
+    loss_fn = PhysicsInformedLoss(PhysicsLossConfig(weight=1.0, duty_cycle_weight=1.0))
+
+    matching = loss_fn(
+        flux,
+        torch.tensor([0.01, float("nan")]),
+        period=torch.tensor([10.0, float("nan")]),
+        duration=torch.tensor([1.0, float("nan")]),
+    )
+    wrong_duty = loss_fn(
+        flux,
+        torch.tensor([0.01, float("nan")]),
+        period=torch.tensor([10.0, 10.0]),
+        duration=torch.tensor([3.0, 3.0]),
+    )
+    unknown = loss_fn(flux, torch.full((2,), float("nan")))
+
+    assert matching.item() == pytest.approx(0.0, abs=5e-3)
+    assert wrong_duty.item() == pytest.approx(0.2, abs=1e-2)
+    assert unknown.item() == 0.0
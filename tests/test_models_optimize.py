@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from app.models.architecture import CNNBiLSTMAttention
+from app.models.datasets import SampleRecord
+from app.models.optimize import (
+    OptimizationProfile,
+    build_profile,
+    optimize_model,
+    prune_conv_channels,
+)
+from app.services.inference import InferenceConfig, InferenceService
+
+
+def _records(tmp_path: Path, count: int = 8, length: int = 64) -> list[SampleRecord]:
+    rng = np.random.default_rng(0)
+    records = []
+    for idx in range(count):
+        path = tmp_path / f"{idx}.npy"
+        np.save(path, rng.normal(1.0, 0.01, length).astype(np.float32))
+        records.append(SampleRecord(flux_path=path, time_path=path, label=idx % 2))
+    return records
+
+
+def test_prune_conv_channels_shrinks_layers_and_keeps_shapes():
+    model = CNNBiLSTMAttention().eval()
+    pruned = prune_conv_channels(model, 0.5).eval()
+
+    convs = [layer for layer in pruned.cnn if isinstance(layer, torch.nn.Conv1d)]
+    assert [conv.out_channels for conv in convs] == [16, 32, 64]
+    assert pruned.lstm.input_size == 64
+    assert sum(p.numel() for p in pruned.parameters()) < sum(
+        p.numel() for p in model.parameters()
+    )
+    logits, attention = pruned(torch.randn(3, 2, 128))
+    assert logits.shape == (3, 2) and attention.shape == (3, 16)
+
+
+def test_dynamic_int8_stays_close_to_fp32():
+    model = CNNBiLSTMAttention().eval()
+    quantized = optimize_model(model, OptimizationProfile(name="int8"))
+    inputs = torch.randn(4, 2, 128)
+    with torch.no_grad():
+        expected, _ = model(inputs)
+        actual, _ = quantized(inputs)
+    assert torch.allclose(actual, expected, atol=5e-2)
+
+
+def test_build_profile_saves_report_and_serves(tmp_path):
+    records = _records(tmp_path)
+    profile = OptimizationProfile(
+        name="int8-static",
+        static_conv=True,
+        prune_amount=0.25,
+        batch_size=4,
+        sequence_length=64,
+    )
+
+    report = build_profile(
+        CNNBiLSTMAttention().eval(),
+        profile,
+        tmp_path / "profiles",
+        calibration_records=records,
+        eval_records=records,
+        latency_iterations=2,
+    )
+
+    assert report.size_bytes < report.baseline_size_bytes
+    assert set(report.latency_ms) == {"1", "8"}
+    assert report.f1_delta is not None
+    saved = json.loads(
+        (tmp_path / "profiles" / "int8-static" / "profile.json").read_text()
+    )
+    assert saved["report"]["profile"] == "int8-static"
+
+    service = InferenceService(
+        InferenceConfig(profile="int8-static", profiles_dir=str(tmp_path / "profiles"))
+    )
+    prediction, probability, attention = service.predict(
+        np.ones((2, 96), dtype=np.float32)
+    )
+    assert prediction in (0, 1) and 0.0 <= probability <= 1.0
+    assert attention.shape == (12,)
@@ -46,7 +46,7 @@ class DummyLightCurve:
         self._folded_period = period
         return self
 
-    def to_periodogram(self, method: str, period_min: float, period_max: float):
+    def to_periodogram(self, method: str, minimum_period: float, maximum_period: float):
         class _Periodogram:
             def __init__(self, value: float) -> None:
                 self.period_at_max_power = DummyValue(np.array([value]))
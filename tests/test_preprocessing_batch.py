@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.preprocessing import BatchConfig, PreprocessingConfig
+from app.preprocessing import batch as batch_module
+from app.preprocessing import preprocess_directory
+from app.utils.manifests import load_manifest
+
+fits = pytest.importorskip("astropy.io.fits")
+
+CONFIG = PreprocessingConfig(engine="numpy", period=2.5, window_length=101)
+_process_chunk = batch_module._process_chunk
+
+
+def _write_curve(path, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    time = np.arange(0.0, 10.0, 0.01)
+    flux = 1000.0 + rng.normal(0.0, 1.0, time.size)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = fits.BinTableHDU.from_columns(
+        [
+            fits.Column("TIME", "D", array=time),
+            fits.Column("PDCSAP_FLUX", "E", array=flux),
+            fits.Column("QUALITY", "J", array=np.zeros(time.size, dtype=np.int32)),
+        ]
+    )
+    fits.HDUList([fits.PrimaryHDU(), table]).writeto(path)
+
+
+def test_preprocess_directory_writes_arrays_and_manifest(tmp_path):
+    raw, processed = tmp_path / "raw", tmp_path / "processed"
+    _write_curve(raw / "kplr001.fits", 0)
+    _write_curve(raw / "q2" / "kplr002.fits", 1)
+    (raw / "broken.fits").write_text("not a fits file")
+
+    report = preprocess_directory(
+        raw,
+        processed,
+        config=CONFIG,
+        batch=BatchConfig(workers=1, chunk_size=2),
+        labels={"kplr001": 1},
+    )
+
+    assert (report.processed, report.skipped, report.failed, report.unlabeled) == (
+        2,
+        0,
+        1,
+        1,
+    )
+    assert report.failures[0]["path"].endswith("broken.fits")
+    assert report.curves_per_second > 0
+
+    records = load_manifest(processed / "manifest.jsonl")
+    assert [record.label for record in records] == [1]
+    assert records[0].flux_path == processed / "kplr001.flux.npy"
+    flux, time = np.load(records[0].flux_path), np.load(records[0].time_path)
+    assert flux.dtype == np.float32 and flux.shape == time.shape
+    metadata = json.loads(records[0].metadata_path.read_text())
+    assert metadata["length"] == flux.size
+
+
+def test_preprocess_directory_resumes_and_detects_changes(tmp_path):
+    raw, processed = tmp_path / "raw", tmp_path / "processed"
+    _write_curve(raw / "a.fits", 0)
+    _write_curve(raw / "b.fits", 1)
+    batch = BatchConfig(workers=1, default_label=0)
+    preprocess_directory(raw, processed, config=CONFIG, batch=batch)
+
+    again = preprocess_directory(raw, processed, config=CONFIG, batch=batch)
+    assert (again.processed, again.skipped) == (0, 2)
+
+    (raw / "b.fits").unlink()
+    _write_curve(raw / "b.fits", 2)
+    stat = (raw / "b.fits").stat()
+    os.utime(raw / "b.fits", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    changed = preprocess_directory(raw, processed, config=CONFIG, batch=batch)
+    assert (changed.processed, changed.skipped) == (1, 1)
+
+    reconfigured = preprocess_directory(
+        raw,
+        processed,
+        config=PreprocessingConfig(engine="numpy", period=3.0, window_length=101),
+        batch=batch,
+    )
+    assert reconfigured.processed == 2
+    assert len(load_manifest(processed / "manifest.jsonl")) == 2
+
+
+def test_preprocess_directory_process_pool(tmp_path):
+    raw, processed = tmp_path / "raw", tmp_path / "processed"
+    for idx in range(3):
+        _write_curve(raw / f"c{idx}.fits", idx)
+
+    report = preprocess_directory(
+        raw,
+        processed,
+        config=CONFIG,
+        batch=BatchConfig(workers=2, chunk_size=1, default_label=0),
+    )
+
+    assert report.processed == 3
+    assert len(load_manifest(processed / "manifest.jsonl")) == 3
+
+
+def _crash_on_c1(tasks, *args):
+    if any(source.name == "c1.fits" for source, _ in tasks):
+        os._exit(1)
+    return _process_chunk(tasks, *args)
+
+
+def test_preprocess_directory_survives_a_dead_worker(tmp_path, monkeypatch):
+    raw, processed = tmp_path / "raw", tmp_path / "processed"
+    for idx in range(3):
+        _write_curve(raw / f"c{idx}.fits", idx)
+    monkeypatch.setattr(batch_module, "_process_chunk", _crash_on_c1)
+
+    report = preprocess_directory(
+        raw,
+        processed,
+        config=CONFIG,
+        batch=BatchConfig(
+            workers=2, chunk_size=1, default_label=0, start_method="fork"
+        ),
+    )
+
+    assert report.failed >= 1
+    assert any("BrokenProcessPool" in failure["error"] for failure in report.failures)
+    assert report.processed + report.failed == 3
+    manifest = load_manifest(processed / "manifest.jsonl")
+    assert len(manifest) == report.processed
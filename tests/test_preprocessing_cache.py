@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import pickle
+import time as time_module
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.preprocessing import (
+    PreprocessingCache,
+    PreprocessingConfig,
+    preprocess_lightcurve,
+)
+from app.telemetry import observe_preprocessing
+
+fits = pytest.importorskip("astropy.io.fits")
+
+CONFIG = PreprocessingConfig(engine="numpy", period=2.5, window_length=101)
+
+
+def _write_curve(path: Path, seed: int = 0) -> Path:
+    rng = np.random.default_rng(seed)
+    time = np.arange(0.0, 10.0, 0.01)
+    table = fits.BinTableHDU.from_columns(
+        [
+            fits.Column("TIME", "D", array=time),
+            fits.Column(
+                "PDCSAP_FLUX", "E", array=1000.0 + rng.normal(0.0, 1.0, time.size)
+            ),
+        ]
+    )
+    fits.HDUList([fits.PrimaryHDU(), table]).writeto(path)
+    return path
+
+
+def test_cache_key_covers_content_config_and_column(tmp_path):
+    cache = PreprocessingCache(tmp_path / "cache")
+    first = _write_curve(tmp_path / "a.fits", seed=0)
+    copy = tmp_path / "copy.fits"
+    copy.write_bytes(first.read_bytes())
+    other = _write_curve(tmp_path / "b.fits", seed=1)
+
+    key = cache.key(first, CONFIG, "PDCSAP_FLUX")
+    assert cache.key(copy, CONFIG, "PDCSAP_FLUX") == key
+    assert cache.key(other, CONFIG, "PDCSAP_FLUX") != key
+    assert (
+        cache.key(first, PreprocessingConfig(engine="numpy", period=3.0), "PDCSAP_FLUX")
+        != key
+    )
+    assert cache.key(first, CONFIG, "SAP_FLUX") != key
+
+
+def test_preprocess_lightcurve_serves_repeat_uploads_from_cache(tmp_path):
+    cache = PreprocessingCache(tmp_path / "cache")
+    first = _write_curve(tmp_path / "upload.fits")
+    artifacts = tmp_path / "artifacts"
+
+    miss = preprocess_lightcurve(
+        first, config=CONFIG, artifact_dir=artifacts, cache=cache
+    )
+    second = tmp_path / "again.fits"
+    second.write_bytes(first.read_bytes())
+    hit = preprocess_lightcurve(
+        second, config=CONFIG, artifact_dir=artifacts, cache=cache
+    )
+
+    assert miss["metadata"]["cache_hit"] is False
+    assert hit["metadata"]["cache_hit"] is True
+    assert hit["metadata"]["path"] == str(second.resolve())
+    assert isinstance(hit["flux"], np.memmap) and hit["flux"].dtype == np.float32
+    np.testing.assert_array_equal(hit["flux"], miss["flux"])
+    np.testing.assert_array_equal(hit["time"], miss["time"])
+    assert hit["statistics"] == miss["statistics"]
+    assert hit["plot_path"] == miss["plot_path"]
+    for result in (miss, hit):
+        observe_preprocessing(result, cache=cache)
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+    Path(hit["plot_path"]).unlink()
+    regenerated = preprocess_lightcurve(
+        second, config=CONFIG, artifact_dir=artifacts, cache=cache
+    )
+    assert regenerated["metadata"]["cache_hit"] is True
+    assert Path(regenerated["plot_path"]).exists()
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = PreprocessingCache(tmp_path / "cache", max_bytes=10**9)
+    arrays = {
+        "time": np.zeros(1000, dtype=np.float32),
+        "flux": np.ones(1000, dtype=np.float32),
+        "metadata": {},
+    }
+    for key in ("aa01", "bb02", "cc03"):
+        cache.put(key, arrays)
+    entry_size = cache.size_bytes() // 3
+
+    old = time_module.time() - 100
+    for offset, key in enumerate(("aa01", "bb02", "cc03")):
+        meta = tmp_path / "cache" / key[:2] / key / "meta.json"
+        os.utime(meta, (old + offset, old + offset))
+    assert cache.get("aa01") is not None  # refreshes its recency
+
+    cache.max_bytes = 2 * entry_size
+    assert cache.evict() == 1
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") is not None and cache.get("cc03") is not None
+
+
+def test_cache_size_total_is_shared_with_worker_copies(tmp_path):
+    cache = PreprocessingCache(tmp_path / "cache", max_bytes=10**9)
+    worker = pickle.loads(pickle.dumps(cache))
+    arrays = {
+        "time": np.zeros(1000, dtype=np.float32),
+        "flux": np.ones(1000, dtype=np.float32),
+        "metadata": {},
+    }
+    cache.put("aa01", arrays)
+    worker.put("bb02", arrays)
+    assert cache._read_total() == cache.size_bytes()
+
+    worker.max_bytes = cache.size_bytes()
+    worker.put("cc03", arrays)
+    assert cache._read_total() == cache.size_bytes() <= worker.max_bytes
+    assert cache.get("aa01") is None and cache.get("cc03") is not None
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.preprocessing import (
+    PreprocessingConfig,
+    PreprocessingError,
+    fast,
+    preprocess_lightcurve,
+)
+
+
+def _synthetic_curve(n: int = 3000, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    time = 1325.0 + np.arange(n) * (2 / 1440)
+    time[n // 2 :] += 1.5
+    flux = 1000 * (1 + 0.002 * np.sin(time / 3.0)) + rng.normal(0, 0.5, n)
+    flux[(time - 1325.3) % 2.71234 < 0.08] -= 5.0
+    flux[[100, n // 3, 2 * n // 3]] += 80
+    flux[50] = np.nan
+    return time, flux
+
+
+def _write_fits(path, time, flux, quality) -> None:
+    fits = pytest.importorskip("astropy.io.fits")
+    primary = fits.PrimaryHDU()
+    primary.header["TELESCOP"] = "TESS"
+    table = fits.BinTableHDU.from_columns(
+        [
+            fits.Column("TIME", "D", array=time),
+            fits.Column("PDCSAP_FLUX", "E", array=flux),
+            fits.Column("QUALITY", "J", array=quality),
+        ]
+    )
+    fits.HDUList([primary, table]).writeto(path)
+
+
+def test_sigma_clip_mask_matches_astropy():
+    stats = pytest.importorskip("astropy.stats")
+    _, flux = _synthetic_curve()
+    expected = ~stats.sigma_clip(flux, sigma=3.0).mask
+    np.testing.assert_array_equal(fast.sigma_clip_mask(flux, 3.0), expected)
+
+
+def test_fold_wraps_and_sorts_by_phase():
+    time = np.arange(10, dtype=float)
+    phase, flux = fast.fold(time, time * 10, period=4.0)
+    assert np.all(np.diff(phase) >= 0)
+    assert phase.min() >= -2.0 and phase.max() < 2.0
+    np.testing.assert_allclose(np.sort((time - time[0] + 2.0) % 4.0 - 2.0), phase)
+    assert flux[0] == 20.0
+
+
+@pytest.mark.parametrize("period", [2.71234, None])
+def test_numpy_engine_matches_lightkurve(period):
+    lk = pytest.importorskip("lightkurve")
+    from app.preprocessing.pipeline import _apply_cleaning, _phase_fold
+
+    time, flux = _synthetic_curve()
+    cfg = PreprocessingConfig(period=period, period_min=1.0, period_max=5.0)
+
+    folded = _phase_fold(_apply_cleaning(lk.LightCurve(time=time, flux=flux), cfg), cfg)
+    fast_time, fast_flux = fast.phase_fold_arrays(
+        *fast.clean_arrays(time, flux, cfg), cfg
+    )
+
+    np.testing.assert_allclose(fast_time, folded.time.value, atol=1e-6)
+    np.testing.assert_allclose(fast_flux, folded.flux.value, rtol=1e-6)
+
+
+def test_preprocess_lightcurve_numpy_engine(tmp_path):
+    time, flux = _synthetic_curve()
+    quality = np.zeros(time.size, dtype=np.int32)
+    quality[[10, 20]] = 32
+    time[30] = np.nan
+    path = tmp_path / "curve.fits"
+    _write_fits(path, time, flux, quality)
+
+    loaded_time, _ = fast.load_arrays(path)
+    assert loaded_time.size == time.size - 3
+
+    cfg = PreprocessingConfig(engine="numpy", period=2.71234)
+    result = preprocess_lightcurve(path, config=cfg)
+    assert result["flux"].dtype == np.float32
+    assert result["time"].size == result["flux"].size
+    assert np.all(np.diff(result["time"]) >= 0)
+    assert result["metadata"]["config"]["engine"] == "numpy"
+
+
+def test_unknown_engine_rejected(tmp_path):
+    with pytest.raises(PreprocessingError):
+        preprocess_lightcurve(
+            tmp_path / "curve.fits", config=PreprocessingConfig(engine="fortran")
+        )
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.preprocessing.features import FEATURE_NAMES, extract_features
+
+
+def test_transit_depth_and_snr_on_folded_curve():
+    rng = np.random.default_rng(3)
+    phase = np.linspace(-0.5, 0.5, 4000)
+    flux = 1.0 + rng.normal(0.0, 1e-4, phase.size)
+    flux[np.abs(phase) < 0.01] -= 1e-3
+
+    features = extract_features(phase, flux)
+
+    assert tuple(features) == FEATURE_NAMES
+    assert abs(features["transit_depth"] - 1e-3) < 2e-4
+    assert features["depth_snr"] > 20
+    assert features["flux_skew"] < 0
+
+
+def test_flat_curve_has_finite_features():
+    features = extract_features(np.arange(50.0), np.ones(50))
+
+    assert all(np.isfinite(value) for value in features.values())
+    assert features["transit_depth"] == 0.0 and features["depth_snr"] == 0.0
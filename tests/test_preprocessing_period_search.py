@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.preprocessing import (
+    PeriodSearchConfig,
+    PreprocessingConfig,
+    fast,
+    search_periods,
+)
+
+
+def _transit_curve(
+    period: float = 2.437,
+    epoch: float = 0.8,
+    duration: float = 0.12,
+    depth: float = 2e-3,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    time = np.arange(0.0, 27.0, 10 / 1440)
+    flux = 1.0 + rng.normal(0.0, 5e-4, time.size)
+    phase = (time - epoch + period / 2) % period - period / 2
+    flux[np.abs(phase) < duration / 2] -= depth
+    return time, flux
+
+
+def test_search_periods_recovers_injected_transit():
+    time, flux = _transit_curve()
+    candidates = search_periods(
+        time, flux, PeriodSearchConfig(period_min=0.5, period_max=10.0)
+    )
+
+    best = candidates[0]
+    assert best.period == pytest.approx(2.437, rel=1e-3)
+    assert best.depth == pytest.approx(2e-3, rel=0.25)
+    assert best.duration == pytest.approx(0.12, abs=0.06)
+    assert (best.epoch - 0.8 + 2.437 / 2) % 2.437 - 2.437 / 2 == pytest.approx(
+        0.0, abs=0.03
+    )
+    assert best.snr > 20
+    assert [candidate.snr for candidate in candidates] == sorted(
+        (c.snr for c in candidates), reverse=True
+    )
+    assert len(candidates) <= 5
+
+
+def test_search_periods_parallel_matches_serial():
+    time, flux = _transit_curve(seed=1)
+    serial = search_periods(time, flux, PeriodSearchConfig(period_max=8.0, top_k=3))
+    parallel = search_periods(
+        time, flux, PeriodSearchConfig(period_max=8.0, top_k=3, workers=2)
+    )
+    assert [c.to_dict() for c in parallel] == [c.to_dict() for c in serial]
+
+
+def test_search_periods_rejects_short_baseline():
+    time = np.linspace(0.0, 0.4, 100)
+    with pytest.raises(ValueError):
+        search_periods(time, np.ones_like(time), PeriodSearchConfig(period_min=0.5))
+
+
+def test_numpy_engine_uses_fast_period_search():
+    time, flux = _transit_curve()
+    cfg = PreprocessingConfig(
+        engine="numpy", period_search="fast", period_min=0.5, period_max=10.0
+    )
+    phase, folded = fast.phase_fold_arrays(time, flux, cfg)
+    assert phase.max() - phase.min() == pytest.approx(2.437, rel=1e-2)
+    assert folded.size == flux.size
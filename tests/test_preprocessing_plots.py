@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+import time as time_module
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.preprocessing import (
+    PlotStore,
+    PreprocessingCache,
+    PreprocessingConfig,
+    decimate_minmax,
+    preprocess_lightcurve,
+)
+
+fits = pytest.importorskip("astropy.io.fits")
+
+
+def test_decimate_minmax_bounds_points_and_keeps_extremes():
+    rng = np.random.default_rng(0)
+    time = np.sort(rng.uniform(0.0, 10.0, 100_000))
+    flux = rng.normal(1.0, 0.01, time.size)
+    flux[12_345] = 0.5
+
+    dec_time, dec_flux = decimate_minmax(time, flux, bins=500)
+
+    assert dec_time.size == dec_flux.size <= 1000
+    assert np.all(np.diff(dec_time) >= 0)
+    assert dec_flux.min() == flux.min() and dec_flux.max() == flux.max()
+
+    short_time, short_flux = decimate_minmax(time[:100], flux[:100], bins=500)
+    assert short_time.size == short_flux.size == 100
+
+
+def test_plot_store_renders_lazily_once(tmp_path):
+    store = PlotStore(tmp_path / "plots", bins=200)
+    time = np.linspace(0.0, 1.0, 5000)
+    flux = np.sin(time * 20)
+
+    plot_id = store.submit(time, flux)
+    assert store.submit(time, flux) == plot_id
+    assert store.exists(plot_id)
+    assert not store.image_path(plot_id).exists()
+
+    image = store.render(plot_id)
+    assert image.read_bytes().startswith(b"\x89PNG")
+    mtime = image.stat().st_mtime_ns
+    assert store.render(plot_id).stat().st_mtime_ns == mtime
+
+    with pytest.raises(FileNotFoundError):
+        store.render("0" * 32)
+    with pytest.raises(ValueError):
+        store.render("../../etc/passwd")
+
+
+def test_preprocess_lightcurve_defers_plot(tmp_path):
+    time = np.arange(0.0, 10.0, 0.01)
+    table = fits.BinTableHDU.from_columns(
+        [
+            fits.Column("TIME", "D", array=time),
+            fits.Column(
+                "PDCSAP_FLUX",
+                "E",
+                array=1000.0 + np.random.default_rng(0).normal(0.0, 1.0, time.size),
+            ),
+        ]
+    )
+    path = tmp_path / "curve.fits"
+    fits.HDUList([fits.PrimaryHDU(), table]).writeto(path)
+    store = PlotStore(tmp_path / "plots")
+    cache = PreprocessingCache(tmp_path / "cache")
+    config = PreprocessingConfig(engine="numpy", period=2.5, window_length=101)
+
+    result = preprocess_lightcurve(
+        path,
+        config=config,
+        artifact_dir=tmp_path / "artifacts",
+        cache=cache,
+        plot_store=store,
+    )
+
+    assert result["statistics"]["count"] == result["flux"].size
+    assert result["plot_path"] == str(store.image_path(result["plot_id"]))
+    assert not Path(result["plot_path"]).exists()
+    assert not (tmp_path / "artifacts").exists()
+
+    hit = preprocess_lightcurve(path, config=config, cache=cache, plot_store=store)
+    assert hit["metadata"]["cache_hit"] is True
+    assert hit["plot_id"] == result["plot_id"]
+
+
+def test_plot_store_evicts_least_recently_used_plots(tmp_path):
+    store = PlotStore(tmp_path / "plots", bins=50)
+    time = np.linspace(0.0, 1.0, 500)
+    ids = [store.submit(time, np.sin(time * (idx + 1))) for idx in range(3)]
+    per_plot = store.size_bytes() // 3
+
+    old = time_module.time() - 100
+    for offset, plot_id in enumerate(ids):
+        os.utime(store.data_path(plot_id), (old + offset, old + offset))
+    store.submit(time, np.sin(time))  # resubmitting refreshes the first plot
+
+    store.max_bytes = 3 * per_plot
+    fourth = store.submit(time, np.cos(time))
+    assert not store.exists(ids[1])
+    assert all(store.exists(plot_id) for plot_id in (ids[0], ids[2], fourth))
+    assert store.size_bytes() <= store.max_bytes
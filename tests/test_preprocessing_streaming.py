@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.preprocessing import LightCurveStream, RingBuffer, StreamConfig
+
+
+def test_ring_buffer_keeps_latest_values_in_order():
+    ring = RingBuffer(4)
+    ring.extend(np.arange(3))
+    ring.extend(np.arange(3, 6))
+    assert ring.values().tolist() == [2, 3, 4, 5]
+    ring.extend(np.arange(10, 20))
+    assert ring.values().tolist() == [16, 17, 18, 19]
+    assert len(ring) == 4
+
+
+def _series(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    time = np.arange(count) * 0.02
+    flux = 1000.0 + 5.0 * time + rng.normal(0, 0.2, count)
+    return time, flux
+
+
+def test_chunking_does_not_change_detrended_window():
+    time, flux = _series(3000)
+    config = StreamConfig(window=500, stride=100, trend_window=101, min_cadences=100)
+
+    whole = LightCurveStream(config)
+    whole.push(time, flux)
+    chunked = LightCurveStream(config)
+    for start in range(0, time.size, 37):
+        chunked.push(time[start : start + 37], flux[start : start + 37])
+
+    expected_time, expected_flux = whole.take_window()
+    actual_time, actual_flux = chunked.take_window()
+    np.testing.assert_array_equal(actual_time, expected_time)
+    np.testing.assert_allclose(actual_flux, expected_flux, rtol=1e-6)
+    # The linear trend is divided out.
+    assert abs(float(np.median(actual_flux)) - 1.0) < 1e-3
+
+
+def test_stream_drops_bad_cadences_and_stays_bounded():
+    time, flux = _series(400)
+    flux[250] = 5000.0
+    flux[260] = np.nan
+    stream = LightCurveStream(
+        StreamConfig(window=128, stride=64, trend_window=64, min_cadences=64)
+    )
+    nbytes = stream.nbytes
+
+    assert stream.push(time, flux) == 398
+    assert stream.push(time[:10], flux[:10]) == 0  # not after the last cadence
+    assert stream.received == 410 and stream.accepted == 398
+    assert stream.buffered == 128 and stream.nbytes == nbytes
+
+    window_time, window_flux = stream.take_window()
+    assert window_time[-1] == time[-1] and float(window_flux.max()) < 1.01
+    assert not stream.due and not stream.has_new_cadences
+    more = time[-1] + 0.02 * np.arange(1, 65)
+    stream.push(more, 1000.0 + 5.0 * more)
+    assert stream.due
+
+
+def test_stream_config_is_validated():
+    with pytest.raises(ValueError):
+        LightCurveStream(StreamConfig(window=10, min_cadences=20))
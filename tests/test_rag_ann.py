@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.rag import vectorstore
+from app.rag.ann import HNSWConfig, IVFPQConfig, IVFPQIndex
+from app.rag.corpus import DocumentEntry
+from app.rag.vectorstore import LocalStoreConfig, LocalVectorStore
+
+
+def _clustered(rows: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(20, dim))
+    return (
+        centres[rng.integers(0, 20, rows)] + 0.3 * rng.normal(size=(rows, dim))
+    ).astype(np.float32)
+
+
+def _filled_store(tmp_path: Path, vectors: np.ndarray, **overrides) -> LocalVectorStore:
+    store = LocalVectorStore(
+        LocalStoreConfig(directory=tmp_path, collection_name="ann", **overrides)
+    )
+    entries = [
+        DocumentEntry(
+            f"doc-{idx}", f"chunk {idx}", {"mission": "Kepler" if idx % 2 else "TESS"}
+        )
+        for idx in range(len(vectors))
+    ]
+    store.upsert_documents(entries, vectors)
+    return store
+
+
+def _recall(found: list[list[str]], truth: list[list[str]]) -> float:
+    return float(np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, truth)]))
+
+
+def test_ivfpq_index_encodes_compactly_and_ranks_neighbours(tmp_path: Path):
+    vectors = _clustered(4000)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = IVFPQIndex.build(
+        vectors, np.ones(len(vectors), dtype=bool), IVFPQConfig(m=16)
+    )
+    index.save(tmp_path / "ann")
+    loaded = IVFPQIndex.load(
+        tmp_path / "ann", rows=len(vectors), nprobe=index.centroids.shape[0]
+    )
+
+    assert loaded.codes.shape == (4000, 16) and loaded.codes.dtype == np.uint8
+    assert isinstance(loaded.codes, np.memmap)
+    rows, scores = loaded.search(vectors[7], 50)
+    assert 7 in rows[:5]
+    assert np.all(np.diff(scores) <= 0)
+    exact = np.argsort(-(vectors @ vectors[7]))[:10]
+    assert len(set(rows) & set(exact)) >= 8
+
+
+def test_store_uses_index_with_rerank_filters_and_new_rows(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(vectorstore, "EXACT_SCAN_ROWS", 0)
+    vectors = _clustered(3000)
+    queries = vectors[:30] + 0.2 * np.random.default_rng(1).normal(
+        size=(30, 32)
+    ).astype(np.float32)
+    store = _filled_store(tmp_path, vectors)
+    truth = [[hit.id for hit in store.search(query, limit=10)] for query in queries]
+
+    store.build_index(IVFPQConfig(m=16))
+    extra = -vectors[:1]
+    store.upsert_documents(
+        [DocumentEntry("late", "added after build", {"mission": "TESS"})], extra
+    )
+    store.delete_documents(["doc-0"])
+
+    reopened = LocalVectorStore(
+        LocalStoreConfig(
+            directory=tmp_path, collection_name="ann", index="ivfpq", nprobe=16
+        )
+    )
+    found = [[hit.id for hit in reopened.search(query, limit=10)] for query in queries]
+    assert reopened._index is not None and reopened._index.kind == "ivfpq"
+    assert _recall(found, truth) >= 0.9
+    assert reopened.search(extra[0], limit=1)[0].id == "late"
+    assert "doc-0" not in {hit.id for hit in reopened.search(vectors[0], limit=10)}
+    tess = reopened.search(queries[0], limit=10, filters={"mission": "TESS"})
+    assert len(tess) == 10 and all(hit.payload["mission"] == "TESS" for hit in tess)
+
+
+def test_compaction_drops_the_index(tmp_path: Path):
+    store = _filled_store(tmp_path, _clustered(500))
+    store.build_index(IVFPQConfig(m=4, kmeans_iterations=4))
+    store.compact()
+
+    assert store._index is None and not (store.path / "ann").exists()
+
+
+def test_automatic_compaction_waits_for_an_index_rebuild(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(vectorstore, "EXACT_SCAN_ROWS", 0)
+    vectors = _clustered(3000)
+    store = _filled_store(tmp_path, vectors)
+    store.build_index(IVFPQConfig(m=4, kmeans_iterations=4))
+    store.delete_documents([f"doc-{idx}" for idx in range(1600)])
+
+    assert store.compaction_pending and store._count == 3000
+    assert store._index is not None and (store.path / "ann").exists()
+    assert store.search(vectors[2000], limit=1)[0].id == "doc-2000"
+
+    store.build_index(IVFPQConfig(m=4, kmeans_iterations=4))
+    assert not store.compaction_pending and store._count == 1400
+    assert store._index is not None and store._index.rows == 1400
+    assert store.search(vectors[2000], limit=1)[0].id == "doc-2000"
+
+
+def test_hnsw_index_round_trip(tmp_path: Path, monkeypatch):
+    pytest.importorskip("hnswlib")
+    monkeypatch.setattr(vectorstore, "EXACT_SCAN_ROWS", 0)
+    vectors = _clustered(2000)
+    store = _filled_store(tmp_path, vectors)
+    store.build_index(HNSWConfig(M=8, ef_construction=100))
+
+    reopened = LocalVectorStore(
+        LocalStoreConfig(directory=tmp_path, collection_name="ann", index="hnsw")
+    )
+    assert reopened.search(vectors[42], limit=1)[0].id == "doc-42"
+    kepler = reopened.search(vectors[42], limit=5, filters={"mission": "Kepler"})
+    assert all(hit.payload["mission"] == "Kepler" for hit in kepler)
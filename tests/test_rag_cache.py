@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from app.rag.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache: TTLCache[int] = TTLCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1}
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache: TTLCache[str] = TTLCache(10, ttl=5.0, timer=clock)
+    cache.set("q", "vector")
+    clock.now = 4.9
+    assert cache.get("q") == "vector"
+    clock.now = 5.1
+    assert cache.get("q") is None
+    assert len(cache) == 0
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.rag.embedding_cache import EmbeddingCache
+
+
+def test_cache_roundtrip_and_reload(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path, "test/model")
+    keys = [cache.key("alpha"), cache.key("beta")]
+    vectors = np.arange(6, dtype=np.float32).reshape(2, 3)
+    cache.add(keys, vectors)
+
+    reloaded = EmbeddingCache(tmp_path, "test/model")
+    results = reloaded.lookup(keys + [reloaded.key("gamma")])
+    np.testing.assert_array_equal(results[0], vectors[0])
+    np.testing.assert_array_equal(results[1], vectors[1])
+    assert results[2] is None
+    assert reloaded.stats() == {"entries": 2, "hits": 2, "misses": 1}
+
+
+def test_cache_key_normalizes_whitespace_and_model(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path, "model-a")
+    other = EmbeddingCache(tmp_path, "model-b")
+    assert cache.key("hot  jupiter\n") == cache.key("hot jupiter")
+    assert cache.key("hot jupiter") != other.key("hot jupiter")
+
+
+def test_cache_recovers_from_torn_append(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path, "model")
+    cache.add([cache.key("a")], np.ones((1, 4), dtype=np.float32))
+    with (cache.directory / "vectors.f32").open("ab") as handle:
+        handle.write(b"\x00" * 10)
+
+    reloaded = EmbeddingCache(tmp_path, "model")
+    assert len(reloaded) == 1
+    reloaded.add([reloaded.key("b")], np.full((1, 4), 2.0, dtype=np.float32))
+    np.testing.assert_array_equal(
+        reloaded.lookup([reloaded.key("b")])[0], np.full(4, 2.0)
+    )
+
+
+def test_cache_rejects_dimension_mismatch(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path, "model")
+    cache.add([cache.key("a")], np.ones((1, 4), dtype=np.float32))
+    with pytest.raises(ValueError):
+        cache.add([cache.key("b")], np.ones((1, 3), dtype=np.float32))
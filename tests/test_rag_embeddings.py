@@ -32,3 +32,19 @@ def test_embedding_service_embeddings():
     assert vectors.shape == (2, 3)
     query = service.embed_query("hello")
     assert query.shape == (3,)
+
+
+def test_embedding_service_only_encodes_cache_misses(tmp_path):
+    from app.rag.embeddings import EmbeddingConfig
+
+    service = EmbeddingService(EmbeddingConfig(cache_dir=str(tmp_path)))
+    first = service.embed_documents(["one", "two"])
+    second = service.embed_documents(["two", "three", "three"])
+
+    assert service.model.encode_calls == [["one", "two"], ["three"]]
+    assert first.shape == (2, 3)
+    assert second.shape == (3, 3)
+
+    restarted = EmbeddingService(EmbeddingConfig(cache_dir=str(tmp_path)))
+    restarted.embed_documents(["one", "two", "three"])
+    assert restarted._model is None
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from app.rag.incremental import IncrementalIndexer, IndexManifest
+from app.rag.indexer import QdrantConfig, QdrantIndexer
+
+
+class DummyEmbeddingService:
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        self.embedded.extend(texts)
+        return np.ones((len(texts), 3), dtype=np.float32)
+
+
+def _make_indexer(tmp_path: Path):
+    client = MagicMock()
+    client.collection_exists.return_value = True
+    embeddings = DummyEmbeddingService()
+    indexer = IncrementalIndexer(
+        QdrantIndexer(client, QdrantConfig(collection_name="test")),
+        embeddings,
+        tmp_path / "manifest.json",
+        chunk_size=10,
+        overlap=0,
+    )
+    return indexer, client, embeddings
+
+
+def test_incremental_indexer_skips_unchanged_files(tmp_path: Path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.md").write_text("A" * 25)
+    (corpus / "b.md").write_text("B" * 10)
+    indexer, client, embeddings = _make_indexer(tmp_path)
+
+    first = indexer.sync(corpus)
+    assert (first.added, first.skipped, first.deleted) == (4, 0, 0)
+    assert client.upsert.call_count == 1
+
+    second = indexer.sync(corpus)
+    assert (second.added, second.skipped, second.deleted) == (0, 4, 0)
+    assert client.upsert.call_count == 1
+    assert len(embeddings.embedded) == 4
+    assert second.version == first.version
+
+
+def test_incremental_indexer_reembeds_changed_and_deletes_removed(tmp_path: Path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.md").write_text("A" * 20)
+    (corpus / "b.md").write_text("B" * 10)
+    indexer, client, embeddings = _make_indexer(tmp_path)
+    first = indexer.sync(corpus)
+
+    (corpus / "a.md").write_text("A" * 10 + "C" * 10)
+    os.utime(corpus / "a.md", ns=(1, 1))
+    (corpus / "b.md").unlink()
+    report = indexer.sync(corpus)
+
+    assert report.added == 1
+    assert report.skipped == 1
+    assert report.deleted == 2
+    assert report.version == first.version + 1
+    assert embeddings.embedded[-1] == "C" * 10
+    deleted = client.delete.call_args.kwargs["points_selector"].points
+    assert len(deleted) == 2
+
+    manifest = IndexManifest.load(tmp_path / "manifest.json")
+    assert set(manifest.files) == {str(corpus / "a.md")}
+
+
+def test_incremental_indexer_rebuilds_when_collection_missing(tmp_path: Path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.md").write_text("A" * 10)
+    indexer, client, embeddings = _make_indexer(tmp_path)
+    indexer.sync(corpus)
+
+    client.collection_exists.return_value = False
+    report = indexer.sync(corpus)
+    assert report.added == 1
+    client.delete.assert_not_called()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.rag.corpus import DocumentEntry
+from app.rag.lexical import BM25Config, BM25Index, reciprocal_rank_fusion, tokenize
+from app.rag.retriever import RetrievalService
+from app.rag.vectorstore import LocalStoreConfig, LocalVectorStore
+
+ENTRIES = [
+    DocumentEntry(
+        "koi",
+        "KOI-7016.01 is a Kepler candidate orbiting a Sun-like star.",
+        {"mission": "Kepler"},
+    ),
+    DocumentEntry(
+        "toi",
+        "TOI-700 d orbits in the habitable zone; TIC 150428135 hosts it.",
+        {"mission": "TESS"},
+    ),
+    DocumentEntry(
+        "k22",
+        "Kepler-22b was the first transiting planet found in a habitable zone.",
+        {"mission": "Kepler"},
+    ),
+    DocumentEntry(
+        "gen",
+        "Transit depth scales with the square of the planet radius.",
+        {"mission": "TESS"},
+    ),
+]
+
+
+def test_tokenizer_keeps_identifiers_and_their_parts():
+    assert tokenize("The KOI-7016.01 signal") == [
+        "koi-7016.01",
+        "koi",
+        "7016.01",
+        "signal",
+    ]
+    assert tokenize("TIC 150428135") == ["tic", "150428135"]
+
+
+def test_bm25_ranks_exact_identifiers_and_round_trips(tmp_path: Path):
+    index = BM25Index.build(ENTRIES)
+
+    assert [hit.id for hit in index.search("Kepler-22b radius", limit=2)] == [
+        "k22",
+        "gen",
+    ]
+    assert index.search("TIC 150428135", limit=1)[0].id == "toi"
+    assert index.search("koi 7016.01", limit=1)[0].payload == {
+        "text": ENTRIES[0].text,
+        "mission": "Kepler",
+    }
+    assert [
+        hit.id
+        for hit in index.search(
+            "habitable zone", limit=5, filters={"mission": "Kepler"}
+        )
+    ] == ["k22"]
+    assert index.search("nonexistent words", limit=5) == []
+
+    index.save(tmp_path / "bm25")
+    loaded = BM25Index.load(tmp_path / "bm25")
+    assert isinstance(loaded.postings, np.memmap)
+    for query in ("Kepler-22b radius", "habitable zone", "TOI-700"):
+        expected = [(hit.id, hit.score) for hit in index.search(query, limit=4)]
+        assert [
+            (hit.id, hit.score) for hit in loaded.search(query, limit=4)
+        ] == expected
+
+
+def test_postings_are_impact_ordered_and_capped():
+    entries = [
+        DocumentEntry(f"d{idx}", "planet " * (1 + idx % 3) + f"filler{idx}", {})
+        for idx in range(30)
+    ]
+    index = BM25Index.build(entries, BM25Config(max_postings=5))
+    term = index.terms["planet"]
+    weights = index.weights[index.indptr[term] : index.indptr[term + 1]]
+
+    assert np.all(np.diff(weights) <= 0)
+    assert len(index.search("planet", limit=30)) == 5
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a", "d"]], k=60)
+    assert [doc_id for doc_id, _ in fused] == ["a", "c", "b", "d"]
+    assert fused[0][1] == 1 / 61 + 1 / 62
+
+
+def test_hybrid_retrieval_surfaces_identifier_matches(tmp_path: Path):
+    store = LocalVectorStore(
+        LocalStoreConfig(directory=tmp_path, collection_name="hybrid")
+    )
+    # Dense vectors ignore identifiers: every query lands nearest the generic chunk.
+    vectors = np.array(
+        [[0.6, 0.8], [0.5, 0.86], [0.55, 0.83], [1.0, 0.0]], dtype=np.float32
+    )
+    store.upsert_documents(ENTRIES, vectors)
+
+    class Embeddings:
+        def embed_query(self, text: str):
+            return [1.0, 0.0]
+
+    retriever = RetrievalService(
+        client=None, embedding_service=Embeddings(), store=store
+    )
+    assert retriever.search("TIC 150428135")[0]["id"] == "gen"
+
+    retriever.set_lexical_index(BM25Index.build(ENTRIES))
+    docs = retriever.search("TIC 150428135")
+    assert docs[0]["id"] == "toi" and docs[0]["metadata"] == {"mission": "TESS"}
+    # Scores stay cosine similarities for display; the fused score orders the results.
+    assert docs[0]["score"] == pytest.approx(0.5 / np.hypot(0.5, 0.86))
+    assert [doc["fusion_score"] for doc in docs] == sorted(
+        (doc["fusion_score"] for doc in docs), reverse=True
+    )
+    assert {doc["id"] for doc in docs} == {"koi", "toi", "k22", "gen"}
+    assert [
+        doc["id"]
+        for doc in retriever.search("TIC 150428135", filters={"mission": "Kepler"})
+    ] == ["koi", "k22"]
+
+
+def test_concurrent_saves_leave_one_complete_index(tmp_path: Path):
+    index = BM25Index.build(ENTRIES)
+    errors: list[BaseException] = []
+
+    def _save():
+        try:
+            for _ in range(10):
+                index.save(tmp_path / "bm25")
+        except BaseException as exc:  # noqa: BLE001 - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["bm25"]
+    assert BM25Index.load(tmp_path / "bm25").search("TOI-700", limit=1)[0].id == "toi"
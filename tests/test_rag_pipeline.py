@@ -24,11 +24,19 @@ class DummyRetriever(RetrievalService):  # type: ignore[misc]
         return [
             {"text": "Evidence A", "score": 0.9, "metadata": {"source": "paper.md"}},
             {"text": "Evidence B", "score": 0.8, "metadata": {"source": "report.md"}},
+            {
+                "text": "Evidence C",
+                "score": None,
+                "fusion_score": 0.016,
+                "metadata": {"source": "notes.md"},
+            },
         ]
 
 
 def test_evidence_generator_builds_answer():
-    generator = EvidenceGenerator(retriever=DummyRetriever(), llm=DummyLLM())
+    llm = DummyLLM()
+    generator = EvidenceGenerator(retriever=DummyRetriever(), llm=llm)
     result = generator.generate("Is this a planet?")
     assert "Answer" in result["answer"]
-    assert len(result["documents"]) == 2
+    assert len(result["documents"]) == 3
+    assert "Score: 0.900" in llm.prompts[0] and "Score: keyword match" in llm.prompts[0]
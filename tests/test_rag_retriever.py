@@ -27,3 +27,29 @@ def test_retrieval_service_returns_documents(monkeypatch):
     docs = retriever.search("question")
     assert len(docs) == 2
     assert docs[0]["metadata"]["source"] == "file.md"
+
+
+def test_retrieval_service_caches_until_version_bump():
+    from types import SimpleNamespace
+
+    client = MagicMock()
+    client.search.return_value = [
+        SimpleNamespace(id="doc1", score=0.9, payload={"text": "context"})
+    ]
+    embeddings = MagicMock()
+    embeddings.embed_query.return_value = [0.1, 0.2, 0.3]
+
+    retriever = RetrievalService(client=client, embedding_service=embeddings)
+    first = retriever.search("Prediction=1")
+    first[0]["text"] = "mutated by caller"
+    second = retriever.search("Prediction=1")
+
+    assert second[0]["text"] == "context"
+    assert client.search.call_count == 1
+    assert embeddings.embed_query.call_count == 1
+    assert retriever.cache_stats()["results"]["hits"] == 1
+
+    retriever.set_collection_version(1)
+    retriever.search("Prediction=1")
+    assert client.search.call_count == 2
+    assert embeddings.embed_query.call_count == 2
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.rag import vectorstore
+from app.rag.corpus import DocumentEntry
+from app.rag.retriever import RetrievalService
+from app.rag.vectorstore import LocalStoreConfig, LocalVectorStore
+
+MISSIONS = ("Kepler", "TESS", "K2")
+
+
+def _corpus(count: int, dim: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dim)).astype(np.float32)
+    entries = [
+        DocumentEntry(
+            doc_id=f"doc-{idx}",
+            text=f"chunk {idx}",
+            metadata={"source": f"file-{idx % 5}.md", "mission": MISSIONS[idx % 3]},
+        )
+        for idx in range(count)
+    ]
+    return entries, vectors
+
+
+def _store(tmp_path: Path, **overrides) -> LocalVectorStore:
+    return LocalVectorStore(
+        LocalStoreConfig(directory=tmp_path, collection_name="test", **overrides)
+    )
+
+
+def _brute_force(
+    vectors: np.ndarray, query: np.ndarray, k: int, rows=None
+) -> list[str]:
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    rows = np.arange(len(vectors)) if rows is None else np.asarray(rows)
+    order = rows[np.argsort(-scores[rows], kind="stable")][:k]
+    return [f"doc-{idx}" for idx in order]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_exact_top_k_persists_across_reload(tmp_path: Path, dtype: str):
+    entries, vectors = _corpus(3000)
+    store = _store(tmp_path, dtype=dtype, initial_capacity=64, block_rows=512)
+    for start in range(0, len(entries), 700):
+        store.upsert_documents(
+            entries[start : start + 700], vectors[start : start + 700]
+        )
+    query = np.random.default_rng(1).normal(size=16).astype(np.float32)
+
+    hits = store.search(query, limit=10)
+    reloaded = _store(tmp_path, dtype=dtype).search(query, limit=10)
+
+    assert [hit.id for hit in hits] == [hit.id for hit in reloaded]
+    if dtype == "float32":
+        assert [hit.id for hit in hits] == _brute_force(vectors, query, 10)
+    else:
+        assert (
+            len(set(hit.id for hit in hits) & set(_brute_force(vectors, query, 10)))
+            >= 8
+        )
+    assert hits[0].payload["text"] == entries[int(hits[0].id.split("-")[1])].text
+    assert all(a.score >= b.score for a, b in zip(hits, hits[1:]))
+
+
+def test_filters_restrict_results_to_matching_payloads(tmp_path: Path):
+    entries, vectors = _corpus(600)
+    store = _store(tmp_path)
+    store.upsert_documents(entries, vectors)
+    query = vectors[4]
+
+    tess = store.search(query, limit=5, filters={"mission": "TESS"})
+    either = store.search(
+        query, limit=5, filters={"mission": ["TESS", "K2"], "source": "file-4.md"}
+    )
+
+    assert [hit.id for hit in tess] == _brute_force(
+        vectors, query, 5, rows=range(1, 600, 3)
+    )
+    assert tess[0].id == "doc-4"
+    assert all(
+        hit.payload["mission"] in ("TESS", "K2")
+        and hit.payload["source"] == "file-4.md"
+        for hit in either
+    )
+    assert store.search(query, limit=5, filters={"mission": "Roman"}) == []
+    with pytest.raises(ValueError):
+        store.search(query, limit=5, filters={"chunk_index": "0"})
+
+
+def test_upsert_replaces_and_delete_hides_documents(tmp_path: Path):
+    entries, vectors = _corpus(40)
+    store = _store(tmp_path)
+    store.upsert_documents(entries, vectors)
+
+    store.upsert_documents(
+        [DocumentEntry("doc-7", "updated", {"mission": "TESS"})], -vectors[7:8]
+    )
+    store.delete_documents(["doc-3", "doc-unknown"])
+
+    assert len(store) == 39
+    assert store.search(-vectors[7], limit=1)[0].payload == {
+        "text": "updated",
+        "mission": "TESS",
+    }
+    assert "doc-3" not in {hit.id for hit in store.search(vectors[3], limit=40)}
+
+    store.compact()
+    reloaded = _store(tmp_path)
+    assert len(reloaded) == 39
+    assert reloaded.search(-vectors[7], limit=1)[0].payload["text"] == "updated"
+    assert [
+        hit.id
+        for hit in reloaded.search(vectors[9], limit=3, filters={"mission": "Kepler"})
+    ] == [
+        hit.id
+        for hit in store.search(vectors[9], limit=3, filters={"mission": "Kepler"})
+    ]
+
+
+def test_retrieval_service_uses_local_store(tmp_path: Path):
+    entries, vectors = _corpus(50)
+    store = _store(tmp_path)
+    store.upsert_documents(entries, vectors)
+
+    class Embeddings:
+        def embed_query(self, text: str):
+            return vectors[int(text)]
+
+    retriever = RetrievalService(
+        client=None, embedding_service=Embeddings(), store=store
+    )
+    docs = retriever.search("12", filters={"mission": "Kepler"})
+
+    assert docs[0]["id"] == "doc-12"
+    assert docs[0]["metadata"] == {"source": "file-2.md", "mission": "Kepler"}
+
+
+def test_reupserts_compact_superseded_payloads(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(vectorstore, "PAYLOAD_COMPACT_BYTES", 0)
+    entries, vectors = _corpus(200)
+    store = _store(tmp_path)
+    for _ in range(5):
+        store.upsert_documents(entries, vectors)
+
+    live = store._live_payload_bytes
+    assert (store.path / "payloads.jsonl").stat().st_size <= 2 * live
+    assert (
+        len(store) == 200
+        and store.search(vectors[5], limit=1)[0].payload["text"] == "chunk 5"
+    )
+
+
+def test_interrupted_compaction_is_completed_on_open(tmp_path: Path, monkeypatch):
+    entries, vectors = _corpus(100)
+    store = _store(tmp_path)
+    store.upsert_documents(entries, vectors)
+    store.delete_documents([f"doc-{idx}" for idx in range(0, 100, 2)])
+
+    def _crash(finished):
+        raise OSError("power cut")
+
+    monkeypatch.setattr(store, "_swap_in", _crash)
+    with pytest.raises(OSError):
+        store.compact()
+    assert (tmp_path / "test.compacted" / "meta.json").exists()
+    (tmp_path / "test.compacting").mkdir()
+
+    reopened = _store(tmp_path)
+    assert len(reopened) == 50 and reopened._count == 50
+    assert reopened.search(vectors[7], limit=1)[0].id == "doc-7"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["test", "test.lock"]
+
+
+def test_search_results_stay_consistent_during_compaction(tmp_path: Path):
+    entries, vectors = _corpus(400)
+    store = _store(tmp_path)
+    store.upsert_documents(entries, vectors)
+    errors: list[str] = []
+    done = threading.Event()
+
+    def _search():
+        while not done.is_set():
+            for hit in store.search(vectors[11], limit=20):
+                if hit.payload["text"] != f"chunk {hit.id.split('-')[1]}":
+                    errors.append(hit.id)
+
+    worker = threading.Thread(target=_search)
+    worker.start()
+    try:
+        for start in range(0, 200, 20):
+            store.delete_documents(
+                [f"doc-{idx}" for idx in range(start, start + 20) if idx != 11]
+            )
+            store.compact()
+    finally:
+        done.set()
+        worker.join()
+    assert errors == []
+
+
+def test_instances_sharing_a_directory_see_each_others_commits(tmp_path: Path):
+    entries, vectors = _corpus(3000)
+    writer, reader = _store(tmp_path), _store(tmp_path)
+    writer.upsert_documents(entries, vectors)
+    assert reader.search(vectors[2999], limit=1)[0].id == "doc-2999"
+
+    # Enough deletions to compact, which renumbers rows and rewrites payloads.jsonl.
+    writer.delete_documents([f"doc-{idx}" for idx in range(1600)])
+    assert writer._count == 1400
+    hits = reader.search(vectors[2999], limit=5)
+    assert hits[0].id == "doc-2999" and hits[0].payload["text"] == "chunk 2999"
+    assert all(int(hit.id.split("-")[1]) >= 1600 for hit in hits)
+
+    # Writes from the stale-looking instance build on the other's compacted state.
+    reader.upsert_documents(entries[:1], vectors[:1])
+    assert len(reader) == 1401
+    assert writer.search(vectors[0], limit=1)[0].payload["text"] == "chunk 0"
+    assert len(_store(tmp_path)) == 1401
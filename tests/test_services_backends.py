@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import torch
+
+from app.models.architecture import CNNBiLSTMAttention
+from app.models.export import export_onnx, export_torchscript, load_backbone
+from app.models.module import ExoplanetClassifier
+from app.services.inference import InferenceConfig, InferenceService
+
+
+def _eager(
+    model: CNNBiLSTMAttention, inputs: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    with torch.no_grad():
+        logits, attention = model(torch.from_numpy(inputs))
+    return logits.numpy(), attention.numpy()
+
+
+def test_load_backbone_restores_checkpoint_weights(tmp_path):
+    module = ExoplanetClassifier().eval()
+    path = tmp_path / "model.ckpt"
+    torch.save(
+        {"state_dict": module.state_dict(), "hyper_parameters": dict(module.hparams)},
+        path,
+    )
+
+    backbone = load_backbone(path)
+    inputs = np.random.default_rng(0).normal(size=(2, 2, 64)).astype(np.float32)
+
+    np.testing.assert_allclose(
+        _eager(backbone, inputs)[0], _eager(module.model, inputs)[0], rtol=1e-6
+    )
+
+
+def test_torchscript_backend_matches_eager_with_dynamic_shapes(tmp_path):
+    model = CNNBiLSTMAttention().eval()
+    path = export_torchscript(model, tmp_path / "model.ts", sequence_length=64)
+    service = InferenceService(
+        InferenceConfig(device="cpu", backend="torchscript", model_path=str(path))
+    )
+
+    for batch_size, length in ((1, 64), (3, 200)):
+        inputs = (
+            np.random.default_rng(length)
+            .normal(size=(batch_size, 2, length))
+            .astype(np.float32)
+        )
+        logits, attention = service._forward(inputs)
+        expected_logits, expected_attention = _eager(model, inputs)
+        np.testing.assert_allclose(logits, expected_logits, rtol=1e-4, atol=1e-5)
+        np.testing.assert_allclose(attention, expected_attention, rtol=1e-4, atol=1e-6)
+
+
+def test_onnx_backend_matches_eager_with_dynamic_shapes(tmp_path):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    model = CNNBiLSTMAttention().eval()
+    path = export_onnx(model, tmp_path / "model.onnx", sequence_length=64)
+    service = InferenceService(
+        InferenceConfig(backend="onnx", model_path=str(path), intra_op_threads=1)
+    )
+
+    for batch_size, length in ((1, 64), (3, 200)):
+        inputs = (
+            np.random.default_rng(length)
+            .normal(size=(batch_size, 2, length))
+            .astype(np.float32)
+        )
+        logits, attention = service._forward(inputs)
+        expected_logits, expected_attention = _eager(model, inputs)
+        np.testing.assert_allclose(logits, expected_logits, rtol=1e-4, atol=1e-5)
+        np.testing.assert_allclose(attention, expected_attention, rtol=1e-4, atol=1e-6)
+
+
+def test_exported_backend_requires_model_path():
+    with pytest.raises(FileNotFoundError):
+        InferenceService(InferenceConfig(backend="torchscript"))
+    with pytest.raises(ValueError):
+        InferenceService(InferenceConfig(backend="tensorrt"))
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+import torch
+
+from app.models.architecture import CNNBiLSTMAttention
+from app.services.batching import BatchingConfig, MicroBatcher
+from app.services.inference import InferenceService
+
+
+class RecordingPredictor:
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, inputs, lengths=None):
+        self.batches.append((inputs.shape, list(lengths or [])))
+        return [
+            (idx, float(sample.sum()), np.ones(2)) for idx, sample in enumerate(inputs)
+        ]
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, BatchingConfig(max_batch_size=8, max_wait_ms=50))
+
+    async def scenario():
+        samples = [np.full((2, 16), float(idx), dtype=np.float32) for idx in range(4)]
+        results = await asyncio.gather(*(batcher.submit(sample) for sample in samples))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert predictor.batches == [((4, 2, 16), [16, 16, 16, 16])]
+    assert [prob for _, prob, _ in results] == [0.0, 32.0, 64.0, 96.0]
+
+
+def test_micro_batcher_buckets_and_pads_lengths():
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(
+        predictor, BatchingConfig(max_batch_size=8, max_wait_ms=50, length_bucket=8)
+    )
+
+    async def scenario():
+        samples = [
+            np.ones((2, 10), dtype=np.float32),
+            np.ones((2, 14), dtype=np.float32),
+            np.ones((2, 20), dtype=np.float32),
+        ]
+        await asyncio.gather(*(batcher.submit(sample) for sample in samples))
+        await batcher.close()
+
+    asyncio.run(scenario())
+    assert sorted(predictor.batches) == [((1, 2, 24), [20]), ((2, 2, 16), [10, 14])]
+
+
+def test_micro_batcher_propagates_errors():
+    class FailingPredictor:
+        def predict_batch(self, inputs, lengths=None):
+            raise RuntimeError("boom")
+
+    batcher = MicroBatcher(FailingPredictor())
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await batcher.submit(np.ones((2, 4), dtype=np.float32))
+        await batcher.close()
+
+    asyncio.run(scenario())
+
+
+def test_micro_batcher_never_leaves_callers_waiting():
+    class ShortPredictor:
+        def predict_batch(self, inputs, lengths=None):
+            return [(0, 0.5, np.ones(2))]
+
+    class SlowPredictor:
+        def predict_batch(self, inputs, lengths=None):
+            threading.Event().wait(0.2)
+            return [(0, 0.5, np.ones(2))] * len(inputs)
+
+    async def short_results():
+        batcher = MicroBatcher(
+            ShortPredictor(), BatchingConfig(max_batch_size=4, max_wait_ms=50)
+        )
+        outcomes = await asyncio.wait_for(
+            asyncio.gather(
+                *(batcher.submit(np.ones((2, 4), dtype=np.float32)) for _ in range(2)),
+                return_exceptions=True,
+            ),
+            timeout=5,
+        )
+        await batcher.close()
+        return outcomes
+
+    async def close_with_pending():
+        batcher = MicroBatcher(
+            SlowPredictor(), BatchingConfig(max_batch_size=1, max_wait_ms=0)
+        )
+        tasks = [
+            asyncio.create_task(batcher.submit(np.ones((2, 4), dtype=np.float32)))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        await batcher.close()
+        return await asyncio.wait_for(
+            asyncio.gather(*tasks, return_exceptions=True), timeout=5
+        )
+
+    assert all(
+        isinstance(outcome, RuntimeError) for outcome in asyncio.run(short_results())
+    )
+    assert all(
+        isinstance(outcome, RuntimeError)
+        for outcome in asyncio.run(close_with_pending())
+    )
+
+
+def test_predict_batch_matches_single_predictions(monkeypatch):
+    monkeypatch.setattr(
+        InferenceService, "_load_model", lambda self: torch.nn.Identity()
+    )
+    service = InferenceService()
+    service.model = CNNBiLSTMAttention().eval()
+    batch = np.random.default_rng(0).normal(size=(3, 2, 64)).astype(np.float32)
+
+    batched = service.predict_batch(batch)
+    for sample, (prediction, probability, attention) in zip(batch, batched):
+        single = service.predict(sample)
+        assert prediction == single[0]
+        assert probability == pytest.approx(single[1], rel=1e-5)
+        np.testing.assert_allclose(attention, single[2], rtol=1e-5, atol=1e-6)
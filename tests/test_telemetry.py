@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app import telemetry
+from app.executors import StageConfig, StageExecutors, StageSaturatedError
+from app.preprocessing import PreprocessingCache
+from app.rag.cache import TTLCache
+
+
+def _value(name: str, **labels) -> float:
+    return telemetry.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_observe_preprocessing_records_steps_and_cache_outcome(tmp_path):
+    before = _value("exoai_preprocess_step_duration_seconds_count", step="bls")
+    hits = _value("exoai_cache_lookups_total", cache="preprocessing", result="hit")
+    result = {
+        "metadata": {"cache_hit": True},
+        "timings": {"load": 0.01, "bls": 0.2, "total": 0.3},
+    }
+
+    cache = PreprocessingCache(tmp_path / "cache")
+    telemetry.observe_preprocessing(result, cache=cache)
+
+    assert (
+        _value("exoai_preprocess_step_duration_seconds_count", step="bls") == before + 1
+    )
+    assert (
+        _value("exoai_cache_lookups_total", cache="preprocessing", result="hit")
+        == hits + 1
+    )
+    assert cache.stats() == {"hits": 1, "misses": 0}
+
+
+def test_ttl_cache_reports_named_lookups():
+    cache = TTLCache(4, name="test_ttl")
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    assert _value("exoai_cache_lookups_total", cache="test_ttl", result="hit") >= 1
+    assert _value("exoai_cache_lookups_total", cache="test_ttl", result="miss") >= 1
+
+
+def test_executor_pending_gauge_and_rejections():
+    executors = StageExecutors(
+        {"gauge_test": StageConfig(max_workers=1, max_pending=1)}
+    )
+    rejected = _value("exoai_executor_rejected_total", stage="gauge_test")
+
+    async def _saturate():
+        async with executors.admit("gauge_test"):
+            assert _value("exoai_executor_pending", stage="gauge_test") == 1
+            with pytest.raises(StageSaturatedError):
+                await executors.run("gauge_test", np.zeros, 3)
+
+    asyncio.run(_saturate())
+    assert _value("exoai_executor_pending", stage="gauge_test") == 0
+    assert _value("exoai_executor_rejected_total", stage="gauge_test") == rejected + 1
+    executors.shutdown(wait=True)
+
+
+def test_multiprocess_registry_aggregates_files(tmp_path, monkeypatch):
+    monkeypatch.setenv(telemetry.MULTIPROCESS_ENV, str(tmp_path))
+    assert telemetry.multiprocess_enabled()
+    registry = telemetry.metrics_registry()
+    assert registry is not telemetry.REGISTRY
+    # An empty directory aggregates to no samples rather than failing.
+    assert list(registry.collect()) == []
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+from app.data.ingestion import IngestionRequest
+from app.workers import IngestionQueue
+
+
+class FakeFetch:
+    def __init__(
+        self, delay: float = 0.0, failures: dict[str, int] | None = None
+    ) -> None:
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.calls: list[str] = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request: IngestionRequest) -> list:
+        with self._lock:
+            self.calls.append(request.target)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            failing = self.failures.get(request.target, 0)
+            self.failures[request.target] = failing - 1
+        try:
+            time.sleep(self.delay)
+            if failing > 0:
+                raise ConnectionError("archive unavailable")
+            return []
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _run(queue: IngestionQueue, *requests: tuple[IngestionRequest, int]):
+    async def _main():
+        accepted = [
+            await queue.enqueue(request, priority=priority)
+            for request, priority in requests
+        ]
+        await queue.start()
+        await asyncio.wait_for(queue.join(), timeout=10)
+        await queue.stop()
+        return accepted
+
+    return asyncio.run(_main())
+
+
+def test_higher_priority_runs_first():
+    fetch = FakeFetch()
+    queue = IngestionQueue(fetch, workers=1)
+    _run(
+        queue,
+        (IngestionRequest(target="low-1"), 0),
+        (IngestionRequest(target="urgent"), 5),
+        (IngestionRequest(target="low-2"), 0),
+    )
+    assert fetch.calls == ["urgent", "low-1", "low-2"]
+
+
+def test_identical_requests_are_deduplicated():
+    fetch = FakeFetch(delay=0.05)
+    queue = IngestionQueue(fetch, workers=2)
+    accepted = _run(
+        queue,
+        (IngestionRequest(target="KIC 1", mission="Kepler"), 0),
+        (IngestionRequest(target="KIC 1", mission="Kepler"), 3),
+        (IngestionRequest(target="KIC 1", mission="TESS"), 0),
+    )
+    assert accepted == [True, False, True]
+    assert sorted(fetch.calls) == ["KIC 1", "KIC 1"]
+    assert queue.stats()["deduplicated"] == 1
+    # Finished requests no longer block resubmission.
+    assert _run(queue, (IngestionRequest(target="KIC 1", mission="Kepler"), 0)) == [
+        True
+    ]
+
+
+def test_failures_retry_with_backoff_then_give_up():
+    fetch = FakeFetch(failures={"flaky": 2, "down": 10})
+    queue = IngestionQueue(fetch, workers=2, max_attempts=3, backoff_seconds=0.01)
+    _run(
+        queue,
+        (IngestionRequest(target="flaky"), 0),
+        (IngestionRequest(target="down"), 0),
+    )
+
+    assert fetch.calls.count("flaky") == 3 and fetch.calls.count("down") == 3
+    stats = queue.stats()
+    assert (stats["succeeded"], stats["failed"], stats["retried"]) == (1, 1, 4)
+
+
+def test_workers_run_in_parallel_off_the_event_loop():
+    fetch = FakeFetch(delay=0.2)
+    queue = IngestionQueue(fetch, workers=3)
+    ticks = 0
+
+    async def _main():
+        nonlocal ticks
+        await queue.start()
+        for idx in range(6):
+            await queue.enqueue(IngestionRequest(target=f"TIC {idx}"))
+        started = time.perf_counter()
+        join = asyncio.create_task(queue.join())
+        while not join.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        await queue.stop()
+        return elapsed
+
+    elapsed = asyncio.run(_main())
+    assert fetch.peak == 3
+    assert elapsed < 0.6
+    assert ticks > 20